@@ -0,0 +1,3 @@
+"""
+Benchmarks of composing, compiling, building and solving models, run with `bin/benchmark.py`.
+"""
@@ -0,0 +1,99 @@
+"""
+The benchmark cases, and the stages of solving a model which are timed for each of them.
+"""
+
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.synthetic import synthetic_cfg
+from tz.osemosys import Model
+from tz.osemosys.io.load_model import load_cfg
+from tz.osemosys.model.profiling import peak_rss
+
+# the example models; two-region-model is left out until its reserve margin validates
+EXAMPLES = {
+    "utopia": "examples/utopia/main.yaml",
+    "CAISO-ERCOT-IC": "examples/CAISO-ERCOT-IC",
+}
+
+SYNTHETIC = {
+    "synthetic-small": dict(),
+    "synthetic-medium": dict(
+        regions=4,
+        technologies=24,
+        modes=2,
+        commodities=4,
+        storage=2,
+        trade_links=8,
+        years=20,
+        timeslices=48,
+    ),
+    "synthetic-large": dict(
+        regions=8,
+        technologies=48,
+        modes=2,
+        commodities=6,
+        storage=4,
+        trade_links=16,
+        years=30,
+        timeslices=96,
+    ),
+}
+
+STAGES = ["compose", "compile", "build", "solve", "solution"]
+
+
+def case_cfg(case: str) -> Dict[str, Any]:
+    """The model config of a benchmark case."""
+    if case in EXAMPLES:
+        return load_cfg(EXAMPLES[case])
+    if case in SYNTHETIC:
+        return synthetic_cfg(**SYNTHETIC[case])
+    raise KeyError(f"Unknown benchmark case '{case}', expected one of {list(EXAMPLES | SYNTHETIC)}")
+
+
+def run_case(case: str, solver_name: str = "highs") -> Dict[str, Dict[str, Any]]:
+    """
+    Time each stage of solving the model of a benchmark case, and the growth of the peak resident
+    set size of the process during it.
+
+    The stages are composing the model from its config (`compose`), compiling its parameters
+    dataset (`compile`), building the linopy model (`build`), solving it (`solve`) and extracting
+    the solution (`solution`). Run each case in a fresh process, so that the peak memory of one
+    does not hide that of another.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: the `time` (seconds) and `peak_rss_delta` (bytes) of each stage
+    """
+    cfg = case_cfg(case)
+    models: Dict[str, Model] = {}
+
+    def compose():
+        models[case] = Model(**cfg)
+
+    def compile():
+        models[case]._build_dataset()
+
+    def solve():
+        models[case]._m.solve(solver_name=solver_name)
+        if models[case]._m.status != "ok":
+            raise RuntimeError(f"Benchmark case '{case}' did not solve")
+
+    stages: Dict[str, Callable[[], Any]] = dict(
+        compose=compose,
+        compile=compile,
+        build=lambda: models[case]._build_model(),
+        solve=solve,
+        solution=lambda: models[case]._get_solution(),
+    )
+
+    results = {}
+    for stage in STAGES:
+        rss = peak_rss()
+        start = time.perf_counter()
+        stages[stage]()
+        results[stage] = dict(
+            time=time.perf_counter() - start,
+            peak_rss_delta=peak_rss() - rss if rss is not None else None,
+        )
+    return results
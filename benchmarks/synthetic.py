@@ -0,0 +1,171 @@
+"""
+A generator of synthetic models of a given size, for benchmarking.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+
+def synthetic_cfg(
+    regions: int = 2,
+    technologies: int = 6,
+    modes: int = 1,
+    commodities: int = 2,
+    storage: int = 0,
+    trade_links: int = 0,
+    years: int = 10,
+    timeslices: int = 12,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    The config of a synthetic, feasible model, for `Model(**cfg)` or `RunSpec(**cfg)`.
+
+    Each commodity has an annual demand with a random timeslice profile. Technology `i` produces
+    commodity `i % commodities`: the first of each commodity's technologies is dispatchable, the
+    others have random capacity factors. Each further mode of a technology also consumes the
+    next commodity. Each storage unit has a technology charging it from, and discharging it to,
+    the first commodity. Trade links carry the first commodity between successive regions, in a
+    ring.
+
+    Args:
+        regions (int): the number of regions
+        technologies (int): the number of production technologies, at least `commodities`
+        modes (int): the number of operating modes of each production technology
+        commodities (int): the number of commodities
+        storage (int): the number of storage units
+        trade_links (int): the number of (directed) trade routes, at most regions * (regions - 1)
+        years (int): the number of years, from 2025
+        timeslices (int): the number of timeslices
+        seed (int): the seed of the random parameters
+
+    Returns:
+        Dict[str, Any]: the model config
+    """
+    if technologies < commodities:
+        raise ValueError("Each commodity needs at least one technology producing it")
+    if trade_links > regions * (regions - 1):
+        raise ValueError(f"{regions} regions have at most {regions * (regions - 1)} trade links")
+
+    rng = np.random.default_rng(seed)
+    region_ids = [f"R{ii:02}" for ii in range(regions)]
+    commodity_ids = [f"C{ii:02}" for ii in range(commodities)]
+    timeslice_ids = [f"T{ii:03}" for ii in range(timeslices)]
+
+    def profile(low: float) -> Dict[str, float]:
+        values = rng.uniform(low, 1, timeslices)
+        return dict(zip(timeslice_ids, values.round(4).tolist()))
+
+    def normalised_profile() -> Dict[str, float]:
+        values = rng.uniform(0.5, 1, timeslices)
+        return dict(zip(timeslice_ids, (values / values.sum()).tolist()))
+
+    cfg_commodities = [
+        dict(
+            id=commodity,
+            demand_annual=round(float(rng.uniform(10, 100)), 2),
+            demand_profile=normalised_profile(),
+        )
+        for commodity in commodity_ids
+    ]
+
+    cfg_technologies = []
+    for ii in range(technologies):
+        output = commodity_ids[ii % commodities]
+        operating_modes = []
+        for mode in range(modes):
+            operating_mode = dict(
+                id=f"M{mode}",
+                opex_variable=round(float(rng.uniform(1, 10)), 2),
+                output_activity_ratio={output: 1.0},
+                emission_activity_ratio={"CO2": round(float(rng.uniform(0, 1)), 3)},
+            )
+            if mode > 0:
+                operating_mode["input_activity_ratio"] = {
+                    commodity_ids[(ii + mode) % commodities]: round(float(rng.uniform(1, 2)), 3)
+                }
+            operating_modes.append(operating_mode)
+        technology = dict(
+            id=f"TECH{ii:03}",
+            operating_life=int(rng.integers(10, 40)),
+            capex=round(float(rng.uniform(100, 1000)), 1),
+            operating_modes=operating_modes,
+        )
+        if ii >= commodities:
+            technology["capacity_factor"] = profile(0.0)
+        cfg_technologies.append(technology)
+
+    cfg_storage = []
+    for ii in range(storage):
+        cfg_storage.append(
+            dict(id=f"STO{ii:02}", capex=round(float(rng.uniform(1, 10)), 2), operating_life=20)
+        )
+        cfg_technologies.append(
+            dict(
+                id=f"STO{ii:02}-TECH",
+                operating_life=20,
+                capex=round(float(rng.uniform(10, 100)), 1),
+                operating_modes=[
+                    dict(
+                        id="charge",
+                        input_activity_ratio={commodity_ids[0]: 1.0},
+                        to_storage={"*": {f"STO{ii:02}": True}},
+                    ),
+                    dict(
+                        id="discharge",
+                        output_activity_ratio={commodity_ids[0]: 1.0},
+                        from_storage={"*": {f"STO{ii:02}": True}},
+                    ),
+                ],
+            )
+        )
+
+    cfg_trade = None
+    if trade_links > 0:
+        # successive regions first, then further apart
+        routes: Dict[str, Dict[str, Dict[str, bool]]] = {}
+        pairs = [
+            (region_ids[ii], region_ids[(ii + step) % regions])
+            for step in range(1, regions)
+            for ii in range(regions)
+        ]
+        for origin, destination in pairs[:trade_links]:
+            routes.setdefault(origin, {})[destination] = {"*": True}
+        cfg_trade = [
+            dict(
+                id=f"{commodity_ids[0]}-trade",
+                commodity=commodity_ids[0],
+                trade_routes=routes,
+                capex=round(float(rng.uniform(10, 100)), 1),
+                operating_life=30,
+                trade_loss=0.05,
+            )
+        ]
+
+    return dict(
+        id=(
+            f"synthetic-r{regions}-t{technologies}-m{modes}-c{commodities}-s{storage}"
+            f"-l{trade_links}-y{years}-ts{timeslices}"
+        ),
+        # a single season and day type, as storage balances need them
+        time_definition=dict(
+            id="synthetic",
+            years=list(range(2025, 2025 + years)),
+            seasons=["1"],
+            day_types=["1"],
+            daily_time_brackets=[str(ii + 1) for ii in range(timeslices)],
+            timeslices=timeslice_ids,
+            timeslice_in_season={timeslice: "1" for timeslice in timeslice_ids},
+            timeslice_in_daytype={timeslice: "1" for timeslice in timeslice_ids},
+            timeslice_in_timebracket={
+                timeslice: str(ii + 1) for ii, timeslice in enumerate(timeslice_ids)
+            },
+            year_split={timeslice: 1 / timeslices for timeslice in timeslice_ids},
+        ),
+        regions=[dict(id=region) for region in region_ids],
+        commodities=cfg_commodities,
+        impacts=[dict(id="CO2")],
+        technologies=cfg_technologies,
+        storage=cfg_storage or None,
+        trade=cfg_trade,
+    )
@@ -0,0 +1,116 @@
+"""
+Benchmark composing, compiling, building, solving and extracting the solution of the example and
+synthetic models, and store the results under benchmarks/results, one file per version and commit,
+so that regressions show up between versions.
+
+usage: python bin/benchmark.py [CASE ...] [--repeats N] [--solver NAME] [--compare RESULTS]
+                               [--threshold RATIO]
+
+CASE is one of the cases in benchmarks/cases.py (default: all). With --compare, the times of each
+stage are compared against a stored results file (e.g. the committed reference run,
+benchmarks/baseline.json), and the script exits with an error if any of them is slower by more
+than --threshold.
+"""
+
+import argparse
+import datetime
+import platform
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from multiprocessing import get_context
+from pathlib import Path
+
+import orjson
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.cases import EXAMPLES, STAGES, SYNTHETIC, run_case  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def _commit() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def _run(case, solver, repeats):
+    # each repeat in a fresh process, so the peak memory of one run does not hide the next
+    runs = []
+    for _ in range(repeats):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            runs.append(pool.submit(run_case, case, solver).result())
+    return {
+        stage: dict(
+            time=min(run[stage]["time"] for run in runs),
+            peak_rss_delta=max(run[stage]["peak_rss_delta"] or 0 for run in runs),
+        )
+        for stage in STAGES
+    }
+
+
+def to_dataframe(results: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            dict(case=case, stage=stage, **values)
+            for case, stages in results["results"].items()
+            for stage, values in stages.items()
+        ]
+    ).set_index(["case", "stage"])
+
+
+def compare(results: dict, base: dict, threshold: float) -> bool:
+    """Print the ratio of the times of each stage to those of `base`; True if none regressed."""
+    ratio = (to_dataframe(results)["time"] / to_dataframe(base)["time"]).dropna()
+    table = pd.DataFrame({"ratio": ratio, "regression": ratio > threshold})
+    print(f"\ncompared with {base['version']} ({base['commit']}):")
+    with pd.option_context("display.max_rows", None, "display.float_format", "{:.2f}".format):
+        print(table)
+    return not table["regression"].any()
+
+
+def main(args):
+    cases = args.cases or list(EXAMPLES | SYNTHETIC)
+    results = dict(
+        version=version("tz-osemosys"),
+        commit=_commit(),
+        date=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        machine=platform.node(),
+        python=platform.python_version(),
+        solver=args.solver,
+        results={},
+    )
+    for case in cases:
+        print(f"running {case} ...", flush=True)
+        results["results"][case] = _run(case, args.solver, args.repeats)
+
+    table = to_dataframe(results)
+    table["peak_rss_delta"] = table["peak_rss_delta"] / 2**20
+    with pd.option_context("display.max_rows", None, "display.float_format", "{:.3f}".format):
+        print(table.rename(columns={"time": "time (s)", "peak_rss_delta": "peak_rss_delta (MiB)"}))
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{results['version']}-{results['commit']}.json"
+    path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    print(f"\nresults written to {path}")
+
+    if args.compare:
+        base = orjson.loads(Path(args.compare).read_bytes())
+        if not compare(results, base, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("cases", nargs="*")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--threshold", type=float, default=1.2)
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Benchmark wildcard composition: the vectorised `_check_set_membership` against the reference
+dataframe implementation it replaced.
+
+usage: python bin/benchmark_compose.py [--repeats N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.fixtures.compose import check_set_membership_pandas  # noqa: E402
+from tz.osemosys.schemas.base import _check_set_membership  # noqa: E402
+
+CASES = {
+    "scalar, RY (10 x 30)": (
+        1.0,
+        {"regions": [f"R{ii}" for ii in range(10)], "years": list(range(2020, 2050))},
+    ),
+    "mixed wildcards, RTY (20 x 200 x 30)": (
+        {
+            "R0": {"*": {"2020": 2.0, "*": 1.0}},
+            "*": {"T0": {"*": 3.0}, "*": {"*": 4.0}},
+        },
+        {
+            "regions": [f"R{ii}" for ii in range(20)],
+            "technologies": [f"T{ii}" for ii in range(200)],
+            "years": list(range(2020, 2050)),
+        },
+    ),
+    "explicit, RYS (10 x 30 x 96)": (
+        {
+            f"R{rr}": {
+                str(yy): {f"S{ss}": 0.1 * ss for ss in range(96)} for yy in range(2020, 2050)
+            }
+            for rr in range(10)
+        },
+        {
+            "regions": [f"R{ii}" for ii in range(10)],
+            "years": list(range(2020, 2050)),
+            "timeslices": [f"S{ii}" for ii in range(96)],
+        },
+    ),
+}
+
+
+def _time(func, data, sets, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func("benchmark", data, dict(sets))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeats):
+    print(f"{'case':<40}{'dataframe (s)':>16}{'vectorised (s)':>16}{'speedup':>10}")
+    for name, (data, sets) in CASES.items():
+        assert _check_set_membership("benchmark", data, dict(sets)) == check_set_membership_pandas(
+            "benchmark", data, dict(sets)
+        )
+        t_df = _time(check_set_membership_pandas, data, sets, repeats)
+        t_np = _time(_check_set_membership, data, sets, repeats)
+        print(f"{name:<40}{t_df:>16.4f}{t_np:>16.4f}{t_df / t_np:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args().repeats)
@@ -0,0 +1,104 @@
+"""
+The dataframe implementation of wildcard composition which the vectorised
+`_check_set_membership` replaced, kept as a reference to test it against (see
+test_compose_base.py) and to benchmark it against (see bin/benchmark_compose.py).
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from tz.osemosys.utils import group_to_json
+
+
+def check_set_membership_pandas(obj_id: str, data: Any, sets: Dict[str, List[str]]):
+    # cast 'years' to str
+    if "years" in sets.keys():
+        sets["years"] = [str(yr) for yr in sets["years"]]
+
+    if not isinstance(data, dict):
+        data = {"*": data}
+
+    # cast to dataframe
+    df = pd.json_normalize(data).T
+    cols = [f"L{ii}" for ii in list(range(max(df.index.str.split(".").str.len())))]
+    df[cols] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
+    df = df.rename(columns={0: "value"})
+
+    # assign each column to a set
+    assign_sets = list(sets.keys())
+
+    for col in cols:
+        col_vals = df.loc[df[col] != "*", col].values.tolist()
+        if col_vals:
+            renamed = False
+            for set_name, set_vals in sets.items():
+                # assign set if it has not been assigned and all the vals are in the set
+                if (set_name in assign_sets) and (len(set(col_vals) - set(set_vals)) == 0):
+                    assign_sets.remove(set_name)
+                    df = df.rename(columns={col: set_name})
+                    renamed = True
+                    break
+            if not renamed:
+                # there were values in a column that did not match any set
+                raise ValueError(
+                    f"Data for {obj_id} contains set values {col_vals} that do not match any set."
+                )
+
+    unassigned_cols = [c for c in df.columns if c not in sets.keys() if c != "value"]
+    if len(unassigned_cols) > len(assign_sets):
+        raise ValueError(
+            f"Data for {obj_id} contains more unassigned columns that there are unassigned sets."
+        )
+
+    # assign any un-assigned wildcard columns to a un-assigned sets
+    df = df.rename(
+        columns=dict(
+            zip(
+                df.columns[(df == "*").all()].values,
+                [set_name for set_name in assign_sets[: (df == "*").all().sum()]],
+            )
+        )
+    )
+
+    # if any un-assigned set remain, expand the dataframe
+    for set_name in assign_sets:
+        if set_name not in df.columns:
+            df[set_name] = "*"
+
+    # explode wildcards - need to do each set separately within group
+    ordered_columns = [c for c in df.columns if c in sets.keys()]
+
+    for col_idx in reversed(range(len(ordered_columns))):
+        group_columns = ordered_columns[:col_idx]
+        if group_columns:
+            explode_col = ordered_columns[col_idx]
+
+            # explode wildcards
+            recombine_groups = []
+            for _idx, g in df.groupby(group_columns):
+                explode_vals = [
+                    val for val in sets[explode_col] if val not in g[explode_col].values.tolist()
+                ]
+                g.loc[g[explode_col] == "*", explode_col] = g.loc[
+                    g[explode_col] == "*", explode_col
+                ].apply(
+                    lambda x: explode_vals  # noqa: B023
+                )
+                g = g.explode(explode_col)
+                recombine_groups.append(g)
+
+            df = pd.concat(recombine_groups)
+
+    # then do the root column
+    root_col = ordered_columns[0]
+    explode_vals = [val for val in sets[root_col] if val not in df[root_col].values.tolist()]
+    df.loc[df[root_col] == "*", root_col] = df.loc[df[root_col] == "*", root_col].apply(
+        lambda x: explode_vals  # noqa: B023
+    )
+    df = df.explode(root_col)
+
+    # re-json
+    data = group_to_json(df, data_columns=list(sets.keys()), target_column="value")
+
+    return data
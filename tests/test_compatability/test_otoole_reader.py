@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from tests.fixtures.paths import OTOOLE_SAMPLE_PATHS
+from tz.osemosys.schemas.compat.reader import OtooleReader
+
+
+def test_otoole_reader():
+    for path in OTOOLE_SAMPLE_PATHS:
+        reader = OtooleReader(path, memory_map_size=0).prefetch()
+
+        assert reader.stems() == sorted(p.stem for p in Path(path).glob("*.csv"))
+
+        df = reader.read("OutputActivityRatio")
+        assert isinstance(df["TECHNOLOGY"].dtype, pd.CategoricalDtype)
+        assert df["YEAR"].dtype == "int64"
+        assert df["MODE_OF_OPERATION"].dtype == "int64"
+        assert reader.read("TECHNOLOGY")["VALUE"].dtype == object
+        assert reader.read("YEAR")["VALUE"].dtype == "int64"
+
+        # readers are given a copy of the shared frame
+        df["VALUE"] = 0
+        assert not (reader.read("OutputActivityRatio")["VALUE"] == 0).all()
+
+        with pytest.raises(FileNotFoundError):
+            reader.read("NotAStem")
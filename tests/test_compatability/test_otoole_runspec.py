@@ -5,6 +5,8 @@ import pandas as pd
 
 from tests.fixtures.paths import OTOOLE_SAMPLE_PATHS
 from tz.osemosys.schemas import RunSpec
+from tz.osemosys.schemas.compat.reader import OtooleParquetReader, polars_to_pandas
+from tz.osemosys.schemas.compat.writer import pandas_to_polars
 
 
 def test_files_equality():
@@ -72,3 +74,73 @@ def check_files_equality(original_files, comparison_files):
             print("---------- comparison_df_sorted ----------")
             print(comparison_df_sorted.head(10))
             raise
+
+
+def test_parquet_roundtrip(tmp_path):
+    """
+    Check the otoole tables of a RunSpec are unchanged after writing to and reading from parquet
+    """
+
+    for path in OTOOLE_SAMPLE_PATHS:
+        output_directory = tmp_path / Path(path).name
+        output_directory.mkdir()
+
+        spec = RunSpec.from_otoole_csv(root_dir=path)
+        spec.to_parquet(output_directory=output_directory)
+
+        dfs = spec.to_otoole_csv_dataframes()
+        reader = OtooleParquetReader(output_directory)
+        assert reader.stems() == sorted(dfs)
+
+        for stem, df in dfs.items():
+            table = reader.read(stem)
+            assert list(table.columns) == list(df.columns), stem
+            if "TECHNOLOGY" in table.columns and not table.empty:
+                assert isinstance(table["TECHNOLOGY"].dtype, pd.CategoricalDtype)
+            if "YEAR" in table.columns:
+                assert pd.api.types.is_integer_dtype(table["YEAR"]), stem
+            check_values_equality(stem, table, df)
+
+    path = "examples/otoole_compat/input_csv/otoole-full-electricity-complete"
+    spec = RunSpec.from_otoole_csv(root_dir=path)
+    reloaded = RunSpec.from_parquet(root_dir=tmp_path / Path(path).name, id=spec.id)
+
+    assert [t.id for t in reloaded.technologies] == [t.id for t in spec.technologies]
+    assert reloaded.time_definition.years == spec.time_definition.years
+    dfs, reloaded_dfs = spec.to_otoole_csv_dataframes(), reloaded.to_otoole_csv_dataframes()
+    assert sorted(dfs) == sorted(reloaded_dfs)
+    for stem, df in dfs.items():
+        check_values_equality(stem, reloaded_dfs[stem], df)
+
+
+def check_values_equality(stem, df, expected):
+    """
+    Check the VALUE columns of two otoole tables are equal, as floats for parameters.
+    """
+    # Cast all parameter values to floats, and set members to str
+    dtype = str if stem.isupper() else float
+    pd.testing.assert_series_equal(
+        df["VALUE"].reset_index(drop=True).astype(dtype),
+        expected["VALUE"].reset_index(drop=True).astype(dtype),
+        check_names=False,
+    )
+
+
+def test_parquet_labels():
+    """
+    Check label columns are converted to and from polars through their codes and distinct labels
+    """
+    df = pd.DataFrame(
+        {
+            "REGION": pd.Categorical(["R2", "R1", None, "R2"]),
+            "TECHNOLOGY": ["T2", "T1", None, "T1"],
+            "TIMESLICE": ["b", "a", None, "b"],
+            "YEAR": [2020, 2021, 2020, 2021],
+            "VALUE": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+    reloaded = polars_to_pandas(pandas_to_polars(df, "CapacityFactor"))
+
+    expected = df.astype({"TECHNOLOGY": "category"})
+    pd.testing.assert_frame_equal(reloaded, expected)
+    assert list(reloaded["TECHNOLOGY"].cat.categories) == ["T1", "T2"]
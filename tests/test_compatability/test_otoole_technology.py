@@ -4,6 +4,7 @@ import pandas as pd
 
 from tests.fixtures.paths import OTOOLE_SAMPLE_PATHS
 from tz.osemosys.schemas.technology import Technology
+from tz.osemosys.utils import group_to_json, group_to_json_by_root
 
 
 def test_otoole_roundtrip():
@@ -43,3 +44,24 @@ def test_otoole_roundtrip():
                         print(right)
 
                     assert left.equals(right)
+
+
+def test_group_to_json_by_root():
+    for path in OTOOLE_SAMPLE_PATHS:
+        for stem, params in Technology.otoole_stems.items():
+            try:
+                df = pd.read_csv(Path(path) / f"{stem}.csv")
+            except FileNotFoundError:
+                continue
+            data_columns = [c for c in params["columns"] if c not in ["TECHNOLOGY", "VALUE"]]
+
+            grouped = group_to_json_by_root(df, root_column="TECHNOLOGY", data_columns=data_columns)
+
+            assert list(grouped.keys()) == df["TECHNOLOGY"].unique().tolist()
+            for technology, data in grouped.items():
+                assert data == group_to_json(
+                    g=df.loc[df["TECHNOLOGY"] == technology],
+                    root_column="TECHNOLOGY",
+                    data_columns=data_columns,
+                    target_column="VALUE",
+                )
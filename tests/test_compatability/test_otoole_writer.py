@@ -0,0 +1,38 @@
+import pandas as pd
+
+from tz.osemosys.schemas.base import OSeMOSYSData
+from tz.osemosys.schemas.compat.writer import StemFrames
+
+OTOOLE_STEMS = {
+    "Param": {"attribute": "param", "columns": ["REGION", "TECHNOLOGY", "YEAR", "VALUE"]},
+}
+
+
+def test_stem_frames():
+    frames = StemFrames(OTOOLE_STEMS)
+    assert "Param" not in frames
+    assert frames.to_dataframe("Param").columns.tolist() == OTOOLE_STEMS["Param"]["columns"]
+
+    composed = OSeMOSYSData.RY({"R1": {"*": 1.0}}).compose(
+        "a", {"R1": {"*": 1.0}}, regions=["R1", "R2"], years=[2020, 2021]
+    )
+    frames.add("Param", composed, ["REGION", "YEAR"], TECHNOLOGY="a")
+    frames.add("Param", OSeMOSYSData.RY({"R2": {"2020": 2}}), ["REGION", "YEAR"], TECHNOLOGY="b")
+    frames.add(
+        "Param",
+        OSeMOSYSData.RY({"R1": {"2020": 3}, "R2": {"2020": 4}}),
+        ["REGION", "YEAR"],
+        subset={"REGION": ["R2"]},
+        TECHNOLOGY="c",
+    )
+
+    expected = pd.DataFrame(
+        {
+            "REGION": ["R1", "R1", "R2", "R2"],
+            "TECHNOLOGY": ["a", "a", "b", "c"],
+            "YEAR": ["2020", "2021", "2020", "2020"],
+            "VALUE": [1.0, 1.0, 2.0, 4.0],
+        }
+    )
+    pd.testing.assert_frame_equal(frames.to_dataframe("Param"), expected, check_dtype=False)
+    assert list(frames.to_dataframes()) == ["Param"]
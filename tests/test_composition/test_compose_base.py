@@ -1,11 +1,12 @@
 import pytest
 
+from tests.fixtures.compose import check_set_membership_pandas
 from tz.osemosys.schemas.base import _check_set_membership
 from tz.osemosys.schemas.commodity import Commodity
 from tz.osemosys.schemas.impact import Impact
 from tz.osemosys.schemas.storage import Storage
 from tz.osemosys.schemas.technology import Technology
-from tz.osemosys.utils import recursive_keys
+from tz.osemosys.utils import broadcast_wildcards, recursive_keys
 
 PASSING_COMMODITIES = dict(
     most_basic=dict(
@@ -211,6 +212,91 @@ def test_compose_dim3():
     assert new_data == target
 
 
+@pytest.mark.parametrize(
+    "data,sets",
+    [
+        (1.5, {"regions": ["R1", "R2"], "years": [2025, 2026]}),
+        ({"*": {"2025": 1, "*": 2.5}}, {"regions": ["R1", "R2"], "years": [2025, 2026]}),
+        ({"R2": {"2026": True, "*": False}}, {"regions": ["R1", "R2"], "years": [2025, 2026]}),
+        ({"2026": {"R1": 3}}, {"regions": ["R1", "R2"], "years": [2025, 2026]}),
+        (
+            {"R1": {"*": {"T1": 1}}, "*": {"C1": {"*": 2}, "*": {"T2": 3}}},
+            {"regions": ["R1", "R2"], "commodities": ["C1", "C2"], "technologies": ["T1", "T2"]},
+        ),
+        (
+            {"*": {"*": {"S1": None, "*": 0.5}}},
+            {"regions": ["R1"], "years": [2025, 2026], "timeslices": ["S1", "S2"]},
+        ),
+    ],
+)
+def test_compose_matches_dataframe_implementation(data, sets):
+    assert _check_set_membership("no-id", data, dict(sets)) == check_set_membership_pandas(
+        "no-id", data, dict(sets)
+    )
+
+
+def test_compose_empty_wildcard():
+    # a wildcard with no remaining set members adds no data
+    new_data = _check_set_membership(
+        "no-id", {"R1": {"*": 1, "2025": 2}}, {"regions": ["R1"], "years": [2025]}
+    )
+
+    assert new_data == {"R1": {"2025": 2}}
+
+
+def test_compose_wildcard_large_sets():
+    # two prefixes whose mixed-radix keys over the sets differ by exactly 2**64, so would collide
+    # in int64 if the keys were not re-densified at each level
+    members = [f"x{ii}" for ii in range(1000)]
+    sets = {f"set{level}": members for level in range(7)}
+    sets["last"] = ["a", "b"]
+
+    def nest(codes, leaf):
+        for code in reversed(codes):
+            leaf = {f"x{code}": leaf}
+        return leaf
+
+    data = nest([0, 0, 214, 0, 238, 500, 0], {"*": 1.0})
+    data.update(nest([18, 337, 0, 197, 0, 0, 16], {"a": 2.0}))
+    _, codes, values = broadcast_wildcards("no-id", data, sets)
+
+    # the wildcard of the first prefix is not excluded by the explicit key of the second
+    cells = sorted(zip(codes[:, 0].tolist(), codes[:, -1].tolist(), values.tolist()))
+    assert cells == [(0, 0, 1.0), (0, 1, 1.0), (18, 0, 2.0)]
+
+
+def test_composed_data_arrays():
+    new_data = _check_set_membership(
+        "no-id",
+        {"R1": {"2025": 1.0, "*": 2.0}},
+        {"regions": ["R1", "R2"], "years": [2025, 2026]},
+    )
+
+    assert new_data.dims == ("regions", "years")
+    assert new_data.values.shape == (2, 2)
+    assert new_data.mask.tolist() == [[True, True], [False, False]]
+    assert list(new_data.keys()) == ["R1"]
+    assert new_data["R1"]["2026"] == 2.0
+    assert "R2" not in new_data
+    assert new_data.to_dict() == {"R1": {"2025": 1.0, "2026": 2.0}}
+
+    df = new_data.to_dataframe(["REGION", "YEAR"], TECHNOLOGY="T1")
+    assert df.columns.tolist() == ["VALUE", "TECHNOLOGY", "REGION", "YEAR"]
+    assert df["YEAR"].tolist() == ["2025", "2026"]
+
+
+def test_composed_data_model_dump():
+    commodity = Commodity(**PASSING_COMMODITIES["most_basic"]["params"])
+    commodity.compose(**PASSING_COMMODITIES["most_basic"]["sets"])
+
+    dumped = commodity.model_dump()["demand_annual"]["data"]
+    assert isinstance(dumped, dict)
+    assert dumped == {
+        "R1": {"2025": 5, "2026": 5, "2027": 5},
+        "R2": {"2025": 5, "2026": 5, "2027": 5},
+    }
+
+
 def test_compose_impact():
     for _name, data in PASSING_IMPACTS.items():
         impact = Impact(**data["params"])
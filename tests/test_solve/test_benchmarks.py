@@ -0,0 +1,11 @@
+from benchmarks.cases import STAGES, run_case
+
+
+def test_benchmark_case():
+    # the benchmark cases drive the stages of building a model directly, so a change to the
+    # internals of Model must keep them running
+    results = run_case("synthetic-small")
+
+    assert list(results) == STAGES
+    for stage in STAGES:
+        assert results[stage]["time"] > 0
@@ -0,0 +1,34 @@
+import numpy as np
+import xarray as xr
+
+from tz.osemosys import Model
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_bounds():
+    name = "NCC1_TotalAnnualMaxNewCapacityConstraint"
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+
+    # limit the new capacity of each technology to half of what it builds
+    built = model.solution["NewCapacity"]
+    limit = (built / 2).where(built > 1)
+    model.update_parameters(TotalAnnualMaxCapacityInvestment=limit)
+    model.solve(solver_name="highs")
+    assert name not in model._m.constraints
+    assert (model.solution["NewCapacity"] <= limit + 1e-6).where(limit.notnull(), True).all()
+
+    # the dual of the folded constraint is that of the same constraint posted as a row
+    rows = Model.from_yaml(EXAMPLE_YAML)
+    rows._data = model._data.copy()
+    rows._build_model()
+    m = rows._m
+    m.variables["NewCapacity"].upper = np.inf
+    m.add_constraints(m["NewCapacity"] <= limit, name=name, mask=limit.notnull())
+    m.solve(solver_name="highs")
+    assert np.isclose(m.objective.value, model._m.objective.value)
+
+    dual = model.lazy_solution[name]
+    assert (dual < 0).any()
+    xr.testing.assert_allclose(dual, m.constraints[name].dual.transpose(*dual.dims), atol=1e-6)
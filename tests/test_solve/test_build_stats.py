@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import orjson
+
+from tz.osemosys import Model
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_build_stats(tmp_path: Path):
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+    model.solution
+
+    stats = model.build_stats.to_dataframe().set_index("stage")
+    for stage in ["build_dataset", "add_variables", "add_constraints", "solve", "build_solution"]:
+        assert stats.loc[stage, "wall_time"] > 0
+    assert stats.loc["solve", "solver_time"] <= stats.loc["solve", "wall_time"]
+
+    # each group of constraints is recorded within the stage adding them all
+    groups = stats[stats.parent == "add_constraints"]
+    assert groups.constraints.sum() == stats.loc["add_constraints", "constraints"]
+    assert stats.loc["add_constraints", "constraints"] == model._m.constraints.ncons
+    assert stats.loc["add_variables", "variables"] == model._m.variables.nvars
+
+    model.build_stats.to_chrome_trace(tmp_path / "build.trace.json")
+    model.build_stats.to_speedscope(tmp_path / "build.speedscope.json")
+    trace = orjson.loads((tmp_path / "build.trace.json").read_bytes())
+    assert len(trace["traceEvents"]) == len(stats)
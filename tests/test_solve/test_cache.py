@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+import xarray as xr
+
+from tz.osemosys import CompileCache, Model
+from tz.osemosys.model import cache as cache_module
+from tz.osemosys.model.cache import spec_hash
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_solve_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = CompileCache(tmp_path, store_model=True)
+
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs", cache=cache)
+    assert len(cache.entries()) == 1
+
+    cached = Model.from_yaml(EXAMPLE_YAML)
+    cached.solve(solver_name="highs", cache=cache)
+    assert len(cache.entries()) == 1
+    xr.testing.assert_identical(cached._data, model._data)
+    xr.testing.assert_identical(cached.solution, model.solution)
+
+    # a changed model is a new entry, evicting the least recently used one
+    (key,) = cache.entries()
+    changed = Model.from_yaml(EXAMPLE_YAML)
+    changed.id = "utopia-changed"
+    cache.max_size = cache.entries()[key][1]
+    changed._build(cache=cache)
+    assert key not in cache.entries()
+    assert len(cache.entries()) == 1
+
+    # entries are keyed by the code which built them, as well as by the spec
+    key = spec_hash(changed)
+    monkeypatch.setattr(cache_module, "CACHE_FORMAT_VERSION", cache_module.CACHE_FORMAT_VERSION + 1)
+    assert spec_hash(changed) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache_module, "build_source_hash", lambda: "changed")
+    assert spec_hash(changed) != key
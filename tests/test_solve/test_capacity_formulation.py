@@ -0,0 +1,27 @@
+import numpy as np
+import xarray as xr
+
+from tz.osemosys import Model
+from tz.osemosys.io.load_model import load_cfg
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_capacity_formulation():
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+
+    recursive = Model(**load_cfg(EXAMPLE_YAML), capacity_formulation="recursive")
+    size = recursive.estimate_size()
+    recursive.solve(solver_name="highs")
+    assert "GrossCapacityRecursion" in recursive._m.constraints
+    assert size.nonzeros.sum() < model.estimate_size().nonzeros.sum()
+
+    # the gross capacities are variables, with the same solution
+    assert np.isclose(recursive.objective, model.objective)
+    for name in ["GrossCapacity", "NewCapacity", "GrossStorageCapacity"]:
+        xr.testing.assert_allclose(
+            recursive.solution[name].transpose(*model.solution[name].dims),
+            model.solution[name],
+            atol=1e-6,
+        )
@@ -0,0 +1,41 @@
+import xarray as xr
+
+from tz.osemosys import Model
+from tz.osemosys.model.tech_modes import densify_tech_modes, tech_modes
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_lazy_solution():
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs", solution_vars=["NewCapacity"])
+
+    # only the objective is evaluated by the solve
+    lazy = model.lazy_solution
+    assert set(lazy._cache) == {"TotalDiscountedCost"}
+    assert "RateOfProductionByTechnologyByMode" in lazy
+    production = lazy["RateOfProductionByTechnologyByMode"]
+    assert lazy["RateOfProductionByTechnologyByMode"] is production
+    # evaluated by a sparse matrix-vector product, as linopy evaluates it by broadcasting, and
+    # reshaped from the operating modes of each technology onto TECHNOLOGY x MODE_OF_OPERATION
+    expected = densify_tech_modes(
+        model._linear_expressions["RateOfProductionByTechnologyByMode"].solution,
+        tech_modes(model._data),
+        model._data.coords,
+        fill_value=0,
+    )
+    xr.testing.assert_allclose(production, expected.rename("RateOfProductionByTechnologyByMode"))
+    assert production.dims == (
+        "REGION",
+        "YEAR",
+        "FUEL",
+        "TECHNOLOGY",
+        "MODE_OF_OPERATION",
+        "TIMESLICE",
+    )
+
+    assert sorted(model.solution.data_vars) == ["NewCapacity", "TotalDiscountedCost"]
+    xr.testing.assert_equal(
+        model.solution["NewCapacity"], model._m.variables["NewCapacity"].solution
+    )
+    assert "RateOfProductionByTechnologyByMode" in lazy.to_dataset()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from tz.osemosys import Commodity, Impact, Model, OperatingMode, Region, Technology, TimeDefinition
+
+
+def annual_model():
+    """
+    Ten annual years of a constant demand, met by gas generation with a variable cost and an
+    emission, so that the operation of every year is the same.
+    """
+    return Model(
+        id="annual",
+        time_definition=TimeDefinition(id="annual", years=range(2020, 2030)),
+        regions=[Region(id="R1")],
+        commodities=[Commodity(id="electricity", demand_annual=10)],
+        impacts=[Impact(id="CO2")],
+        technologies=[
+            Technology(
+                id="gas-gen",
+                operating_life=30,
+                capex=50,
+                capacity_activity_unit_ratio=1,
+                operating_modes=[
+                    OperatingMode(
+                        id="generation",
+                        opex_variable=10,
+                        output_activity_ratio={"electricity": 1.0},
+                        emission_activity_ratio={"CO2": 0.5},
+                    )
+                ],
+            ),
+        ],
+    )
+
+
+def test_milestone_years_all_years():
+    model = annual_model()
+    model.solve()
+
+    milestones = model.select_milestone_years(model.time_definition.years)
+    assert set(milestones.time_definition.year_weight.values()) == {1.0}
+    milestones.solve()
+
+    assert np.isclose(milestones.objective, model.objective)
+
+
+def test_milestone_years():
+    model = annual_model()
+    model.solve()
+
+    milestones = model.select_milestone_years([2020, 2025])
+    assert milestones.time_definition.years == [2020, 2025]
+    assert milestones.time_definition.year_weight == {2020: 5.0, 2025: 5.0}
+    milestones.solve()
+
+    # the operation of each milestone year stands for that of the five years it represents
+    assert np.isclose(milestones.objective, model.objective)
+    assert np.isclose(
+        milestones.solution.ProductionByTechnology.sum(),
+        model.solution.ProductionByTechnology.sum() / 5,
+    )
+
+
+def test_milestone_years_not_in_spec():
+    with pytest.raises(ValueError):
+        annual_model().select_milestone_years([2020, 2035])
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import xarray as xr
+
+from tz.osemosys import Model
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_read_netcdf(tmp_path: Path):
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+    model.save_netcdf(tmp_path / "model.solve.nc")
+
+    read = Model.read_netcdf(tmp_path / "model.solve.nc")
+    assert read.id == model.id
+    assert read.objective == model.objective
+    xr.testing.assert_identical(read._data.load(), model._data)
+    xr.testing.assert_identical(read.solution.load(), model.solution)
+
+    read = Model.read_netcdf(tmp_path / "model.solve.nc", chunks={})
+    assert read.solution["NewCapacity"].chunks is not None
+
+    model.save_netcdf(
+        tmp_path / "model.compressed.nc", compression="zlib", chunks={"YEAR": 5}, sparse=True
+    )
+    assert (tmp_path / "model.compressed.nc").stat().st_size < (
+        tmp_path / "model.solve.nc"
+    ).stat().st_size
+
+    read = Model.read_netcdf(tmp_path / "model.compressed.nc")
+    xr.testing.assert_identical(read._data.load(), model._data)
+    xr.testing.assert_identical(read.solution.load(), model.solution)
@@ -0,0 +1,80 @@
+import numpy as np
+import xarray as xr
+
+from tz.osemosys import Model
+from tz.osemosys.io.load_model import load_cfg
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def hydrogen_cfg():
+    cfg = load_cfg(EXAMPLE_YAML)
+    # without storage, as technologies are only dropped from models without, see `reduce_dataset`
+    del cfg["storage"]
+    cfg["technologies"] = [tech for tech in cfg["technologies"] if tech["id"] != "STO_DAM"]
+    # hydrogen vehicles, fuelled only by electrolysers which may not be built
+    cfg["commodities"].append({"id": "H2", "long_name": "Hydrogen"})
+    cfg["technologies"] += [
+        {
+            "id": "ELZ",
+            "long_name": "Electrolyser producing hydrogen",
+            "capex": 500,
+            "operating_life": 20,
+            "capacity_gross_max": 0,
+            "operating_modes": [
+                {
+                    "id": "ELECTROLYSIS",
+                    "input_activity_ratio": {"ELC": 1.4},
+                    "output_activity_ratio": {"H2": 1.0},
+                }
+            ],
+        },
+        {
+            "id": "TXH",
+            "long_name": "Transport in passenger km consuming hydrogen",
+            "capex": 10,
+            "operating_life": 15,
+            "operating_modes": [
+                {
+                    "id": "TRAVEL",
+                    "input_activity_ratio": {"H2": 1.0},
+                    "output_activity_ratio": {"TX": 1.0},
+                }
+            ],
+        },
+    ]
+    return cfg
+
+
+
+def test_model_reduction():
+    model = Model(**hydrogen_cfg(), reduce=True)
+    model.solve(solver_name="highs")
+    full = Model(**hydrogen_cfg())
+    full.solve(solver_name="highs")
+
+    # the technologies, fuel and mode which cannot be used are dropped before building
+    assert not {"ELZ", "TXH"} & set(model._data.coords["TECHNOLOGY"].values)
+    assert "H2" not in model._data.coords["FUEL"]
+    assert "ELECTROLYSIS" not in model._data.coords["MODE_OF_OPERATION"]
+    assert model._m.variables.nvars < full._m.variables.nvars
+    assert model._m.constraints.ncons < full._m.constraints.ncons
+    assert np.isclose(model.objective, full.objective)
+
+    # the solution is over the full labels, with no value for the variables of those dropped and
+    # zero for their linear expressions, as off the operating modes of each technology
+    assert model.solution["NewCapacity"].sel(TECHNOLOGY=["ELZ", "TXH"]).isnull().all()
+    assert model.solution["ProductionByTechnology"].sel(TECHNOLOGY=["ELZ", "TXH"]).sum() == 0
+    for name in ["NewCapacity", "ProductionByTechnology", "TotalAnnualTechnologyActivityByMode"]:
+        solution = model.solution[name].fillna(0)
+        xr.testing.assert_allclose(
+            solution.transpose(*full.solution[name].dims), full.solution[name].fillna(0), atol=1e-6
+        )
+
+    # the model is rebuilt if an update lets the electrolysers be built
+    limit = xr.DataArray([1.0], coords={"TECHNOLOGY": ["ELZ"]})
+    for m in [model, full]:
+        m.update_parameters(TotalAnnualMaxCapacity=limit)
+        m.solve(solver_name="highs")
+    assert "ELZ" in model._data.coords["TECHNOLOGY"]
+    assert np.isclose(model.objective, full.objective)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from tz.osemosys import Model
+from tz.osemosys.model.rolling import window_dataset
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_solve_rolling():
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+
+    # a single window is the whole model
+    single = Model.from_yaml(EXAMPLE_YAML)
+    single.solve_rolling(window=len(model._data.YEAR), solver_name="highs")
+    assert np.isclose(single.objective, model.objective)
+
+    rolling = Model.from_yaml(EXAMPLE_YAML)
+    status, condition = rolling.solve_rolling(window=10, overlap=5, solver_name="highs")
+    assert condition == "optimal"
+    np.testing.assert_array_equal(rolling.solution.YEAR, model.solution.YEAR)
+    # myopic foresight can only be as good as perfect foresight
+    assert rolling.objective >= model.objective - 1e-6
+    # each window records its own build stats, not the model's
+    assert "add_variables" not in rolling.build_stats.to_dataframe()["stage"].values
+
+    # a window starts from the storage level at the end of the last committed year, at the last
+    # timeslice of the dataset, whatever the order of the committed values
+    years = model._data.YEAR.values.tolist()
+    level = model.lazy_solution["StorageLevel"]
+    committed = {"StorageLevel": level.sel(YEAR=years[:5]).isel(TIMESLICE=slice(None, None, -1))}
+    start = window_dataset(model._data, years[5:10], committed)["StorageLevelStart"]
+    end = level.sel(YEAR=years[4], TIMESLICE=model._data.TIMESLICE.values[-1])
+    np.testing.assert_allclose(start.values, end.transpose(*start.dims).values)
+
+    with pytest.raises(ValueError):
+        rolling.solve_rolling(window=5, overlap=5, solver_name="highs")
@@ -0,0 +1,23 @@
+import pytest
+
+from tz.osemosys import Model
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_estimate_size():
+    model = Model.from_yaml(EXAMPLE_YAML)
+    size = model.estimate_size()
+
+    with pytest.raises(MemoryError):
+        model.solve(solver_name="highs", max_memory=2**10)
+    assert not hasattr(model, "_m")
+
+    model.solve(solver_name="highs", max_memory=2**30)
+    for name, block in size.iterrows():
+        built = model._m.variables if block.kind == "variable" else model._m.constraints
+        labels = built[name].labels.values
+        assert block.rows == (labels != -1).sum()
+        assert block.cells == labels.size
+        if block.kind == "constraint":
+            assert block.nonzeros == (built[name].vars.values != -1)[labels != -1].sum()
@@ -4,6 +4,7 @@ import numpy as np
 import xarray as xr
 
 from tz.osemosys import Commodity, Model, OperatingMode, Region, Storage, Technology, TimeDefinition
+from tz.osemosys.model.links import densify_links, trade_links
 
 EXAMPLE_YAML = "examples/utopia/main.yaml"
 
@@ -43,14 +44,15 @@ def test_model_save_netcdf(tmp_path: Path):
     model.save_netcdf(tmp_path / "model.build.nc")
     assert hasattr(model, "_data")
     model.solve(solver_name="highs")
-    assert model._solution is not None
+    assert model.solution is not None
     model.save_netcdf(tmp_path / "model.solve.nc")
 
-    ds = xr.load_dataset(tmp_path / "model.solve.nc")
+    data = xr.load_dataset(tmp_path / "model.solve.nc", group="data")
     for var in model._data:
-        xr.testing.assert_identical(ds[var], model._data[var])
-    for var in model._solution:
-        xr.testing.assert_identical(ds[var], model._solution[var])
+        xr.testing.assert_identical(data[var], model._data[var])
+    solution = xr.load_dataset(tmp_path / "model.solve.nc", group="solution")
+    for var in model.solution:
+        xr.testing.assert_identical(solution[var], model.solution[var])
 
 
 def test_most_simple():
@@ -674,18 +676,20 @@ def test_trade_masking():
     )
 
     model._build()
-    # There should be no self-trade
-    assert not model._m.variables["Import"].mask.sel(REGION="R1", _REGION="R1").any()
-    assert not model._m.variables["Export"].mask.sel(REGION="R2", _REGION="R2").any()
-    # Import mask should be transpose of Export mask in (REGION, _REGION) dims
-    assert (
-        model._m.variables["Export"].mask.sel(REGION="R1").to_numpy()
-        == model._m.variables["Import"].mask.sel(_REGION="R1").to_numpy()
-    ).all()
-    assert (
-        model._m.variables["Export"].mask.sel(REGION="R2").to_numpy()
-        == model._m.variables["Import"].mask.sel(_REGION="R2").to_numpy()
-    ).all()
+    export = model._m.variables["Export"]
+    links = trade_links(model._data)
+    # Trade is only indexed by the trade links, so there should be no self-trade
+    assert export.labels.dims[0] == "LINK"
+    assert set(zip(links["REGION"].values, links["_REGION"].values)) == {
+        ("R1", "R2"),
+        ("R2", "R1"),
+    }
+    # Import should share the links of Export, and each link only be open in its years
+    assert (export.mask == model._m.variables["Import"].mask).all()
+    mask = densify_links(export.mask.any("TIMESLICE"), links)
+    assert mask.sel(REGION="R1", _REGION="R2", YEAR=2020).all()
+    assert not mask.sel(REGION="R1", _REGION="R2", YEAR=2021).any()
+    assert mask.sel(REGION="R2", _REGION="R1", YEAR=2021).all()
     # Masking should also be applied on constraints
     assert model._m.constraints["EBa10_EnergyBalanceEachTS4_trn"].mask is not None
 
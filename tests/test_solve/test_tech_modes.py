@@ -0,0 +1,48 @@
+import numpy as np
+
+from tz.osemosys import Model
+from tz.osemosys.model.tech_modes import tech_modes
+
+
+def test_tech_mode_index():
+    model = Model(
+        id="test-tech-mode-index",
+        time_definition=dict(id="years-only", years=range(2020, 2022)),
+        regions=[dict(id="single-region")],
+        impacts=[],
+        commodities=[dict(id="electricity", demand_annual=10), dict(id="heat", demand_annual=5)],
+        technologies=[
+            dict(
+                id="chp",
+                capex=100,
+                operating_modes=[
+                    dict(id="power", opex_variable=2, output_activity_ratio={"electricity": 1}),
+                    dict(id="heat", opex_variable=1, output_activity_ratio={"heat": 1}),
+                ],
+            ),
+            dict(
+                id="gen",
+                capex=200,
+                operating_modes=[
+                    dict(id="power", opex_variable=1, output_activity_ratio={"electricity": 1})
+                ],
+            ),
+        ],
+    )
+
+    model.solve(solver_name="highs", solution_vars="all")
+    # Activity is only indexed by the operating modes each technology has
+    activity = model._m.variables["RateOfActivity"]
+    assert activity.dims == ("REGION", "TECH_MODE", "YEAR", "TIMESLICE")
+    modes = tech_modes(model._data)
+    assert set(zip(modes["TECHNOLOGY"].values, modes["MODE_OF_OPERATION"].values)) == {
+        ("chp", "power"),
+        ("chp", "heat"),
+        ("gen", "power"),
+    }
+    # and its solution is reshaped onto TECHNOLOGY x MODE_OF_OPERATION
+    solution = model.solution["RateOfActivity"]
+    assert solution.dims == ("REGION", "TECHNOLOGY", "MODE_OF_OPERATION", "YEAR", "TIMESLICE")
+    assert solution.sel(TECHNOLOGY="gen", MODE_OF_OPERATION="heat").isnull().all()
+    heat = model.solution["RateOfProductionByTechnology"].sel(TECHNOLOGY="chp", FUEL="heat")
+    assert np.allclose(heat.sum("TIMESLICE"), 5)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from tz.osemosys import Commodity, Model, OperatingMode, Region, Technology, TimeDefinition
+from tz.osemosys.schemas.aggregation import disaggregate_timeslices
+
+TIMESLICES = [f"h{ii:03}" for ii in range(24 * 14)]
+
+
+def hourly_model():
+    """
+    Two weeks of hourly timeslices, with a demand which is higher at weekends and solar which is
+    stronger every third day, so that there are exactly four distinct days.
+    """
+    hours = np.arange(len(TIMESLICES)) % 24
+    days = np.arange(len(TIMESLICES)) // 24
+    demand = 1 + 0.5 * np.sin(hours / 24 * 2 * np.pi) + 0.3 * (days % 7 >= 5)
+    solar = np.clip(np.sin((hours - 6) / 12 * np.pi), 0, None) * (0.5 + 0.5 * (days % 3 == 0))
+
+    return Model(
+        id="hourly",
+        time_definition=TimeDefinition(id="hourly", years=range(2020, 2023), timeslices=TIMESLICES),
+        regions=[Region(id="R1")],
+        commodities=[
+            Commodity(
+                id="electricity",
+                demand_annual=100,
+                demand_profile=dict(zip(TIMESLICES, (demand / demand.sum()).tolist())),
+            )
+        ],
+        impacts=[],
+        technologies=[
+            Technology(
+                id="solar-pv",
+                operating_life=20,
+                capex=100,
+                capacity_factor=dict(zip(TIMESLICES, solar.tolist())),
+                operating_modes=[
+                    OperatingMode(id="generation", output_activity_ratio={"electricity": 1.0})
+                ],
+            ),
+            Technology(
+                id="gas-gen",
+                operating_life=20,
+                capex=50,
+                operating_modes=[
+                    OperatingMode(
+                        id="generation",
+                        opex_variable=10,
+                        output_activity_ratio={"electricity": 1.0},
+                    )
+                ],
+            ),
+        ],
+    )
+
+
+@pytest.mark.parametrize("method", ["kmeans", "kmedoids"])
+def test_aggregate_timeslices(method):
+    model = hourly_model()
+    model.solve(solver_name="highs")
+
+    reduced, timeslice_map = model.aggregate_timeslices(4, period_length=24, method=method)
+    assert isinstance(reduced, Model)
+
+    time_definition = reduced.time_definition
+    assert len(time_definition.timeslices) == 4 * 24
+    assert np.isclose(sum(time_definition.year_split.values()), 1)
+    assert timeslice_map.sizes["TIMESLICE"] == len(TIMESLICES)
+
+    # a day of each day type, as OSeMOSYS counts days in a week, with the periods each stands
+    # for in its year split
+    assert set(time_definition.days_in_day_type.values()) == {1}
+    year_split = np.asarray(list(time_definition.year_split.values())).reshape(4, 24)
+    day_split = np.asarray(list(time_definition.day_split.values()))
+    counts = [(timeslice_map.values == f"{period}-1").sum() for period in time_definition.day_types]
+    assert sum(counts) == 14
+    assert np.allclose(year_split / day_split, np.asarray(counts)[:, None])
+
+    # the four distinct days are represented exactly
+    reduced.solve(solver_name="highs")
+    assert np.isclose(reduced.objective, model.objective)
+
+    production = disaggregate_timeslices(reduced.solution["ProductionByTechnology"], timeslice_map)
+    assert list(production.TIMESLICE.values) == TIMESLICES
+
+
+def test_aggregate_timeslices_invalid():
+    model = hourly_model()
+    with pytest.raises(ValueError):
+        model.aggregate_timeslices(4, period_length=25)
+    with pytest.raises(ValueError):
+        model.aggregate_timeslices(15, period_length=24)
+    with pytest.raises(ValueError):
+        model.aggregate_timeslices(4, method="hierarchical")
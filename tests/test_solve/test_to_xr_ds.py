@@ -1,4 +1,8 @@
+import xarray as xr
+
+from tz.osemosys import Model
 from tz.osemosys.io.load_model import load_model
+from tz.osemosys.model.dataset import compile_dataset
 
 EXAMPLE_YAML = "examples/utopia/main.yaml"
 
@@ -10,3 +14,21 @@ def test_to_xr_ds():
 
     run_spec_object = load_model(EXAMPLE_YAML)
     run_spec_object.to_xr_ds()
+
+
+def test_compile_dataset_matches_to_xr_ds():
+    """
+    Check the direct dataset compiler gives the same parameters as the otoole route
+    """
+
+    model = Model.from_yaml(EXAMPLE_YAML)
+    expected = model.to_xr_ds()
+    compiled = compile_dataset(model)
+
+    assert set(compiled.data_vars) == set(expected.data_vars)
+    for name, expected_array in expected.data_vars.items():
+        if name in ["DepreciationMethod", "TradeRouteLookup"]:
+            continue
+        array = compiled[name].transpose(*expected_array.dims).reindex_like(expected_array)
+        xr.testing.assert_allclose(array.astype(float), expected_array.astype(float))
+        assert array.attrs == expected_array.attrs
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from tz.osemosys import Model
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def test_model_update_parameters():
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+    objective = model.objective
+
+    penalty = model._data["EmissionsPenalty"].fillna(0) + 50
+    model.update_parameters(
+        EmissionsPenalty=penalty, CapitalCost=model._data["CapitalCost"].isel(TECHNOLOGY=[0]) * 2
+    )
+    model.solve(solver_name="highs")
+    assert model.objective > objective
+
+    rebuilt = Model.from_yaml(EXAMPLE_YAML)
+    rebuilt._data = model._data.copy()
+    rebuilt._build_model()
+    rebuilt._m.solve(solver_name="highs")
+    assert np.isclose(model._m.objective.value, rebuilt._m.objective.value)
+
+    with pytest.raises(ValueError):
+        model.update_parameters(TradeRoute=1)
+    with pytest.raises(KeyError):
+        model.update_parameters(NotAParameter=1)
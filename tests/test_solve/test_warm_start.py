@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tz.osemosys import Model
+from tz.osemosys.model import model as model_module
+from tz.osemosys.model.warm_start import get_basis, write_warm_start
+
+EXAMPLE_YAML = "examples/utopia/main.yaml"
+
+
+def warm_start_columns(path: Path, m, previous, name: str):
+    # the values written to a warm start solution file for the columns of a variable of a model,
+    # and those of the same variable of the previous model, as built alike
+    lines = path.read_text().splitlines()
+    columns = lines.index(next(line for line in lines if line.startswith("# Columns")))
+    values = dict(line.split() for line in lines[columns + 1 :])
+    labels = m.variables[name].labels
+    active = labels.values != -1
+    written = np.array([float(values[f"x{label}"]) for label in labels.values[active]])
+    return written, previous.variables[name].solution.transpose(*labels.dims).values[active]
+
+
+
+def test_model_warm_start(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # the basis is only read from the solver when it is used as a warm start
+    bases = []
+    monkeypatch.setattr(model_module, "get_basis", lambda solved: bases.append(get_basis(solved)))
+    model = Model.from_yaml(EXAMPLE_YAML)
+    model.solve(solver_name="highs")
+    objective = model.objective
+    cold = model._m.solver_model.getInfo().simplex_iteration_count
+    assert not bases
+    monkeypatch.undo()
+
+    # from the basis of the previous solve, mapped onto the rebuilt constraints
+    model.update_parameters(CapitalCost=model._data["CapitalCost"] * 0.8)
+    model.solve(solver_name="highs", warm_start=model)
+    assert model._m.solver_model.getInfo().simplex_iteration_count < cold
+
+    # from the primal values of a solution dataset
+    warm = Model.from_yaml(EXAMPLE_YAML)
+    warm.solve(solver_name="highs", warm_start=model.solution)
+    assert np.isclose(warm.objective, objective)
+
+    # whose dense activity is mapped onto the operating modes of each technology
+    activity = {"RateOfActivity": model.lazy_solution["RateOfActivity"]}
+    path = write_warm_start(tmp_path, warm._m, activity, ds=warm._data)
+    written, previous = warm_start_columns(path, warm._m, model._m, "RateOfActivity")
+    np.testing.assert_allclose(written, previous)
+    assert written.any()
+
+    rebuilt = Model.from_yaml(EXAMPLE_YAML)
+    rebuilt._data = model._data.copy()
+    rebuilt._build_model()
+    rebuilt._m.solve(solver_name="highs")
+    assert np.isclose(model._m.objective.value, rebuilt._m.objective.value)
+
+
+
+def three_node_trade_cfg():
+    # three regions, of which only the first generates cheaply, linked by trade routes
+    return dict(
+        id="test-three-node-trade",
+        time_definition=dict(id="years-only", years=range(2020, 2026)),
+        regions=[dict(id="R1"), dict(id="R2"), dict(id="R3")],
+        trade=[
+            dict(
+                id="electricity transmission",
+                commodity="electricity",
+                trade_routes={
+                    "R1": {"R2": {"*": True}, "R3": {"*": True}},
+                    "R2": {"R3": {"*": True}},
+                },
+                capex={"*": {"*": {"*": 100}}},
+                operating_life={"*": {"*": {"*": 10}}},
+                trade_loss={"*": {"*": {"*": 0.1}}},
+                cost_of_capital={"*": {"*": 0.1}},
+                capacity_additional_max={"*": {"*": {"*": 5}}},
+            )
+        ],
+        commodities=[dict(id="electricity", demand_annual=20)],
+        impacts=[],
+        technologies=[
+            dict(
+                id="coal-gen",
+                operating_life=10,
+                capex={"R1": {"*": 0}, "*": {"*": 400}},
+                operating_modes=[
+                    dict(id="generation", opex_variable=5, output_activity_ratio={"electricity": 1})
+                ],
+            )
+        ],
+    )
+
+
+
+def test_model_warm_start_trade(tmp_path: Path):
+    model = Model(**three_node_trade_cfg())
+    model.solve(solver_name="highs", solution_vars="all")
+    cold = model._m.solver_model.getInfo().simplex_iteration_count
+    assert (model.solution["Export"].fillna(0) > 0).any()
+
+    # the dense trade values of a solution dataset are mapped onto the trade links
+    warm = Model(**three_node_trade_cfg())
+    warm._build()
+    path = write_warm_start(tmp_path, warm._m, model.solution, ds=warm._data)
+    for name in ["Export", "Import", "NewTradeCapacity"]:
+        written, previous = warm_start_columns(path, warm._m, model._m, name)
+        np.testing.assert_allclose(written, previous)
+        assert written.any()
+
+    warm.solve(solver_name="highs", warm_start=model.solution)
+    assert np.isclose(warm.objective, model.objective)
+
+    # and from the basis of a solved model, through the links of each model: its reserve margin
+    # rows have no terms, so are not passed to the solver and need no basis status
+    warm = Model(**three_node_trade_cfg())
+    warm.solve(solver_name="highs", warm_start=model)
+    assert np.isclose(warm.objective, model.objective)
+    assert warm._m.solver_model.getInfo().simplex_iteration_count < cold
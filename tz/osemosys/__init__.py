@@ -7,6 +7,7 @@ except PackageNotFoundError:
     pass
 
 from tz.osemosys.io.load_model import load_model
+from tz.osemosys.model.cache import CompileCache
 from tz.osemosys.model.model import Model
 from tz.osemosys.schemas.commodity import Commodity
 from tz.osemosys.schemas.impact import Impact
@@ -26,4 +27,5 @@ __all__ = [
     "TimeDefinition",
     "OperatingMode",
     "load_model",
+    "CompileCache",
 ]
@@ -0,0 +1,179 @@
+import os
+from typing import Dict, Tuple
+
+import h5netcdf
+import numpy as np
+import xarray as xr
+
+COMPRESSION = {"zlib": "gzip", "lzf": "lzf"}
+
+# suffix of the dimension along which the cells of a sparse variable are stored
+SPARSE_SUFFIX = "__cell"
+
+
+def to_sparse(ds: xr.Dataset, max_density: float = 0.5) -> xr.Dataset:
+    """
+    Store the sparse float variables of a dataset as their non-NaN cells only.
+
+    Each sparse variable is replaced by a 1-d variable of its non-NaN values, indexed by the flat
+    position of each value in the dense array and with the dense dimensions given in its
+    'sparse_dims' attribute.
+
+    Parameters
+    ----------
+    ds: xr.Dataset
+        The dataset to convert
+    max_density: float
+        Variables with at most this fraction of non-NaN values are stored sparse
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset with its sparse variables replaced
+    """
+    sparse = {}
+    for name, da in ds.data_vars.items():
+        if da.ndim == 0 or da.dtype.kind != "f":
+            continue
+        values = da.values
+        cells = np.flatnonzero(~np.isnan(values))
+        if cells.size > max_density * values.size:
+            continue
+        cell_dim = f"{name}{SPARSE_SUFFIX}"
+        sparse[name] = xr.DataArray(
+            values.ravel()[cells],
+            dims=[cell_dim],
+            coords={cell_dim: cells},
+            attrs={**da.attrs, "sparse_dims": list(da.dims)},
+        )
+    return ds.drop_vars(list(sparse)).assign(sparse)
+
+
+def from_sparse(ds: xr.Dataset) -> xr.Dataset:
+    """
+    Restore the variables of a dataset stored by `to_sparse` to dense, NaN-filled arrays.
+    """
+    dense = {}
+    for name, da in ds.data_vars.items():
+        if "sparse_dims" not in da.attrs:
+            continue
+        dims = [str(dim) for dim in np.atleast_1d(da.attrs["sparse_dims"])]
+        shape = [ds.sizes[dim] for dim in dims]
+        values = np.full(int(np.prod(shape)), np.nan, dtype=da.dtype)
+        values[da[f"{name}{SPARSE_SUFFIX}"].values] = da.values
+        dense[name] = xr.DataArray(
+            values.reshape(shape),
+            dims=dims,
+            coords={dim: ds[dim] for dim in dims if dim in ds.coords},
+            attrs={key: value for key, value in da.attrs.items() if key != "sparse_dims"},
+        )
+    cell_dims = [f"{name}{SPARSE_SUFFIX}" for name in dense]
+    return ds.drop_vars(list(dense) + cell_dims).assign(dense)
+
+
+def _encoding(
+    ds: xr.Dataset,
+    compression: str | None,
+    complevel: int | None,
+    chunks: Dict[str, int] | None,
+) -> Dict[str, Dict]:
+    # per-variable h5netcdf encoding, for numeric variables with data to chunk
+    encoding = {}
+    for name, var in ds.variables.items():
+        if var.ndim == 0 or 0 in var.shape or var.dtype.kind not in "biuf":
+            continue
+        encoding[name] = {}
+        if compression is not None:
+            encoding[name]["compression"] = COMPRESSION[compression]
+            if compression == "zlib" and complevel is not None:
+                encoding[name]["compression_opts"] = complevel
+        if chunks is not None:
+            encoding[name]["chunksizes"] = tuple(
+                min(chunks.get(dim, size), size) for dim, size in zip(var.dims, var.shape)
+            )
+    return encoding
+
+
+def write_netcdf(
+    path: str | os.PathLike[str],
+    groups: Dict[str, xr.Dataset | None],
+    attrs: Dict | None = None,
+    compression: str | None = None,
+    complevel: int | None = None,
+    chunks: Dict[str, int] | None = None,
+    sparse: bool = False,
+) -> None:
+    """
+    Write a number of datasets to a netcdf file, each as its own group.
+
+    Groups are written one after the other, so that the datasets are never merged in memory.
+
+    Parameters
+    ----------
+    path: str | os.PathLike[str]
+        Path of the netcdf file
+    groups: Dict[str, xr.Dataset | None]
+        A dictionary of group name to dataset, skipping any dataset which is None
+    attrs: Dict, optional
+        Attributes of the root group of the file
+    compression: str, optional
+        Compression of each variable, 'zlib' or 'lzf'
+    complevel: int, optional
+        zlib compression level, from 0 to 9
+    chunks: Dict[str, int], optional
+        Chunk size of each dimension, applied to every variable with that dimension. Dimensions
+        not given are not chunked.
+    sparse: bool
+        Store sparse variables as their non-NaN cells only, see `to_sparse`
+    """
+    if compression is not None and compression not in COMPRESSION:
+        raise ValueError(f"compression must be one of {list(COMPRESSION)}, got '{compression}'")
+
+    xr.Dataset(attrs=attrs or {}).to_netcdf(path, mode="w", engine="h5netcdf")
+    for group, ds in groups.items():
+        if ds is None:
+            continue
+        if sparse:
+            ds = to_sparse(ds)
+        ds.to_netcdf(
+            path,
+            mode="a",
+            group=group,
+            engine="h5netcdf",
+            encoding=_encoding(ds, compression, complevel, chunks),
+        )
+
+
+def open_netcdf(
+    path: str | os.PathLike[str], chunks: int | dict | str | None = None
+) -> Tuple[Dict, Dict[str, xr.Dataset]]:
+    """
+    Open the groups of a netcdf file written by `write_netcdf`.
+
+    Datasets are read from the file lazily as they are accessed, or are dask-backed if `chunks` is
+    given (see `xarray.open_dataset`). Sparse variables are restored to dense arrays.
+
+    Parameters
+    ----------
+    path: str | os.PathLike[str]
+        Path of the netcdf file
+    chunks: int | dict | str, optional
+        Chunks with which to open each group as dask arrays
+
+    Returns
+    -------
+    attrs: Dict
+        The attributes of the root group of the file
+    groups: Dict[str, xr.Dataset]
+        A dictionary of group name to dataset
+    """
+    with h5netcdf.File(path, "r") as f:
+        names = list(f.groups)
+
+    with xr.open_dataset(path, engine="h5netcdf") as root:
+        attrs = dict(root.attrs)
+    groups = {
+        name: from_sparse(xr.open_dataset(path, group=name, engine="h5netcdf", chunks=chunks))
+        for name in names
+    }
+    return attrs, groups
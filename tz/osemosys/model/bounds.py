@@ -0,0 +1,183 @@
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import xarray as xr
+from linopy import Model
+
+from tz.osemosys.model.linear_expressions.capacity import recursive_capacity
+from tz.osemosys.model.links import on_links, trade_links
+
+# the sign of a constraint folded into the upper, or the lower, bound of its variable
+UPPER = "<="
+LOWER = ">="
+
+# the own (lower, upper) bounds of the variables with constraints folded into their bounds
+VARIABLE_BOUNDS = {
+    "NewCapacity": (0, np.inf),
+    "GrossCapacity": (-np.inf, np.inf),
+    "NewTradeCapacity": (0, np.inf),
+    "StorageLevel": (0, np.inf),
+}
+
+
+class Bound(NamedTuple):
+    """
+    A constraint on a single variable, `variable <= rhs` or `variable >= rhs` where `mask`,
+    folded into the bounds of the variable rather than posted as rows of the model.
+    """
+
+    variable: str
+    sign: str
+    rhs: xr.DataArray
+    mask: xr.DataArray
+
+
+def new_capacity_bounds(ds: xr.Dataset) -> Dict[str, Bound]:
+    """
+    NCC1 and NCC2, the limits on the new capacity of each technology, on NewCapacity.
+    """
+    return {
+        "NCC1_TotalAnnualMaxNewCapacityConstraint": Bound(
+            "NewCapacity",
+            UPPER,
+            ds["TotalAnnualMaxCapacityInvestment"],
+            ds["TotalAnnualMaxCapacityInvestment"] >= 0,
+        ),
+        "NCC2_TotalAnnualMinNewCapacityConstraint": Bound(
+            "NewCapacity",
+            LOWER,
+            ds["TotalAnnualMinCapacityInvestment"],
+            ds["TotalAnnualMinCapacityInvestment"] > 0,
+        ),
+    }
+
+
+def gross_capacity_bounds(ds: xr.Dataset) -> Dict[str, Bound]:
+    """
+    TCC1 and TCC2, the limits on the total capacity of each technology, on GrossCapacity where
+    it is a variable, see `capacity_recursion`.
+    """
+    if not recursive_capacity(ds):
+        return {}
+    return {
+        "TCC1_TotalAnnualMaxCapacityConstraint": Bound(
+            "GrossCapacity",
+            UPPER,
+            ds["TotalAnnualMaxCapacity"],
+            ds["TotalAnnualMaxCapacity"] >= 0,
+        ),
+        "TCC2_TotalAnnualMinCapacityConstraint": Bound(
+            "GrossCapacity",
+            LOWER,
+            ds["TotalAnnualMinCapacity"],
+            ds["TotalAnnualMinCapacity"] > 0,
+        ),
+    }
+
+
+def trade_capacity_bounds(ds: xr.Dataset, links: xr.Dataset) -> Dict[str, Bound]:
+    """
+    TC4, the limit on the new capacity of each trade link, on NewTradeCapacity.
+    """
+    investment = on_links(ds["TotalAnnualMaxTradeInvestment"], links)
+    route = on_links(ds["TradeRoute"], links)
+    return {
+        "TC4_TradeConstraint": Bound(
+            "NewTradeCapacity", UPPER, investment * route, (route == 1) & investment.notnull()
+        )
+    }
+
+
+def storage_level_bounds(ds: xr.Dataset) -> Dict[str, Bound]:
+    """
+    The minimum charge of each storage, on StorageLevel.
+    """
+    if "MinStorageCharge" not in ds:
+        return {}
+    return {
+        "StorageMinimumCharge": Bound(
+            "StorageLevel", LOWER, ds["MinStorageCharge"], ds["MinStorageCharge"].notnull()
+        )
+    }
+
+
+def model_bounds(ds: xr.Dataset) -> Dict[str, Bound]:
+    """
+    The constraints of a model on a single variable, by constraint name, which are folded into
+    the bounds of their variables rather than posted as rows, see `fold_bounds`.
+    """
+    bounds = {**new_capacity_bounds(ds), **gross_capacity_bounds(ds)}
+    links = trade_links(ds)
+    if links.sizes["LINK"] > 0:
+        bounds.update(trade_capacity_bounds(ds, links))
+    if ds.sizes["STORAGE"] > 0:
+        bounds.update(storage_level_bounds(ds))
+    return bounds
+
+
+def fold_bounds(
+    bounds: Dict[str, Bound], variable: str, coords: Sequence[xr.DataArray]
+) -> Tuple[xr.DataArray, xr.DataArray]:
+    """
+    The lower and upper bounds of a variable over its `coords`, within its own bounds (see
+    VARIABLE_BOUNDS) and within each of the `bounds` on it where they are defined.
+
+    Each bound is the tightest of a variable's own bound and its constraints, as the rows would
+    be: the solver moves rows on a single variable into its bounds anyway, but only once they
+    have been built, written and read.
+    """
+    lower, upper = VARIABLE_BOUNDS[variable]
+    for bound in bounds.values():
+        if bound.variable != variable:
+            continue
+        if bound.sign == UPPER:
+            upper = np.minimum(upper, bound.rhs.where(bound.mask, upper))
+        else:
+            lower = np.maximum(lower, bound.rhs.where(bound.mask, lower))
+    # over the coords, in their order, as linopy orders the dimensions of a variable by its bounds
+    zeros = xr.DataArray(0.0, coords=list(coords))
+    return (zeros + lower).transpose(*zeros.dims), (zeros + upper).transpose(*zeros.dims)
+
+
+def reduced_costs(m: Model) -> np.ndarray:
+    """
+    The reduced costs of the variables of a solved linopy model, indexed by variable label: their
+    objective coefficients less the duals of the constraints they are in, weighted by their
+    coefficients. Missing if the solver returned no duals, e.g. for a MILP.
+    """
+    reduced = np.zeros(m._xCounter)
+    objective = m.objective.expression
+    vars, coeffs = objective.vars.values.ravel(), objective.coeffs.values.ravel()
+    valid = (vars != -1) & ~np.isnan(coeffs)
+    reduced += np.bincount(vars[valid], coeffs[valid], minlength=m._xCounter)
+    duals = False
+    for name in m.constraints:
+        con = m.constraints[name]
+        dims = con.vars.dims
+        active = ((con.labels != -1) & (con.vars != -1)).transpose(*dims).values
+        weighted = (con.coeffs * con.dual).transpose(*dims).values[active]
+        # terms with missing coefficients, and rows without any terms (which have no dual), are
+        # not passed to the solver
+        valid = ~np.isnan(weighted)
+        duals |= bool(valid.any())
+        reduced -= np.bincount(con.vars.values[active][valid], weighted[valid], m._xCounter)
+    return reduced if duals or not len(m.constraints) else np.full(m._xCounter, np.nan)
+
+
+def bound_dual(m: Model, bound: Bound, reduced: np.ndarray) -> xr.DataArray:
+    """
+    The dual of a constraint folded into the bounds of its variable, as though posted as a row:
+    the reduced cost of the variable where it is at that bound, of the sign of the bound, and
+    zero elsewhere; missing where the constraint is not defined. Where the constraint is no
+    tighter than the variable's own bound, the reduced cost is that of its own bound, as the
+    solver would have it with the row.
+    """
+    variable = m.variables[bound.variable]
+    labels = variable.labels
+    cost = labels.copy(data=np.where(labels.values != -1, reduced[labels.values], np.nan))
+    lower, upper = VARIABLE_BOUNDS[bound.variable]
+    if bound.sign == UPPER:
+        cost, at_bound = cost.clip(max=0), (variable.upper == bound.rhs) & (bound.rhs < upper)
+    else:
+        cost, at_bound = cost.clip(min=0), (variable.lower == bound.rhs) & (bound.rhs > lower)
+    return cost.where(at_bound | cost.isnull(), 0).where(bound.mask & (labels != -1))
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import linopy
+import numpy as np
+import orjson
+import pandas as pd
+import xarray as xr
+
+import tz.osemosys
+from tz.osemosys.logger import logging
+
+if TYPE_CHECKING:
+    from tz.osemosys.schemas.model import RunSpec
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "tz-osemosys"
+
+DATASET_FILE = "data.pkl"
+MODEL_FILE = "model.pkl"
+
+# the version of what is stored in each entry, to bump when it changes in a way that the source
+# of the build code (see `build_source_hash`) does not record, e.g. the pickled classes of another
+# package
+CACHE_FORMAT_VERSION = 1
+
+
+def _default(obj: Any) -> Any:
+    # serialise the values of a model dump which orjson does not support natively
+    if isinstance(obj, pd.Index):
+        return obj.tolist()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def _dump(obj: Any, path: Path):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path: Path) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+@lru_cache(maxsize=None)
+def build_source_hash() -> str:
+    """
+    A hash of the source of the modules which compile the parameter dataset and build the linopy
+    model from it (the `tz.osemosys.model` package).
+
+    Development and editable installs keep their package version as the code changes, so entries
+    are also keyed by the code which built them.
+
+    Returns:
+        str: the hex digest of the hash
+    """
+    root = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def spec_hash(spec: "RunSpec") -> str:
+    """
+    A stable hash of the contents of a RunSpec, of the package and linopy versions, of the cache
+    format version and of the source of the build code (see `build_source_hash`).
+
+    Args:
+        spec (RunSpec): a composed RunSpec (or Model)
+
+    Returns:
+        str: the hex digest of the hash
+    """
+    content = orjson.dumps(
+        spec.model_dump(),
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+    versions = ":".join(
+        [
+            getattr(tz.osemosys, "__version__", ""),
+            linopy.__version__,
+            str(CACHE_FORMAT_VERSION),
+            build_source_hash(),
+        ]
+    )
+    return hashlib.sha256(versions.encode() + content).hexdigest()
+
+
+class CompileCache:
+    """
+    A persistent, content-addressed cache of compiled models.
+
+    Each entry is keyed by `spec_hash` and stores the compiled parameter dataset and, if
+    `store_model` is set, the built linopy model with its linear expressions. Entries are evicted
+    least-recently-used first once the cache grows beyond `max_size`.
+
+    Entries are stored with pickle, so a cache directory should only be shared between trusted
+    users.
+
+    Args:
+        cache_dir (str | os.PathLike): directory of the cache, defaults to ~/.cache/tz-osemosys
+        max_size (int | None): maximum total size of the cache in bytes, or None for no limit
+        store_model (bool): also store the built linopy model
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike[str] = DEFAULT_CACHE_DIR,
+        max_size: Optional[int] = None,
+        store_model: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.store_model = store_model
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _touch(self, key: str):
+        # entry directory mtimes record the last use of each entry, for eviction
+        os.utime(self._entry(key))
+
+    def load_dataset(self, key: str) -> Optional[xr.Dataset]:
+        """
+        Load the compiled parameter dataset of an entry, or None if it is not cached.
+        """
+        path = self._entry(key) / DATASET_FILE
+        if not path.is_file():
+            return None
+        self._touch(key)
+        return _load(path)
+
+    def load_model(self, key: str) -> Optional[Tuple]:
+        """
+        Load the built linopy model of an entry, as saved, or None if it is not cached.
+        """
+        path = self._entry(key) / MODEL_FILE
+        if not path.is_file():
+            return None
+        self._touch(key)
+        return _load(path)
+
+    def save(self, key: str, data: xr.Dataset, built: Optional[Tuple] = None):
+        """
+        Save an entry, replacing any existing entry with the same key, and evict entries beyond
+        `max_size`.
+
+        Args:
+            key (str): the key of the entry, see `spec_hash`
+            data (xr.Dataset): the compiled parameter dataset
+            built (Tuple, optional): the built linopy model, with its linear expressions and
+                any other state needed to solve it. Only saved if `store_model` is set.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary directory first, so that a partial entry is never read
+        tmp = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-"))
+        try:
+            _dump(data, tmp / DATASET_FILE)
+            if self.store_model and built is not None:
+                _dump(built, tmp / MODEL_FILE)
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            os.replace(tmp, self._entry(key))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict(keep=key)
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        """
+        The last use time and size in bytes of each entry, keyed by entry key.
+        """
+        entries = {}
+        for entry in self.cache_dir.iterdir() if self.cache_dir.is_dir() else []:
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            entries[entry.name] = (entry.stat().st_mtime, size)
+        return entries
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove the least recently used entries until the cache is no larger than `max_size`.
+
+        Args:
+            keep (str | None): the key of an entry never to remove, e.g. the one just saved
+        """
+        if self.max_size is None:
+            return
+        entries = self.entries()
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            logging.info(f"Evicting compiled model {key} from {self.cache_dir}")
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """
+        Remove all the entries of the cache.
+        """
+        for key in self.entries():
+            shutil.rmtree(self._entry(key), ignore_errors=True)
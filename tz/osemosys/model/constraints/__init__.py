@@ -1,8 +1,11 @@
-from typing import Dict
+from functools import partial
+from typing import Dict, Optional
 
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.tracking import BuildTracker, any_notnull, nonempty
+
 from .annual_activity import add_annual_activity_constraints
 from .annual_capacity_factor_min import add_annual_capacity_factor_min_constraints
 from .capacity_adequacy_a import add_capacity_adequacy_a_constraints
@@ -21,7 +24,12 @@ from .total_capacity import add_total_capacity_constraints
 from .trade import add_trade_constraints
 
 
-def add_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]) -> Model:
+def add_constraints(
+    ds: xr.Dataset,
+    m: Model,
+    lex: Dict[str, LinearExpression],
+    tracker: Optional[BuildTracker] = None,
+) -> Model:
     """Add all constraints to the model
 
     Arguments
@@ -30,31 +38,37 @@ def add_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression])
         The parameters dataset
     m: linopy.Model
         A linopy model
+    lex: Dict[str, LinearExpression]
+        A dictionary of linear expressions, persisted after solve
+    tracker: BuildTracker, optional
+        Records the dependencies of each constraint, for updating parameters
 
     Returns
     -------
     linopy.Model
     """
 
+    tracker = tracker or BuildTracker()
+
     # restore one at a time
-    m = add_capacity_adequacy_a_constraints(ds, m, lex)
-    m = add_capacity_adequacy_b_constraints(ds, m, lex)
-    m = add_energy_balance_a_constraints(ds, m, lex)
-    m = add_energy_balance_b_constraints(ds, m, lex)
-    m = add_emissions_constraints(ds, m, lex)
-    if ds["REGIONGROUP"].size > 0:
-        m = add_regiongroup_constraints(ds, m, lex)
-    m = add_annual_activity_constraints(ds, m, lex)
-    m = add_new_capacity_constraints(ds, m, lex)
-    if ds["REMinProductionTarget"].notnull().any():
-        m = add_re_targets_constraints(ds, m, lex)
-    m = add_production_target_constraints(ds, m, lex)
-    m = add_reserve_margin_constraints(ds, m, lex)
-    m = add_storage_constraints(ds, m, lex)
-    m = add_total_activity_constraints(ds, m, lex)
-    m = add_total_capacity_constraints(ds, m, lex)
-    m = add_capacity_growthrate_constraints(ds, m, lex)
-    m = add_trade_constraints(ds, m, lex)
-    m = add_annual_capacity_factor_min_constraints(ds, m, lex)
+    m = tracker.step(add_capacity_adequacy_a_constraints, ds, m, lex)
+    m = tracker.step(add_capacity_adequacy_b_constraints, ds, m, lex)
+    m = tracker.step(add_energy_balance_a_constraints, ds, m, lex)
+    m = tracker.step(add_energy_balance_b_constraints, ds, m, lex)
+    m = tracker.step(add_emissions_constraints, ds, m, lex)
+    m = tracker.step(add_regiongroup_constraints, ds, m, lex, when=partial(nonempty, "REGIONGROUP"))
+    m = tracker.step(add_annual_activity_constraints, ds, m, lex)
+    m = tracker.step(add_new_capacity_constraints, ds, m, lex)
+    m = tracker.step(
+        add_re_targets_constraints, ds, m, lex, when=partial(any_notnull, "REMinProductionTarget")
+    )
+    m = tracker.step(add_production_target_constraints, ds, m, lex)
+    m = tracker.step(add_reserve_margin_constraints, ds, m, lex)
+    m = tracker.step(add_storage_constraints, ds, m, lex)
+    m = tracker.step(add_total_activity_constraints, ds, m, lex)
+    m = tracker.step(add_total_capacity_constraints, ds, m, lex)
+    m = tracker.step(add_capacity_growthrate_constraints, ds, m, lex)
+    m = tracker.step(add_trade_constraints, ds, m, lex)
+    m = tracker.step(add_annual_capacity_factor_min_constraints, ds, m, lex)
 
     return m
@@ -37,6 +37,9 @@ def add_annual_capacity_factor_min_constraints(
         lex["GrossCapacity"] * ds["CapacityToActivityUnit"]
     )
 
-    m.add_constraints(con, name="ACF1_TotalAnnualMinCapacityFactor")
+    # otherwise trivial, as activity and capacity are not negative; and, where the activity ratios
+    # of a technology were cleared (see `reduce_dataset`), without terms
+    mask = ds["TotalAnnualMinCapacityFactor"] > 0
+    m.add_constraints(con, name="ACF1_TotalAnnualMinCapacityFactor", mask=mask)
 
     return m
@@ -3,6 +3,8 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import capacity_recursion, recursive_capacity
+
 
 def add_capacity_adequacy_a_constraints(
     ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]
@@ -57,6 +59,13 @@ def add_capacity_adequacy_a_constraints(
     ```
     """
 
+    # gross capacity, accumulated from year to year
+    if recursive_capacity(ds):
+        con = capacity_recursion(
+            ds, m["GrossCapacity"], m["NewCapacity"], ds["OperationalLife"], ds["ResidualCapacity"]
+        )
+        m.add_constraints(con, name="GrossCapacityRecursion")
+
     # gross capacity sufficiency
     con = (
         lex["RateOfTotalActivity"]
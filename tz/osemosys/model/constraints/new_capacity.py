@@ -41,11 +41,6 @@ def add_new_capacity_constraints(
 
     ```
     """
-    con = m["NewCapacity"] <= ds["TotalAnnualMaxCapacityInvestment"]
-    mask = ds["TotalAnnualMaxCapacityInvestment"] >= 0
-    m.add_constraints(con, name="NCC1_TotalAnnualMaxNewCapacityConstraint", mask=mask)
-
-    con = m["NewCapacity"] >= ds["TotalAnnualMinCapacityInvestment"]
-    mask = ds["TotalAnnualMinCapacityInvestment"] > 0
-    m.add_constraints(con, name="NCC2_TotalAnnualMinNewCapacityConstraint", mask=mask)
+    # single-variable constraints, folded into the bounds of NewCapacity, see
+    # `new_capacity_bounds`
     return m
@@ -4,6 +4,8 @@ import numpy as np
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import capacity_recursion, recursive_capacity
+
 # from timeit import default_timer as timer
 
 
@@ -280,6 +282,17 @@ def add_storage_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpre
             name="StorageLevelStart",
         )
 
+        # gross storage capacity, accumulated from year to year
+        if recursive_capacity(ds):
+            con = capacity_recursion(
+                ds,
+                m["GrossStorageCapacity"],
+                m["NewStorageCapacity"],
+                ds["OperationalLifeStorage"],
+                ds["ResidualStorageCapacity"],
+            )
+            m.add_constraints(con, name="GrossStorageCapacityRecursion")
+
         # add constraints for gross storage capacity sufficiency
         m.add_constraints(
             lex["StorageLevel"]
@@ -287,12 +300,8 @@ def add_storage_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpre
             name="StorageGrossCapacitySufficiency",
         )
 
-        # storage level may not be less than minimum charge
-        if "MinStorageCharge" in ds.data_vars:
-            con = lex["StorageLevel"] >= ds["MinStorageCharge"].expand_dims(
-                {"TIMESLICE": ds["TIMESLICE"]}
-            )
-            m.add_constraints(con, name="StorageMinimumCharge")
+        # storage level may not be less than minimum charge: folded into the bounds of
+        # StorageLevel, see `storage_level_bounds`
 
         # storage charge rate may not exceed max charge rate
         if "StorageMaxChargeRate" in ds.data_vars:
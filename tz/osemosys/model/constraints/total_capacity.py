@@ -3,6 +3,8 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import recursive_capacity
+
 
 def add_total_capacity_constraints(
     ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]
@@ -38,6 +40,9 @@ def add_total_capacity_constraints(
         TotalCapacityAnnual[r,t,y] >= TotalAnnualMinCapacity[r,t,y];
     ```
     """
+    if recursive_capacity(ds):
+        # GrossCapacity is a variable, whose bounds these are, see `gross_capacity_bounds`
+        return m
 
     con = lex["GrossCapacity"] <= ds["TotalAnnualMaxCapacity"]
     mask = ds["TotalAnnualMaxCapacity"] >= 0
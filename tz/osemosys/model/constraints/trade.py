@@ -3,6 +3,9 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import capacity_recursion, recursive_capacity
+from tz.osemosys.model.links import on_links, trade_links
+
 
 def add_trade_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]) -> Model:
     """Add Trade constraints to the model.
@@ -49,63 +52,75 @@ def add_trade_constraints(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpress
     ```
     """
 
-    if (mask_ := ds["TradeRoute"] == 1).any():
+    links = trade_links(ds)
+    if links.sizes["LINK"] > 0:
+        # Trade is indexed by the trade links, see `trade_links`
+        def param(name: str) -> xr.DataArray:
+            return on_links(ds[name], links)
+
+        mask_ = param("TradeRoute") == 1
+        loss = 1 - param("TradeLossBetweenRegions")
+
         # Energy Balance
-        con = (
-            m["Export"]
-            - m["Import"].rename({"REGION": "_REGION", "_REGION": "REGION"}) * ds["TradeRoute"]
-            == 0
-        )
+        con = m["Export"] - m["Import"] == 0
         m.add_constraints(con, name="EBa10_EnergyBalanceEachTS4_trn", mask=mask_)
 
         # Capacity
-        con = lex["GrossTradeCapacity"] * ds["TradeRoute"] * (
-            1 - ds["TradeLossBetweenRegions"]
-        ) >= m["Export"] / (ds["TradeCapacityToActivityUnit"] * ds["YearSplit"])
+        if recursive_capacity(ds):
+            con = capacity_recursion(
+                ds,
+                m["GrossTradeCapacity"],
+                m["NewTradeCapacity"],
+                param("OperationalLifeTrade"),
+                param("ResidualTradeCapacity"),
+            )
+            m.add_constraints(con, name="GrossTradeCapacityRecursion")
+
+        con = lex["GrossTradeCapacity"] * param("TradeRoute") * loss >= m["Export"] / (
+            param("TradeCapacityToActivityUnit") * ds["YearSplit"]
+        )
         m.add_constraints(con, name="TC1a_TradeConstraint_Export", mask=mask_)
 
-        con = lex["GrossTradeCapacity"] * ds["TradeRoute"] * (
-            1 - ds["TradeLossBetweenRegions"]
-        ) >= m["Import"].rename({"REGION": "_REGION", "_REGION": "REGION"}) / (
-            ds["TradeCapacityToActivityUnit"] * ds["YearSplit"]
+        con = lex["GrossTradeCapacity"] * param("TradeRoute") * loss >= m["Import"] / (
+            param("TradeCapacityToActivityUnit") * ds["YearSplit"]
         )
         m.add_constraints(con, name="TC1b_TradeConstraint_Import", mask=mask_)
 
-        con = m["NewTradeCapacity"] <= ds["TotalAnnualMaxTradeInvestment"] * ds["TradeRoute"]
-        mask = mask_ & ds["TotalAnnualMaxTradeInvestment"].notnull()
-        m.add_constraints(con, name="TC4_TradeConstraint", mask=mask)
+        # TC4 is folded into the bounds of NewTradeCapacity, see `trade_capacity_bounds`
 
         # Activity constraints
-        con = lex["ExportAnnual"] <= ds["TotalTradeAnnualActivityUpperLimit"] * ds["TradeRoute"] * (
-            1 - ds["TradeLossBetweenRegions"]
+        con = (
+            lex["ExportAnnual"]
+            <= param("TotalTradeAnnualActivityUpperLimit") * param("TradeRoute") * loss
         )
-        mask = mask_ & ds["TotalTradeAnnualActivityUpperLimit"].notnull()
+        mask = mask_ & param("TotalTradeAnnualActivityUpperLimit").notnull()
         m.add_constraints(con, name="TradeConstraint_TotalTradeAnnualActivityUpperLimit", mask=mask)
-        con = lex["ExportAnnual"] >= ds["TotalTradeAnnualActivityLowerLimit"] * ds["TradeRoute"] * (
-            1 - ds["TradeLossBetweenRegions"]
+        con = (
+            lex["ExportAnnual"]
+            >= param("TotalTradeAnnualActivityLowerLimit") * param("TradeRoute") * loss
         )
-        mask = mask_ & ds["TotalTradeAnnualActivityLowerLimit"].notnull()
+        mask = mask_ & param("TotalTradeAnnualActivityLowerLimit").notnull()
         m.add_constraints(con, name="TradeConstraint_TotalTradeAnnualActivityLowerLimit", mask=mask)
         # availability factor constraints:
         con = (
             lex["ExportAnnual"]
             <= lex["GrossTradeCapacity"]
-            * ds["TradeRoute"]
-            * (1 - ds["TradeLossBetweenRegions"])
-            * ds["AvailabilityFactorTrade"]
-            * ds["TradeCapacityToActivityUnit"]
+            * param("TradeRoute")
+            * loss
+            * param("AvailabilityFactorTrade")
+            * param("TradeCapacityToActivityUnit")
         )
-        mask = mask_ & ds["AvailabilityFactorTrade"].notnull()
+        mask = mask_ & param("AvailabilityFactorTrade").notnull()
         m.add_constraints(con, name="TradeConstraint_AvailabilityFactor", mask=mask)
         con = (
             lex["ExportAnnual"]
             >= lex["GrossTradeCapacity"]
-            * ds["TradeRoute"]
-            * (1 - ds["TradeLossBetweenRegions"])
-            * ds["TotalAnnualMinCapacityFactorTrade"]
-            * ds["TradeCapacityToActivityUnit"]
+            * param("TradeRoute")
+            * loss
+            * param("TotalAnnualMinCapacityFactorTrade")
+            * param("TradeCapacityToActivityUnit")
         )
-        mask = mask_ & ds["TotalAnnualMinCapacityFactorTrade"].notnull()
+        mask = mask_ & param("TotalAnnualMinCapacityFactorTrade").notnull()
         m.add_constraints(con, name="TradeConstraint_AvailabilityFactorMin", mask=mask)
 
     return m
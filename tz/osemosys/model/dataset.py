@@ -0,0 +1,523 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from tz.osemosys.defaults import defaults
+from tz.osemosys.logger import logging
+from tz.osemosys.schemas.base import OSeMOSYSData
+from tz.osemosys.schemas.commodity import Commodity
+from tz.osemosys.schemas.impact import Impact
+from tz.osemosys.schemas.region import RegionGroup
+from tz.osemosys.schemas.storage import Storage
+from tz.osemosys.schemas.technology import Technology
+from tz.osemosys.schemas.time_definition import TimeDefinition
+from tz.osemosys.schemas.trade import Trade
+from tz.osemosys.schemas.validation.timedefinition_validation import time_adj_to_list
+from tz.osemosys.utils import ComposedData
+
+if TYPE_CHECKING:
+    from tz.osemosys.schemas.model import RunSpec
+
+DEPRECIATION_METHODS = {"sinking-fund": 1, "straight-line": 2}
+
+
+class _Param:
+    """
+    A parameter array under construction: float values over the full product of its coords, the
+    cells which have been written, and the dtype of the data written to it.
+    """
+
+    def __init__(self, dims: List[str], shape: tuple):
+        self.dims = dims
+        self.values = np.full(shape, np.nan)
+        self.mask = np.zeros(shape, dtype=bool)
+        self.dtype = None
+
+
+class DatasetCompiler:
+    """
+    Compile a RunSpec directly to the xarray parameter dataset used to build the linopy model.
+
+    Each parameter is preallocated over the full coords of its dimensions, and the (composed)
+    data of each component is written into it with integer indexing. Parameters are named as in
+    otoole, and their dimensions are sorted, matching the dataset produced by
+    `RunSpec.to_xr_ds`. Defaults are filled in once all data has been written.
+
+    Args:
+        spec (RunSpec): a composed RunSpec (or Model)
+    """
+
+    def __init__(self, spec: "RunSpec"):
+        self.spec = spec
+        self.coords = self._build_coords(spec)
+        self._indexes = {
+            dim: pd.Index([str(label) for label in labels], dtype=object)
+            for dim, labels in self.coords.items()
+        }
+        self._params: Dict[str, _Param] = {}
+        self._lookups: Dict[str, xr.DataArray] = {}
+
+        # stems by otoole name, with their dimensions
+        self._stem_dims = {}
+        for obj in (spec, Technology, Impact, Commodity, TimeDefinition, RegionGroup, Trade):
+            for stem, params in obj.otoole_stems.items():
+                if not stem.isupper():
+                    self._stem_dims[stem] = sorted(c for c in params["columns"] if c != "VALUE")
+        # storage parameters are only included in the dataset if storage data is given
+        self._optional_stem_dims = {
+            stem: sorted(c for c in params["columns"] if c != "VALUE")
+            for stem, params in Storage.otoole_stems.items()
+        }
+        for stem in self._stem_dims:
+            self._param(stem)
+
+    @staticmethod
+    def _build_coords(spec: "RunSpec") -> Dict[str, List[Any]]:
+        time_definition = spec.time_definition
+        regions = [region.id for region in spec.regions]
+
+        coords = {
+            "REGION": regions,
+            "_REGION": regions,
+            "REGIONGROUP": [rg.id for rg in spec.regionsgroup] if spec.regionsgroup else [],
+            "TECHNOLOGY": [technology.id for technology in spec.technologies],
+            "MODE_OF_OPERATION": list(
+                dict.fromkeys(
+                    mode.id
+                    for technology in spec.technologies
+                    for mode in technology.operating_modes
+                )
+            ),
+            "FUEL": [commodity.id for commodity in spec.commodities],
+            "EMISSION": [impact.id for impact in spec.impacts],
+            "STORAGE": [storage.id for storage in spec.storage] if spec.storage else [],
+            "YEAR": sorted(int(year) for year in time_definition.years),
+            "TIMESLICE": list(time_definition.timeslices),
+            "SEASON": list(time_definition.seasons or []),
+            "DAYTYPE": list(time_definition.day_types or []),
+            "DAILYTIMEBRACKET": list(time_definition.daily_time_brackets or []),
+        }
+
+        # Order seasons/day_types/time_brackets chronologically by adjacency if provided
+        if coords["SEASON"] and time_definition.adj.seasons:
+            coords["SEASON"] = time_adj_to_list(time_definition.adj.seasons)
+        if coords["DAYTYPE"] and time_definition.adj.day_types:
+            coords["DAYTYPE"] = time_adj_to_list(time_definition.adj.day_types)
+        if coords["DAILYTIMEBRACKET"] and time_definition.adj.time_brackets:
+            coords["DAILYTIMEBRACKET"] = time_adj_to_list(time_definition.adj.time_brackets)
+
+        # set members are unique, in order of appearance
+        for dim, labels in coords.items():
+            if dim != "YEAR":
+                coords[dim] = list(dict.fromkeys(str(label) for label in labels))
+        return coords
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _param(self, stem: str) -> _Param:
+        if stem not in self._params:
+            dims = self._stem_dims.get(stem) or self._optional_stem_dims[stem]
+            self._params[stem] = _Param(dims, tuple(len(self.coords[dim]) for dim in dims))
+        return self._params[stem]
+
+    def _positions(self, dim: str, labels: Any) -> np.ndarray:
+        return self._indexes[dim].get_indexer([str(label) for label in labels])
+
+    def write(self, stem: str, cells: Dict[str, np.ndarray], values: np.ndarray):
+        """
+        Write values to a parameter.
+
+        Args:
+            stem (str): the (otoole) name of the parameter
+            cells (Dict[str, np.ndarray]): integer positions along each dimension of the parameter,
+                as arrays aligned with `values` or as scalars
+            values (np.ndarray): the values to write
+        """
+        param = self._param(stem)
+        values = np.asarray(values)
+        if values.dtype.kind == "O":
+            # non-numeric values are null
+            values = np.array(
+                [v if pd.api.types.is_number(v) else np.nan for v in values.ravel()], dtype=float
+            ).reshape(values.shape)
+
+        index = tuple(np.broadcast_arrays(*(np.asarray(cells[dim]) for dim in param.dims)))
+        if index:
+            # drop any cells which fall outside the model sets
+            valid = np.logical_and.reduce([idx >= 0 for idx in index])
+            if not valid.all():
+                index = tuple(idx[valid] for idx in index)
+                values = values[valid]
+        if values.size == 0:
+            return
+
+        param.dtype = (
+            values.dtype if param.dtype is None else np.result_type(param.dtype, values.dtype)
+        )
+        param.values[index] = values
+        param.mask[index] = True
+
+    def add(
+        self,
+        stem: str,
+        param: Optional[OSeMOSYSData],
+        columns: List[str],
+        value_map: Optional[Dict[Any, Any] | Callable] = None,
+        data_mask: Optional[np.ndarray] = None,
+        **constants: str,
+    ):
+        """
+        Write composed data to a parameter.
+
+        Args:
+            stem (str): the (otoole) name of the parameter
+            param (OSeMOSYSData): composed data, or None
+            columns (List[str]): the parameter dimension corresponding to each data dimension
+            value_map (Dict | Callable, optional): mapping applied to the data values
+            data_mask (np.ndarray, optional): boolean mask, broadcast against the data, of the
+                cells to write
+            **constants: the label of the parameter dimensions not indexed by the data
+        """
+        if param is None:
+            return
+        data = param.data
+        if not isinstance(data, ComposedData):
+            raise ValueError(f"Data for '{stem}' must be composed to compile the dataset.")
+
+        mask = data.mask if data_mask is None else data.mask & data_mask
+        codes = np.nonzero(mask)
+        values = data.values[codes]
+        if value_map is not None:
+            values = pd.Series(values).map(value_map).to_numpy()
+
+        cells = {
+            column: self._positions(column, data.coords[dim])[code]
+            for column, dim, code in zip(columns, data.dims, codes)
+        }
+        for column, label in constants.items():
+            cells[column] = self._positions(column, [label])[0]
+
+        self.write(stem, cells, values)
+
+    # ------------------------------------------------------------------
+    # Components
+    # ------------------------------------------------------------------
+
+    def add_model_params(self):
+        spec = self.spec
+
+        if spec.depreciation_method:
+            self.add(
+                "DepreciationMethod",
+                spec.depreciation_method,
+                ["REGION"],
+                value_map=DEPRECIATION_METHODS,
+            )
+        if spec.discount_rate:
+            self.add("DiscountRate", spec.discount_rate, ["REGION"])
+        if spec.cost_of_capital:
+            self.add("DiscountRateIdv", spec.cost_of_capital, ["REGION", "TECHNOLOGY"])
+        if spec.cost_of_capital_storage:
+            self.add("DiscountRateStorage", spec.cost_of_capital_storage, ["REGION", "STORAGE"])
+
+        if spec.reserve_margin:
+            self.add("ReserveMargin", spec.reserve_margin, ["REGION", "YEAR"])
+            for technology in spec.technologies:
+                self.add(
+                    "ReserveMarginTagTechnology",
+                    technology.include_in_joint_reserve_margin,
+                    ["REGION", "YEAR"],
+                    value_map=float,
+                    TECHNOLOGY=technology.id,
+                )
+            for commodity in spec.commodities:
+                self.add(
+                    "ReserveMarginTagFuel",
+                    commodity.include_in_joint_reserve_margin,
+                    ["REGION", "YEAR"],
+                    value_map=int,
+                    FUEL=commodity.id,
+                )
+
+        if spec.renewable_production_target:
+            self.add("REMinProductionTarget", spec.renewable_production_target, ["REGION", "YEAR"])
+        if spec.region_group_renewable_production_target:
+            self.add(
+                "RegionGroupREMinProductionTarget",
+                spec.region_group_renewable_production_target,
+                ["REGIONGROUP", "YEAR"],
+            )
+
+    def add_technologies(self):
+        for technology in self.spec.technologies:
+            omitted_fields = []
+            for stem, params in Technology.otoole_stems.items():
+                if stem in Technology.operating_mode_stem_translation.keys():
+                    continue
+                data = getattr(technology, params["attribute"])
+                if data is None:
+                    continue
+                if not data.is_composed:
+                    omitted_fields.append(stem)
+                    continue
+                self.add(
+                    stem,
+                    data,
+                    [c for c in params["columns"] if c not in ["TECHNOLOGY", "VALUE"]],
+                    value_map=int if stem == "RETagTechnology" else None,
+                    TECHNOLOGY=technology.id,
+                )
+
+            for stem, (attribute, _) in Technology.operating_mode_stem_translation.items():
+                columns = [
+                    c
+                    for c in Technology.otoole_stems[stem]["columns"]
+                    if c not in ["TECHNOLOGY", "VALUE", "MODE_OF_OPERATION"]
+                ]
+                for mode in technology.operating_modes:
+                    data = getattr(mode, attribute)
+                    if data is None:
+                        continue
+                    if not data.is_composed:
+                        omitted_fields.append(stem)
+                        continue
+                    self.add(
+                        stem, data, columns, TECHNOLOGY=technology.id, MODE_OF_OPERATION=mode.id
+                    )
+
+            if omitted_fields:
+                logging.warning(
+                    f"{technology.id}: Data for {omitted_fields} not composed - omitting."
+                )
+
+    def add_commodities(self):
+        for commodity in self.spec.commodities:
+            if commodity.demand_annual is not None:
+                # demand with a profile is specified demand, otherwise accumulated demand
+                annual = commodity.demand_annual.data
+                if commodity.demand_profile is not None:
+                    profile = commodity.demand_profile.data
+                    profiled = np.isin(annual.coords[annual.dims[0]], list(profile.keys()))
+                else:
+                    profiled = np.zeros(len(annual.coords[annual.dims[0]]), dtype=bool)
+
+                self.add(
+                    "SpecifiedAnnualDemand",
+                    commodity.demand_annual,
+                    ["REGION", "YEAR"],
+                    data_mask=profiled[:, None],
+                    FUEL=commodity.id,
+                )
+                self.add(
+                    "AccumulatedAnnualDemand",
+                    commodity.demand_annual,
+                    ["REGION", "YEAR"],
+                    data_mask=~profiled[:, None],
+                    FUEL=commodity.id,
+                )
+                if profiled.any():
+                    profile_regions = np.isin(
+                        profile.coords[profile.dims[0]], annual.defined_labels(annual.dims[0])
+                    )
+                    self.add(
+                        "SpecifiedDemandProfile",
+                        commodity.demand_profile,
+                        ["REGION", "YEAR", "TIMESLICE"],
+                        data_mask=profile_regions[:, None, None],
+                        FUEL=commodity.id,
+                    )
+
+            self.add(
+                "RETagFuel",
+                commodity.include_in_joint_renewable_target,
+                ["REGION", "YEAR"],
+                value_map=int,
+                FUEL=commodity.id,
+            )
+
+    def add_impacts(self):
+        for impact in self.spec.impacts:
+            for stem, params in Impact.otoole_stems.items():
+                self.add(
+                    stem,
+                    getattr(impact, params["attribute"]),
+                    [c for c in params["columns"] if c not in ["EMISSION", "VALUE"]],
+                    EMISSION=impact.id,
+                )
+
+    def add_storage(self):
+        for storage in self.spec.storage or []:
+            for stem, params in Storage.otoole_stems.items():
+                self.add(
+                    stem,
+                    getattr(storage, params["attribute"]),
+                    [c for c in params["columns"] if c not in ["STORAGE", "VALUE"]],
+                    STORAGE=storage.id,
+                )
+
+    def add_region_groups(self):
+        for region_group in self.spec.regionsgroup or []:
+            self.add(
+                "RegionGroupTagRegion",
+                region_group.include_in_region_group,
+                ["REGION", "YEAR"],
+                value_map=int,
+                REGIONGROUP=region_group.id,
+            )
+
+    def add_trade(self):
+        if self.spec.trade is None:
+            return
+
+        # the trade instance of each route
+        dims = ["FUEL", "REGION", "_REGION"]
+        lookup = np.full(tuple(len(self.coords[dim]) for dim in dims), np.nan, dtype=object)
+        for trade in self.spec.trade:
+            if trade.trade_routes is None:
+                continue
+            data = trade.trade_routes.data
+            routes = data.mask.reshape(data.mask.shape[0], data.mask.shape[1], -1).any(axis=-1)
+            src, dst = np.nonzero(routes)
+            lookup[
+                self._positions("FUEL", [trade.commodity])[0],
+                self._positions("REGION", np.asarray(data.coords[data.dims[0]])[src]),
+                self._positions("_REGION", np.asarray(data.coords[data.dims[1]])[dst]),
+            ] = trade.id
+        self._lookups["TradeRouteLookup"] = xr.DataArray(
+            lookup, coords={dim: self.coords[dim] for dim in dims}, dims=dims
+        )
+
+        for trade in self.spec.trade:
+            for stem, params in Trade.otoole_stems.items():
+                data = getattr(trade, params["attribute"])
+                if (
+                    stem == "TradeCapacityToActivityUnit"
+                    and data is not None
+                    and data.data == defaults.trade_capacity_activity_unit_ratio
+                ):
+                    continue
+                self.add(
+                    stem,
+                    data,
+                    [c for c in params["columns"] if c not in ["FUEL", "VALUE"]],
+                    value_map=int if stem == "TradeRoute" else None,
+                    FUEL=trade.commodity,
+                )
+
+    def add_time_definition(self):
+        time_definition = self.spec.time_definition
+        years = np.arange(len(self.coords["YEAR"]))
+
+        def _broadcast(stem, dim, mapping):
+            # values given by `dim` label, constant over years
+            pos = self._positions(dim, mapping.keys())
+            values = np.asarray(list(mapping.values()))
+            self.write(
+                stem,
+                {dim: np.repeat(pos, len(years)), "YEAR": np.tile(years, len(pos))},
+                np.repeat(values, len(years)),
+            )
+
+        def _tag(stem, dim, mapping):
+            # timeslice membership of each part
+            self.write(
+                stem,
+                {
+                    "TIMESLICE": self._positions("TIMESLICE", mapping.keys()),
+                    dim: self._positions(dim, mapping.values()),
+                },
+                np.ones(len(mapping), dtype=np.int64),
+            )
+
+        _broadcast("YearSplit", "TIMESLICE", time_definition.year_split)
+        if time_definition.daily_time_brackets is not None:
+            _broadcast("DaySplit", "DAILYTIMEBRACKET", time_definition.day_split)
+        if time_definition.days_in_day_type is not None:
+            seasons = np.arange(len(self.coords["SEASON"]))
+            day_types = self._positions("DAYTYPE", time_definition.days_in_day_type.keys())
+            values = np.asarray(list(time_definition.days_in_day_type.values()))
+            grid = np.meshgrid(seasons, np.arange(len(day_types)), years, indexing="ij")
+            self.write(
+                "DaysInDayType",
+                {"SEASON": grid[0], "DAYTYPE": day_types[grid[1]], "YEAR": grid[2]},
+                values[grid[1]],
+            )
+        if time_definition.timeslice_in_daytype is not None:
+            _tag("Conversionld", "DAYTYPE", time_definition.timeslice_in_daytype)
+        if time_definition.timeslice_in_season is not None:
+            _tag("Conversionls", "SEASON", time_definition.timeslice_in_season)
+        if time_definition.timeslice_in_timebracket is not None:
+            _tag("Conversionlh", "DAILYTIMEBRACKET", time_definition.timeslice_in_timebracket)
+        if time_definition.year_weight is not None:
+            # not an otoole parameter: milestone-year models only
+            self._lookups["YearWeight"] = xr.DataArray(
+                [float(time_definition.year_weight[year]) for year in self.coords["YEAR"]],
+                coords={"YEAR": self.coords["YEAR"]},
+                dims=["YEAR"],
+            )
+
+    # ------------------------------------------------------------------
+    # Assembly
+    # ------------------------------------------------------------------
+
+    def to_dataset(self) -> xr.Dataset:
+        """
+        Assemble the compiled parameters into a dataset, filling defaults.
+        """
+        default_values = self.spec.default_param_values()
+
+        data_vars = {}
+        for stem, param in self._params.items():
+            values = param.values
+            if param.mask.all() and param.dtype is not None and param.dtype.kind in "biu":
+                # fully-defined integer and boolean parameters keep their dtype
+                values = values.astype(param.dtype)
+
+            attrs = {}
+            if stem in default_values:
+                default = default_values[stem]
+                attrs["default"] = default
+                if stem == "DepreciationMethod":
+                    default = DEPRECIATION_METHODS.get(default, default)
+                if values.dtype.kind == "f":
+                    values[np.isnan(values)] = default
+
+            data_vars[stem] = xr.DataArray(
+                values,
+                coords={dim: self.coords[dim] for dim in param.dims},
+                dims=param.dims,
+                attrs=attrs,
+            )
+
+        data_vars.update(self._lookups)
+
+        return xr.Dataset(data_vars=data_vars, coords=self.coords)
+
+    def compile(self) -> xr.Dataset:
+        self.add_model_params()
+        self.add_technologies()
+        self.add_impacts()
+        self.add_commodities()
+        self.add_time_definition()
+        self.add_region_groups()
+        self.add_storage()
+        self.add_trade()
+        return self.to_dataset()
+
+
+def compile_dataset(spec: "RunSpec") -> xr.Dataset:
+    """
+    Compile a composed RunSpec to the xarray parameter dataset used to build the linopy model,
+    without going through the otoole dataframes.
+
+    Args:
+        spec (RunSpec): a composed RunSpec (or Model)
+
+    Returns:
+        xr.Dataset: a dataset with a DataArray for each (otoole-named) parameter
+    """
+    return DatasetCompiler(spec).compile()
@@ -0,0 +1,26 @@
+from typing import Dict
+
+import xarray as xr
+
+from tz.osemosys.model.links import trade_links
+from tz.osemosys.model.tech_modes import tech_modes
+
+
+def sparse_indices(ds: xr.Dataset) -> Dict[str, xr.Dataset]:
+    """
+    The sparse indices of the variables and constraints of a model built from a parameters
+    dataset, by dimension: its trade links and the operating modes of each technology.
+    """
+    return {"LINK": trade_links(ds), "TECH_MODE": tech_modes(ds)}
+
+
+def with_sparse_indices(ds: xr.Dataset) -> xr.Dataset:
+    """
+    The parameters dataset with its sparse indices as attributes, so that they are found once
+    for every step of building a model from it, rather than by each step, see `trade_links` and
+    `tech_modes`.
+
+    The indices are found from the dataset as it is, so they are found again for a dataset
+    whose parameters are updated, see `Model.update_parameters`.
+    """
+    return ds.assign_attrs(trade_links=trade_links(ds), tech_modes=tech_modes(ds))
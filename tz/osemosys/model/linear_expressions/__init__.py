@@ -1,4 +1,5 @@
-from typing import Dict
+from functools import partial
+from typing import Dict, Optional
 
 import xarray as xr
 from linopy import LinearExpression, Model
@@ -14,26 +15,33 @@ from tz.osemosys.model.linear_expressions.regiongroup import add_lex_regiongroup
 from tz.osemosys.model.linear_expressions.reserve_margin import add_lex_reserve_margin
 from tz.osemosys.model.linear_expressions.storage import add_lex_storage
 from tz.osemosys.model.linear_expressions.trade import add_lex_trade
+from tz.osemosys.model.tracking import (
+    BuildTracker,
+    LinearExpressions,
+    any_equal,
+    any_notnull,
+    nonempty,
+)
 
 
-def add_linear_expressions(ds: xr.Dataset, m: Model) -> Dict[str, LinearExpression]:
-    lex = {}
+def add_linear_expressions(
+    ds: xr.Dataset, m: Model, tracker: Optional[BuildTracker] = None
+) -> Dict[str, LinearExpression]:
+    lex = LinearExpressions()
+    tracker = tracker or BuildTracker()
 
-    add_lex_discounting(ds, m, lex)
-    add_lex_activity(ds, m, lex)
-    add_lex_capacity(ds, m, lex)
-    if ds["EMISSION"].size > 0:
-        add_lex_emissions(ds, m, lex)
-    if ds["REGIONGROUP"].size > 0:
-        add_lex_regiongroup(ds, m, lex)
-    if ds["STORAGE"].size > 0:
-        add_lex_storage(ds, m, lex)
-    if (ds["TradeRoute"] == 1).any():
-        add_lex_trade(ds, m, lex)
-    add_lex_financials(ds, m, lex)
-    add_lex_quantities(ds, m, lex)
-    add_lex_reserve_margin(ds, m, lex)
-    if ds["REMinProductionTarget"].notnull().any():
-        add_lex_re_production(ds, m, lex)
+    tracker.step(add_lex_discounting, ds, m, lex)
+    tracker.step(add_lex_activity, ds, m, lex)
+    tracker.step(add_lex_capacity, ds, m, lex)
+    tracker.step(add_lex_emissions, ds, m, lex, when=partial(nonempty, "EMISSION"))
+    tracker.step(add_lex_regiongroup, ds, m, lex, when=partial(nonempty, "REGIONGROUP"))
+    tracker.step(add_lex_storage, ds, m, lex, when=partial(nonempty, "STORAGE"))
+    tracker.step(add_lex_trade, ds, m, lex, when=partial(any_equal, "TradeRoute", 1))
+    tracker.step(add_lex_financials, ds, m, lex)
+    tracker.step(add_lex_quantities, ds, m, lex)
+    tracker.step(add_lex_reserve_margin, ds, m, lex)
+    tracker.step(
+        add_lex_re_production, ds, m, lex, when=partial(any_notnull, "REMinProductionTarget")
+    )
 
     return lex
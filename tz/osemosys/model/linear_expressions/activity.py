@@ -3,12 +3,20 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.discounting import year_weight
+from tz.osemosys.model.tech_modes import aggregate_modes, tech_modes
+
 
 def add_lex_activity(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
-    RateOfTotalActivity = m["RateOfActivity"].sum(dims="MODE_OF_OPERATION")
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+
+    RateOfTotalActivity = aggregate_modes(m["RateOfActivity"].to_linexpr(), modes, ds.coords)
     TotalTechnologyAnnualActivity = (RateOfTotalActivity * ds["YearSplit"]).sum("TIMESLICE")
     TotalAnnualTechnologyActivityByMode = (m["RateOfActivity"] * ds["YearSplit"]).sum("TIMESLICE")
-    TotalTechnologyModelPeriodActivity = TotalTechnologyAnnualActivity.sum(dims="YEAR")
+    TotalTechnologyModelPeriodActivity = (TotalTechnologyAnnualActivity * year_weight(ds)).sum(
+        dims="YEAR"
+    )
 
     lex.update(
         {
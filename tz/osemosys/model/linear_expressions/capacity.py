@@ -1,19 +1,95 @@
 from typing import Dict
 
+import numpy as np
 import xarray as xr
-from linopy import LinearExpression, Model
+from linopy import LinearExpression, Model, Variable
 
+# the formulations of the gross capacities of a model, see `Model.capacity_formulation`
+CAPACITY_FORMULATIONS = ["vintage", "recursive"]
+
+
+def recursive_capacity(ds: xr.Dataset) -> bool:
+    """
+    Whether the gross capacities of a model are variables accumulated from year to year (see
+    `capacity_recursion`), rather than sums of the capacity built in every earlier year.
+    """
+    return ds.attrs.get("capacity_formulation", "vintage") == "recursive"
+
+
+def vintage_weights(
+    ds: xr.Dataset, build_year: xr.DataArray, life: xr.DataArray
+) -> xr.DataArray:
+    """
+    The share of the capacity built in each BUILDYEAR which is within its operational life in
+    each model YEAR.
+
+    In a milestone-year model, capacity counts for the share of the years represented by each
+    model year in which it is within its operational life.
+    """
+    if "YearWeight" not in ds:
+        return ((ds.YEAR - build_year >= 0) & (ds.YEAR - build_year < life)).astype(float)
+
+    start = np.maximum(ds.YEAR, build_year)
+    end = np.minimum(ds.YEAR + ds["YearWeight"], build_year + life)
+    return ((end - start) / ds["YearWeight"]).clip(min=0).where(ds.YEAR >= build_year, 0)
 
-def add_lex_capacity(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
-    NewCapacity = m["NewCapacity"].rename(YEAR="BUILDYEAR")
 
-    mask = (ds.YEAR - NewCapacity.data.BUILDYEAR >= 0) & (
-        ds.YEAR - NewCapacity.data.BUILDYEAR < ds.OperationalLife
+def accumulate_vintages(ds: xr.Dataset, new_capacity: Variable, life: xr.DataArray):
+    """
+    The capacity built in each year (`new_capacity`, indexed by YEAR) within its operational
+    life in each model year, see `vintage_weights`.
+    """
+    new_capacity = new_capacity.rename(YEAR="BUILDYEAR")
+    share = vintage_weights(ds, new_capacity.data.BUILDYEAR, life)
+
+    if "YearWeight" not in ds:
+        return new_capacity.where(share > 0).sum("BUILDYEAR")
+    return (share * new_capacity).where(share > 0).sum("BUILDYEAR")
+
+
+def capacity_recursion(
+    ds: xr.Dataset,
+    gross_capacity: Variable,
+    new_capacity: Variable,
+    life: xr.DataArray,
+    residual: xr.DataArray,
+):
+    """
+    The gross capacity of each year as that of the previous year, plus the capacity built and
+    less the capacity retired in between, e.g. for technologies:
+
+    ```ampl
+    GrossCapacity[r,t,y] - GrossCapacity[r,t,y-1]
+    =
+    sum{yy in YEAR} (w[r,t,y,yy] - w[r,t,y-1,yy]) * NewCapacity[r,t,yy]
+    + ResidualCapacity[r,t,y] - ResidualCapacity[r,t,y-1];
+    ```
+
+    with the vintage weights `w` of `vintage_weights`, which only differ between successive
+    years for the few vintages built or retired in between. Each year then has a few terms,
+    rather than one for every vintage still in operation, as `accumulate_vintages` has in each
+    use of the gross capacity.
+    """
+    new_capacity = new_capacity.rename(YEAR="BUILDYEAR")
+    share = vintage_weights(ds, new_capacity.data.BUILDYEAR, life)
+    change = share - share.shift(YEAR=1, fill_value=0)
+    built = (change * new_capacity).where(change != 0).sum("BUILDYEAR").densify_terms()
+
+    residual = residual.fillna(0)
+    return (
+        gross_capacity - gross_capacity.shift(YEAR=1) - built
+        == residual - residual.shift(YEAR=1, fill_value=0)
     )
 
-    AccumulatedNewCapacity = NewCapacity.where(mask).sum("BUILDYEAR")
 
-    GrossCapacity = AccumulatedNewCapacity + ds["ResidualCapacity"].fillna(0)
+def add_lex_capacity(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
+    if recursive_capacity(ds):
+        # constrained by `capacity_recursion`, see `add_capacity_adequacy_a_constraints`
+        GrossCapacity = m["GrossCapacity"].to_linexpr()
+        AccumulatedNewCapacity = GrossCapacity - ds["ResidualCapacity"].fillna(0)
+    else:
+        AccumulatedNewCapacity = accumulate_vintages(ds, m["NewCapacity"], ds.OperationalLife)
+        GrossCapacity = AccumulatedNewCapacity + ds["ResidualCapacity"].fillna(0)
 
     lex.update(
         {
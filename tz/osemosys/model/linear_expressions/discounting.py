@@ -1,21 +1,52 @@
-from typing import Dict
+from typing import Dict, Tuple
 
 import xarray as xr
 from linopy import LinearExpression, Model
 
 
+def year_weight(ds: xr.Dataset) -> xr.DataArray | int:
+    """
+    The number of years represented by each model year: the 'YearWeight' of a milestone-year
+    model, or 1.
+    """
+    if "YearWeight" in ds:
+        return ds["YearWeight"]
+    return 1
+
+
+def horizon(ds: xr.Dataset) -> Tuple[int, int]:
+    """
+    The first and last years of the model horizon, to which costs are discounted and at which
+    salvage values are taken: the first and last years of the dataset, unless given by its
+    'horizon' attribute, as for the windows of a rolling-horizon solve. The last year of a
+    milestone-year model is the last year represented by its last model year.
+    """
+    if "horizon" in ds.attrs:
+        first, last = ds.attrs["horizon"]
+        return int(first), int(last)
+    last = int(ds.coords["YEAR"].max())
+    if "YearWeight" in ds:
+        last += int(ds["YearWeight"].sel(YEAR=last)) - 1
+    return int(ds.coords["YEAR"].min()), last
+
+
 def add_lex_discounting(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
+    first_year, last_year = horizon(ds)
 
     # discounting
-    DiscountFactor = (1 + ds["DiscountRate"]) ** (ds.coords["YEAR"] - min(ds.coords["YEAR"]))
+    DiscountFactor = (1 + ds["DiscountRate"]) ** (ds.coords["YEAR"] - first_year)
 
-    DiscountFactorMid = (1 + ds["DiscountRate"]) ** (
-        ds.coords["YEAR"] - min(ds.coords["YEAR"]) + 0.5
-    )
+    DiscountFactorMid = (1 + ds["DiscountRate"]) ** (ds.coords["YEAR"] - first_year + 0.5)
+    if "YearWeight" in ds:
+        # annual costs of a milestone year are incurred in each of the years it represents
+        DiscountFactorMid = DiscountFactorMid / xr.where(
+            ds["DiscountRate"] == 0,
+            ds["YearWeight"],
+            (1 - (1 + ds["DiscountRate"]) ** (-ds["YearWeight"]))
+            / (1 - (1 + ds["DiscountRate"]) ** (-1)),
+        )
 
-    DiscountFactorSalvage = (1 + ds["DiscountRateIdv"]) ** (
-        1 + max(ds.coords["YEAR"]) - min(ds.coords["YEAR"])
-    )
+    DiscountFactorSalvage = (1 + ds["DiscountRateIdv"]) ** (1 + last_year - first_year)
 
     PVAnnuity = (
         (1 - (1 + ds["DiscountRate"]) ** (-(ds["OperationalLife"])))
@@ -28,28 +59,26 @@ def add_lex_discounting(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpressio
     )
 
     # salvage value
-    SV1Numerator = (1 + ds["DiscountRateIdv"]) ** (
-        max(ds.coords["YEAR"]) - ds.coords["YEAR"] + 1
-    ) - 1
+    SV1Numerator = (1 + ds["DiscountRateIdv"]) ** (last_year - ds.coords["YEAR"] + 1) - 1
 
     SV1Denominator = (1 + ds["DiscountRateIdv"]) ** ds["OperationalLife"] - 1
 
-    SV2Numerator = max(ds.coords["YEAR"]) - ds.coords["YEAR"] + 1
+    SV2Numerator = last_year - ds.coords["YEAR"] + 1
 
     SV2Denominator = ds["OperationalLife"]
 
     sv1_mask = (
         (ds["DepreciationMethod"] == 1)
-        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > max(ds.coords["YEAR"]))
+        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > last_year)
         & (ds["DiscountRateIdv"] > 0)
     )
     sv2_mask = (
         (ds["DepreciationMethod"] == 1)
-        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > max(ds.coords["YEAR"]))
+        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > last_year)
         & (ds["DiscountRateIdv"] == 0)
     ) | (
         (ds["DepreciationMethod"] == 2)
-        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > max(ds.coords["YEAR"]))
+        & ((ds.coords["YEAR"] + ds["OperationalLife"] - 1) > last_year)
     )
 
     lex.update(
@@ -3,17 +3,26 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.discounting import year_weight
+from tz.osemosys.model.sparse import transpose_expression
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_emissions(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
-    AnnualTechnologyEmissionByMode = (
-        (ds["EmissionActivityRatio"] * ds["YearSplit"] * m["RateOfActivity"])
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+    EmissionActivityRatio = on_tech_modes(ds["EmissionActivityRatio"], modes)
+
+    AnnualTechnologyEmissionByMode = transpose_expression(
+        (EmissionActivityRatio * ds["YearSplit"] * m["RateOfActivity"])
         .sum("TIMESLICE")
-        .where(ds["EmissionActivityRatio"].notnull(), drop=False)
+        .where(EmissionActivityRatio.notnull(), drop=False),
+        ["REGION", "YEAR", "TECH_MODE", "EMISSION"],
     )
 
-    AnnualTechnologyEmission = AnnualTechnologyEmissionByMode.sum(dims="MODE_OF_OPERATION").where(
-        ds["EmissionActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    )
+    AnnualTechnologyEmission = aggregate_modes(
+        AnnualTechnologyEmissionByMode, modes, ds.coords
+    ).where(ds["EmissionActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False)
 
     AnnualTechnologyEmissionPenaltyByEmission = (
         AnnualTechnologyEmission * ds["EmissionsPenalty"]
@@ -29,7 +38,7 @@ def add_lex_emissions(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]
 
     AnnualEmissions = AnnualTechnologyEmission.sum(dims="TECHNOLOGY")
 
-    ModelPeriodEmissions = AnnualEmissions.sum(dims="YEAR") + ds[
+    ModelPeriodEmissions = (AnnualEmissions * year_weight(ds)).sum(dims="YEAR") + ds[
         "ModelPeriodExogenousEmission"
     ].fillna(0)
 
@@ -3,6 +3,9 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.links import aggregate_links, trade_links
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_financials(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
     CapitalInvestment = (
@@ -15,14 +18,17 @@ def add_lex_financials(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression
     DiscountedCapitalInvestment = CapitalInvestment / lex["DiscountFactor"]
 
     # costs
-    AnnualVariableOperatingCost = (
-        (lex["TotalAnnualTechnologyActivityByMode"] * ds["VariableCost"].fillna(0))
-        .sum(dims="MODE_OF_OPERATION")
-        .where(
-            (ds["VariableCost"].sum(dim="MODE_OF_OPERATION") != 0)
-            & (~ds["VariableCost"].sum(dim="MODE_OF_OPERATION").isnull()),
-            drop=False,
-        )
+    # activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+    AnnualVariableOperatingCost = aggregate_modes(
+        lex["TotalAnnualTechnologyActivityByMode"]
+        * on_tech_modes(ds["VariableCost"].fillna(0), modes),
+        modes,
+        ds.coords,
+    ).where(
+        (ds["VariableCost"].sum(dim="MODE_OF_OPERATION") != 0)
+        & (~ds["VariableCost"].sum(dim="MODE_OF_OPERATION").isnull()),
+        drop=False,
     )
     AnnualFixedOperatingCost = lex["GrossCapacity"] * ds["FixedCost"].fillna(0)
     OperatingCost = AnnualVariableOperatingCost + AnnualFixedOperatingCost
@@ -72,8 +78,10 @@ def add_lex_financials(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression
             ["STORAGE", "TECHNOLOGY"]
         )
     if (ds["TradeRoute"] == 1).any():
-        TotalDiscountedCost = TotalDiscountedCost + lex["TotalDiscountedCostTrade"].sum(
-            ["FUEL", "_REGION"]
+        # the cost of each trade link is borne by its region of origin
+        links = trade_links(ds)
+        TotalDiscountedCost = TotalDiscountedCost + aggregate_links(
+            lex["TotalDiscountedCostTrade"], links, {"REGION": "REGION"}, ds.coords
         )
 
     lex.update(
@@ -3,26 +3,42 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_quantities(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+
+    def param(da: xr.DataArray) -> xr.DataArray:
+        return on_tech_modes(da, modes)
+
     # Production
-    RateOfProductionByTechnologyByMode = m["RateOfActivity"] * ds["OutputActivityRatio"].where(
-        ds["OutputActivityRatio"].notnull(), drop=False
+    RateOfProductionByTechnologyByMode = m["RateOfActivity"] * param(
+        ds["OutputActivityRatio"].where(ds["OutputActivityRatio"].notnull(), drop=False)
+    )
+    RateOfProductionByTechnology = aggregate_modes(
+        RateOfProductionByTechnologyByMode.where(
+            param(ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0), drop=False
+        ),
+        modes,
+        ds.coords,
     )
-    RateOfProductionByTechnology = RateOfProductionByTechnologyByMode.where(
-        ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    ).sum(dims="MODE_OF_OPERATION")
     RateOfProduction = RateOfProductionByTechnology.sum(dims="TECHNOLOGY")
     ProductionByTechnology = RateOfProductionByTechnology * ds["YearSplit"]
     Production = RateOfProduction * ds["YearSplit"]
     ProductionAnnual = Production.sum(dims="TIMESLICE")
 
-    RateOfUseByTechnologyByMode = m["RateOfActivity"] * ds["InputActivityRatio"].where(
-        ds["InputActivityRatio"].notnull(), drop=False
+    RateOfUseByTechnologyByMode = m["RateOfActivity"] * param(
+        ds["InputActivityRatio"].where(ds["InputActivityRatio"].notnull(), drop=False)
+    )
+    RateOfUseByTechnology = aggregate_modes(
+        RateOfUseByTechnologyByMode.where(
+            param(ds["InputActivityRatio"].sum("MODE_OF_OPERATION") != 0), drop=False
+        ),
+        modes,
+        ds.coords,
     )
-    RateOfUseByTechnology = RateOfUseByTechnologyByMode.where(
-        ds["InputActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    ).sum(dims="MODE_OF_OPERATION")
     RateOfUse = RateOfUseByTechnology.sum(dims="TECHNOLOGY")
     Use = RateOfUse * ds["YearSplit"]
     UseAnnual = Use.sum(dims="TIMESLICE")
@@ -3,14 +3,28 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_re_production(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
-    RateOfProductionByTechnologyByModeRE = m["RateOfActivity"] * ds["OutputActivityRatio"].where(
-        ds["OutputActivityRatio"].notnull() & (ds["RETagTechnology"] == 1), drop=False
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+
+    def param(da: xr.DataArray) -> xr.DataArray:
+        return on_tech_modes(da, modes)
+
+    RateOfProductionByTechnologyByModeRE = m["RateOfActivity"] * param(
+        ds["OutputActivityRatio"].where(
+            ds["OutputActivityRatio"].notnull() & (ds["RETagTechnology"] == 1), drop=False
+        )
+    )
+    RateOfProductionByTechnologyRE = aggregate_modes(
+        RateOfProductionByTechnologyByModeRE.where(
+            param(ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0), drop=False
+        ),
+        modes,
+        ds.coords,
     )
-    RateOfProductionByTechnologyRE = RateOfProductionByTechnologyByModeRE.where(
-        ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    ).sum(dims="MODE_OF_OPERATION")
     RateOfProductionRE = RateOfProductionByTechnologyRE.sum(dims="TECHNOLOGY")
     ProductionByTechnologyRE = RateOfProductionByTechnologyRE * ds["YearSplit"]
     ProductionRE = RateOfProductionRE * ds["YearSplit"]
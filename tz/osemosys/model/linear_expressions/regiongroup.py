@@ -3,20 +3,29 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_regiongroup(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+
+    def param(da: xr.DataArray) -> xr.DataArray:
+        return on_tech_modes(da, modes)
 
     # EMISSIONS
 
     AnnualTechnologyEmissionByModeRegionGroup = (
-        (ds["EmissionActivityRatio"] * ds["YearSplit"] * m["RateOfActivity"]).sum("TIMESLICE")
+        (param(ds["EmissionActivityRatio"]) * ds["YearSplit"] * m["RateOfActivity"]).sum(
+            "TIMESLICE"
+        )
     ).where(
-        ds["EmissionActivityRatio"].notnull() & (ds["RegionGroupTagRegion"] == 1),
+        param(ds["EmissionActivityRatio"].notnull() & (ds["RegionGroupTagRegion"] == 1)),
         drop=False,
     )
 
-    AnnualTechnologyEmissionRegionGroup = AnnualTechnologyEmissionByModeRegionGroup.sum(
-        dims="MODE_OF_OPERATION"
+    AnnualTechnologyEmissionRegionGroup = aggregate_modes(
+        AnnualTechnologyEmissionByModeRegionGroup, modes, ds.coords
     ).where(ds["EmissionActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False)
 
     AnnualEmissionsRegionGroupTag = AnnualTechnologyEmissionRegionGroup.sum(dims="TECHNOLOGY")
@@ -24,12 +33,18 @@ def add_lex_regiongroup(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpressio
 
     # PRODUCTION
 
-    RateOfProductionByTechnologyByModeRG = m["RateOfActivity"] * ds["OutputActivityRatio"].where(
-        ds["OutputActivityRatio"].notnull() & (ds["RegionGroupTagRegion"] == 1), drop=False
+    RateOfProductionByTechnologyByModeRG = m["RateOfActivity"] * param(
+        ds["OutputActivityRatio"].where(
+            ds["OutputActivityRatio"].notnull() & (ds["RegionGroupTagRegion"] == 1), drop=False
+        )
+    )
+    RateOfProductionByTechnologyRegionGroup = aggregate_modes(
+        RateOfProductionByTechnologyByModeRG.where(
+            param(ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0), drop=False
+        ),
+        modes,
+        ds.coords,
     )
-    RateOfProductionByTechnologyRegionGroup = RateOfProductionByTechnologyByModeRG.where(
-        ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    ).sum(dims="MODE_OF_OPERATION")
     RateOfProductionRegionGroup = RateOfProductionByTechnologyRegionGroup.sum(dims="TECHNOLOGY")
     ProductionByTechnologyRegionGroup = RateOfProductionByTechnologyRegionGroup * ds["YearSplit"]
     ProductionRegionGroup = RateOfProductionRegionGroup * ds["YearSplit"]
@@ -39,15 +54,21 @@ def add_lex_regiongroup(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpressio
     )
 
     # RE PRODUCTION
-    RateOfProductionByTechnologyByModeRERG = m["RateOfActivity"] * ds["OutputActivityRatio"].where(
-        ds["OutputActivityRatio"].notnull()
-        & (ds["RETagTechnology"] == 1)
-        & (ds["RegionGroupTagRegion"] == 1),
-        drop=False,
+    RateOfProductionByTechnologyByModeRERG = m["RateOfActivity"] * param(
+        ds["OutputActivityRatio"].where(
+            ds["OutputActivityRatio"].notnull()
+            & (ds["RETagTechnology"] == 1)
+            & (ds["RegionGroupTagRegion"] == 1),
+            drop=False,
+        )
+    )
+    RateOfProductionByTechnologyRERegionGroup = aggregate_modes(
+        RateOfProductionByTechnologyByModeRERG.where(
+            param(ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0), drop=False
+        ),
+        modes,
+        ds.coords,
     )
-    RateOfProductionByTechnologyRERegionGroup = RateOfProductionByTechnologyByModeRERG.where(
-        ds["OutputActivityRatio"].sum("MODE_OF_OPERATION") != 0, drop=False
-    ).sum(dims="MODE_OF_OPERATION")
     RateOfProductionRERegionGroup = RateOfProductionByTechnologyRERegionGroup.sum(dims="TECHNOLOGY")
     ProductionByTechnologyRERegionGroup = (
         RateOfProductionByTechnologyRERegionGroup * ds["YearSplit"]
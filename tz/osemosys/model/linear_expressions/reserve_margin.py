@@ -3,6 +3,8 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.tech_modes import aggregate_modes, on_tech_modes, tech_modes
+
 
 def add_lex_reserve_margin(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
     TotalCapacityInReserveMargin = (
@@ -16,32 +18,29 @@ def add_lex_reserve_margin(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpres
         )
     ).sum("TECHNOLOGY")
 
-    RateOfProductionByTechnologyByModeWithReserveMargin = m["RateOfActivity"] * ds[
-        "OutputActivityRatio"
-    ].where(
+    # activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+    reserve_margin_mask = (
         (ds["OutputActivityRatio"].notnull())
         & (ds["ReserveMargin"] > 0)
         & (ds["ReserveMarginTagFuel"] == 1)
-        & (ds["ReserveMarginTagTechnology"] > 0),
-        drop=False,
+        & (ds["ReserveMarginTagTechnology"] > 0)
+    )
+
+    RateOfProductionByTechnologyByModeWithReserveMargin = m["RateOfActivity"] * on_tech_modes(
+        ds["OutputActivityRatio"].where(reserve_margin_mask, drop=False), modes
     )
 
-    RateOfProductionByTechnologyWithReserveMargin = (
+    RateOfProductionByTechnologyWithReserveMargin = aggregate_modes(
         RateOfProductionByTechnologyByModeWithReserveMargin.where(
-            (ds["OutputActivityRatio"].notnull())
-            & (ds["ReserveMargin"] > 0)
-            & (ds["ReserveMarginTagFuel"] == 1)
-            & (ds["ReserveMarginTagTechnology"] > 0),
-            drop=False,
-        ).sum(dims="MODE_OF_OPERATION")
+            on_tech_modes(reserve_margin_mask, modes), drop=False
+        ),
+        modes,
+        ds.coords,
     )
 
     RateOfProductionWithReserveMargin = RateOfProductionByTechnologyWithReserveMargin.where(
-        (ds["OutputActivityRatio"].notnull())
-        & (ds["ReserveMargin"] > 0)
-        & (ds["ReserveMarginTagFuel"] == 1)
-        & (ds["ReserveMarginTagTechnology"] > 0),
-        drop=False,
+        reserve_margin_mask, drop=False
     ).sum(dims="TECHNOLOGY")
 
     DemandNeedingReserveMargin = (
@@ -3,22 +3,35 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import (
+    accumulate_vintages,
+    recursive_capacity,
+)
+from tz.osemosys.model.linear_expressions.discounting import horizon
+from tz.osemosys.model.tech_modes import on_tech_modes, tech_modes
+
 
 def add_lex_storage(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
-    DiscountFactorStorage = (1 + ds["DiscountRateStorage"]) ** (
-        1 + ds.coords["YEAR"][-1] - ds.coords["YEAR"][0]
-    )
+    # Activity is indexed by the operating modes of each technology, see `tech_modes`
+    modes = tech_modes(ds)
+
+    def param(da: xr.DataArray) -> xr.DataArray:
+        return on_tech_modes(da, modes)
+
+    first_year, last_year = horizon(ds)
+    DiscountFactorStorage = (1 + ds["DiscountRateStorage"]) ** (1 + last_year - first_year)
 
     RateOfStorageCharge = (
-        (ds["TechnologyToStorage"] * m["RateOfActivity"]).where(
-            (ds["TechnologyToStorage"].notnull()) & (ds["TechnologyToStorage"] != 0), drop=True
+        (param(ds["TechnologyToStorage"]) * m["RateOfActivity"]).where(
+            param((ds["TechnologyToStorage"].notnull()) & (ds["TechnologyToStorage"] != 0)),
+            drop=True,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION"])
+    ).sum("TECH_MODE")
 
     StorageChargeDaily = (
         (
             ds["DaySplit"]
-            * ds["TechnologyToStorage"]
+            * param(ds["TechnologyToStorage"])
             * (
                 ds["Conversionlh"].fillna(0)
                 * ds["Conversionls"].fillna(0)
@@ -26,17 +39,17 @@ def add_lex_storage(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
             ).sum(dim="DAILYTIMEBRACKET")
             * m["RateOfActivity"]
         ).where(
-            (ds["TechnologyToStorage"].notnull())
+            param(ds["TechnologyToStorage"].notnull())
             & (ds["StorageBalanceDay"] != 0)
             & (ds["Conversionls"] != 0),
             drop=False,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION", "TIMESLICE"])
+    ).sum(["TECH_MODE", "TIMESLICE"])
 
     StorageChargeSeasonally = (
         (
             ds["YearSplit"]
-            * ds["TechnologyToStorage"]
+            * param(ds["TechnologyToStorage"])
             * (
                 ds["Conversionlh"].fillna(0)
                 * ds["Conversionls"].fillna(0)
@@ -44,23 +57,24 @@ def add_lex_storage(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
             ).sum(dim="DAYTYPE")
             * m["RateOfActivity"]
         ).where(
-            (ds["TechnologyToStorage"].notnull())
+            param(ds["TechnologyToStorage"].notnull())
             & (ds["StorageBalanceSeason"] != 0)
             & (ds["Conversionls"] != 0),
             drop=False,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION", "TIMESLICE"])
+    ).sum(["TECH_MODE", "TIMESLICE"])
 
     RateOfStorageDischarge = (
-        (ds["TechnologyFromStorage"] * m["RateOfActivity"]).where(
-            (ds["TechnologyFromStorage"].notnull()) & (ds["TechnologyFromStorage"] != 0), drop=True
+        (param(ds["TechnologyFromStorage"]) * m["RateOfActivity"]).where(
+            param((ds["TechnologyFromStorage"].notnull()) & (ds["TechnologyFromStorage"] != 0)),
+            drop=True,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION"])
+    ).sum("TECH_MODE")
 
     StorageDischargeDaily = (
         (
             ds["DaySplit"]
-            * ds["TechnologyFromStorage"]
+            * param(ds["TechnologyFromStorage"])
             * (
                 ds["Conversionlh"].fillna(0)
                 * ds["Conversionls"].fillna(0)
@@ -68,17 +82,17 @@ def add_lex_storage(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
             ).sum(dim="DAILYTIMEBRACKET")
             * m["RateOfActivity"]
         ).where(
-            (ds["TechnologyFromStorage"].notnull())
+            param(ds["TechnologyFromStorage"].notnull())
             & (ds["StorageBalanceDay"] != 0)
             & (ds["Conversionls"] != 0),
             drop=False,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION", "TIMESLICE"])
+    ).sum(["TECH_MODE", "TIMESLICE"])
 
     StorageDischargeSeasonally = (
         (
             ds["YearSplit"]
-            * ds["TechnologyFromStorage"]
+            * param(ds["TechnologyFromStorage"])
             * (
                 ds["Conversionlh"].fillna(0)
                 * ds["Conversionls"].fillna(0)
@@ -86,28 +100,27 @@ def add_lex_storage(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
             ).sum(dim="DAYTYPE")
             * m["RateOfActivity"]
         ).where(
-            (ds["TechnologyFromStorage"].notnull())
+            param(ds["TechnologyFromStorage"].notnull())
             & (ds["StorageBalanceSeason"] != 0)
             & (ds["Conversionls"] != 0),
             drop=False,
         )
-    ).sum(["TECHNOLOGY", "MODE_OF_OPERATION", "TIMESLICE"])
+    ).sum(["TECH_MODE", "TIMESLICE"])
 
     NetCharge = ds["YearSplit"] * (RateOfStorageCharge - RateOfStorageDischarge)
 
     # Explicit storage level (state of charge) per timeslice
     StorageLevel = m["StorageLevel"]
 
-    NewStorageCapacity = m["NewStorageCapacity"].rename(YEAR="BUILDYEAR")
-
-    # mask to handle operating life of storage
-    mask = (ds.YEAR - NewStorageCapacity.data.BUILDYEAR >= 0) & (
-        ds.YEAR - NewStorageCapacity.data.BUILDYEAR < ds.OperationalLifeStorage
-    )
-
-    AccumulatedNewStorageCapacity = NewStorageCapacity.where(mask).sum("BUILDYEAR")
-
-    GrossStorageCapacity = AccumulatedNewStorageCapacity + ds["ResidualStorageCapacity"]
+    if recursive_capacity(ds):
+        # constrained by `capacity_recursion`, see `add_storage_constraints`
+        GrossStorageCapacity = m["GrossStorageCapacity"].to_linexpr()
+        AccumulatedNewStorageCapacity = GrossStorageCapacity - ds["ResidualStorageCapacity"]
+    else:
+        AccumulatedNewStorageCapacity = accumulate_vintages(
+            ds, m["NewStorageCapacity"], ds.OperationalLifeStorage
+        )
+        GrossStorageCapacity = AccumulatedNewStorageCapacity + ds["ResidualStorageCapacity"]
 
     CapitalInvestmentStorage = ds["CapitalCostStorage"] * m["NewStorageCapacity"]
     DiscountedCapitalInvestmentStorage = CapitalInvestmentStorage / lex["DiscountFactor"]
@@ -3,72 +3,89 @@ from typing import Dict
 import xarray as xr
 from linopy import LinearExpression, Model
 
+from tz.osemosys.model.linear_expressions.capacity import (
+    accumulate_vintages,
+    recursive_capacity,
+)
+from tz.osemosys.model.linear_expressions.discounting import horizon
+from tz.osemosys.model.links import aggregate_links, on_links, trade_links
+from tz.osemosys.model.sparse import transpose_expression
+
 
 def add_lex_trade(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
+    # Trade is indexed by the trade links, see `trade_links`
+    links = trade_links(ds)
+
+    def param(name: str) -> xr.DataArray:
+        return on_links(ds[name], links)
+
     # Capacity #
-    NewTradeCapacity = m["NewTradeCapacity"].rename(YEAR="BUILDYEAR")
-    mask = (ds.YEAR - NewTradeCapacity.data.BUILDYEAR >= 0) & (
-        ds.YEAR - NewTradeCapacity.data.BUILDYEAR < ds.OperationalLifeTrade
-    )
-    AccumulatedNewTradeCapacity = NewTradeCapacity.where(mask).sum("BUILDYEAR")
-    GrossTradeCapacity = AccumulatedNewTradeCapacity + ds["ResidualTradeCapacity"].fillna(0)
+    if recursive_capacity(ds):
+        # constrained by `capacity_recursion`, see `add_trade_constraints`
+        GrossTradeCapacity = m["GrossTradeCapacity"].to_linexpr()
+        AccumulatedNewTradeCapacity = GrossTradeCapacity - param("ResidualTradeCapacity").fillna(0)
+    else:
+        AccumulatedNewTradeCapacity = accumulate_vintages(
+            ds, m["NewTradeCapacity"], param("OperationalLifeTrade")
+        )
+        GrossTradeCapacity = AccumulatedNewTradeCapacity + param("ResidualTradeCapacity").fillna(0)
 
     # Activity #
-    NetTrade = (
-        ((m["Export"] / (1 - ds["TradeLossBetweenRegions"])) - m["Import"])
-        .where(ds["TradeRoute"].notnull(), drop=False)
-        .sum("_REGION")
-        .fillna(0)
+    # exports (with their losses) by region of origin, less imports by region of destination
+    NetTrade = aggregate_links(
+        m["Export"] / (1 - param("TradeLossBetweenRegions")),
+        links,
+        {"REGION": "REGION", "FUEL": "FUEL"},
+        ds.coords,
+    ) - aggregate_links(
+        m["Import"].to_linexpr(), links, {"REGION": "_REGION", "FUEL": "FUEL"}, ds.coords
     )
+    NetTrade = transpose_expression(NetTrade, ["REGION", "YEAR", "FUEL", "TIMESLICE"])
     NetTradeAnnual = NetTrade.sum("TIMESLICE")
     ExportAnnual = m["Export"].sum("TIMESLICE")
 
     # Discounting #
-    DiscountFactorTrade = (1 + ds["DiscountRateTrade"]) ** (
-        ds.coords["YEAR"] - min(ds.coords["YEAR"])
-    )
+    first_year, last_year = horizon(ds)
 
-    DiscountFactorSalvageTrade = (1 + ds["DiscountRateTrade"]) ** (
-        1 + max(ds.coords["YEAR"]) - min(ds.coords["YEAR"])
-    )
+    DiscountFactorTrade = (1 + param("DiscountRateTrade")) ** (ds.coords["YEAR"] - first_year)
+
+    DiscountFactorSalvageTrade = (1 + param("DiscountRateTrade")) ** (1 + last_year - first_year)
 
     PVAnnuityTrade = (
-        (1 - (1 + ds["DiscountRateTrade"]) ** (-(ds["OperationalLifeTrade"])))
-        * (1 + ds["DiscountRateTrade"])
-        / ds["DiscountRateTrade"]
+        (1 - (1 + param("DiscountRateTrade")) ** (-(param("OperationalLifeTrade"))))
+        * (1 + param("DiscountRateTrade"))
+        / param("DiscountRateTrade")
     )
 
-    CapitalRecoveryFactorTrade = (1 - (1 + ds["DiscountRateTrade"]) ** (-1)) / (
-        1 - (1 + ds["DiscountRateTrade"]) ** (-(ds["OperationalLifeTrade"]))
+    CapitalRecoveryFactorTrade = (1 - (1 + param("DiscountRateTrade")) ** (-1)) / (
+        1 - (1 + param("DiscountRateTrade")) ** (-(param("OperationalLifeTrade")))
     )
 
-    SV1NumeratorTrade = (1 + ds["DiscountRateTrade"]) ** (
-        max(ds.coords["YEAR"]) - ds.coords["YEAR"] + 1
-    ) - 1
+    SV1NumeratorTrade = (1 + param("DiscountRateTrade")) ** (last_year - ds.coords["YEAR"] + 1) - 1
 
-    SV1DenominatorTrade = (1 + ds["DiscountRateTrade"]) ** ds["OperationalLifeTrade"] - 1
+    SV1DenominatorTrade = (1 + param("DiscountRateTrade")) ** param("OperationalLifeTrade") - 1
 
-    SV2NumeratorTrade = max(ds.coords["YEAR"]) - ds.coords["YEAR"] + 1
+    SV2NumeratorTrade = last_year - ds.coords["YEAR"] + 1
 
-    SV2DenominatorTrade = ds["OperationalLifeTrade"]
+    SV2DenominatorTrade = param("OperationalLifeTrade")
 
     sv1_trade_mask = (
-        (ds["DepreciationMethod"] == 1)
-        & ((ds.coords["YEAR"] + ds["OperationalLifeTrade"] - 1) > max(ds.coords["YEAR"]))
-        & (ds["DiscountRateTrade"] > 0)
+        (param("DepreciationMethod") == 1)
+        & ((ds.coords["YEAR"] + param("OperationalLifeTrade") - 1) > last_year)
+        & (param("DiscountRateTrade") > 0)
     )
     sv2_trade_mask = (
-        (ds["DepreciationMethod"] == 1)
-        & ((ds.coords["YEAR"] + ds["OperationalLifeTrade"] - 1) > max(ds.coords["YEAR"]))
-        & (ds["DiscountRateTrade"] == 0)
+        (param("DepreciationMethod") == 1)
+        & ((ds.coords["YEAR"] + param("OperationalLifeTrade") - 1) > last_year)
+        & (param("DiscountRateTrade") == 0)
     ) | (
-        (ds["DepreciationMethod"] == 2)
-        & ((ds.coords["YEAR"] + ds["OperationalLifeTrade"] - 1) > max(ds.coords["YEAR"]))
+        (param("DepreciationMethod") == 2)
+        & ((ds.coords["YEAR"] + param("OperationalLifeTrade") - 1) > last_year)
     )
 
     # Financials #
     CapitalInvestmentTrade = (
-        ds["CapitalCostTrade"].fillna(0)
+        param("CapitalCostTrade").fillna(0)
         * m["NewTradeCapacity"]
         * CapitalRecoveryFactorTrade
         * PVAnnuityTrade
@@ -77,11 +94,11 @@ def add_lex_trade(ds: xr.Dataset, m: Model, lex: Dict[str, LinearExpression]):
     DiscountedCapitalInvestmentTrade = CapitalInvestmentTrade / DiscountFactorTrade
 
     # salvage value factors (trade)
-    SV1CostTrade = ds["CapitalCostTrade"].fillna(0) * (
+    SV1CostTrade = param("CapitalCostTrade").fillna(0) * (
         1 - (SV1NumeratorTrade / SV1DenominatorTrade)
     )
 
-    SV2CostTrade = ds["CapitalCostTrade"].fillna(0) * (
+    SV2CostTrade = param("CapitalCostTrade").fillna(0) * (
         1 - (SV2NumeratorTrade / SV2DenominatorTrade)
     )
 
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Mapping
+
+import numpy as np
+import xarray as xr
+from linopy import LinearExpression
+
+from tz.osemosys.model.sparse import aggregate, densify, on_index, sparse_index
+
+# the dimensions of a trade route, which index each trade link
+LINK_DIMS = ["REGION", "_REGION", "FUEL"]
+
+# variables indexed by the destination of each trade link, see `densify_links`
+IMPORTS = ["Import"]
+
+
+def trade_links(ds: xr.Dataset) -> xr.Dataset:
+    """
+    The trade links of a model: the origin REGION, destination _REGION and FUEL of each trade
+    route which is open in any year, indexed by LINK.
+
+    Trade variables, linear expressions and constraints are indexed by LINK rather than over the
+    dense REGION x _REGION x FUEL grid, of which only the few routes are ever used. They are found
+    once for every step of building a model from a dataset with its sparse indices, see
+    `with_sparse_indices`.
+    """
+    if "trade_links" in ds.attrs:
+        # read through the dataset, so that the build steps using the links depend on the trade
+        # routes, see `BuildTracker`
+        ds["TradeRoute"]
+        return ds.attrs["trade_links"]
+    return sparse_index((ds["TradeRoute"] == 1).any("YEAR"), LINK_DIMS, "LINK")
+
+
+def on_links(da: xr.DataArray, links: xr.Dataset) -> xr.DataArray:
+    """
+    A parameter over (some of) the dimensions of a trade route, at each trade link, see
+    `on_index`.
+    """
+    return on_index(da, links)
+
+
+def aggregate_links(
+    expression: LinearExpression,
+    links: xr.Dataset,
+    keys: Dict[str, str],
+    coords: Mapping[str, Any],
+) -> LinearExpression:
+    """
+    Sum a linear expression indexed by LINK over the links with the same keys, e.g. the exports
+    of each link by the REGION and FUEL of its origin, see `aggregate`.
+    """
+    return aggregate(expression, links, keys, coords)
+
+
+def densify_links(
+    da: xr.DataArray,
+    links: xr.Dataset,
+    coords: Mapping[str, Any] | None = None,
+    imports: bool = False,
+    fill_value: float = np.nan,
+) -> xr.DataArray:
+    """
+    Reshape the solution of a variable or linear expression indexed by LINK onto the dense
+    REGION x _REGION x FUEL grid of the trade routes, with missing values off the links.
+
+    Arguments
+    ---------
+    da: xr.DataArray
+        The solution
+    links: xr.Dataset
+        The trade links, see `trade_links`
+    coords: Mapping[str, Any], optional
+        The labels of REGION, _REGION and FUEL, e.g. the coords of the parameters dataset;
+        otherwise only the labels of the links are kept
+    imports: bool
+        Whether the solution is indexed by the destination REGION of each link, from its origin
+        _REGION, as Import is
+    fill_value: float
+        The value off the links, see `densify`
+    """
+    if imports:
+        links = links.rename({"REGION": "_REGION", "_REGION": "REGION"})[LINK_DIMS]
+    return densify(da, links, coords, fill_value)
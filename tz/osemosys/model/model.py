@@ -1,18 +1,53 @@
 import os
-from typing import Any, Dict, Optional
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Literal, Mapping, Optional, Tuple, Union
 
+import linopy
+import numpy as np
+import pandas as pd
 import xarray as xr
 from linopy import LinearExpression
 from linopy import Model as LPModel
+from pydantic import Field
 
 from tz.osemosys.io.load_model import load_cfg
+from tz.osemosys.io.netcdf import open_netcdf, write_netcdf
+from tz.osemosys.logger import logging
+from tz.osemosys.model.cache import CompileCache, spec_hash
 from tz.osemosys.model.constraints import add_constraints
+from tz.osemosys.model.dataset import compile_dataset
+from tz.osemosys.model.indices import with_sparse_indices
 from tz.osemosys.model.linear_expressions import add_linear_expressions
+from tz.osemosys.model.linear_expressions.discounting import horizon, year_weight
+from tz.osemosys.model.links import densify_links, trade_links
 from tz.osemosys.model.objective import add_objective
-from tz.osemosys.model.solution import build_solution
+from tz.osemosys.model.profiling import BuildStats, solver_time
+from tz.osemosys.model.reduction import Reduction, reduce_dataset, same_reduction
+from tz.osemosys.model.rolling import (
+    CAPACITY_CARRIED,
+    commit,
+    rolling_windows,
+    stitch,
+    window_dataset,
+)
+from tz.osemosys.model.size import check_memory, estimate_size
+from tz.osemosys.model.solution import LazySolution, build_solution
+from tz.osemosys.model.tracking import BuildTracker
 from tz.osemosys.model.variables import add_variables
+from tz.osemosys.model.warm_start import (
+    Basis,
+    SolvedBasis,
+    densify_values,
+    get_basis,
+    solved_basis,
+    write_warm_start,
+)
 from tz.osemosys.schemas import RunSpec
 
+# Scalar fields of the spec stored as attributes of a saved netcdf
+NETCDF_ATTRS = ["id", "long_name", "description", "capacity_formulation"]
+
 
 class Model(RunSpec):
     """
@@ -168,6 +203,20 @@ class Model(RunSpec):
     model = Model.from_otoole_csv(root_dir=path_to_csvs)
     ```
 
+    ### From parquet
+
+    A model written to a directory of parquet tables with to_parquet(), one table per otoole
+    stem, can be loaded with the class method from_parquet():
+
+    ```python
+    from tz.osemosys import Model
+
+    path_to_csvs = "examples/otoole_compat/input_csv/otoole-full-electricity-complete/"
+
+    Model.from_otoole_csv(root_dir=path_to_csvs).to_parquet("archive/")
+    model = Model.from_parquet(root_dir="archive/")
+    ```
+
     ### From yaml
 
     Alternatively, a model can be created from a TZ-OSeMOSYS yaml or set of yamls, examples of
@@ -200,6 +249,138 @@ class Model(RunSpec):
     solvers. To specify a solver, pass the name of the solver as a string to the solve() method for
     the argument `solver_name` (e.g. `model.solve(solver_name="highs")`).
 
+    ### Capacity formulation
+
+    By default, the gross capacity of a technology, storage or trade route in each year is a sum
+    of the capacity built in every earlier year still within its operational life, repeated in
+    every constraint using it, which has as many terms as the vintages in operation. With
+    `capacity_formulation="recursive"`, the gross capacities are instead variables, each equal to
+    that of the previous year plus the capacity built and less the capacity retired in between,
+    so that the number of nonzeros grows with the number of years rather than its square. Both
+    formulations have the same solutions. The formulation can be set in the spec's yaml, or when
+    creating a Model:
+
+    ```python
+    from tz.osemosys.io.load_model import load_cfg
+
+    cfg = load_cfg("examples/utopia/main.yaml")
+    model = Model(**cfg, capacity_formulation="recursive")
+    ```
+
+    ### Reducing a model
+
+    Before the model is built, the technologies, fuels and operating modes which provably cannot
+    be used are found in each region: technologies which can have no capacity, fuels which are
+    neither produced, demanded nor traded, and the modes which use those fuels. Their activity
+    ratios are cleared, and the labels unused in every region are dropped from the parameters
+    dataset (technologies only from models without storage), so that they have no variables or
+    constraints. The solution is returned over the full labels, with no value for the variables
+    and duals of those dropped and zero for their linear expressions, as off the operating modes
+    of each technology. The reduction is opt-in, with `reduce=True`:
+
+    ```python
+    model = Model(**cfg, reduce=True)
+    ```
+
+    ### Caching compiled models
+
+    Building a model (compiling its parameter dataset and generating the linopy variables and
+    constraints) can take longer than solving it. Passing a CompileCache to solve() stores the
+    compiled dataset, keyed by a hash of the model's contents and of the code which built it, so
+    that re-solving an unchanged model skips compilation. With `store_model=True` the built
+    linopy model is stored too, and an unchanged model goes straight to the solver.
+    Least-recently-used entries are evicted once the cache grows beyond `max_size` bytes.
+
+    ```python
+    from tz.osemosys import CompileCache, Model
+
+    cache = CompileCache("cache/", max_size=10 * 2**30, store_model=True)
+
+    model = Model.from_yaml("examples/utopia/main.yaml")
+    model.solve(cache=cache)
+    ```
+
+    ### Limiting memory
+
+    The size of a model can be estimated before it is built with estimate_size(). Passing
+    `max_memory` (in bytes) to solve() raises a MemoryError, with the estimated memory of each
+    block of the model, instead of building a model estimated to need more.
+
+    ```python
+    model.estimate_size()
+    model.solve(max_memory=8 * 2**30)
+    ```
+
+    ### Profiling a build
+
+    The wall time, peak RSS growth, and variables, constraints and nonzeros of each stage of
+    building and solving a model, including each group of linear expressions and constraints,
+    are recorded in `build_stats`, which can be written as a Chrome trace or a speedscope
+    profile:
+
+    ```python
+    model.solve()
+    model.build_stats.to_dataframe()
+    model.build_stats.to_chrome_trace("build.trace.json")
+    model.build_stats.to_speedscope("build.speedscope.json")
+    ```
+
+    ### Updating parameters
+
+    For sensitivity sweeps, the parameters of a built model can be updated with
+    update_parameters(), using the (otoole) names of the model's parameter dataset. Only the
+    linear expressions and constraints which depend on the updated parameters are rebuilt before
+    the model is solved again. Parameters can be given as a scalar or array for every cell, or as
+    a DataArray updating only the cells it covers.
+
+    ```python
+    model.solve()
+
+    model.update_parameters(EmissionsPenalty=100, CapitalCost=model._data["CapitalCost"] * 0.9)
+    model.solve()
+    ```
+
+    Updates which change the structure of the model, e.g. the variables it has, raise a
+    ValueError, and the model must be rebuilt instead.
+
+    ### Warm starts
+
+    Successive solves of similar models, e.g. in a sensitivity sweep, can be warm started from a
+    previous solution by passing a solved Model, or a solution Dataset, to solve() as
+    `warm_start`. The previous solution is mapped onto the variables and constraints of the new
+    model by coordinate, so the two models may differ in structure. If the basis of the previous
+    solve covers the whole of the new model, it is passed to the solver, otherwise the previous
+    values of the variables are. The basis of a solve is only read from the solver when the model
+    is passed as a warm start. Warm starts are supported with the HiGHS solver.
+
+    ```python
+    model.solve(solver_name="highs")
+
+    model.update_parameters(EmissionsPenalty=100)
+    model.solve(solver_name="highs", warm_start=model)
+    ```
+
+    ### Rolling-horizon solves
+
+    Long horizons can be solved myopically with solve_rolling(), which solves the model over
+    successive windows of `window` years, each overlapping the next by `overlap` years. The
+    decisions of the first `window - overlap` years of each window are committed: capacity built
+    is carried forward as residual capacity, the final storage level as the starting storage
+    level, and emissions and activity count towards the model period limits of later windows.
+    The committed years of each window are stitched into a single `solution`. Every window
+    discounts costs to the first year of the model. Salvage values are taken at the end of each
+    window when it is solved, but at the end of the model in the stitched solution, so that its
+    costs are those of the whole model.
+
+    ```python
+    model = Model.from_yaml("examples/utopia/main.yaml")
+    model.solve_rolling(window=10, overlap=5)
+    model.solution["NewCapacity"]
+    ```
+
+    Each window only sees its own years, so constraints linking years across windows (e.g.
+    capacity growth rates) are not applied at window boundaries.
+
     ### Viewing the model solution
 
     Once the model has been solved, the solution can be accessed via the `solution` attribute of the
@@ -220,6 +401,35 @@ class Model(RunSpec):
     model.solution["NewCapacity"].to_dataframe().reset_index()
     ```
 
+    The solution is evaluated when it is first accessed, and only for the `solution_vars` passed
+    to solve(). Any other variable, linear expression or dual of the solved model can be
+    evaluated on demand from the `lazy_solution` attribute, which caches what it evaluates:
+    ```python
+    model.lazy_solution["RateOfProductionByTechnologyByMode"]
+    model.lazy_solution.to_dataset(["NewCapacity", "RateOfActivity"])
+    ```
+
+    ### Saving and reading a model
+
+    The model parameters, and the solution of a solved model, can be saved to a netcdf file with
+    save_netcdf(), as the 'data' and 'solution' groups of the file. Variables can be compressed
+    (`compression="zlib"` or `"lzf"`) and chunked (e.g. `chunks={"TIMESLICE": 24}`), and with
+    `sparse=True` mostly-NaN variables are stored as their non-NaN values only.
+
+    read_netcdf() opens a saved file without rebuilding the model: the parameters are available via
+    the `_data` attribute and the solution via the `solution` attribute. Data is read from the file
+    lazily as it is accessed, or is dask-backed if `chunks` is given (see `xarray.open_dataset`).
+
+    ```python
+    model.save_netcdf("model.nc", compression="zlib", sparse=True)
+
+    model = Model.read_netcdf("model.nc")
+    model.solution["NewCapacity"]
+    ```
+
+    A model read from netcdf is intended for post-processing: only its id, long_name and
+    description are restored, so it cannot be re-solved.
+
     ### Writing the model solution to excel
 
     Writing a specfic DataArray (NewCapacity) to an excel file can be done by running the following:
@@ -239,12 +449,25 @@ class Model(RunSpec):
 
     """
 
+    # the formulation of the gross capacities, see `recursive_capacity`
+    capacity_formulation: Literal["vintage", "recursive"] = Field("vintage")
+    # drop the technologies, fuels and modes which cannot be used before building, see
+    # `reduce_dataset`
+    reduce: bool = Field(False)
+
     _data: xr.Dataset
+    _compiled_data: xr.Dataset
+    _reduction: Optional[Reduction] = None
     _m: LPModel
     _linear_expressions: Dict[str, LinearExpression]
+    _tracker: BuildTracker
     _solution: Optional[xr.Dataset] = None
+    _lazy_solution: Optional[LazySolution] = None
+    _solution_vars: list[str] | str | None = None
     _objective: Optional[float] = None
     _objective_constant: Optional[float] = None
+    _basis: Optional[SolvedBasis] = None
+    _build_stats: Optional[BuildStats] = None
 
     @classmethod
     def from_yaml(cls, *spec_files):
@@ -252,63 +475,323 @@ class Model(RunSpec):
         return cls(**cfg)
 
     @classmethod
-    def from_otoole_csv(cls, root_dir, id: str | None = None):
-        runspec = RunSpec.from_otoole_csv(root_dir, id)
+    def from_otoole_csv(cls, root_dir, id: str | None = None, memory_map_size: int | None = None):
+        runspec = RunSpec.from_otoole_csv(root_dir, id, memory_map_size=memory_map_size)
+        cfg = {name: data for name, data in runspec}
+        return cls(**cfg)
+
+    @classmethod
+    def from_parquet(cls, root_dir, id: str | None = None, memory_map_size: int | None = None):
+        runspec = RunSpec.from_parquet(root_dir, id, memory_map_size=memory_map_size)
         cfg = {name: data for name, data in runspec}
         return cls(**cfg)
 
+    @property
+    def build_stats(self) -> Optional[BuildStats]:
+        """
+        The wall time, peak RSS growth, and variables, constraints and nonzeros of each stage of
+        building and solving the model, since its dataset was compiled.
+        """
+        return self._build_stats
+
+    def _stage(self, name: str, m: Optional[LPModel] = None):
+        if self._build_stats is None:
+            self._build_stats = BuildStats()
+        return self._build_stats.stage(name, m)
+
     def _build_dataset(self):
-        data = self.to_xr_ds()
-        return data
+        # a new dataset starts a new build
+        self._build_stats = BuildStats()
+        with self._stage("build_dataset"):
+            self._compiled_data = self._compile_dataset()
+        with self._stage("reduce_dataset"):
+            self._data, self._reduction = self._reduce(self._compiled_data)
+
+    def _reduce(self, data: xr.Dataset) -> Tuple[xr.Dataset, Optional[Reduction]]:
+        return reduce_dataset(data) if self.reduce else (data, None)
+
+    def _compile_dataset(self) -> xr.Dataset:
+        # the capacity formulation is set as an attribute of the dataset, from which the build
+        # steps read it, see `recursive_capacity`
+        return compile_dataset(self).assign_attrs(capacity_formulation=self.capacity_formulation)
+
+    def estimate_size(self) -> pd.DataFrame:
+        """
+        Estimate the size of the linopy model, in the capacity formulation of the model and from
+        its reduced dataset, see `RunSpec.estimate_size`.
+        """
+        return estimate_size(self._reduce(self._compile_dataset())[0])
 
     def _build_model(self):
         self._m = LPModel(force_dim_names=True)
-        add_variables(self._data, self._m)
-        self._linear_expressions = add_linear_expressions(self._data, self._m)
-        add_constraints(self._data, self._m, self._linear_expressions)
-        self._objective_constant = add_objective(self._m, self._linear_expressions)
-
-    def _build(self, *, force: bool = False):
+        # the sparse indices are found once, rather than by every step using them
+        data = with_sparse_indices(self._data)
+        with self._stage("add_variables", self._m):
+            self._tracker = BuildTracker(self._build_stats)
+            add_variables(data, self._m, self._tracker)
+        with self._stage("add_linear_expressions", self._m):
+            self._linear_expressions = add_linear_expressions(data, self._m, self._tracker)
+        with self._stage("add_constraints", self._m):
+            add_constraints(data, self._m, self._linear_expressions, self._tracker)
+        with self._stage("add_objective", self._m):
+            self._objective_constant = add_objective(self._m, self._linear_expressions)
+
+    def _build(self, *, force: bool = False, cache: Optional[CompileCache] = None):
         if force or not hasattr(self, "_data") or not hasattr(self, "_m"):
-            self._data = self._build_dataset()
+            if cache is not None:
+                self._build_cached(cache)
+            else:
+                if force or not hasattr(self, "_data"):
+                    self._build_dataset()
+                self._build_model()
+
+    def _build_cached(self, cache: CompileCache):
+        key = spec_hash(self)
+        self._build_stats = BuildStats()
+        with self._stage("load_cache"):
+            data = cache.load_dataset(key)
+            built = cache.load_model(key) if cache.store_model and data is not None else None
+        # the compiled dataset is cached, and reduced as it is loaded
+        if data is None:
+            self._build_dataset()
+        else:
+            self._compiled_data = data
+            with self._stage("reduce_dataset"):
+                self._data, self._reduction = self._reduce(data)
+        if built is not None:
+            self._m, self._linear_expressions, self._objective_constant, self._tracker = built
+            self._tracker.stats = self._build_stats
+            return
+
+        self._build_model()
+        if data is None or cache.store_model:
+            built = (self._m, self._linear_expressions, self._objective_constant, self._tracker)
+            cache.save(key, self._compiled_data, built)
+
+    def update_parameters(self, **parameters: Any) -> None:
+        self._build()
+
+        data = self._compiled_data.copy()
+        for name, value in parameters.items():
+            if name not in data.data_vars:
+                raise KeyError(f"'{name}' is not a parameter of the model")
+            current = data[name]
+            if isinstance(value, xr.DataArray):
+                # cells not covered by the update keep their current values
+                value = value.broadcast_like(current).reindex_like(current)
+                value = value.where(value.notnull(), current).transpose(*current.dims)
+            else:
+                value = current.copy(data=np.broadcast_to(value, current.shape))
+            data[name] = value.astype(current.dtype)
+
+        reduced, reduction = self._reduce(data)
+        self._compiled_data = data
+        if not same_reduction(reduction, self._reduction):
+            # the technologies, fuels or modes which cannot be used have changed
+            self._data, self._reduction = reduced, reduction
             self._build_model()
+        else:
+            updated = {
+                name for name in parameters if not reduced[name].identical(self._data[name])
+            }
+            with self._stage("update_parameters", self._m):
+                dirty = self._tracker.rerun(
+                    with_sparse_indices(reduced), self._m, self._linear_expressions, updated
+                )
+                self._data = reduced
+                if "TotalDiscountedCost" in dirty:
+                    self._objective_constant = add_objective(self._m, self._linear_expressions)
+        self._solution = None
+        self._lazy_solution = None
+        self._objective = None
 
     def _get_solution(self, solution_vars: list[str] | str | None = None) -> xr.Dataset:
-        return build_solution(self._m, self._linear_expressions, solution_vars)
+        return build_solution(
+            self._m, self._linear_expressions, solution_vars, self._data, self._reduction
+        )
+
+    def _warm_start_values(
+        self, warm_start: Union["Model", xr.Dataset]
+    ) -> Tuple[Mapping[str, xr.DataArray], Optional[Basis]]:
+        if isinstance(warm_start, xr.Dataset):
+            return warm_start, None
+        m = getattr(warm_start, "_m", None)
+        if m is not None and m.status == "ok":
+            # every variable of the built model, not only the solution_vars of its solution, on
+            # the dense grids of its sparse indices, to be mapped onto those of this model
+            ds, basis = warm_start._data, get_basis(warm_start._basis)
+            if basis is not None:
+                basis = (densify_values(basis[0], ds, -1), densify_values(basis[1], ds, -1))
+            return densify_values(m.solution, ds), basis
+        if warm_start.solution is None:
+            raise ValueError("The warm start model has not been solved.")
+        return warm_start.solution, None
 
     def solve(
         self,
         solution_vars: list[str] | str | None = None,
         solver_options: dict[str, Any] | None = None,
+        cache: Optional[CompileCache] = None,
+        warm_start: Union["Model", xr.Dataset, None] = None,
+        max_memory: Optional[int] = None,
         **linopy_solve_kwargs: Any,
     ) -> tuple[str, str]:
-        self._build()
-
-        self._m.solve(**(solver_options or {}), **linopy_solve_kwargs)
+        if max_memory is not None and not hasattr(self, "_m"):
+            # fail before building a model which would run out of memory
+            if not hasattr(self, "_data"):
+                self._build_dataset()
+            check_memory(self._data, max_memory)
+        self._build(cache=cache)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            if warm_start is not None:
+                solver_name = linopy_solve_kwargs.get("solver_name") or linopy.available_solvers[0]
+                if solver_name != "highs":
+                    raise ValueError(f"Warm starts are not supported with solver '{solver_name}'")
+                with self._stage("write_warm_start"):
+                    linopy_solve_kwargs["warmstart_fn"] = write_warm_start(
+                        tmp, self._m, *self._warm_start_values(warm_start), ds=self._data
+                    )
+            with self._stage("solve") as record:
+                self._m.solve(**(solver_options or {}), **linopy_solve_kwargs)
+                record["solver_time"] = solver_time(self._m)
 
         if self._m.status == "ok":
-            self._solution = self._get_solution(solution_vars)
+            # the basis is only read from the solver if the model is used as a warm start
+            self._basis = solved_basis(self._m)
+            # the solution is only evaluated as it is accessed
+            self._lazy_solution = LazySolution(
+                self._m, self._linear_expressions, self._data, self._reduction
+            )
+            self._solution_vars = solution_vars
+            self._solution = None
 
             # rather hacky - constants not currently supported in objective functions:
             # https://github.com/PyPSA/linopy/issues/236
             # TODO: find out why and add constant back on: + self._objective_constant
-            self._objective = self._solution.TotalDiscountedCost.sum().values
+            self._objective = self._lazy_solution["TotalDiscountedCost"].sum().values
+        else:
+            # the linopy model no longer holds the solution it was read from
+            self._lazy_solution = None
 
         return self._m.status, self._m.termination_condition
 
-    def save_netcdf(self, path: str | os.PathLike[str]) -> None:
+    def solve_rolling(
+        self,
+        window: int,
+        overlap: int = 0,
+        solution_vars: list[str] | str | None = None,
+        solver_options: dict[str, Any] | None = None,
+        **linopy_solve_kwargs: Any,
+    ) -> tuple[str, str]:
+        if not hasattr(self, "_data"):
+            self._build_dataset()
+        windows = rolling_windows(self._data.coords["YEAR"].values.tolist(), window, overlap)
+
+        # the whole horizon, over which the decisions of each window are valued in its solution
+        whole_horizon = horizon(self._data)
+
+        committed, solutions = {}, []
+        for years, committed_years in windows:
+            model = self.model_copy()
+            # the copy is shallow: each window records its own build, rather than the model's
+            model._build_stats = BuildStats()
+            model._data = window_dataset(self._data, years, committed)
+            model._build_model()
+            # salvage values at the end of the horizon rather than the window, as capacity
+            # committed in the window is carried forward; evaluated on the window's solution
+            data = with_sparse_indices(model._data).assign_attrs(horizon=whole_horizon)
+            lex = add_linear_expressions(data, model._m)
+            model._m.solve(**(solver_options or {}), **linopy_solve_kwargs)
+            if model._m.status != "ok":
+                logging.error(f"Rolling-horizon window {years[0]}-{years[-1]} failed to solve")
+                self._solution = None
+                self._lazy_solution = None
+                self._objective = None
+                return model._m.status, model._m.termination_condition
+
+            links = trade_links(data)
+            values = {
+                name: densify_links(model._m.variables[name].solution, links, self._data.coords)
+                for name in [*CAPACITY_CARRIED, "StorageLevel"]
+                if name in model._m.variables
+            }
+            for name in ["AnnualEmissions", "TotalTechnologyAnnualActivity"]:
+                if name in lex:
+                    values[name] = lex[name].solution
+            committed = commit(committed, values, committed_years)
+            solution = build_solution(model._m, lex, solution_vars, model._data, self._reduction)
+            solutions.append((solution, committed_years))
+
+        self._lazy_solution = None
+        self._solution = stitch(solutions, year_weight(self._data))
+        self._objective = self._solution.TotalDiscountedCost.sum().values
+        return model._m.status, model._m.termination_condition
+
+    def save_netcdf(
+        self,
+        path: str | os.PathLike[str],
+        compression: str | None = None,
+        complevel: int | None = None,
+        chunks: Dict[str, int] | None = None,
+        sparse: bool = False,
+    ) -> None:
         if not hasattr(self, "_data"):
-            self._data = self._build_dataset()
-        ds = self._data if self._solution is None else self._data.merge(self._solution)
-        ds.to_netcdf(path, engine="h5netcdf")
+            self._build_dataset()
+        # record the spec's identity, for read_netcdf
+        attrs = {name: getattr(self, name) for name in NETCDF_ATTRS if getattr(self, name)}
+        write_netcdf(
+            path,
+            {"data": self._data, "solution": self.solution},
+            attrs=attrs,
+            compression=compression,
+            complevel=complevel,
+            chunks=chunks,
+            sparse=sparse,
+        )
 
-    def read_netcdf(self, path: str | os.PathLike[str]):
-        raise NotImplementedError("Reading from netcdf is not implemented yet.")
+    @classmethod
+    def read_netcdf(
+        cls, path: str | os.PathLike[str], chunks: int | dict | str | None = None
+    ) -> "Model":
+        attrs, groups = open_netcdf(path, chunks=chunks)
+        if not groups:
+            # a file with the parameters and solution merged into its root group
+            ds = xr.open_dataset(path, engine="h5netcdf", chunks=chunks)
+            solution_vars = list(np.atleast_1d(ds.attrs.get("solution_vars", [])))
+            groups = {"data": ds.drop_vars(solution_vars)}
+            if solution_vars:
+                groups["solution"] = ds[solution_vars]
+
+        spec = {name: attrs[name] for name in NETCDF_ATTRS if name in attrs}
+        spec.setdefault("id", Path(path).stem)
+
+        # a model handle on the stored data: the spec itself is not rebuilt
+        model = cls.model_construct(**spec)
+        model._data = groups["data"]
+        if "solution" in groups:
+            model._solution = groups["solution"]
+            if "TotalDiscountedCost" in model._solution:
+                model._objective = model._solution.TotalDiscountedCost.sum().values
+        return model
 
     @property
-    def solution(self):
+    def solution(self) -> Optional[xr.Dataset]:
+        if self._solution is None and self._lazy_solution is not None:
+            with self._stage("build_solution"):
+                self._solution = self._lazy_solution.to_dataset(
+                    self._lazy_solution.select(self._solution_vars)
+                )
         return self._solution
 
+    @property
+    def lazy_solution(self) -> Optional[LazySolution]:
+        """
+        The solution of the last solve, evaluating each variable, linear expression or dual only
+        as it is accessed, see `LazySolution`.
+        """
+        return self._lazy_solution
+
     @property
     def objective(self):
         if not self._objective:
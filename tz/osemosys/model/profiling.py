@@ -0,0 +1,170 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+import pandas as pd
+from linopy import Model as LPModel
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+
+STATS_COLUMNS = [
+    "stage",
+    "parent",
+    "depth",
+    "start",
+    "wall_time",
+    "peak_rss_delta",
+    "variables",
+    "constraints",
+    "nonzeros",
+    "solver_time",
+]
+
+
+def peak_rss() -> Optional[int]:
+    """The peak resident set size of the process, in bytes, or None where it is unavailable."""
+    if resource is None:
+        return None
+    # kilobytes on linux, bytes on macos
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def model_counts(m: LPModel, variables: List[str], constraints: List[str]) -> Dict[str, int]:
+    """
+    The number of (unmasked) variables and constraints, and of constraint nonzeros, of the named
+    variables and constraints of a linopy model.
+    """
+    counts = dict(variables=0, constraints=0, nonzeros=0)
+    for name in variables:
+        counts["variables"] += int((m.variables[name].labels.values != -1).sum())
+    for name in constraints:
+        con = m.constraints[name]
+        active = con.labels.values != -1
+        counts["constraints"] += int(active.sum())
+        vars = con.vars.values
+        counts["nonzeros"] += int(((vars != -1) & active.reshape(*active.shape, 1)).sum())
+    return counts
+
+
+def solver_time(m: LPModel) -> Optional[float]:
+    """
+    The run time reported by the solver of a solved linopy model, in seconds, without the time
+    linopy takes to pass the model to the solver and read its solution; where the solver reports
+    it (HiGHS).
+    """
+    solver_model = getattr(m, "solver_model", None)
+    if solver_model is None or not hasattr(solver_model, "getRunTime"):
+        return None
+    return float(solver_model.getRunTime())
+
+
+class BuildStats:
+    """
+    Records the wall time, the growth of the peak resident set size, and the variables,
+    constraints and nonzeros added by each stage of building and solving a model.
+
+    Stages are nested: the steps adding each group of linear expressions or constraints are
+    recorded within the stage adding them all. The `solver_time` of a solve is the time spent
+    in the solver, where it is reported, the rest of its `wall_time` is spent passing the model
+    to the solver and reading back its solution.
+    """
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, m: Optional[LPModel] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Record a stage, counting the variables and constraints it adds to the linopy model `m`.
+
+        Yields the record of the stage, which may be updated within it.
+        """
+        record = dict(
+            stage=name,
+            parent=self._stack[-1] if self._stack else None,
+            depth=len(self._stack),
+            variables=0,
+            constraints=0,
+            nonzeros=0,
+            solver_time=None,
+        )
+        self.records.append(record)
+        self._stack.append(name)
+        before = (set(m.variables), set(m.constraints)) if m is not None else None
+        rss = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["start"] = start - self._origin
+            record["wall_time"] = time.perf_counter() - start
+            record["peak_rss_delta"] = peak_rss() - rss if rss is not None else None
+            self._stack.pop()
+            if before is not None:
+                variables = [name for name in m.variables if name not in before[0]]
+                constraints = [name for name in m.constraints if name not in before[1]]
+                record.update(model_counts(m, variables, constraints))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """The records of the stages, in the order they started."""
+        return pd.DataFrame(self.records, columns=STATS_COLUMNS)
+
+    def to_chrome_trace(self, path: str | os.PathLike[str]) -> None:
+        """
+        Write the stages as a Chrome trace (JSON trace event format), for chrome://tracing or
+        https://ui.perfetto.dev.
+        """
+        events = [
+            dict(
+                name=record["stage"],
+                ph="X",
+                ts=record["start"] * 1e6,
+                dur=record["wall_time"] * 1e6,
+                pid=os.getpid(),
+                tid=0,
+                args={
+                    key: record[key]
+                    for key in ["peak_rss_delta", "variables", "constraints", "nonzeros"]
+                },
+            )
+            for record in self.records
+        ]
+        with open(path, "wb") as f:
+            f.write(orjson.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+    def to_speedscope(self, path: str | os.PathLike[str]) -> None:
+        """Write the stages as a speedscope (https://www.speedscope.app) evented profile."""
+        names = list(dict.fromkeys(record["stage"] for record in self.records))
+        events = []
+        for record in self.records:
+            frame = names.index(record["stage"])
+            events.append(dict(type="O", frame=frame, at=record["start"]))
+            events.append(dict(type="C", frame=frame, at=record["start"] + record["wall_time"]))
+        # a stage closes before the next one opens at the same time
+        events.sort(key=lambda event: (event["at"], event["type"] == "O"))
+        end = max((event["at"] for event in events), default=0)
+        profile = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": name} for name in names]},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": "build",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "events": events,
+                }
+            ],
+        }
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(profile))
@@ -0,0 +1,189 @@
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from tz.osemosys.model.tech_modes import ACTIVITY_RATIOS, activity_mask
+
+# the dimensions from which unused labels are dropped
+REDUCED_DIMS = ["TECHNOLOGY", "FUEL", "MODE_OF_OPERATION"]
+
+# the parameters which, where positive, require the capacity or activity of a technology
+LOWER_LIMITS = [
+    "TotalAnnualMinCapacity",
+    "TotalAnnualMinCapacityInvestment",
+    "TotalTechnologyAnnualActivityLowerLimit",
+    "TotalTechnologyModelPeriodActivityLowerLimit",
+    "TechnologyMinProductionTarget",
+]
+
+
+class Reduction(NamedTuple):
+    """
+    The reduction of a parameters dataset, see `reduce_dataset`: the full and the kept labels of
+    each of the dimensions from which labels were dropped, and the (REGION, TECHNOLOGY,
+    MODE_OF_OPERATION, YEAR) in which a technology cannot operate, whose activity ratios were
+    cleared.
+    """
+
+    coords: Dict[str, pd.Index]
+    kept: Dict[str, pd.Index]
+    inactive: xr.DataArray
+
+
+def _any(da: xr.DataArray, *dims: str) -> xr.DataArray:
+    return da.any([d for d in dims if d in da.dims])
+
+
+def _required(ds: xr.Dataset) -> xr.DataArray:
+    # the (REGION, TECHNOLOGY) with a positive lower limit on their capacity or activity
+    required = xr.zeros_like(ds["ResidualCapacity"].isel(YEAR=0, drop=True), dtype=bool)
+    for name in LOWER_LIMITS:
+        if name in ds:
+            required = required | _any(ds[name] > 0, "FUEL", "YEAR")
+    return required
+
+
+def no_capacity(ds: xr.Dataset) -> xr.DataArray:
+    """
+    The (REGION, TECHNOLOGY, YEAR) in which a technology has no capacity, so cannot operate: it
+    has no residual capacity, and either may have no capacity in the year or may never invest in
+    new capacity, and its activity is limited by its capacity in every timeslice.
+    """
+    return (
+        (ds["ResidualCapacity"].fillna(0) == 0)
+        & (
+            (ds["TotalAnnualMaxCapacity"] == 0)
+            | (ds["TotalAnnualMaxCapacityInvestment"] == 0).all("YEAR")
+        )
+        & ds["CapacityFactor"].notnull().all("TIMESLICE")
+        & ds["CapacityToActivityUnit"].notnull()
+    )
+
+
+def idle_capacity(ds: xr.Dataset) -> xr.DataArray:
+    """
+    The (REGION, TECHNOLOGY) whose capacity is of no use without activity, so is never built
+    where the technology cannot operate: it has no residual capacity, does not count towards the
+    reserve margin, and costs are not negative.
+    """
+    return (
+        (ds["ResidualCapacity"].fillna(0) == 0).all("YEAR")
+        & (ds["ReserveMarginTagTechnology"].fillna(0) == 0).all("YEAR")
+        & ~(ds["CapitalCost"] < 0).any("YEAR")
+        & ~(ds["FixedCost"] < 0).any("YEAR")
+    )
+
+
+def reduce_dataset(ds: xr.Dataset) -> Tuple[xr.Dataset, Reduction]:
+    """
+    Reduce a parameters dataset before the model is built from it, by the technologies, fuels
+    and operating modes which are provably unused.
+
+    In each region, a technology cannot operate in the years in which it has no capacity (see
+    `no_capacity`), a fuel cannot be used in the years in which it is neither produced by an
+    operating technology, demanded nor traded, and an operating mode cannot be used in the years
+    in which it uses a fuel which cannot be. These are found together, to a fixpoint, and the
+    activity ratios of the modes which cannot be used are cleared, so that they have no activity
+    variables. Technologies with a positive lower limit are left as they are.
+
+    The labels of TECHNOLOGY, FUEL and MODE_OF_OPERATION which are then unused in every region
+    are dropped from the dataset: technologies which can never operate and whose capacity is
+    idle (see `idle_capacity`), in models without storage, fuels which can never be used, and
+    modes with no activity ratios.
+    Their variables and duals are missing and their linear expressions zero, see `restore`.
+
+    Arguments
+    ---------
+    ds: xarray.Dataset
+        The parameters dataset
+
+    Returns
+    -------
+    Tuple[xarray.Dataset, Reduction]
+        The reduced dataset, and the reduction to restore its solution by
+    """
+    required = _required(ds)
+    inputs, outputs = ds["InputActivityRatio"], ds["OutputActivityRatio"]
+    # fuels are used by positive input (or negative output) activity ratios, and the reverse
+    uses = (inputs > 0) | (outputs < 0)
+    produces = (outputs > 0) | (inputs < 0)
+    demanded = (ds["SpecifiedAnnualDemand"].fillna(0) != 0) | (
+        ds["AccumulatedAnnualDemand"].fillna(0) != 0
+    )
+    route = ds["TradeRoute"] == 1
+    traded = route.any("_REGION") | route.any("REGION").rename(_REGION="REGION")
+    available = demanded | traded
+
+    operable = activity_mask(ds)
+    live = operable & ~(no_capacity(ds) & ~required)
+    while True:
+        unused = ~((live & produces).any(["TECHNOLOGY", "MODE_OF_OPERATION"]) | available)
+        dead = live & (uses & unused).any("FUEL") & ~required
+        if not dead.any():
+            break
+        live = live & ~dead
+
+    # activity is only masked by year where the mode has no storage, whose ratios are by mode
+    storage = _any(
+        ds["TechnologyToStorage"].notnull() | ds["TechnologyFromStorage"].notnull(), "STORAGE"
+    )
+    inactive = operable & ~live
+    inactive = (inactive & (~storage | inactive.all("YEAR"))).transpose(
+        "REGION", "TECHNOLOGY", "MODE_OF_OPERATION", "YEAR"
+    )
+
+    reduced = ds.copy()
+    for name in ACTIVITY_RATIOS:
+        cleared = inactive if "YEAR" in ds[name].dims else inactive.all("YEAR")
+        reduced[name] = ds[name].where(~cleared)
+
+    # labels unused in every region; the costs of storage are summed over every technology (see
+    # `TotalDiscountedStorageCost`), so technologies are only dropped from models without storage
+    drop = {
+        "TECHNOLOGY": (
+            ~live.any(["MODE_OF_OPERATION", "YEAR"])
+            & ~required
+            & (no_capacity(ds).all("YEAR") | idle_capacity(ds))
+        ).all("REGION")
+        & (ds.sizes["STORAGE"] == 0),
+        "FUEL": (unused & ~(live & uses).any(["TECHNOLOGY", "MODE_OF_OPERATION"])).all(
+            ["REGION", "YEAR"]
+        ),
+        "MODE_OF_OPERATION": ~activity_mask(reduced).any(["REGION", "TECHNOLOGY", "YEAR"]),
+    }
+    coords = {dim: ds.indexes[dim] for dim in REDUCED_DIMS if drop[dim].any()}
+    reduced = reduced.sel({dim: ~drop[dim] for dim in coords})
+    kept = {dim: reduced.indexes[dim] for dim in coords}
+    return reduced, Reduction(coords, kept, inactive)
+
+
+def same_reduction(a: Optional[Reduction], b: Optional[Reduction]) -> bool:
+    """
+    Whether two reductions of a dataset are the same, e.g. before and after updating its
+    parameters.
+    """
+    if a is None or b is None:
+        return a is b
+    return (
+        a.kept.keys() == b.kept.keys()
+        and all(a.kept[dim].equals(b.kept[dim]) for dim in a.kept)
+        and a.inactive.equals(b.inactive)
+    )
+
+
+def restore(
+    da: xr.DataArray, reduction: Optional[Reduction], fill_value: float = np.nan
+) -> xr.DataArray:
+    """
+    Reindex the solution of a variable, linear expression or dual of a model built from a
+    reduced dataset onto the full labels of its dimensions, with `fill_value` (e.g. missing for
+    variables and duals, or zero for linear expressions, as off the sparse indices) at the
+    dropped labels.
+    """
+    if reduction is None:
+        return da
+    coords = {dim: labels for dim, labels in reduction.coords.items() if dim in da.dims}
+    return da.reindex(coords, fill_value=fill_value) if coords else da
+
@@ -0,0 +1,204 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import xarray as xr
+
+from tz.osemosys.model.linear_expressions.discounting import horizon, year_weight
+
+# New capacity variables, with the residual capacity parameter they carry forward into and the
+# operational life of the capacity
+CAPACITY_CARRIED = {
+    "NewCapacity": ("ResidualCapacity", "OperationalLife"),
+    "NewStorageCapacity": ("ResidualStorageCapacity", "OperationalLifeStorage"),
+    "NewTradeCapacity": ("ResidualTradeCapacity", "OperationalLifeTrade"),
+}
+
+
+def rolling_windows(years: List[int], window: int, overlap: int = 0) -> List[Tuple[List, List]]:
+    """
+    Split the years of a model into overlapping windows for a rolling-horizon solve.
+
+    Each window is `window` years long, and the first `window - overlap` years of each window are
+    committed, i.e. kept in the solution and carried forward to the following windows. The years
+    of the last window are all committed.
+
+    Parameters
+    ----------
+    years: List[int]
+        The (sorted) years of the model
+    window: int
+        The number of years in each window
+    overlap: int
+        The number of years by which successive windows overlap
+
+    Returns
+    -------
+    List[Tuple[List, List]]
+        The years and the committed years of each window
+    """
+    if window < 1 or not 0 <= overlap < window:
+        raise ValueError(
+            f"A rolling horizon needs window >= 1 and 0 <= overlap < window, "
+            f"got window={window} and overlap={overlap}"
+        )
+    step = window - overlap
+    windows = []
+    for start in range(0, len(years), step):
+        window_years = list(years[start : start + window])
+        last = start + window >= len(years)
+        windows.append((window_years, window_years if last else window_years[:step]))
+        if last:
+            break
+    return windows
+
+
+def _accumulated(built: xr.DataArray, life: xr.DataArray, ds: xr.Dataset) -> xr.DataArray:
+    # capacity built in committed years and still operating in each year of the window, as in
+    # `accumulate_vintages`
+    built = built.rename(YEAR="BUILDYEAR")
+    if "YEAR" in life.dims:
+        life = life.sel(YEAR=ds.YEAR)
+    if "YearWeight" not in ds:
+        mask = (ds.YEAR - built.BUILDYEAR >= 0) & (ds.YEAR - built.BUILDYEAR < life)
+        return built.where(mask).sum("BUILDYEAR")
+    start = np.maximum(ds.YEAR, built.BUILDYEAR)
+    end = np.minimum(ds.YEAR + ds["YearWeight"], built.BUILDYEAR + life)
+    share = ((end - start) / ds["YearWeight"]).clip(min=0).where(ds.YEAR >= built.BUILDYEAR, 0)
+    return (share * built).sum("BUILDYEAR")
+
+
+def window_dataset(
+    data: xr.Dataset, years: List[int], committed: Dict[str, xr.DataArray]
+) -> xr.Dataset:
+    """
+    The parameters dataset of a window of a rolling-horizon solve, with the decisions of the
+    committed years of previous windows carried forward.
+
+    Capacity built in committed years is added to the residual capacity of the window, while it
+    is within its operational life. The storage level at the end of the committed years is the
+    starting storage level of the window. Committed emissions count towards the model period
+    emissions of the window, and committed activity towards the model period activity limits.
+    Costs are discounted to the first year of the model, and salvage values are taken at the last
+    year of the window.
+
+    Parameters
+    ----------
+    data: xr.Dataset
+        The parameters dataset of the whole model
+    years: List[int]
+        The years of the window
+    committed: Dict[str, xr.DataArray]
+        The values of the variables and linear expressions of the committed years of previous
+        windows, keyed by name, see `commit`
+
+    Returns
+    -------
+    xr.Dataset
+        The parameters dataset of the window
+    """
+    ds = data.sel(YEAR=years)
+    # a new attrs dict, as the selection shares that of the data
+    ds.attrs = {key: value for key, value in data.attrs.items() if key != "horizon"}
+    ds.attrs["horizon"] = (int(data.coords["YEAR"].min()), horizon(ds)[1])
+
+    for variable, (residual, life) in CAPACITY_CARRIED.items():
+        if variable not in committed or residual not in ds:
+            continue
+        accumulated = _accumulated(committed[variable], data[life], ds)
+        current = ds[residual]
+        carried = (current.fillna(0) + accumulated).where(current.notnull() | (accumulated != 0))
+        ds[residual] = carried.transpose(*current.dims).astype(np.result_type(current, float))
+
+    if "StorageLevel" in committed and "StorageLevelStart" in ds:
+        level = committed["StorageLevel"]
+        # the end of the last committed year is its last timeslice in the order in which the
+        # storage level recursion chains them (see `StorageLevelRecursion`), that of the TIMESLICE
+        # coordinate of the dataset, selected by label rather than by its position in the values
+        last = data.coords["TIMESLICE"].values[-1]
+        end = level.sel(YEAR=level.YEAR.max(), TIMESLICE=last).drop_vars(["YEAR", "TIMESLICE"])
+        ds["StorageLevelStart"] = end.broadcast_like(ds["StorageLevelStart"]).transpose(
+            *ds["StorageLevelStart"].dims
+        )
+
+    if "AnnualEmissions" in committed and "ModelPeriodExogenousEmission" in ds:
+        emitted = (committed["AnnualEmissions"] * year_weight(data)).sum("YEAR")
+        current = ds["ModelPeriodExogenousEmission"]
+        ds["ModelPeriodExogenousEmission"] = (current.fillna(0) + emitted).transpose(*current.dims)
+
+    if "TotalTechnologyAnnualActivity" in committed:
+        activity = (committed["TotalTechnologyAnnualActivity"] * year_weight(data)).sum("YEAR")
+        for limit, active in [
+            ("TotalTechnologyModelPeriodActivityUpperLimit", lambda v: v >= 0),
+            ("TotalTechnologyModelPeriodActivityLowerLimit", lambda v: v > 0),
+        ]:
+            if limit not in ds:
+                continue
+            current = ds[limit]
+            remaining = (current - activity).clip(min=0).transpose(*current.dims)
+            ds[limit] = remaining.where(active(current), current)
+
+    return ds
+
+
+def commit(
+    committed: Dict[str, xr.DataArray], values: Dict[str, xr.DataArray], years: List[int]
+) -> Dict[str, xr.DataArray]:
+    """
+    Add the values of the committed years of a window to those of previous windows.
+
+    Parameters
+    ----------
+    committed: Dict[str, xr.DataArray]
+        The values of the committed years of previous windows, keyed by name
+    values: Dict[str, xr.DataArray]
+        The solved values of the window, keyed by name
+    years: List[int]
+        The committed years of the window
+
+    Returns
+    -------
+    Dict[str, xr.DataArray]
+        The values of all the committed years so far
+    """
+    updated = {}
+    for name, value in values.items():
+        value = value.sel(YEAR=years).fillna(0)
+        updated[name] = xr.concat([committed[name], value], "YEAR") if name in committed else value
+    return updated
+
+
+def stitch(
+    solutions: List[Tuple[xr.Dataset, List[int]]], weight: xr.DataArray | int = 1
+) -> xr.Dataset:
+    """
+    Stitch the solutions of the windows of a rolling-horizon solve into a single solution.
+
+    Variables with a YEAR dimension are taken from the window in which each year is committed.
+    Variables without one are taken from the last window, except the model period activity of
+    each technology, which is summed over the stitched annual activity.
+
+    Parameters
+    ----------
+    solutions: List[Tuple[xr.Dataset, List[int]]]
+        The solution and committed years of each window
+    weight: xr.DataArray | int
+        The number of years represented by each year, see `year_weight`
+
+    Returns
+    -------
+    xr.Dataset
+        The solution of the whole model
+    """
+    last = solutions[-1][0]
+    yearly = [name for name in last.data_vars if "YEAR" in last[name].dims]
+    solution = xr.concat(
+        [solution[yearly].sel(YEAR=years) for solution, years in solutions], "YEAR"
+    )
+    solution = solution.merge(last.drop_vars(yearly).drop_dims("YEAR"))
+    if "TotalTechnologyModelPeriodActivity" in solution and "TotalTechnologyAnnualActivity" in (
+        solution
+    ):
+        solution["TotalTechnologyModelPeriodActivity"] = (
+            solution["TotalTechnologyAnnualActivity"] * weight
+        ).sum("YEAR")
+    return solution
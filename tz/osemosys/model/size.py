@@ -0,0 +1,216 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from tz.osemosys.model.linear_expressions.capacity import recursive_capacity
+from tz.osemosys.model.links import trade_links
+from tz.osemosys.model.tech_modes import activity_mask, tech_modes
+
+# bytes per cell of a linopy variable (labels, lower and upper bounds), and of a constraint
+# (labels, sign and rhs) plus bytes per term of a constraint (coefficient and variable label)
+VARIABLE_CELL_BYTES = 24
+CONSTRAINT_CELL_BYTES = 24
+TERM_BYTES = 16
+
+SIZE_COLUMNS = ["kind", "rows", "cells", "nonzeros", "memory"]
+
+
+def _count(mask: xr.DataArray) -> int:
+    return int(mask.sum())
+
+
+def _cells(ds: xr.Dataset, *dims: str) -> int:
+    return int(np.prod([ds.sizes[dim] for dim in dims]))
+
+
+def _live_vintages(ds: xr.Dataset, life: xr.DataArray) -> xr.DataArray:
+    # the number of build years whose capacity is operating in each year, as in the vintage mask
+    # of `accumulate_vintages`
+    build = ds["YEAR"].rename(YEAR="BUILDYEAR")
+    live = (ds["YEAR"] - build >= 0) & (ds["YEAR"] - build < life)
+    return live.sum("BUILDYEAR")
+
+
+def estimate_size(ds: xr.Dataset) -> pd.DataFrame:
+    """
+    Estimate the size of the linopy model built from a parameters dataset, without building it.
+
+    The blocks of the model which are indexed by timeslice, and so dominate its size, are
+    estimated from the cardinalities of the sets and the sparsity of the parameters which mask
+    them (e.g. the activity ratios of RateOfActivity, and the trade routes of Export and Import).
+    Annual blocks are small by comparison and are only counted for the capacity variables.
+
+    The memory of a block is that of the dense arrays linopy holds for it: a variable or a
+    constraint is stored over the full product of its sets (`cells`), masked or not, and a
+    constraint with as many terms per cell as its densest row. Nonzeros are those passed to the
+    solver, once terms with missing coefficients have been dropped.
+
+    Arguments
+    ---------
+    ds: xarray.Dataset
+        The parameters dataset
+
+    Returns
+    -------
+    pd.DataFrame
+        For each block, indexed by its name, its `kind` ('variable' or 'constraint'), its
+        `rows` (unmasked variables or constraints), `cells`, `nonzeros` (constraint
+        coefficients) and `memory` (bytes)
+    """
+    n_timeslices = ds.sizes["TIMESLICE"]
+    blocks: Dict[str, List] = {}
+
+    def variable(name: str, rows: int, cells: int):
+        blocks[name] = ["variable", rows, cells, 0, cells * VARIABLE_CELL_BYTES]
+
+    def constraint(name: str, rows: int, cells: int, nonzeros: int, terms: int):
+        memory = cells * (CONSTRAINT_CELL_BYTES + terms * TERM_BYTES)
+        blocks[name] = ["constraint", rows, cells, nonzeros, memory]
+
+    # VARIABLES
+    # ---------
+    # activity is indexed by the operating modes of each technology, see `tech_modes`
+    activity = activity_mask(ds)
+    n_tech_modes = tech_modes(ds).sizes["TECH_MODE"]
+    # the most modes of any technology, summed over by the expressions by technology
+    max_modes = int(activity.any(["REGION", "YEAR"]).sum("MODE_OF_OPERATION").max())
+    variable(
+        "RateOfActivity",
+        _count(activity) * n_timeslices,
+        n_tech_modes * _cells(ds, "REGION", "YEAR", "TIMESLICE"),
+    )
+    # trade is indexed by the trade links, see `trade_links`
+    links = trade_links(ds)
+    n_links = links.sizes["LINK"]
+    routes = ds["TradeRoute"] == 1
+    if n_links > 0:
+        for name in ["Export", "Import"]:
+            variable(
+                name, _count(routes) * n_timeslices, n_links * n_timeslices * ds.sizes["YEAR"]
+            )
+    variable("StorageLevel", *[_cells(ds, "REGION", "STORAGE", "YEAR", "TIMESLICE")] * 2)
+    variable("NewCapacity", *[_cells(ds, "REGION", "TECHNOLOGY", "YEAR")] * 2)
+    variable(
+        "NumberOfNewTechnologyUnits",
+        _count(ds["CapacityOfOneTechnologyUnit"].notnull()),
+        _cells(ds, "REGION", "TECHNOLOGY", "YEAR"),
+    )
+    if n_links > 0:
+        variable("NewTradeCapacity", _count(routes), n_links * ds.sizes["YEAR"])
+    variable("NewStorageCapacity", *[_cells(ds, "REGION", "STORAGE", "YEAR")] * 2)
+    # gross capacities are variables in the recursive formulation, see `capacity_recursion`,
+    # and otherwise sums of the vintages in operation wherever they are used
+    recursive = recursive_capacity(ds)
+    if recursive:
+        variable("GrossCapacity", *[_cells(ds, "REGION", "TECHNOLOGY", "YEAR")] * 2)
+        if n_links > 0:
+            variable("GrossTradeCapacity", *[n_links * ds.sizes["YEAR"]] * 2)
+        variable("GrossStorageCapacity", *[_cells(ds, "REGION", "STORAGE", "YEAR")] * 2)
+
+    # CONSTRAINTS
+    # -----------
+    # CAa4: the activity of each technology's modes within its gross capacity
+    modes = activity.sum("MODE_OF_OPERATION")
+    vintages = 1 if recursive else _live_vintages(ds, ds["OperationalLife"])
+    capacity_factor = ds["CapacityFactor"].notnull()
+    constraint(
+        "CAa4_Constraint_Capacity",
+        _count(capacity_factor),
+        _cells(ds, "REGION", "TECHNOLOGY", "TIMESLICE", "YEAR"),
+        int((capacity_factor * ((modes > 0) * modes + vintages)).sum()),
+        max_modes + (1 if recursive else ds.sizes["YEAR"]),
+    )
+
+    # EBa11: the production, use and net trade of each fuel in each timeslice
+    produced = ds["OutputActivityRatio"].notnull().sum(["TECHNOLOGY", "MODE_OF_OPERATION"])
+    used = ds["InputActivityRatio"].notnull().sum(["TECHNOLOGY", "MODE_OF_OPERATION"])
+    traded = routes.sum("_REGION") + routes.sum("REGION").rename(_REGION="REGION")
+    terms = 2 * ds.sizes["TECHNOLOGY"] * max_modes
+    if n_links > 0:
+        # the links of the cell with the most exports, and of that with the most imports
+        for dim in ["REGION", "_REGION"]:
+            terms += int(links.to_dataframe().value_counts([dim, "FUEL"]).max())
+    else:
+        traded = traded * 0
+    constraint(
+        "EBa11_EnergyBalanceEachTS5_trn",
+        _cells(ds, "REGION", "TIMESLICE", "FUEL", "YEAR"),
+        _cells(ds, "REGION", "TIMESLICE", "FUEL", "YEAR"),
+        int((produced + used + traded).sum()) * n_timeslices,
+        terms,
+    )
+
+    if n_links > 0:
+        constraint(
+            "EBa10_EnergyBalanceEachTS4_trn",
+            _count(routes) * n_timeslices,
+            n_links * n_timeslices * ds.sizes["YEAR"],
+            2 * _count(routes) * n_timeslices,
+            2,
+        )
+
+    if ds.sizes["STORAGE"] > 0:
+        # the storage level of each timeslice, from the last and the net charge
+        linked = (
+            ds["TechnologyToStorage"].notnull() | ds["TechnologyFromStorage"].notnull()
+        ).sum(["TECHNOLOGY", "MODE_OF_OPERATION"])
+        levels = _cells(ds, "REGION", "STORAGE", "YEAR", "TIMESLICE")
+        recursions = ds.sizes["YEAR"] * n_timeslices - 1
+        constraint(
+            "StorageLevelRecursion",
+            levels - _cells(ds, "REGION", "STORAGE"),
+            levels,
+            int((2 + linked).sum()) * recursions,
+            2 + 2 * n_tech_modes,
+        )
+        # the storage level of each timeslice within the gross storage capacity
+        if recursive:
+            nonzeros, terms = 2 * levels, 2
+        else:
+            vintages = _live_vintages(ds, ds["OperationalLifeStorage"])
+            nonzeros, terms = int((1 + vintages).sum()) * n_timeslices, 1 + ds.sizes["YEAR"]
+        constraint("StorageGrossCapacitySufficiency", levels, levels, nonzeros, terms)
+
+    return pd.DataFrame.from_dict(blocks, orient="index", columns=SIZE_COLUMNS)
+
+
+def peak_memory(size: pd.DataFrame) -> int:
+    """
+    The peak memory, in bytes, of building a model of the estimated size: all its blocks, and the
+    intermediate expressions of the largest block while it is built.
+    """
+    return int(size["memory"].sum() + size["memory"].max())
+
+
+def check_memory(ds: xr.Dataset, max_memory: int) -> pd.DataFrame:
+    """
+    Check the estimated peak memory of building the model of a parameters dataset against a limit.
+
+    Arguments
+    ---------
+    ds: xarray.Dataset
+        The parameters dataset
+    max_memory: int
+        The memory limit, in bytes
+
+    Returns
+    -------
+    pd.DataFrame
+        The estimated size of the model, see `estimate_size`
+
+    Raises
+    ------
+    MemoryError
+        If the estimated peak memory exceeds `max_memory`, with the estimate of each block
+    """
+    size = estimate_size(ds)
+    peak = peak_memory(size)
+    if peak > max_memory:
+        breakdown = size.sort_values("memory", ascending=False).to_string()
+        raise MemoryError(
+            f"Building the model is estimated to take {peak / 2**20:.1f} MiB, more than "
+            f"max_memory ({max_memory / 2**20:.1f} MiB):\n{breakdown}"
+        )
+    return size
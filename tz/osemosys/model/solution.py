@@ -1,7 +1,16 @@
-from typing import Dict
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional
 
+import numpy as np
 import xarray as xr
 from linopy import LinearExpression, Model
+from linopy.constants import TERM_DIM
+from scipy.sparse import csr_matrix
+
+from tz.osemosys.model.bounds import Bound, bound_dual, model_bounds, reduced_costs
+from tz.osemosys.model.links import IMPORTS, densify_links, trade_links
+from tz.osemosys.model.reduction import Reduction, restore
+from tz.osemosys.model.tech_modes import densify_tech_modes, tech_modes
 
 SOLUTION_KEYS = [
     "AnnualTechnologyEmission",
@@ -54,84 +63,221 @@ SOLUTION_KEYS = [
 ]
 
 
-def build_solution(
-    m: Model, lex: Dict[str, LinearExpression], solution_vars: list[str] | str | None = None
-) -> xr.Dataset:
+# duals of the energy balances, and of the emission limits where both are defined
+DUALS = {
+    "EBa11_EnergyBalanceEachTS5_trn": "marginal_cost_of_demand",
+    "EBb4_EnergyBalanceEachYear4": "marginal_cost_of_demand_annual",
+}
+EMISSION_DUALS = {
+    "E8_AnnualEmissionsLimit": "marginal_cost_of_emissions_annual",
+    "E9_ModelPeriodEmissionsLimit": "marginal_cost_of_emissions_total",
+}
 
-    # construct duals separately
-    duals = xr.Dataset(
-        {
-            key: getattr(m.constraints, key).dual
-            for key in [
-                "EBa11_EnergyBalanceEachTS5_trn",
-                "EBb4_EnergyBalanceEachYear4",
-            ]
-        }
-    )
 
-    duals = duals.merge(
-        xr.Dataset(
-            {
-                key: getattr(m.constraints, key).dual
-                for key in [
-                    "E8_AnnualEmissionsLimit",
-                    "E9_ModelPeriodEmissionsLimit",
-                ]
-                if hasattr(m.constraints, key)
-            }
-        )
-    )
+def solution_vector(m: Model) -> np.ndarray:
+    """
+    The solution of the variables of a solved linopy model, indexed by variable label. Missing
+    values are zero, as they drop out of the solution of linear expressions.
+    """
+    x = np.zeros(m._xCounter)
+    for name in m.variables:
+        var = m.variables[name]
+        labels = var.labels.values
+        active = labels != -1
+        x[labels[active]] = var.solution.transpose(*var.labels.dims).values[active]
+    return np.nan_to_num(x)
+
+
+def evaluate_expressions(
+    expressions: Dict[str, LinearExpression], x: np.ndarray
+) -> Dict[str, xr.DataArray]:
+    """
+    Evaluate linear expressions at the variable values `x`, indexed by variable label.
 
-    duals = duals.rename(
-        dict(
-            zip(
-                [
-                    "EBa11_EnergyBalanceEachTS5_trn",
-                    "EBb4_EnergyBalanceEachYear4",
-                ],
-                [
-                    "marginal_cost_of_demand",
-                    "marginal_cost_of_demand_annual",
-                ],
-            )
-        )
+    The terms of all the expressions are compiled into a single sparse (CSR) matrix, with a row
+    per cell of each expression and a column per variable label, so that they are all evaluated
+    by one matrix-vector product plus their constants, rather than by broadcasting each of them
+    against the solution in turn. Terms with missing variables or coefficients are dropped, as
+    in `LinearExpression.solution`.
+    """
+    indptr, indices, data, consts = [np.zeros(1, dtype=int)], [], [], []
+    nonzeros = 0
+    for expression in expressions.values():
+        const = expression.const
+        shape = (const.size, expression.vars.sizes[TERM_DIM])
+        vars = expression.vars.transpose(*const.dims, TERM_DIM).values.reshape(shape)
+        coeffs = expression.coeffs.transpose(*const.dims, TERM_DIM).values.reshape(shape)
+        valid = (vars != -1) & ~np.isnan(coeffs)
+        indptr.append(nonzeros + np.cumsum(valid.sum(axis=1)))
+        nonzeros += int(valid.sum())
+        indices.append(vars[valid])
+        data.append(coeffs[valid])
+        consts.append(const.values.ravel())
+
+    rows = np.concatenate(consts)
+    matrix = csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), np.concatenate(indptr)),
+        shape=(rows.size, x.size),
     )
-    if "E8_AnnualEmissionsLimit" in duals and "E9_ModelPeriodEmissionsLimit" in duals:
-        duals = duals.rename(
-            dict(
-                zip(
-                    [
-                        "E8_AnnualEmissionsLimit",
-                        "E9_ModelPeriodEmissionsLimit",
-                    ],
-                    [
-                        "marginal_cost_of_emissions_annual",
-                        "marginal_cost_of_emissions_total",
-                    ],
-                )
-            )
-        )
-
-    # StorageLevel is now a first-class decision variable (see add_storage_variables), so it
-    # already arrives in m.solution.
-    solution_base = m.solution.merge(
-        xr.Dataset(
-            {
-                k: v.solution
-                for k, v in lex.items()
-                if ((k not in m.solution) and (hasattr(v, "solution")) and ("YRTS" not in v.coords))
-            }
-        )
-    ).merge(duals)
-
-    if solution_vars is None:
-        return solution_base[sorted(set(SOLUTION_KEYS) & set(solution_base.data_vars))]
-    elif solution_vars == "all":
-        return solution_base[sorted(solution_base.data_vars)]
-    else:
-        if isinstance(solution_vars, str):
-            solution_vars = [solution_vars]
-        # ensure TotalDiscountedCost is always included
-        if "TotalDiscountedCost" not in solution_vars:
-            solution_vars.append("TotalDiscountedCost")
-        return solution_base[sorted(set(solution_vars) & set(solution_base.data_vars))]
+    values = matrix @ x + rows
+
+    solutions, start = {}, 0
+    for name, expression in expressions.items():
+        const = expression.const
+        solutions[name] = const.copy(data=values[start : start + const.size].reshape(const.shape))
+        start += const.size
+    return solutions
+
+
+class LazySolution(Mapping[str, xr.DataArray]):
+    """
+    The solution of a solved linopy model: its variables, linear expressions and the duals of
+    its energy balances and emission limits, by name.
+
+    The solution of each is only evaluated when it is first accessed, and is then cached, so that
+    large linear expressions (e.g. RateOfProductionByTechnologyByMode) which are not needed are
+    never evaluated. The linear expressions materialised together by `to_dataset` are evaluated
+    in a single batch, see `evaluate_expressions`. Linear expressions stacked over a YRTS
+    dimension are left out. Given the parameters dataset `ds`, solutions indexed by trade link
+    are reshaped onto the trade routes, see `densify_links`, and those indexed by the operating
+    modes of each technology onto TECHNOLOGY x MODE_OF_OPERATION, see `densify_tech_modes`; and
+    the constraints folded into the bounds of their variables have duals by name, from the
+    reduced costs of those variables, see `bound_dual`. Given the `reduction` of the dataset,
+    solutions are reindexed onto the labels it dropped, filled as off the sparse indices, see
+    `restore`.
+
+    ```python
+    solution = LazySolution(m, lex)
+    solution["RateOfProductionByTechnologyByMode"]
+    solution.to_dataset(["NewCapacity", "TotalDiscountedCost"])
+    ```
+    """
+
+    def __init__(
+        self,
+        m: Model,
+        lex: Dict[str, LinearExpression],
+        ds: Optional[xr.Dataset] = None,
+        reduction: Optional[Reduction] = None,
+    ):
+        self._m = m
+        self._ds = ds
+        self._reduction = reduction
+        if ds is not None:
+            self._links = trade_links(ds)
+            self._modes = tech_modes(ds)
+        self._x: Optional[np.ndarray] = None
+        self._reduced: Optional[np.ndarray] = None
+        self._cache: Dict[str, xr.DataArray] = {}
+        self._sources: Dict[str, Callable[[], xr.DataArray]] = {}
+        self._expressions: Dict[str, LinearExpression] = {}
+        for name in m.variables:
+            self._sources[name] = partial(getattr, m.variables[name], "solution")
+        for name, expression in lex.items():
+            if (
+                name not in self._sources
+                and hasattr(expression, "solution")
+                and "YRTS" not in expression.coords
+            ):
+                self._expressions[name] = expression
+
+        duals = dict(DUALS)
+        if all(key in m.constraints for key in EMISSION_DUALS):
+            duals.update(EMISSION_DUALS)
+        else:
+            duals.update({key: key for key in EMISSION_DUALS if key in m.constraints})
+        for key, name in duals.items():
+            self._sources[name] = partial(getattr, m.constraints[key], "dual")
+        if ds is not None:
+            for name, bound in model_bounds(ds).items():
+                self._sources[name] = partial(self._bound_dual, bound)
+
+    def _bound_dual(self, bound: Bound) -> xr.DataArray:
+        if self._reduced is None:
+            self._reduced = reduced_costs(self._m)
+        return bound_dual(self._m, bound, self._reduced)
+
+    def _densify(
+        self,
+        solution: xr.DataArray,
+        imports: bool = False,
+        fill_value: float = np.nan,
+    ) -> xr.DataArray:
+        if self._ds is None:
+            return solution
+        solution = densify_links(solution, self._links, self._ds.coords, imports, fill_value)
+        solution = densify_tech_modes(solution, self._modes, self._ds.coords, fill_value)
+        return restore(solution, self._reduction, fill_value)
+
+    def _evaluate(self, names: Iterable[str]) -> None:
+        # evaluate the uncached linear expressions of `names` in a single batch
+        expressions = {
+            name: self._expressions[name]
+            for name in names
+            if name in self._expressions and name not in self._cache
+        }
+        if not expressions:
+            return
+        if self._x is None:
+            self._x = solution_vector(self._m)
+        for name, solution in evaluate_expressions(expressions, self._x).items():
+            # linear expressions are zero off the sparse indices, as over the dense grids
+            self._cache[name] = self._densify(solution, fill_value=0).rename(name)
+
+    def __getitem__(self, name: str) -> xr.DataArray:
+        if name not in self._cache:
+            if name in self._expressions:
+                self._evaluate([name])
+            else:
+                solution = self._densify(self._sources[name](), name in IMPORTS)
+                self._cache[name] = solution.rename(name)
+        return self._cache[name]
+
+    def __contains__(self, name: object) -> bool:
+        # without evaluating the solution
+        return name in self._sources or name in self._expressions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([*self._sources, *self._expressions])
+
+    def __len__(self) -> int:
+        return len(self._sources) + len(self._expressions)
+
+    def select(self, solution_vars: list[str] | str | None = None) -> List[str]:
+        """
+        The names of the solution to materialise: the SOLUTION_KEYS by default, everything with
+        "all", or the given names with TotalDiscountedCost.
+        """
+        if solution_vars is None:
+            names = set(SOLUTION_KEYS)
+        elif solution_vars == "all":
+            names = set(self)
+        else:
+            if isinstance(solution_vars, str):
+                solution_vars = [solution_vars]
+            # ensure TotalDiscountedCost is always included
+            names = set(solution_vars) | {"TotalDiscountedCost"}
+        return sorted(names & set(self))
+
+    def to_dataset(self, names: Iterable[str] | None = None) -> xr.Dataset:
+        """Materialise the solution of the given names (default: all) as a dataset."""
+        names = list(self if names is None else names)
+        self._evaluate(names)
+        return xr.Dataset({name: self[name] for name in names})
+
+
+def build_solution(
+    m: Model,
+    lex: Dict[str, LinearExpression],
+    solution_vars: list[str] | str | None = None,
+    ds: Optional[xr.Dataset] = None,
+    reduction: Optional[Reduction] = None,
+) -> xr.Dataset:
+    """
+    The solution of a solved linopy model as a dataset: the SOLUTION_KEYS by default, every
+    variable, linear expression and dual with `solution_vars="all"`, or the given
+    `solution_vars`. Only those are evaluated, see `LazySolution`. Given the `reduction` of the
+    dataset, it is over the full labels of the dataset, see `restore`.
+    """
+    solution = LazySolution(m, lex, ds, reduction)
+    return solution.to_dataset(solution.select(solution_vars))
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from linopy import LinearExpression
+from linopy.constants import TERM_DIM
+
+
+def sparse_index(present: xr.DataArray, dims: List[str], dim: str) -> xr.Dataset:
+    """
+    A sparse index of the cells of `present` which are True: the labels of each cell along each
+    of `dims`, indexed by the position of the cell along `dim`.
+
+    Sparse indices (e.g. the trade links, or the operating modes of each technology) replace the
+    dense product of their dimensions in variables, linear expressions and constraints, where
+    only few of its cells are ever used.
+    """
+    present = present.transpose(*dims)
+    positions = np.nonzero(present.values)
+    return xr.Dataset(
+        {d: (dim, present.indexes[d].values[position]) for d, position in zip(dims, positions)},
+        coords={dim: np.arange(len(positions[0]))},
+    )
+
+
+def on_index(da: xr.DataArray, index: xr.Dataset) -> xr.DataArray:
+    """
+    A parameter over (some of) the dimensions of a sparse index, at each of its cells.
+
+    The parameter is only indexed by the position of each cell, as are the variables and linear
+    expressions built from it: linopy orders the dimensions of an expression by its coordinates,
+    so the labels of the cells are kept on the index, see `densify`.
+    """
+    dims = [d for d in index.data_vars if d in da.dims]
+    if not dims:
+        return da
+    (dim,) = index.dims
+    selected = da.sel({d: index[d] for d in dims}).drop_vars(dims)
+    # linopy orders the dimensions of an expression by the coords of its parameters: keep the
+    # index in place of its dimensions, rather than last
+    order = list(dict.fromkeys(dim if c in dims else c for c in da.coords))
+    coords = {c: selected.coords[c].variable for c in order}
+    return xr.DataArray(selected.variable, coords=coords, name=da.name)
+
+
+def aggregate(
+    expression: LinearExpression,
+    index: xr.Dataset,
+    keys: Dict[str, str],
+    coords: Mapping[str, Any],
+) -> LinearExpression:
+    """
+    Sum a linear expression over the cells of a sparse index with the same keys, e.g. the exports
+    of each trade link by the REGION and FUEL of its origin.
+
+    The cells of each key are gathered through a sparse incidence mapping, so the terms of a key
+    are only those of its own cells, rather than the product of its cells with every key.
+
+    Arguments
+    ---------
+    expression: LinearExpression
+        An expression indexed by the sparse index
+    index: xr.Dataset
+        The sparse index, see `sparse_index`
+    keys: Dict[str, str]
+        The dimension of the index which labels each dimension of the sum, e.g.
+        {"REGION": "_REGION"} to sum trade links by their destination
+    coords: Mapping[str, Any]
+        The labels of each dimension of the sum, e.g. the coords of the parameters dataset
+
+    Returns
+    -------
+    LinearExpression
+        The expression summed over the index, with the dimensions of `keys` in its place
+    """
+    (dim,) = index.dims
+    key_dims = list(keys)
+    shape = tuple(len(coords[d]) for d in key_dims)
+    target = np.ravel_multi_index(
+        [pd.Index(coords[d]).get_indexer(index[keys[d]].values) for d in key_dims], shape
+    )
+    n_keys = int(np.prod(shape))
+
+    # the cells of each key, padded to the largest number of cells of any key
+    by_key = np.argsort(target, kind="stable")
+    counts = np.bincount(target, minlength=n_keys)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    slots = np.full((n_keys, max(int(counts.max(initial=0)), 1)), -1)
+    slots[target[by_key], np.arange(len(by_key)) - starts[target[by_key]]] = by_key
+    present = slots != -1
+
+    data = expression.data
+    before = list(data.const.dims[: data.const.dims.index(dim)])
+    rest = [d for d in data.const.dims if d != dim]
+    vars = data.vars.transpose(dim, *rest, TERM_DIM).values
+    coeffs = data.coeffs.transpose(dim, *rest, TERM_DIM).values
+    const = data.const.transpose(dim, *rest).values
+
+    def gather(values: np.ndarray, fill: Any) -> np.ndarray:
+        # (cell, *rest, term) -> (*key, *rest, cell * term)
+        gathered = values[slots]
+        gathered[~present] = fill
+        gathered = np.moveaxis(gathered, 1, -2)
+        return gathered.reshape(*shape, *gathered.shape[1:-2], -1)
+
+    # missing constants count as zero, as in `LinearExpression.sum`
+    summed = np.where(present.reshape(*present.shape, *[1] * len(rest)), const[slots], 0)
+    summed = np.nansum(summed, axis=1).reshape(*shape, *const.shape[1:])
+    labels = {
+        **{d: pd.Index(coords[d]) for d in key_dims},
+        **{d: data.indexes[d] for d in rest},
+    }
+    # the keys in place of the index, see `transpose_expression`; given as indexes, as coords
+    # given as DataArrays are placed first
+    ds = xr.Dataset(coords={d: labels[d] for d in [*before, *key_dims, *rest]}).assign(
+        vars=([*key_dims, *rest, TERM_DIM], gather(vars, -1)),
+        coeffs=([*key_dims, *rest, TERM_DIM], gather(coeffs, np.nan)),
+        const=([*key_dims, *rest], summed),
+    )
+    return LinearExpression(ds, expression.model)
+
+
+def transpose_expression(expression: LinearExpression, dims: List[str]) -> LinearExpression:
+    """
+    A linear expression with its dimensions in the order of `dims`, e.g. that of the dense
+    formulation of an expression aggregated from a sparse index.
+    """
+    # linopy broadcasts the fields of an expression to the order of the dimensions of its
+    # dataset, which is that of the first variables (here the coords) to use each dimension
+    data = expression.data
+    ordered = xr.Dataset(coords={d: data.indexes[d] for d in dims}).merge(data)
+    return LinearExpression(ordered, expression.model)
+
+
+def densify(
+    da: xr.DataArray,
+    index: xr.Dataset,
+    coords: Mapping[str, Any] | None = None,
+    fill_value: float = np.nan,
+) -> xr.DataArray:
+    """
+    Reshape the solution of a variable or linear expression indexed by a sparse index onto the
+    dense product of its dimensions, with missing values off the index.
+
+    Arguments
+    ---------
+    da: xr.DataArray
+        The solution
+    index: xr.Dataset
+        The sparse index, see `sparse_index`
+    coords: Mapping[str, Any], optional
+        The labels of the dimensions of the index, e.g. the coords of the parameters dataset;
+        otherwise only the labels of its cells are kept
+    fill_value: float
+        The value off the index, e.g. zero for a linear expression, whose cells without terms
+        evaluate to zero
+    """
+    (dim,) = index.dims
+    if dim not in da.dims:
+        return da
+    dims = list(index.data_vars)
+    order = [d for existing in da.dims for d in (dims if existing == dim else [existing])]
+    cells = index.sel({dim: da[dim]})
+    dense = (
+        da.assign_coords({d: (dim, cells[d].values) for d in dims})
+        .set_index({dim: dims})
+        .unstack(dim, fill_value=fill_value)
+    )
+    if coords is not None:
+        dense = dense.reindex({d: coords[d] for d in dims}, fill_value=fill_value)
+    return dense.transpose(*order)
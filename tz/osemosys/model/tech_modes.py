@@ -0,0 +1,82 @@
+from typing import Any, Mapping
+
+import numpy as np
+import xarray as xr
+from linopy import LinearExpression
+
+from tz.osemosys.model.sparse import aggregate, densify, on_index, sparse_index
+
+# the dimensions of an operating mode of a technology, which index each TECH_MODE
+TECH_MODE_DIMS = ["TECHNOLOGY", "MODE_OF_OPERATION"]
+
+# the parameters which tie an operating mode of a technology to its fuels, emissions and storage
+ACTIVITY_RATIOS = [
+    "InputActivityRatio",
+    "OutputActivityRatio",
+    "EmissionActivityRatio",
+    "TechnologyToStorage",
+    "TechnologyFromStorage",
+]
+
+
+def activity_mask(ds: xr.Dataset) -> xr.DataArray:
+    """
+    The (REGION, TECHNOLOGY, MODE_OF_OPERATION, YEAR) in which a technology can operate in a mode:
+    those with any activity ratio, to a fuel, an emission or a storage.
+    """
+    return (
+        ds["InputActivityRatio"].notnull().any(dim="FUEL")
+        | ds["OutputActivityRatio"].notnull().any(dim="FUEL")
+        | ds["EmissionActivityRatio"].notnull().any(dim="EMISSION")
+        | ds["TechnologyToStorage"].notnull().any(dim="STORAGE")
+        | ds["TechnologyFromStorage"].notnull().any(dim="STORAGE")
+    )
+
+
+def tech_modes(ds: xr.Dataset) -> xr.Dataset:
+    """
+    The operating modes of each technology: the TECHNOLOGY and MODE_OF_OPERATION of each mode in
+    which a technology can operate in any region and year, indexed by TECH_MODE.
+
+    MODE_OF_OPERATION is the union of the modes of every technology, most of which have only one
+    or a few of them, so activity and the linear expressions by mode are indexed by TECH_MODE
+    rather than over the dense TECHNOLOGY x MODE_OF_OPERATION grid. They are found once for every
+    step of building a model from a dataset with its sparse indices, see `with_sparse_indices`.
+    """
+    if "tech_modes" in ds.attrs:
+        # read through the dataset, so that the build steps using the modes depend on the
+        # parameters they are found from, see `BuildTracker`
+        ds[ACTIVITY_RATIOS]
+        return ds.attrs["tech_modes"]
+    return sparse_index(activity_mask(ds).any(["REGION", "YEAR"]), TECH_MODE_DIMS, "TECH_MODE")
+
+
+def on_tech_modes(da: xr.DataArray, modes: xr.Dataset) -> xr.DataArray:
+    """
+    A parameter over TECHNOLOGY and/or MODE_OF_OPERATION, at each TECH_MODE, see `on_index`.
+    """
+    return on_index(da, modes)
+
+
+def aggregate_modes(
+    expression: LinearExpression, modes: xr.Dataset, coords: Mapping[str, Any]
+) -> LinearExpression:
+    """
+    Sum a linear expression indexed by TECH_MODE over the modes of each technology, see
+    `aggregate`.
+    """
+    return aggregate(expression, modes, {"TECHNOLOGY": "TECHNOLOGY"}, coords)
+
+
+def densify_tech_modes(
+    da: xr.DataArray,
+    modes: xr.Dataset,
+    coords: Mapping[str, Any] | None = None,
+    fill_value: float = np.nan,
+) -> xr.DataArray:
+    """
+    Reshape the solution of a variable or linear expression indexed by TECH_MODE onto the dense
+    TECHNOLOGY x MODE_OF_OPERATION grid, with missing values for the modes a technology does not
+    have (or `fill_value`), see `densify`.
+    """
+    return densify(da, modes, coords, fill_value)
@@ -0,0 +1,200 @@
+from typing import Any, Callable, List, Optional, Set
+
+import numpy as np
+import xarray as xr
+from linopy import Model as LPModel
+
+from tz.osemosys.model.profiling import BuildStats
+
+
+def nonempty(name: str, ds: xr.Dataset) -> bool:
+    return ds[name].size > 0
+
+
+def any_notnull(name: str, ds: xr.Dataset) -> bool:
+    return bool(ds[name].notnull().any())
+
+
+def any_equal(name: str, value: Any, ds: xr.Dataset) -> bool:
+    return bool((ds[name] == value).any())
+
+
+class _RecordingDataset:
+    """
+    A read-only view of a dataset which records the names of the variables read through it.
+    """
+
+    def __init__(self, ds: xr.Dataset, reads: Set[str]):
+        self._ds = ds
+        self._reads = reads
+
+    def __getitem__(self, key):
+        self._reads.update([key] if isinstance(key, str) else key)
+        return self._ds[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._ds
+
+    def get(self, key, default=None):
+        self._reads.add(key)
+        return self._ds.get(key, default)
+
+    def __getattr__(self, name):
+        if name in self._ds.variables:
+            self._reads.add(name)
+        return getattr(self._ds, name)
+
+
+class LinearExpressions(dict):
+    """
+    The dictionary of linear expressions of a model, recording the keys read while `reads` is set.
+    """
+
+    reads: Optional[Set[str]] = None
+
+    def __getitem__(self, key):
+        if self.reads is not None:
+            self.reads.add(key)
+        return super().__getitem__(key)
+
+
+class _Step:
+    def __init__(self, func: Callable, when: Optional[Callable]):
+        self.func = func
+        self.when = when
+        self.ran = False
+        # dataset variables read by the condition and by the step itself
+        self.conditions: Set[str] = set()
+        self.params: Set[str] = set()
+        self.lex_reads: Set[str] = set()
+        self.lex_writes: Set[str] = set()
+        self.variables: List[str] = []
+        self.constraints: List[str] = []
+
+
+class BuildTracker:
+    """
+    Records, for each step of building a linopy model (a function adding variables, linear
+    expressions or constraints), the dataset variables and linear expressions it reads and the
+    variables, linear expressions and constraints it adds.
+
+    With these dependencies, `rerun` rebuilds only the linear expressions and constraints which
+    depend on a set of updated dataset variables. With `stats`, each step run is recorded as a
+    stage of the build.
+    """
+
+    def __init__(self, stats: Optional[BuildStats] = None):
+        self.steps: List[_Step] = []
+        self.stats = stats
+
+    def _run(
+        self, step: _Step, ds: xr.Dataset, m: LPModel, lex: Optional[LinearExpressions]
+    ) -> Any:
+        step.params = set()
+        variables, constraints = set(m.variables), set(m.constraints)
+        if lex is None:
+            result = step.func(_RecordingDataset(ds, step.params), m)
+        else:
+            before = {key: id(value) for key, value in lex.items()}
+            lex.reads = step.lex_reads = set()
+            try:
+                result = step.func(_RecordingDataset(ds, step.params), m, lex)
+            finally:
+                lex.reads = None
+            step.lex_writes = {key for key, value in lex.items() if before.get(key) != id(value)}
+        step.variables = [name for name in m.variables if name not in variables]
+        step.constraints = [name for name in m.constraints if name not in constraints]
+        return result
+
+    def step(
+        self,
+        func: Callable,
+        ds: xr.Dataset,
+        m: LPModel,
+        lex: Optional[LinearExpressions] = None,
+        when: Optional[Callable[[xr.Dataset], bool]] = None,
+    ) -> Any:
+        """
+        Run and record a build step, called as `func(ds, m)` or `func(ds, m, lex)`.
+
+        Args:
+            func (Callable): the build step
+            ds (xr.Dataset): the parameters dataset
+            m (linopy.Model): the linopy model
+            lex (LinearExpressions, optional): the linear expressions, if used by the step
+            when (Callable, optional): a condition on the dataset for the step to be run, e.g.
+                `functools.partial(nonempty, "STORAGE")`
+
+        Returns:
+            The result of the step, or `m` if it is not run
+        """
+        step = _Step(func, when)
+        self.steps.append(step)
+        if when is not None and not when(_RecordingDataset(ds, step.conditions)):
+            return m
+        step.ran = True
+        if self.stats is None:
+            return self._run(step, ds, m, lex)
+        with self.stats.stage(func.__name__, m):
+            return self._run(step, ds, m, lex)
+
+    def rerun(
+        self, ds: xr.Dataset, m: LPModel, lex: LinearExpressions, params: Set[str]
+    ) -> Set[str]:
+        """
+        Rerun the steps which depend, directly or through linear expressions, on updated dataset
+        variables, replacing their linear expressions and constraints in the model, and the
+        bounds of their variables.
+
+        Args:
+            ds (xr.Dataset): the parameters dataset, with its updated variables
+            m (linopy.Model): the linopy model built from the dataset before its update
+            lex (LinearExpressions): the linear expressions of the model
+            params (Set[str]): the names of the updated dataset variables
+
+        Returns:
+            Set[str]: the keys of the rebuilt linear expressions
+
+        Raises:
+            ValueError: If the update changes the structure of the model, i.e. the steps which
+                are run or the masks of its variables
+        """
+        # check the structure of the model is unchanged before modifying it
+        bounds = {}
+        for step in self.steps:
+            if step.conditions & params and bool(step.when(ds)) != step.ran:
+                raise ValueError(
+                    f"Updating {sorted(params)} changes whether {step.func.__name__} is run; "
+                    "the model must be rebuilt"
+                )
+            if step.ran and step.variables and step.params & params:
+                # variables cannot be replaced, so their masks must be unchanged
+                scratch = LPModel(force_dim_names=True)
+                step.func(ds, scratch)
+                for name in step.variables:
+                    if not np.array_equal(
+                        scratch.variables[name].labels.values != -1,
+                        m.variables[name].labels.values != -1,
+                    ):
+                        raise ValueError(
+                            f"Updating {sorted(params)} changes the variable {name}; "
+                            "the model must be rebuilt"
+                        )
+                    # but their bounds may change, see `fold_bounds`
+                    bounds[name] = scratch.variables[name]
+
+        for name, variable in bounds.items():
+            m.variables[name].lower = variable.lower
+            m.variables[name].upper = variable.upper
+
+        dirty = set()
+        for step in self.steps:
+            if not step.ran or step.variables:
+                continue
+            if step.params & params or step.lex_reads & dirty:
+                for name in step.constraints:
+                    m.remove_constraints(name)
+                self._run(step, ds, m, lex)
+                dirty |= step.lex_writes
+
+        return dirty
@@ -1,12 +1,16 @@
+from typing import Optional
+
 import xarray as xr
 from linopy import Model
 
+from tz.osemosys.model.tracking import BuildTracker
+
 from .activity import add_activity_variables
 from .capacity import add_capacity_variables
 from .storage import add_storage_variables
 
 
-def add_variables(ds: xr.Dataset, m: Model) -> Model:
+def add_variables(ds: xr.Dataset, m: Model, tracker: Optional[BuildTracker] = None) -> Model:
     """Add all variables to the model
 
     Arguments
@@ -15,14 +19,18 @@ def add_variables(ds: xr.Dataset, m: Model) -> Model:
         The parameters dataset
     m: linopy.Model
         A linopy model
+    tracker: BuildTracker, optional
+        Records the dependencies of each variable, for updating parameters
 
     Returns
     -------
     linopy.Model
     """
 
-    m = add_storage_variables(ds, m)
-    m = add_capacity_variables(ds, m)
-    m = add_activity_variables(ds, m)
+    tracker = tracker or BuildTracker()
+
+    m = tracker.step(add_storage_variables, ds, m)
+    m = tracker.step(add_capacity_variables, ds, m)
+    m = tracker.step(add_activity_variables, ds, m)
 
     return m
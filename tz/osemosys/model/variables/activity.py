@@ -2,6 +2,9 @@ import xarray as xr
 from linopy import Model
 from numpy import inf
 
+from tz.osemosys.model.links import on_links, trade_links
+from tz.osemosys.model.tech_modes import activity_mask, on_tech_modes, tech_modes
+
 
 def add_activity_variables(ds: xr.Dataset, m: Model) -> Model:
     """Add activity variables to the model
@@ -17,42 +20,26 @@ def add_activity_variables(ds: xr.Dataset, m: Model) -> Model:
     -------
     linopy.Model
     """
-    # Add indices
-    RRTiFY = [
-        ds.coords["REGION"],
-        ds.coords["_REGION"],
-        ds.coords["TIMESLICE"],
-        ds.coords["FUEL"],
-        ds.coords["YEAR"],
-    ]
-    RTeMYTi = [
+    # activity is indexed by the operating modes of each technology, rather than the dense grid
+    # of technologies and modes
+    modes = tech_modes(ds)
+    RTmYTi = [
         ds.coords["REGION"],
-        ds.coords["TECHNOLOGY"],
-        ds.coords["MODE_OF_OPERATION"],
+        modes.coords["TECH_MODE"],
         ds.coords["YEAR"],
         ds.coords["TIMESLICE"],
     ]
-
-    mask = (
-        ds["InputActivityRatio"].notnull().any(dim="FUEL")
-        | ds["OutputActivityRatio"].notnull().any(dim="FUEL")
-        | ds["EmissionActivityRatio"].notnull().any(dim="EMISSION")
-        | ds["TechnologyToStorage"].notnull().any(dim="STORAGE")
-        | ds["TechnologyFromStorage"].notnull().any(dim="STORAGE")
-    )
+    mask = on_tech_modes(activity_mask(ds), modes)
     m.add_variables(
-        lower=0, upper=inf, coords=RTeMYTi, name="RateOfActivity", integer=False, mask=mask
+        lower=0, upper=inf, coords=RTmYTi, name="RateOfActivity", integer=False, mask=mask
     )
 
-    mask = ds["TradeRoute"] == 1
-    m.add_variables(lower=0, upper=inf, coords=RRTiFY, name="Export", integer=False, mask=mask)
-    m.add_variables(
-        lower=0,
-        upper=inf,
-        coords=RRTiFY,
-        name="Import",
-        integer=False,
-        mask=mask.rename({"REGION": "_REGION", "_REGION": "REGION"}),
-    )
+    # trade is indexed by the trade links, rather than the dense grid of trade routes
+    links = trade_links(ds)
+    if links.sizes["LINK"] > 0:
+        LTiY = [links.coords["LINK"], ds.coords["TIMESLICE"], ds.coords["YEAR"]]
+        mask = on_links(ds["TradeRoute"], links) == 1
+        for name in ["Export", "Import"]:
+            m.add_variables(lower=0, upper=inf, coords=LTiY, name=name, integer=False, mask=mask)
 
     return m
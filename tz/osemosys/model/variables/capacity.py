@@ -2,6 +2,15 @@ import xarray as xr
 from linopy import Model
 from numpy import inf
 
+from tz.osemosys.model.bounds import (
+    fold_bounds,
+    gross_capacity_bounds,
+    new_capacity_bounds,
+    trade_capacity_bounds,
+)
+from tz.osemosys.model.linear_expressions.capacity import recursive_capacity
+from tz.osemosys.model.links import on_links, trade_links
+
 
 def add_capacity_variables(ds: xr.Dataset, m: Model) -> Model:
     """Add capacity variables to the model
@@ -19,7 +28,6 @@ def add_capacity_variables(ds: xr.Dataset, m: Model) -> Model:
     """
     # Create the required index
     RTeY = [ds.coords["REGION"], ds.coords["TECHNOLOGY"], ds.coords["YEAR"]]
-    RRFY = [ds.coords["REGION"], ds.coords["_REGION"], ds.coords["FUEL"], ds.coords["YEAR"]]
 
     # masks
     mask = ds["CapacityOfOneTechnologyUnit"].notnull()
@@ -27,11 +35,27 @@ def add_capacity_variables(ds: xr.Dataset, m: Model) -> Model:
     m.add_variables(
         lower=0, upper=inf, coords=RTeY, name="NumberOfNewTechnologyUnits", integer=True, mask=mask
     )
-    m.add_variables(lower=0, upper=inf, coords=RTeY, name="NewCapacity", integer=False)
-
-    mask = ds["TradeRoute"] == 1
-    m.add_variables(
-        lower=0, upper=inf, coords=RRFY, name="NewTradeCapacity", integer=False, mask=mask
-    )
+    # the limits on new (and, as a variable, total) capacity are its bounds, see `fold_bounds`
+    lower, upper = fold_bounds(new_capacity_bounds(ds), "NewCapacity", RTeY)
+    m.add_variables(lower=lower, upper=upper, coords=RTeY, name="NewCapacity", integer=False)
+    if recursive_capacity(ds):
+        # accumulated from year to year, see `capacity_recursion`
+        lower, upper = fold_bounds(gross_capacity_bounds(ds), "GrossCapacity", RTeY)
+        m.add_variables(lower=lower, upper=upper, coords=RTeY, name="GrossCapacity", integer=False)
+
+    # trade is indexed by the trade links, rather than the dense grid of trade routes
+    links = trade_links(ds)
+    if links.sizes["LINK"] > 0:
+        LY = [links.coords["LINK"], ds.coords["YEAR"]]
+        mask = on_links(ds["TradeRoute"], links) == 1
+        bounds = trade_capacity_bounds(ds, links)
+        lower, upper = fold_bounds(bounds, "NewTradeCapacity", LY)
+        m.add_variables(
+            lower=lower, upper=upper, coords=LY, name="NewTradeCapacity", integer=False, mask=mask
+        )
+        if recursive_capacity(ds):
+            m.add_variables(
+                lower=-inf, upper=inf, coords=LY, name="GrossTradeCapacity", integer=False
+            )
 
     return m
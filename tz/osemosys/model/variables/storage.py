@@ -2,6 +2,9 @@ import xarray as xr
 from linopy import Model
 from numpy import inf
 
+from tz.osemosys.model.bounds import fold_bounds, storage_level_bounds
+from tz.osemosys.model.linear_expressions.capacity import recursive_capacity
+
 
 def add_storage_variables(ds: xr.Dataset, m: Model) -> Model:
     """Add storage variables to the model
@@ -20,8 +23,15 @@ def add_storage_variables(ds: xr.Dataset, m: Model) -> Model:
     RSY = [ds.coords["REGION"], ds.coords["STORAGE"], ds.coords["YEAR"]]
 
     m.add_variables(lower=0, upper=inf, coords=RSY, name="NewStorageCapacity", integer=False)
+    if recursive_capacity(ds):
+        # accumulated from year to year, see `capacity_recursion`
+        m.add_variables(
+            lower=-inf, upper=inf, coords=RSY, name="GrossStorageCapacity", integer=False
+        )
 
     # New variable: Explicit storage level (state of charge) per timeslice
     RSYTs = [ds.coords["REGION"], ds.coords["STORAGE"], ds.coords["YEAR"], ds.coords["TIMESLICE"]]
-    m.add_variables(lower=0, upper=inf, coords=RSYTs, name="StorageLevel", integer=False)
+    # the minimum charge of each storage is a bound of its level, see `fold_bounds`
+    lower, upper = fold_bounds(storage_level_bounds(ds), "StorageLevel", RSYTs)
+    m.add_variables(lower=lower, upper=upper, coords=RSYTs, name="StorageLevel", integer=False)
     return m
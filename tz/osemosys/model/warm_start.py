@@ -0,0 +1,316 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from linopy import Constraint, Variable
+from linopy import Model as LPModel
+from linopy.constants import TERM_DIM
+
+from tz.osemosys.model.indices import sparse_indices
+from tz.osemosys.model.links import IMPORTS, LINK_DIMS, densify_links, trade_links
+from tz.osemosys.model.sparse import on_index
+from tz.osemosys.model.tech_modes import densify_tech_modes, tech_modes
+
+# HiGHS basis status of a column or row which is basic
+BASIC = 1
+
+# Basis statuses by coordinate, for the variables and the constraints of a linopy model
+Basis = Tuple[Dict[str, xr.DataArray], Dict[str, xr.DataArray]]
+
+
+class SolvedBasis(NamedTuple):
+    """
+    The HiGHS solver of a solved linopy model, with the labels of its variables and constraints
+    as they were solved, from which its basis is only read when it is used, see `get_basis`.
+    """
+
+    solver_model: Any
+    variables: Dict[str, xr.DataArray]
+    constraints: Dict[str, xr.DataArray]
+    n_variables: int
+    n_constraints: int
+
+
+def _by_label(labels: np.ndarray, status: np.ndarray, counter: int) -> np.ndarray:
+    # index statuses by linopy label, with -1 for labels without a status
+    by_label = np.full(counter, -1, dtype=np.int8)
+    by_label[labels] = status
+    return by_label
+
+
+def _read_section(lines: pd.Series, header: str) -> Tuple[np.ndarray, np.ndarray]:
+    # the (label, status) pairs of the '# Columns' or '# Rows' section of a HiGHS basis file
+    start = lines.index[lines.str.startswith(header)][0]
+    n = int(lines[start].split()[-1])
+    if n == 0:
+        return np.array([], dtype=int), np.array([], dtype=np.int8)
+    entries = lines[start + 1 : start + 1 + n].str.split(" ", n=1, expand=True)
+    return entries[0].str[1:].astype(int).to_numpy(), entries[1].astype(np.int8).to_numpy()
+
+
+def solved_basis(m: LPModel) -> Optional[SolvedBasis]:
+    """
+    The HiGHS solver of a solved linopy model and the labels of its variables and constraints,
+    from which to read its basis if it is used, e.g. to warm start another solve.
+
+    Only references are kept: the labels of a model are not changed in place (e.g. by
+    `Model.update_parameters`, which replaces the constraints it rebuilds), and the solver of a
+    model is replaced by each solve.
+
+    Parameters
+    ----------
+    m: linopy.Model
+        A solved linopy model
+
+    Returns
+    -------
+    SolvedBasis | None
+        The solver and labels of the model, or None if it was not solved with HiGHS
+    """
+    h = getattr(m, "solver_model", None)
+    if h is None or not hasattr(h, "writeBasis"):
+        return None
+    return SolvedBasis(
+        h,
+        {name: m.variables[name].labels for name in m.variables},
+        {name: m.constraints[name].labels for name in m.constraints},
+        m._xCounter,
+        m._cCounter,
+    )
+
+
+def get_basis(solved: Optional[SolvedBasis]) -> Optional[Basis]:
+    """
+    The basis of a linopy model solved with HiGHS, as basis statuses by coordinate.
+
+    Parameters
+    ----------
+    solved: SolvedBasis, optional
+        The solver and labels of a solved linopy model, see `solved_basis`
+
+    Returns
+    -------
+    Tuple[Dict[str, xr.DataArray], Dict[str, xr.DataArray]] | None
+        The HiGHS basis status of each variable and each constraint, keyed by name with -1 for
+        masked cells, or None if the model was not solved with HiGHS or has no valid basis
+    """
+    if solved is None or not solved.solver_model.getBasis().valid:
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "basis.bas"
+        solved.solver_model.writeBasis(str(path))
+        lines = pd.Series(path.read_text().splitlines())
+
+    cols = _by_label(*_read_section(lines, "# Columns"), solved.n_variables)
+    rows = _by_label(*_read_section(lines, "# Rows"), solved.n_constraints)
+
+    def _status(labels: xr.DataArray, by_label: np.ndarray) -> xr.DataArray:
+        return labels.copy(data=np.where(labels.values != -1, by_label[labels.values], -1))
+
+    return (
+        {name: _status(labels, cols) for name, labels in solved.variables.items()},
+        {name: _status(labels, rows) for name, labels in solved.constraints.items()},
+    )
+
+
+def densify_values(
+    values: Mapping[str, xr.DataArray], ds: xr.Dataset, fill_value: float = np.nan
+) -> Dict[str, xr.DataArray]:
+    """
+    The values of the variables or constraints of a built model (e.g. its primal values or its
+    basis statuses) on the dense grids of its sparse indices where they are indexed by LINK or
+    TECH_MODE, as in its solution, see `densify_links` and `densify_tech_modes`. The sparse
+    indices of two models may differ, so the values of one are mapped onto the indices of the
+    other by coordinate rather than by position.
+
+    Parameters
+    ----------
+    values: Mapping[str, xr.DataArray]
+        The values, keyed by variable or constraint name
+    ds: xarray.Dataset
+        The parameters dataset of the model
+    fill_value: float
+        The value off the indices, e.g. missing for primal values or -1 for basis statuses
+
+    Returns
+    -------
+    Dict[str, xr.DataArray]
+        The values, keyed by name
+    """
+    links, modes = trade_links(ds), tech_modes(ds)
+    dense = {}
+    for name, value in values.items():
+        value = densify_links(value, links, ds.coords, name in IMPORTS, fill_value)
+        dense[name] = densify_tech_modes(value, modes, ds.coords, fill_value)
+    return dense
+
+
+def _on_index(values: xr.DataArray, name: str, dim: str, index: xr.Dataset, fill) -> xr.DataArray:
+    # dense values of a previous model (e.g. of a solution dataset) at each cell of a sparse index
+    # of the new model, with `fill` at the cells the previous model does not have, see `on_links`
+    # and `on_tech_modes`
+    if dim == "LINK" and name in IMPORTS:
+        # indexed by the destination of each link, see `densify_links`
+        index = index.rename({"REGION": "_REGION", "_REGION": "REGION"})[LINK_DIMS]
+    dims = list(index.data_vars)
+    if not set(dims) <= set(values.dims):
+        return values
+    labels = {d: np.unique(index[d].values) for d in dims}
+    return on_index(values.reindex(labels, fill_value=fill), index)
+
+
+def _align(
+    values: Optional[xr.DataArray],
+    labels: xr.DataArray,
+    fill,
+    name: str = "",
+    indices: Optional[Dict[str, xr.Dataset]] = None,
+) -> Optional[np.ndarray]:
+    # values of a previous model aligned by coordinate to the labels of a new model, or None if
+    # the dimensions of the two differ
+    if values is None:
+        return None
+    for dim, index in (indices or {}).items():
+        if dim in labels.dims and dim not in values.dims:
+            values = _on_index(values, name, dim, index, fill)
+    if set(values.dims) != set(labels.dims):
+        return None
+    values = values.transpose(*labels.dims).reindex_like(labels, fill_value=fill)
+    return values.values
+
+
+def _in_solver(item: Union[Variable, Constraint]) -> np.ndarray:
+    # the cells of a variable or constraint which linopy passes to the solver: those which are
+    # not masked and, of a constraint, which have a term with a non-zero coefficient
+    labels = item.labels
+    active = labels.values != -1
+    if isinstance(item, Constraint):
+        terms = (item.vars != -1) & (item.coeffs != 0)
+        active &= terms.any(TERM_DIM).transpose(*labels.dims).values
+    return active
+
+
+def _by_solver_order(labels: List[np.ndarray], values: List[np.ndarray]):
+    # the columns or rows of a model in the order linopy passes them to the solver, by label
+    labels, values = np.concatenate(labels), np.concatenate(values)
+    order = np.argsort(labels, kind="stable")
+    return labels[order], values[order]
+
+
+def _write_basis(
+    path: Path, m: LPModel, basis: Basis, indices: Optional[Dict[str, xr.Dataset]] = None
+) -> bool:
+    # write a HiGHS basis file for the new model, or return False if the basis does not cover
+    # every column and row of the model which is passed to the solver
+    sections = []
+    for header, items, statuses in [
+        ("# Columns", m.variables, basis[0]),
+        ("# Rows", m.constraints, basis[1]),
+    ]:
+        labels, values = [], []
+        for name in items:
+            new = items[name].labels
+            status = _align(statuses.get(name), new, -1, name, indices)
+            active = _in_solver(items[name])
+            if status is None or (status[active] == -1).any():
+                return False
+            labels.append(new.values[active])
+            values.append(status[active])
+        sections.append((header, *_by_solver_order(labels, values)))
+
+    n_rows = len(sections[1][1])
+    if (sections[0][2] == BASIC).sum() + (sections[1][2] == BASIC).sum() != n_rows:
+        return False
+
+    with open(path, "w") as f:
+        f.write("HiGHS_basis_file v2\nValid\n")
+        for (header, labels, values), prefix in zip(sections, "xc"):
+            f.write(f"{header} {len(labels)}\n")
+            pd.DataFrame(
+                {"name": np.char.add(prefix, labels.astype(str)), "status": values}
+            ).to_csv(f, sep=" ", header=False, index=False)
+    return True
+
+
+def _write_primal(
+    path: Path,
+    m: LPModel,
+    primal: Mapping[str, xr.DataArray],
+    indices: Optional[Dict[str, xr.Dataset]] = None,
+):
+    # write a HiGHS solution file with a primal value for every column of the new model; columns
+    # not in the previous solution start at the value in their bounds nearest zero
+    labels, values = [], []
+    for name in m.variables:
+        variable = m.variables[name]
+        new = variable.labels
+        active = new.values != -1
+        value = _align(primal.get(name), new, np.nan, name, indices)
+        if value is None:
+            value = np.full(new.shape, np.nan)
+        start = np.clip(0.0, variable.lower.values, variable.upper.values)
+        value = np.where(np.isnan(value), start, value)
+        labels.append(new.values[active])
+        values.append(value[active])
+    labels, values = _by_solver_order(labels, values)
+
+    with open(path, "w") as f:
+        f.write("Model status\nNone\n\n# Primal solution values\nFeasible\nObjective 0\n")
+        f.write(f"# Columns {len(labels)}\n")
+        pd.DataFrame({"name": np.char.add("x", labels.astype(str)), "value": values}).to_csv(
+            f, sep=" ", header=False, index=False
+        )
+
+
+def write_warm_start(
+    directory: str | os.PathLike[str],
+    m: LPModel,
+    primal: Optional[Mapping[str, xr.DataArray]] = None,
+    basis: Optional[Basis] = None,
+    ds: Optional[xr.Dataset] = None,
+) -> Optional[Path]:
+    """
+    Write a HiGHS warm start file for a linopy model from the solution of a previous model,
+    mapped onto the labels of the new model by coordinate.
+
+    The previous basis is written if it covers every variable and constraint of the new model,
+    e.g. when re-solving a model after updating its parameters. Otherwise the previous primal
+    values are written, from which HiGHS constructs a starting basis. Previous values on the
+    dense grids of the sparse indices, as in a solution dataset (see `densify_values`), are
+    mapped onto the sparse indices of the new model.
+
+    Parameters
+    ----------
+    directory: str | os.PathLike[str]
+        Directory in which to write the file
+    m: linopy.Model
+        The new linopy model
+    primal: Mapping[str, xr.DataArray], optional
+        The values of the variables of the previous model, keyed by variable name
+    basis: Tuple[Dict[str, xr.DataArray], Dict[str, xr.DataArray]], optional
+        The basis of the previous model, see `get_basis`
+    ds: xarray.Dataset, optional
+        The parameters dataset of the new model, whose sparse indices (see `sparse_indices`)
+        its variables and constraints are indexed by
+
+    Returns
+    -------
+    Path | None
+        The path of the basis (.bas) or solution (.sol) file, to pass to linopy as
+        `warmstart_fn`, or None if there is nothing to warm start from
+    """
+    indices = sparse_indices(ds) if ds is not None else None
+    if basis is not None:
+        path = Path(directory) / "warm_start.bas"
+        if _write_basis(path, m, basis, indices):
+            return path
+    if primal is not None:
+        path = Path(directory) / "warm_start.sol"
+        _write_primal(path, m, primal, indices)
+        return path
+    return None
@@ -0,0 +1,364 @@
+from copy import deepcopy
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import xarray as xr
+from pydantic import BaseModel
+
+from tz.osemosys.schemas.base import OSeMOSYSData
+from tz.osemosys.schemas.time_definition import TimeAdjacency, TimeDefinition
+from tz.osemosys.utils.composed import ComposedData
+
+AGGREGATION_METHODS = ["kmeans", "kmedoids"]
+
+
+def _sq_distances(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    # squared euclidean distances between the rows of X and the rows of C
+    return np.maximum(
+        (X**2).sum(axis=1)[:, None] + (C**2).sum(axis=1)[None, :] - 2 * X @ C.T,
+        0,
+    )
+
+
+def _init_centres(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    # k-means++ seeding: the indices of k rows of X
+    centres = [int(rng.integers(len(X)))]
+    for _ in range(1, k):
+        d = _sq_distances(X, X[centres]).min(axis=1)
+        if d.sum() == 0:
+            # fewer distinct rows than clusters
+            centres.append(int(np.setdiff1d(np.arange(len(X)), centres)[0]))
+        else:
+            centres.append(int(rng.choice(len(X), p=d / d.sum())))
+    return np.asarray(centres)
+
+
+def kmeans(
+    X: np.ndarray, k: int, seed: int = 0, max_iter: int = 100
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster the rows of X with Lloyd's k-means algorithm, seeded with k-means++.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the cluster of each row, and the cluster centroids
+    """
+    rng = np.random.default_rng(seed)
+    centroids = X[_init_centres(X, k, rng)]
+    labels = None
+    for _ in range(max_iter):
+        d = _sq_distances(X, centroids)
+        new_labels = d.argmin(axis=1)
+        # re-seed any empty cluster with the row furthest from its centroid
+        for cluster in np.setdiff1d(np.arange(k), new_labels):
+            furthest = d[np.arange(len(X)), new_labels].argmax()
+            new_labels[furthest] = cluster
+            d[furthest] = 0
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        centroids = np.stack([X[labels == cluster].mean(axis=0) for cluster in range(k)])
+    return labels, centroids
+
+
+def kmedoids(
+    X: np.ndarray, k: int, seed: int = 0, max_iter: int = 100
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster the rows of X with the alternating k-medoids algorithm, seeded with k-means++.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the cluster of each row, and the row index of each medoid
+    """
+    rng = np.random.default_rng(seed)
+    medoids = _init_centres(X, k, rng)
+    labels = None
+    for _ in range(max_iter):
+        d = _sq_distances(X, X[medoids])
+        d[medoids, np.arange(k)] = -1  # each medoid is in its own cluster
+        new_labels = d.argmin(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            within = np.sqrt(_sq_distances(X[members], X[members])).sum(axis=1)
+            medoids[cluster] = members[within.argmin()]
+    return labels, medoids
+
+
+def _timeslice_profiles(cfg: Dict[str, Any]) -> List[Tuple[Any, str, OSeMOSYSData]]:
+    # every timeslice-indexed parameter of the spec's components
+    profiles = []
+    for name in ["commodities", "technologies", "storage", "trade", "regions", "impacts"]:
+        for component in cfg.get(name) or []:
+            for field in type(component).model_fields:
+                value = getattr(component, field)
+                if (
+                    isinstance(value, OSeMOSYSData)
+                    and isinstance(value.data, ComposedData)
+                    and "timeslices" in value.data.dims
+                ):
+                    profiles.append((component, field, value))
+    return profiles
+
+
+def _features(profiles: List[OSeMOSYSData], n_periods: int, period_length: int) -> np.ndarray:
+    # one row per period, with each profile scaled by its maximum
+    features = []
+    for profile in profiles:
+        data = profile.data
+        values = np.where(data.mask, data.values, 0).astype(float)
+        values = np.moveaxis(values, data.dims.index("timeslices"), -1)
+        values = values.reshape(-1, n_periods, period_length)
+        scale = np.abs(values).max(axis=(1, 2), keepdims=True)
+        values = np.divide(values, scale, out=np.zeros_like(values), where=scale > 0)
+        features.append(values.transpose(1, 0, 2).reshape(n_periods, -1))
+    return np.concatenate(features, axis=1) if features else np.zeros((n_periods, 0))
+
+
+def _reduce_profile(
+    profile: OSeMOSYSData,
+    timeslices: List[str],
+    labels: np.ndarray,
+    medoids: np.ndarray | None,
+    weights: np.ndarray,
+    period_length: int,
+) -> OSeMOSYSData:
+    data = profile.data
+    axis = data.dims.index("timeslices")
+    values = np.moveaxis(np.where(data.mask, data.values, np.nan).astype(float), axis, -1)
+    values = values.reshape(*values.shape[:-1], -1, period_length)
+    k = len(np.unique(labels))
+
+    # demand profiles are shares of an annual total, summed over the periods each representative
+    # period stands for; other profiles are averaged, weighted by their year split
+    extensive = profile.sums_to_one
+    if medoids is not None:
+        counts = np.bincount(labels, minlength=k)[:, None]
+        reduced = values[..., medoids, :] * (counts if extensive else 1)
+    else:
+        members = np.eye(k)[labels]  # periods x clusters
+        defined = ~np.isnan(values)
+        filled = np.where(defined, values, 0)
+        if extensive:
+            reduced = np.einsum("...pl,pk->...kl", filled, members)
+        else:
+            total = np.einsum("...pl,pl,pk->...kl", filled, weights, members)
+            norm = np.einsum("...pl,pl,pk->...kl", defined.astype(float), weights, members)
+            reduced = np.divide(total, norm, out=np.full_like(total, np.nan), where=norm > 0)
+        reduced[np.einsum("...pl,pk->...kl", defined.astype(float), members) == 0] = np.nan
+    if extensive:
+        # restore the sum to one lost to medoid selection
+        sums = np.nansum(reduced, axis=(-2, -1), keepdims=True)
+        reduced = np.divide(reduced, sums, out=reduced, where=sums > 0)
+
+    reduced = np.moveaxis(reduced.reshape(*reduced.shape[:-2], -1), -1, axis)
+    coords = {**data.coords, "timeslices": timeslices}
+    return type(profile)(ComposedData(data.dims, coords, reduced, ~np.isnan(reduced)))
+
+
+def aggregate_timeslices(
+    spec: Any,
+    n_periods: int,
+    period_length: int = 24,
+    method: str = "kmeans",
+    seed: int = 0,
+    max_iter: int = 100,
+) -> Tuple[Any, xr.DataArray]:
+    """
+    Aggregate the timeslices of a RunSpec into representative periods.
+
+    The timeslices, in the order of `time_definition.timeslices`, are split into consecutive
+    periods of `period_length` timeslices (e.g. days of 24 hours). The periods are clustered on
+    their timeslice profiles (e.g. `demand_profile` and `capacity_factor`), each scaled by its
+    maximum, into `n_periods` representative periods:
+
+    - with k-means, a representative period takes the year-split weighted mean of the profiles
+      of the periods it represents;
+    - with k-medoids, it takes the profiles of its medoid, an actual period.
+
+    Demand profiles, which are shares of the annual demand, are summed over the periods each
+    representative period stands for, so that they still sum to one. The year split of a
+    representative timeslice is the sum of the year splits of the timeslices it represents.
+
+    The reduced time definition has a single season, a day type for each representative period,
+    and a daily time bracket for each timeslice of a period, with `day_split` the mean year split
+    of each timeslice of a period. The number of periods each representative period stands for
+    is carried by its year split only: `days_in_day_type` keeps the meaning OSeMOSYS gives it, of
+    days in a week (one of each day type), rather than counting periods, which may be more than
+    seven. The YearSplit of a representative timeslice is then its DaySplit times the number of
+    periods it stands for.
+    With a `period_length` of 1, timeslices are clustered individually and the reduced time
+    definition has timeslices only.
+
+    Args:
+        spec (RunSpec): the spec to aggregate
+        n_periods (int): the number of representative periods
+        period_length (int): the number of timeslices in each period
+        method (str): the clustering method, 'kmeans' or 'kmedoids'
+        seed (int): the seed of the cluster initialisation
+        max_iter (int): the maximum number of clustering iterations
+
+    Returns:
+        Tuple[RunSpec, xr.DataArray]: the aggregated spec, of the same type as `spec`, and the
+            representative timeslice of each original timeslice, indexed by TIMESLICE
+
+    Raises:
+        ValueError: If the timeslices cannot be split into periods, or `n_periods` is not
+            between 1 and the number of periods
+    """
+    if method not in AGGREGATION_METHODS:
+        raise ValueError(f"method must be one of {AGGREGATION_METHODS}, got '{method}'")
+    time_definition = spec.time_definition
+    original = [str(timeslice) for timeslice in time_definition.timeslices]
+    if period_length < 1 or len(original) % period_length != 0:
+        raise ValueError(
+            f"{len(original)} timeslices cannot be split into periods of {period_length}"
+        )
+    n_original = len(original) // period_length
+    if not 1 <= n_periods <= n_original:
+        raise ValueError(f"n_periods must be between 1 and {n_original}, got {n_periods}")
+
+    # the spec's fields only, not the private attributes of e.g. a built Model
+    cfg = {name: deepcopy(value) for name, value in spec}
+    profiles = _timeslice_profiles(cfg)
+    X = _features([profile for _, _, profile in profiles], n_original, period_length)
+    if method == "kmeans":
+        labels, _ = kmeans(X, n_periods, seed=seed, max_iter=max_iter)
+        medoids = None
+    else:
+        labels, medoids = kmedoids(X, n_periods, seed=seed, max_iter=max_iter)
+
+    # number the representative periods in order of their first occurrence
+    _, first = np.unique(labels, return_index=True)
+    order = np.argsort(np.argsort(first))
+    labels = order[labels]
+    if medoids is not None:
+        medoids = medoids[np.argsort(order)]
+
+    year_split = {str(ts): value for ts, value in time_definition.year_split.items()}
+    weights = np.asarray([year_split[ts] for ts in original], dtype=float)
+    weights = weights.reshape(n_original, period_length)
+    members = np.eye(n_periods)[labels]
+    year_split = np.einsum("pl,pk->kl", weights, members)
+
+    periods = [str(ii + 1) for ii in range(n_periods)]
+    steps = [str(ii + 1) for ii in range(period_length)]
+    if period_length == 1:
+        timeslices = periods
+        time_cfg = dict(timeslices=timeslices)
+    else:
+        timeslices = [f"{period}-{step}" for period in periods for step in steps]
+        time_cfg = dict(
+            seasons=["1"],
+            day_types=periods,
+            daily_time_brackets=steps,
+            timeslices=timeslices,
+            timeslice_in_season={ts: "1" for ts in timeslices},
+            timeslice_in_daytype={ts: ts.split("-")[0] for ts in timeslices},
+            timeslice_in_timebracket={ts: ts.split("-")[1] for ts in timeslices},
+            day_split=dict(zip(steps, weights.mean(axis=0).tolist())),
+            # a day of each day type, as OSeMOSYS counts days in a week; the periods each stands
+            # for are weighted by its year split
+            days_in_day_type={period: 1 for period in periods},
+        )
+
+    for component, field, profile in profiles:
+        setattr(
+            component,
+            field,
+            _reduce_profile(profile, timeslices, labels, medoids, weights, period_length),
+        )
+    cfg["time_definition"] = TimeDefinition(
+        id=time_definition.id,
+        years=time_definition.years,
+        year_split=dict(zip(timeslices, year_split.ravel().tolist())),
+        **time_cfg,
+    )
+
+    representative = np.asarray(timeslices, dtype=object).reshape(n_periods, period_length)
+    timeslice_map = xr.DataArray(
+        representative[labels].ravel(),
+        dims="TIMESLICE",
+        coords={"TIMESLICE": original},
+        name="representative_timeslice",
+    )
+
+    return type(spec)(**cfg), timeslice_map
+
+
+def disaggregate_timeslices(obj: xr.Dataset | xr.DataArray, timeslice_map: xr.DataArray):
+    """
+    Expand the TIMESLICE dimension of an aggregated model's parameters or solution back to the
+    original timeslices, as mapped by `aggregate_timeslices`.
+
+    Each original timeslice takes the value of its representative timeslice, which suits rates
+    (e.g. RateOfActivity, in `solution_vars="all"`) and prices; quantities accumulated over a
+    timeslice should first be divided by the YearSplit of the aggregated model.
+    """
+    expanded = obj.sel(TIMESLICE=timeslice_map.values)
+    return expanded.assign_coords(TIMESLICE=timeslice_map["TIMESLICE"].values)
+
+
+def _select_years(obj: Any, years: List[str]) -> Any:
+    # the obj with every years-indexed OSeMOSYSData, in any nested component, restricted to years
+    if isinstance(obj, OSeMOSYSData):
+        data = obj.data
+        if isinstance(data, ComposedData) and "years" in data.dims:
+            axis = data.dims.index("years")
+            index = [data.coords["years"].index(year) for year in years]
+            obj.data = ComposedData(
+                data.dims,
+                {**data.coords, "years": list(years)},
+                np.take(data.values, index, axis=axis),
+                np.take(data.mask, index, axis=axis),
+            )
+    elif isinstance(obj, BaseModel):
+        for field in type(obj).model_fields:
+            _select_years(getattr(obj, field), years)
+    elif isinstance(obj, list):
+        for item in obj:
+            _select_years(item, years)
+    return obj
+
+
+def select_milestone_years(spec: Any, years: List[int]) -> Any:
+    """
+    Reduce a RunSpec to milestone years, e.g. every fifth year of an annual model.
+
+    The parameters of the spec are taken at the milestone years only. Each milestone year stands
+    for the years up to the next milestone year, and the last for as many years as the gap before
+    it; these `year_weight`s of the time definition weight the operating costs, emissions and
+    activity of each milestone year, and the share of each milestone year over which capacity
+    built in a milestone year operates.
+
+    Args:
+        spec (RunSpec): the spec to reduce
+        years (List[int]): the milestone years, which must be years of the spec
+
+    Returns:
+        RunSpec: the reduced spec, of the same type as `spec`
+
+    Raises:
+        ValueError: If `years` is empty or has years not in the spec
+    """
+    time_definition = spec.time_definition
+    years = sorted({int(year) for year in years})
+    missing = sorted(set(years) - {int(year) for year in time_definition.years})
+    if not years or missing:
+        raise ValueError(f"milestone years must be years of the spec, got {missing or years}")
+    if time_definition.year_weight is not None:
+        raise ValueError("the spec already has milestone years")
+
+    gaps = [later - earlier for earlier, later in zip(years[:-1], years[1:])]
+    year_weight = dict(zip(years, gaps + gaps[-1:] if gaps else [1]))
+
+    # the spec's fields only, not the private attributes of e.g. a built Model
+    cfg = {name: deepcopy(value) for name, value in spec if name != "time_definition"}
+    _select_years(list(cfg.values()), [str(year) for year in years])
+
+    adj = time_definition.adj.model_copy(update={"years": TimeAdjacency.from_years(years).years})
+    cfg["time_definition"] = time_definition.model_copy(
+        update=dict(years=years, year_weight=year_weight, adj=adj, adj_inv=adj.inv())
+    )
+    return type(spec)(**cfg)
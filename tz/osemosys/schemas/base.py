@@ -1,6 +1,6 @@
 import re
 from enum import Enum
-from typing import Annotated, Any, Dict, List, Mapping, Union
+from typing import Annotated, Any, ClassVar, Dict, List, Mapping, Union
 
 import numpy as np
 import pandas as pd
@@ -16,7 +16,9 @@ from pydantic.fields import FieldInfo
 
 from tz.osemosys.defaults import defaults
 from tz.osemosys.utils import (
-    group_to_json,
+    ComposedData,
+    broadcast_wildcards,
+    flatten_nested,
     isnumeric,
     recursive_keys,
     rgetattr,
@@ -94,6 +96,12 @@ def nested_sum_one(values: Mapping, info: ValidationInfo) -> bool:
     if data is None:
         return values
 
+    if isinstance(data, ComposedData):
+        sums = np.where(data.mask, data.values, 0).sum(axis=-1)
+        if not np.allclose(sums[data.mask.any(axis=-1)], 1.0, atol=defaults.equals_one_tolerance):
+            raise ValueError("Nested data must sum to 1.0 along the last indexing level.")
+        return values
+
     # check for single value
     if isnumeric(data):
         if float(data) == 1.0:
@@ -131,6 +139,9 @@ def check_or_cast_int(cls, v):
     """
     if isinstance(v, int):
         return v
+    elif isinstance(v, ComposedData):
+        # composed data is cast on composition
+        return v
     elif isinstance(v, dict):
         # check or try to cast
         keys = [k for k in recursive_keys(v)]
@@ -154,6 +165,9 @@ def check_or_cast_bool(cls, v):
     """
     if isinstance(v, bool):
         return v
+    elif isinstance(v, ComposedData):
+        # composed data is cast on composition
+        return v
     elif isinstance(v, dict):
         # check or try to cast
         keys = [k for k in recursive_keys(v)]
@@ -177,6 +191,9 @@ def check_or_cast_dm(cls, v):
     """
     if isinstance(v, DepreciationMethod):
         return v
+    elif isinstance(v, ComposedData):
+        # composed data is cast on composition
+        return v
     elif isinstance(v, dict):
         # check or try to cast
         keys = [k for k in recursive_keys(v)]
@@ -316,8 +333,12 @@ class OSeMOSYSData(BaseModel):
             else:
                 super().__init__(data=data)
 
+    # whether the data is a share, summing to one over its innermost dimension (see
+    # `nested_sum_one`), set on the SumOne classes of each data coordinate key
+    sums_to_one: ClassVar[bool] = False
     is_composed: bool = False
     data: Union[
+        ComposedData,  # composed data, see `_check_set_membership`
         DataVar,  # {data: 6.}
         Dict[IdxVar, DataVar],
         Dict[IdxVar, Dict[IdxVar, DataVar]],
@@ -332,6 +353,21 @@ class OSeMOSYSData(BaseModel):
     def __setitem__(self, key: Any, value: Any):
         self.data[key] = value
 
+    def to_dataframe(self, columns: List[str], **constants: Any) -> pd.DataFrame:
+        """
+        Long-format dataframe of the data, with a 'VALUE' column, any constant-valued columns,
+        and a column for each nesting level of the data.
+        """
+        if isinstance(self.data, ComposedData):
+            return self.data.to_dataframe(columns, **constants)
+
+        paths, values = flatten_nested(self.data)
+        df = pd.DataFrame({"VALUE": values})
+        for name, value in constants.items():
+            df[name] = value
+        df[columns] = pd.DataFrame(paths, index=df.index)
+        return df
+
 
 class DepreciationMethod(str, Enum):
     sinking_fund = "sinking-fund"
@@ -339,7 +375,12 @@ class DepreciationMethod(str, Enum):
 
 
 def _check_nesting_depth(obj_id: str, data: Any, max_depth: int):
-    if isinstance(data, dict):
+    if isinstance(data, ComposedData):
+        if len(data.dims) > max_depth:
+            raise ValueError(
+                f"Data for {obj_id} must not have a nesting depth greater than {max_depth}."
+            )
+    elif isinstance(data, dict):
         keys = recursive_keys(data)
         if max([len(k) for k in keys]) > max_depth:
             raise ValueError(
@@ -349,96 +390,8 @@ def _check_nesting_depth(obj_id: str, data: Any, max_depth: int):
 
 
 def _check_set_membership(obj_id: str, data: Any, sets: Dict[str, List[str]]):
-    # cast 'years' to str
-    if "years" in sets.keys():
-        sets["years"] = [str(yr) for yr in sets["years"]]
-
-    if not isinstance(data, dict):
-        data = {"*": data}
-
-    # cast to dataframe
-    df = pd.json_normalize(data).T
-    cols = [f"L{ii}" for ii in list(range(max(df.index.str.split(".").str.len())))]
-    df[cols] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
-    df = df.rename(columns={0: "value"})
-
-    # assign each column to a set
-    assign_sets = list(sets.keys())
-
-    for col in cols:
-        col_vals = df.loc[df[col] != "*", col].values.tolist()
-        if col_vals:
-            renamed = False
-            for set_name, set_vals in sets.items():
-                # assign set if it has not been assigned and all the vals are in the set
-                if (set_name in assign_sets) and (len(set(col_vals) - set(set_vals)) == 0):
-                    assign_sets.remove(set_name)
-                    df = df.rename(columns={col: set_name})
-                    renamed = True
-                    break
-            if not renamed:
-                # there were values in a column that did not match any set
-                raise ValueError(
-                    f"Data for {obj_id} contains set values {col_vals} that do not match any set."
-                )
-
-    unassigned_cols = [c for c in df.columns if c not in sets.keys() if c != "value"]
-    if len(unassigned_cols) > len(assign_sets):
-        raise ValueError(
-            f"Data for {obj_id} contains more unassigned columns that there are unassigned sets."
-        )
-
-    # assign any un-assigned wildcard columns to a un-assigned sets
-    df = df.rename(
-        columns=dict(
-            zip(
-                df.columns[(df == "*").all()].values,
-                [set_name for set_name in assign_sets[: (df == "*").all().sum()]],
-            )
-        )
-    )
-
-    # if any un-assigned set remain, expand the dataframe
-    for set_name in assign_sets:
-        if set_name not in df.columns:
-            df[set_name] = "*"
-
-    # explode wildcards - need to do each set separately within group
-    ordered_columns = [c for c in df.columns if c in sets.keys()]
-
-    for col_idx in reversed(range(len(ordered_columns))):
-        group_columns = ordered_columns[:col_idx]
-        if group_columns:
-            explode_col = ordered_columns[col_idx]
-
-            # explode wildcards
-            recombine_groups = []
-            for _idx, g in df.groupby(group_columns):
-                explode_vals = [
-                    val for val in sets[explode_col] if val not in g[explode_col].values.tolist()
-                ]
-                g.loc[g[explode_col] == "*", explode_col] = g.loc[
-                    g[explode_col] == "*", explode_col
-                ].apply(
-                    lambda x: explode_vals  # noqa: B023
-                )
-                g = g.explode(explode_col)
-                recombine_groups.append(g)
-
-            df = pd.concat(recombine_groups)
-
-    # then do the root column
-    root_col = ordered_columns[0]
-    explode_vals = [val for val in sets[root_col] if val not in df[root_col].values.tolist()]
-    df.loc[df[root_col] == "*", root_col] = df.loc[df[root_col] == "*", root_col].apply(
-        lambda x: explode_vals  # noqa: B023
-    )
-    df = df.explode(root_col)
-
-    # re-json
-    data = group_to_json(df, data_columns=list(sets.keys()), target_column="value")
-
-    return data
+    labels, codes, values = broadcast_wildcards(obj_id, data, sets)
+    return ComposedData.from_cells(labels, codes, values)
 
 
 def _compose_R(self, obj_id, data, regions, **sets):
@@ -723,6 +676,7 @@ for key, func in zip(
                 },
             ),
         )
+    getattr(OSeMOSYSData, key).SumOne.sums_to_one = True
 
 OSeMOSYSData.R.DM = create_model(
     "OSeMOSYSData_R_DM",
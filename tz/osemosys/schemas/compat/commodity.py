@@ -1,5 +1,3 @@
-import os
-from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, List, Union
 
 import pandas as pd
@@ -7,7 +5,9 @@ from pydantic import BaseModel, Field
 
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.commodity import Commodity
@@ -39,18 +39,20 @@ class OtooleCommodity(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir):
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None):
         # ###########
         # Load Data #
         # ###########
 
-        df_commodity = pd.read_csv(os.path.join(root_dir, "FUEL.csv"))
+        reader = reader or OtooleReader(root_dir)
+
+        df_commodity = reader.read("FUEL")
 
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
@@ -67,42 +69,36 @@ class OtooleCommodity(BaseModel):
 
         # Check impact names are consistent with those in FUEL.csv
         for df in dfs.keys():
-            for commodity in dfs[df]["FUEL"].unique():
-                if commodity not in list(df_commodity["VALUE"]):
-                    raise ValueError(f"{commodity} given in {df}.csv but not in FUEL.csv")
+            unknown = dfs[df].loc[~dfs[df]["FUEL"].isin(df_commodity["VALUE"]), "FUEL"]
+            if not unknown.empty:
+                raise ValueError(f"{unknown.iloc[0]} given in {df}.csv but not in FUEL.csv")
 
         # ########################
         # Define class instances #
         # ########################
 
+        # group each csv by commodity in a single pass
+        data_columns = {
+            "SpecifiedAnnualDemand": ["REGION", "YEAR"],
+            "SpecifiedDemandProfile": ["REGION", "YEAR", "TIMESLICE"],
+            "AccumulatedAnnualDemand": ["REGION", "YEAR"],
+            "RETagFuel": ["REGION", "YEAR"],
+        }
+        grouped = {
+            key: group_to_json_by_root(dfs[key], root_column="FUEL", data_columns=columns)
+            for key, columns in data_columns.items()
+        }
+
         commodity_instances = []
         for commodity in df_commodity["VALUE"].values.tolist():
             demand_annual = (
-                OSeMOSYSData.RY(
-                    group_to_json(
-                        g=dfs["SpecifiedAnnualDemand"].loc[
-                            dfs["SpecifiedAnnualDemand"]["FUEL"] == commodity
-                        ],
-                        root_column="FUEL",
-                        data_columns=["REGION", "YEAR"],
-                        target_column="VALUE",
-                    )
-                )
-                if commodity in dfs["SpecifiedAnnualDemand"]["FUEL"].values
+                OSeMOSYSData.RY(grouped["SpecifiedAnnualDemand"][commodity])
+                if commodity in grouped["SpecifiedAnnualDemand"]
                 else None
             )
             accumulated_demand = (
-                OSeMOSYSData.RY(
-                    group_to_json(
-                        g=dfs["AccumulatedAnnualDemand"].loc[
-                            dfs["AccumulatedAnnualDemand"]["FUEL"] == commodity
-                        ],
-                        root_column="FUEL",
-                        data_columns=["REGION", "YEAR"],
-                        target_column="VALUE",
-                    )
-                )
-                if commodity in dfs["AccumulatedAnnualDemand"]["FUEL"].values
+                OSeMOSYSData.RY(grouped["AccumulatedAnnualDemand"][commodity])
+                if commodity in grouped["AccumulatedAnnualDemand"]
                 else None
             )
 
@@ -117,29 +113,13 @@ class OtooleCommodity(BaseModel):
                         )
 
             demand_profile = (
-                OSeMOSYSData.RYS.SumOne(
-                    group_to_json(
-                        g=dfs["SpecifiedDemandProfile"].loc[
-                            dfs["SpecifiedDemandProfile"]["FUEL"] == commodity
-                        ],
-                        root_column="FUEL",
-                        data_columns=["REGION", "YEAR", "TIMESLICE"],
-                        target_column="VALUE",
-                    )
-                )
-                if commodity in dfs["SpecifiedDemandProfile"]["FUEL"].values
+                OSeMOSYSData.RYS.SumOne(grouped["SpecifiedDemandProfile"][commodity])
+                if commodity in grouped["SpecifiedDemandProfile"]
                 else None
             )
             include_in_joint_renewable_target = (
-                OSeMOSYSData.RY.Bool(
-                    group_to_json(
-                        g=dfs["RETagFuel"].loc[dfs["RETagFuel"]["FUEL"] == commodity],
-                        root_column="FUEL",
-                        data_columns=["REGION", "YEAR"],
-                        target_column="VALUE",
-                    )
-                )
-                if commodity in dfs["RETagFuel"]["FUEL"].values
+                OSeMOSYSData.RY.Bool(grouped["RETagFuel"][commodity])
+                if commodity in grouped["RETagFuel"]
                 else None
             )
 
@@ -173,95 +153,101 @@ class OtooleCommodity(BaseModel):
         dfs["FUEL"] = pd.DataFrame({"VALUE": [commodity.id for commodity in commodities]})
 
         # Parameters
-        # collect demand dataframes
-        accumulated_demand_dfs = []
-        annual_demand_dfs = []
-        demand_profile_dfs = []
-        include_in_joint_renewable_target_dfs = []
-
+        # collect demand data
+        frames = StemFrames(cls.otoole_stems)
         for commodity in commodities:
             if commodity.demand_annual is not None:
-                df = pd.json_normalize(commodity.demand_annual.data).T.rename(columns={0: "VALUE"})
-                df["FUEL"] = commodity.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-
                 if commodity.demand_profile is not None:
-                    for region in commodity.demand_annual.data.keys():
-                        if region in commodity.demand_profile.data.keys():
-                            # if profile data is given, add df to annual_demand_dfs
-                            annual_demand_dfs.append(df.loc[df["REGION"] == region])
-
-                            # ... and add profile df to demand_profile_dfs
-                            df_profile = pd.json_normalize(commodity.demand_profile.data).T.rename(
-                                columns={0: "VALUE"}
-                            )
-                            df_profile["FUEL"] = commodity.id
-                            df_profile[["REGION", "YEAR", "TIMESLICE"]] = pd.DataFrame(
-                                df_profile.index.str.split(".").to_list(),
-                                index=df_profile.index,
-                            )
-                            demand_profile_dfs.append(
-                                df_profile.loc[df_profile["REGION"] == region]
-                            )
-                        else:
-                            accumulated_demand_dfs.append(df.loc[df["REGION"] == region])
+                    # if profile data is given for a region, add its demand to
+                    # SpecifiedAnnualDemand and its profile to SpecifiedDemandProfile ...
+                    regions = list(commodity.demand_annual.data.keys())
+                    profile_regions = [
+                        region
+                        for region in regions
+                        if region in commodity.demand_profile.data.keys()
+                    ]
+                    frames.add(
+                        "SpecifiedAnnualDemand",
+                        commodity.demand_annual,
+                        ["REGION", "YEAR"],
+                        subset={"REGION": profile_regions},
+                        FUEL=commodity.id,
+                    )
+                    frames.add(
+                        "SpecifiedDemandProfile",
+                        commodity.demand_profile,
+                        ["REGION", "YEAR", "TIMESLICE"],
+                        subset={"REGION": profile_regions},
+                        FUEL=commodity.id,
+                    )
+                    # ... otherwise add its demand to AccumulatedAnnualDemand
+                    frames.add(
+                        "AccumulatedAnnualDemand",
+                        commodity.demand_annual,
+                        ["REGION", "YEAR"],
+                        subset={
+                            "REGION": [
+                                region for region in regions if region not in profile_regions
+                            ]
+                        },
+                        FUEL=commodity.id,
+                    )
                 # If no demand_profile, put all data in accumulated demand
                 else:
-                    accumulated_demand_dfs.append(df)
+                    frames.add(
+                        "AccumulatedAnnualDemand",
+                        commodity.demand_annual,
+                        ["REGION", "YEAR"],
+                        FUEL=commodity.id,
+                    )
 
             if commodity.include_in_joint_renewable_target is not None:
-                df = pd.json_normalize(commodity.include_in_joint_renewable_target.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df["FUEL"] = commodity.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
+                frames.add(
+                    "RETagFuel",
+                    commodity.include_in_joint_renewable_target,
+                    ["REGION", "YEAR"],
+                    FUEL=commodity.id,
                 )
-                df["VALUE"] = df["VALUE"].map({True: 1, False: 0})
-                include_in_joint_renewable_target_dfs.append(df)
-
-        dfs["SpecifiedAnnualDemand"] = (
-            pd.concat(annual_demand_dfs)
-            if annual_demand_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["SpecifiedAnnualDemand"]["columns"])
-        )
-        dfs["AccumulatedAnnualDemand"] = (
-            pd.concat(accumulated_demand_dfs)
-            if accumulated_demand_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["AccumulatedAnnualDemand"]["columns"])
-        )
-        dfs["SpecifiedDemandProfile"] = (
-            pd.concat(demand_profile_dfs)
-            if demand_profile_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["SpecifiedDemandProfile"]["columns"])
-        )
-        dfs["RETagFuel"] = (
-            pd.concat(include_in_joint_renewable_target_dfs)
-            if include_in_joint_renewable_target_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["RETagFuel"]["columns"])
-        )
+
+        for stem in cls.otoole_stems:
+            dfs[stem] = frames.to_dataframe(stem)
+        dfs["RETagFuel"]["VALUE"] = dfs["RETagFuel"]["VALUE"].map({True: 1, False: 0})
 
         return dfs
 
     @classmethod
-    def to_otoole_csv(cls, commodities: List["Commodity"], output_directory: str):
-        """Write a number of Commodity objects to otoole-organised csvs.
+    def to_otoole_csv_dataframes(cls, commodities: List["Commodity"]) -> dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Commodity objects which are written to
+        csv.
 
         Args:
             commodities (List[Commodity]): A list of Commodity instances
-            output_directory (str): Path to the root of the otoole csv directory
+
+        Returns:
+            dict[str, pd.DataFrame]: A dictionary of dataframes
         """
 
         dfs = cls.to_dataframes(commodities=commodities)
 
-        # Sets
-        dfs["FUEL"].to_csv(os.path.join(output_directory, "FUEL.csv"), index=False)
+        # set, and params where appropriate
+        return {
+            "FUEL": dfs["FUEL"],
+            **{
+                stem: dfs[stem]
+                for stem in cls.otoole_stems
+                if any([(stem not in commodity.otoole_cfg.empty_dfs) for commodity in commodities])
+            },
+        }
+
+    @classmethod
+    def to_otoole_csv(cls, commodities: List["Commodity"], output_directory: str):
+        """Write a number of Commodity objects to otoole-organised csvs.
+
+        Args:
+            commodities (List[Commodity]): A list of Commodity instances
+            output_directory (str): Path to the root of the otoole csv directory
+        """
 
-        # params to csv where appropriate
-        for stem, _params in cls.otoole_stems.items():
-            if any([(stem not in commodity.otoole_cfg.empty_dfs) for commodity in commodities]):
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+        write_csvs(cls.to_otoole_csv_dataframes(commodities), output_directory)
 
         return True
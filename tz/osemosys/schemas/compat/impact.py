@@ -1,5 +1,3 @@
-import os
-from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, List, Union
 
 import pandas as pd
@@ -7,7 +5,9 @@ from pydantic import BaseModel, Field
 
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.impact import Impact
@@ -51,7 +51,7 @@ class OtooleImpact(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> List["Impact"]:
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> List["Impact"]:
         """
         Instantiate a number of Impact objects from otoole-organised csvs.
 
@@ -59,6 +59,8 @@ class OtooleImpact(BaseModel):
         ----------
         root_dir: str
             Path to the root of the otoole csv directory
+        reader: OtooleReader, optional
+            A reader shared between components, so that each csv is only parsed once
 
         Returns
         -------
@@ -70,13 +72,15 @@ class OtooleImpact(BaseModel):
         # Load Data #
         # ###########
 
-        df_impacts = pd.read_csv(os.path.join(root_dir, "EMISSION.csv"))
+        reader = reader or OtooleReader(root_dir)
+
+        df_impacts = reader.read("EMISSION")
 
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
@@ -93,14 +97,24 @@ class OtooleImpact(BaseModel):
 
         # Check impact names are consistent with those in EMISSION.csv
         for df in dfs.keys():
-            for impact in dfs[df]["EMISSION"].unique():
-                if impact not in list(df_impacts["VALUE"]):
-                    raise ValueError(f"{impact} given in {df}.csv but not in EMISSION.csv")
+            unknown = dfs[df].loc[~dfs[df]["EMISSION"].isin(df_impacts["VALUE"]), "EMISSION"]
+            if not unknown.empty:
+                raise ValueError(f"{unknown.iloc[0]} given in {df}.csv but not in EMISSION.csv")
 
         # ########################
         # Define class instances #
         # ########################
 
+        # group each csv by impact in a single pass
+        grouped = {
+            key: group_to_json_by_root(
+                dfs[key],
+                root_column="EMISSION",
+                data_columns=[c for c in params["columns"] if c not in ["EMISSION", "VALUE"]],
+            )
+            for key, params in cls.otoole_stems.items()
+        }
+
         impact_instances = []
         for impact in df_impacts["VALUE"].values.tolist():
             impact_instances.append(
@@ -108,101 +122,38 @@ class OtooleImpact(BaseModel):
                     id=impact,
                     otoole_cfg=otoole_cfg,
                     constraint_annual=(
-                        OSeMOSYSData.RY(
-                            data=group_to_json(
-                                g=dfs["AnnualEmissionLimit"].loc[
-                                    dfs["AnnualEmissionLimit"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGION", "YEAR"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["AnnualEmissionLimit"]["EMISSION"].values
+                        OSeMOSYSData.RY(data=grouped["AnnualEmissionLimit"][impact])
+                        if impact in grouped["AnnualEmissionLimit"]
                         else None
                     ),
                     constraint_annual_region_group=(
-                        OSeMOSYSData.GY(
-                            data=group_to_json(
-                                g=dfs["AnnualEmissionLimitRegionGroup"].loc[
-                                    dfs["AnnualEmissionLimitRegionGroup"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGIONGROUP", "YEAR"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["AnnualEmissionLimitRegionGroup"]["EMISSION"].values
+                        OSeMOSYSData.GY(data=grouped["AnnualEmissionLimitRegionGroup"][impact])
+                        if impact in grouped["AnnualEmissionLimitRegionGroup"]
                         else None
                     ),
                     constraint_total=(
-                        OSeMOSYSData.R(
-                            data=group_to_json(
-                                g=dfs["ModelPeriodEmissionLimit"].loc[
-                                    dfs["ModelPeriodEmissionLimit"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGION"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["ModelPeriodEmissionLimit"]["EMISSION"].values
+                        OSeMOSYSData.R(data=grouped["ModelPeriodEmissionLimit"][impact])
+                        if impact in grouped["ModelPeriodEmissionLimit"]
                         else None
                     ),
                     exogenous_annual=(
-                        OSeMOSYSData.RY(
-                            data=group_to_json(
-                                g=dfs["AnnualExogenousEmission"].loc[
-                                    dfs["AnnualExogenousEmission"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGION", "YEAR"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["AnnualExogenousEmission"]["EMISSION"].values
+                        OSeMOSYSData.RY(data=grouped["AnnualExogenousEmission"][impact])
+                        if impact in grouped["AnnualExogenousEmission"]
                         else None
                     ),
                     exogenous_annual_region_group=(
-                        OSeMOSYSData.GY(
-                            data=group_to_json(
-                                g=dfs["AnnualExogenousEmissionRegionGroup"].loc[
-                                    dfs["AnnualExogenousEmissionRegionGroup"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGIONGROUP", "YEAR"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["AnnualExogenousEmissionRegionGroup"]["EMISSION"].values
+                        OSeMOSYSData.GY(data=grouped["AnnualExogenousEmissionRegionGroup"][impact])
+                        if impact in grouped["AnnualExogenousEmissionRegionGroup"]
                         else None
                     ),
                     exogenous_total=(
-                        OSeMOSYSData.R(
-                            data=group_to_json(
-                                g=dfs["ModelPeriodExogenousEmission"].loc[
-                                    dfs["ModelPeriodExogenousEmission"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGION"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["ModelPeriodExogenousEmission"]["EMISSION"].values
+                        OSeMOSYSData.R(data=grouped["ModelPeriodExogenousEmission"][impact])
+                        if impact in grouped["ModelPeriodExogenousEmission"]
                         else None
                     ),
                     penalty=(
-                        OSeMOSYSData.RY(
-                            data=group_to_json(
-                                g=dfs["EmissionsPenalty"].loc[
-                                    dfs["EmissionsPenalty"]["EMISSION"] == impact
-                                ],
-                                root_column="EMISSION",
-                                data_columns=["REGION", "YEAR"],
-                                target_column="VALUE",
-                            )
-                        )
-                        if impact in dfs["EmissionsPenalty"]["EMISSION"].values
+                        OSeMOSYSData.RY(data=grouped["EmissionsPenalty"][impact])
+                        if impact in grouped["EmissionsPenalty"]
                         else None
                     ),
                 )
@@ -221,82 +172,19 @@ class OtooleImpact(BaseModel):
             dict[str, pd.DataFrame]: A dictionary of dataframes
         """
 
-        # collect constraint, exogenous, and penalty dataframes
-        penalty_dfs = []
-        annual_constraint_dfs = []
-        annual_constraint_region_group_dfs = []
-        total_constraint_dfs = []
-        annual_exogenous_dfs = []
-        annual_exogenous_region_group_dfs = []
-        total_exogenous_dfs = []
-
+        # collect constraint, exogenous, and penalty data
+        frames = StemFrames(cls.otoole_stems)
         for impact in impacts:
-            if impact.penalty is not None:
-                df = pd.json_normalize(impact.penalty.data).T.rename(columns={0: "VALUE"})
-                df["EMISSION"] = impact.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                penalty_dfs.append(df)
-            if impact.constraint_annual is not None:
-                df = pd.json_normalize(impact.constraint_annual.data).T.rename(columns={0: "VALUE"})
-                df["EMISSION"] = impact.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                annual_constraint_dfs.append(df)
-            if impact.constraint_annual_region_group is not None:
-                df = pd.json_normalize(impact.constraint_annual_region_group.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df["EMISSION"] = impact.id
-                df[["REGIONGROUP", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                annual_constraint_region_group_dfs.append(df)
-            if impact.constraint_total is not None:
-                df = pd.json_normalize(impact.constraint_total.data).T.rename(columns={0: "VALUE"})
-                df["EMISSION"] = impact.id
-                df["REGION"] = df.index
-                total_constraint_dfs.append(df)
-            if impact.exogenous_annual is not None:
-                df = pd.json_normalize(impact.exogenous_annual.data).T.rename(columns={0: "VALUE"})
-                df["EMISSION"] = impact.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                annual_exogenous_dfs.append(df)
-            if impact.exogenous_annual_region_group is not None:
-                df = pd.json_normalize(impact.exogenous_annual_region_group.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df["EMISSION"] = impact.id
-                df[["REGIONGROUP", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                annual_exogenous_region_group_dfs.append(df)
-            if impact.exogenous_total is not None:
-                df = pd.json_normalize(impact.exogenous_total.data).T.rename(columns={0: "VALUE"})
-                df["EMISSION"] = impact.id
-                df["REGION"] = df.index
-                total_exogenous_dfs.append(df)
-
-        # collect concatenaed dfs
-        dfs = {}
-        if penalty_dfs:
-            dfs["EmissionsPenalty"] = pd.concat(penalty_dfs)
-        if annual_constraint_dfs:
-            dfs["AnnualEmissionLimit"] = pd.concat(annual_constraint_dfs)
-        if annual_constraint_region_group_dfs:
-            dfs["AnnualEmissionLimitRegionGroup"] = pd.concat(annual_constraint_region_group_dfs)
-        if total_constraint_dfs:
-            dfs["ModelPeriodEmissionLimit"] = pd.concat(total_constraint_dfs)
-        if annual_exogenous_dfs:
-            dfs["AnnualExogenousEmission"] = pd.concat(annual_exogenous_dfs)
-        if annual_exogenous_region_group_dfs:
-            dfs["AnnualExogenousEmissionRegionGroup"] = pd.concat(annual_exogenous_region_group_dfs)
-        if total_exogenous_dfs:
-            dfs["ModelPeriodExogenousEmission"] = pd.concat(total_exogenous_dfs)
+            for stem, params in cls.otoole_stems.items():
+                if getattr(impact, params["attribute"]) is not None:
+                    frames.add(
+                        stem,
+                        getattr(impact, params["attribute"]),
+                        [c for c in params["columns"] if c not in ["EMISSION", "VALUE"]],
+                        EMISSION=impact.id,
+                    )
+
+        dfs = frames.to_dataframes()
 
         # SETS
         dfs["EMISSION"] = pd.DataFrame({"VALUE": [impact.id for impact in impacts]})
@@ -304,25 +192,37 @@ class OtooleImpact(BaseModel):
         return dfs
 
     @classmethod
-    def to_otoole_csv(cls, impacts: List["Impact"], output_directory: str):
-        """Write a number of Impact objects to otoole-organised csvs.
+    def to_otoole_csv_dataframes(cls, impacts: List["Impact"]) -> dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Impact objects which are written to csv.
 
         Args:
             impacts (List[Impact]): A list of Impact instances
-            output_directory (str): Path to the root of the otoole csv directory
-        """
 
-        # TODO: it's getting wet. Refactor into functions alongside other compat methods
+        Returns:
+            dict[str, pd.DataFrame]: A dictionary of dataframes
+        """
 
         dfs = cls.to_dataframes(impacts)
 
-        # set to csv
-        dfs["EMISSION"].to_csv(os.path.join(output_directory, "EMISSION.csv"), index=False)
+        # set, and params where appropriate
+        return {
+            "EMISSION": dfs["EMISSION"],
+            **{
+                stem: dfs[stem]
+                for stem in cls.otoole_stems
+                if any([(stem not in impact.otoole_cfg.empty_dfs) for impact in impacts])
+            },
+        }
+
+    @classmethod
+    def to_otoole_csv(cls, impacts: List["Impact"], output_directory: str):
+        """Write a number of Impact objects to otoole-organised csvs.
 
-        # params to csv where appropriate
-        for stem, _params in cls.otoole_stems.items():
-            if any([(stem not in impact.otoole_cfg.empty_dfs) for impact in impacts]):
+        Args:
+            impacts (List[Impact]): A list of Impact instances
+            output_directory (str): Path to the root of the otoole csv directory
+        """
 
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+        write_csvs(cls.to_otoole_csv_dataframes(impacts), output_directory)
 
         return True
@@ -1,6 +1,5 @@
-import os
 from pathlib import Path
-from typing import ClassVar, Dict, Union
+from typing import Any, ClassVar, Dict, Union
 
 import pandas as pd
 import xarray as xr
@@ -10,6 +9,8 @@ from tz.osemosys.defaults import defaults, defaults_linopy
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.commodity import Commodity
 from tz.osemosys.schemas.compat.base import DefaultsOtoole, OtooleCfg
+from tz.osemosys.schemas.compat.reader import OtooleParquetReader, OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs, write_parquets
 from tz.osemosys.schemas.impact import Impact
 from tz.osemosys.schemas.region import Region, RegionGroup
 from tz.osemosys.schemas.storage import Storage
@@ -89,6 +90,32 @@ class RunSpecOtoole(BaseModel):
         df = df.set_index(index_cols)
         return df
 
+    def default_param_values(self) -> Dict[str, Any]:
+        """
+        Return the default values of the linopy parameters, by otoole name
+
+        Args:
+          self: this RunSpec instance
+
+        Returns:
+          Dict[str, Any]: default value for each parameter which has one
+        """
+
+        # If runspec not generated using otoole config yaml, use linopy defaults
+        if self.defaults_otoole is None:
+            default_values = defaults_linopy.otoole_name_defaults
+            # If storage technologies present, use additional relevant default values
+            if self.storage:
+                default_values = {**default_values, **defaults_linopy.otoole_name_storage_defaults}
+        # Otherwise take defaults from otoole config yaml file
+        else:
+            default_values = {}
+            for name, data in self.defaults_otoole.values.items():
+                if data["type"] == "param":
+                    default_values[name] = data["default"]
+
+        return default_values
+
     def to_xr_ds(self):
         """
         Return the current RunSpec as an xarray dataset
@@ -144,18 +171,7 @@ class RunSpecOtoole(BaseModel):
 
         ds = xr.Dataset(data_vars=data_arrays, coords=coords)
 
-        # If runspec not generated using otoole config yaml, use linopy defaults
-        if self.defaults_otoole is None:
-            default_values = defaults_linopy.otoole_name_defaults
-            # If storage technologies present, use additional relevant default values
-            if self.storage:
-                default_values = {**default_values, **defaults_linopy.otoole_name_storage_defaults}
-        # Otherwise take defaults from otoole config yaml file
-        else:
-            default_values = {}
-            for name, data in self.defaults_otoole.values.items():
-                if data["type"] == "param":
-                    default_values[name] = data["default"]
+        default_values = self.default_param_values()
 
         # Replace any nan values in ds with default values (or None) for corresponding param,
         # adding default values as attribute of each data array
@@ -173,26 +189,52 @@ class RunSpecOtoole(BaseModel):
         return ds
 
     @classmethod
-    def from_otoole_csv(cls, root_dir, id: str | None = None):
+    def from_otoole_csv(
+        cls,
+        root_dir,
+        id: str | None = None,
+        memory_map_size: int | None = None,
+        reader: OtooleReader | None = None,
+    ):
+        """
+        Instantiate a RunSpec from otoole-organised csvs.
+
+        All the csvs in `root_dir` are parsed once, concurrently, and shared between the
+        component readers.
+
+        Args:
+            root_dir (str): Path to the root of the otoole csv directory
+            id (str, optional): id of the RunSpec, defaults to the name of `root_dir`
+            memory_map_size (int, optional): csvs of at least this many bytes are memory-mapped
+                rather than read into a buffer
+            reader (OtooleReader, optional): A reader of the stems of `root_dir`, e.g. an
+                OtooleParquetReader. Defaults to an OtooleReader of the csvs.
+
+        Returns:
+            RunSpec: A single RunSpec instance
+        """
+        reader = reader or OtooleReader(root_dir, memory_map_size=memory_map_size)
+        reader.prefetch()
+
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
                 otoole_cfg.empty_dfs.append(key)
 
         # load from other objects
-        impacts = Impact.from_otoole_csv(root_dir=root_dir)
-        regions = Region.from_otoole_csv(root_dir=root_dir)
-        regionsgroup = RegionGroup.from_otoole_csv(root_dir=root_dir)
-        technologies = Technology.from_otoole_csv(root_dir=root_dir)
-        storage = Storage.from_otoole_csv(root_dir=root_dir)
-        commodities = Commodity.from_otoole_csv(root_dir=root_dir)
-        time_definition = TimeDefinition.from_otoole_csv(root_dir=root_dir)
-        trade = Trade.from_otoole_csv(root_dir=root_dir)
+        impacts = Impact.from_otoole_csv(root_dir=root_dir, reader=reader)
+        regions = Region.from_otoole_csv(root_dir=root_dir, reader=reader)
+        regionsgroup = RegionGroup.from_otoole_csv(root_dir=root_dir, reader=reader)
+        technologies = Technology.from_otoole_csv(root_dir=root_dir, reader=reader)
+        storage = Storage.from_otoole_csv(root_dir=root_dir, reader=reader)
+        commodities = Commodity.from_otoole_csv(root_dir=root_dir, reader=reader)
+        time_definition = TimeDefinition.from_otoole_csv(root_dir=root_dir, reader=reader)
+        trade = Trade.from_otoole_csv(root_dir=root_dir, reader=reader)
 
         otoole_cfg.empty_dfs += list(
             set(flatten([impact.otoole_cfg.empty_dfs for impact in impacts]))
@@ -361,150 +403,83 @@ class RunSpecOtoole(BaseModel):
 
         # depreciation_method
         if self.depreciation_method:
-            df = pd.json_normalize(self.depreciation_method.data).T.rename(columns={0: "VALUE"})
-            df[["REGION"]] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
+            df = self.depreciation_method.to_dataframe(["REGION"])
             df["VALUE"] = df["VALUE"].map({"sinking-fund": 1, "straight-line": 2})
             dfs["DepreciationMethod"] = df
 
         # discount rate
         if self.discount_rate:
-            df = pd.json_normalize(self.discount_rate.data).T.rename(columns={0: "VALUE"})
-            df[["REGION"]] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
+            df = self.discount_rate.to_dataframe(["REGION"])
             dfs["DiscountRate"] = df
 
         if self.cost_of_capital:
-            df = pd.json_normalize(self.cost_of_capital.data).T.rename(columns={0: "VALUE"})
-            df[["REGION", "TECHNOLOGY"]] = pd.DataFrame(
-                df.index.str.split(".").to_list(), index=df.index
-            )
+            df = self.cost_of_capital.to_dataframe(["REGION", "TECHNOLOGY"])
             dfs["DiscountRateIdv"] = df
 
         if self.cost_of_capital_storage:
-            df = pd.json_normalize(self.cost_of_capital_storage.data).T.rename(columns={0: "VALUE"})
-            df[["REGION", "STORAGE"]] = pd.DataFrame(
-                df.index.str.split(".").to_list(), index=df.index
-            )
+            df = self.cost_of_capital_storage.to_dataframe(["REGION", "STORAGE"])
             dfs["DiscountRateStorage"] = df
 
         # reserve margins
         if self.reserve_margin:
-            df = pd.json_normalize(self.reserve_margin.data).T.rename(columns={0: "VALUE"})
-            df[["REGION", "YEAR"]] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
+            df = self.reserve_margin.to_dataframe(["REGION", "YEAR"])
             dfs["ReserveMargin"] = df
 
-            dfs_tag_technology = []
+            frames = StemFrames(self.otoole_stems)
             for technology in self.technologies:
                 if technology.include_in_joint_reserve_margin is not None:
-                    df = pd.json_normalize(
-                        technology.include_in_joint_reserve_margin.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df["TECHNOLOGY"] = technology.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
+                    frames.add(
+                        "ReserveMarginTagTechnology",
+                        technology.include_in_joint_reserve_margin,
+                        ["REGION", "YEAR"],
+                        TECHNOLOGY=technology.id,
                     )
-                    df["VALUE"] = df["VALUE"].astype(float)
-                    dfs_tag_technology.append(df)
-
-            dfs_tag_fuel = []
             for commodity in self.commodities:
                 if commodity.include_in_joint_reserve_margin is not None:
-                    df = pd.json_normalize(commodity.include_in_joint_reserve_margin.data).T.rename(
-                        columns={0: "VALUE"}
-                    )
-                    df["FUEL"] = commodity.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
+                    frames.add(
+                        "ReserveMarginTagFuel",
+                        commodity.include_in_joint_reserve_margin,
+                        ["REGION", "YEAR"],
+                        FUEL=commodity.id,
                     )
-                    df["VALUE"] = df["VALUE"].astype(int)
-                    dfs_tag_fuel.append(df)
-
-            dfs["ReserveMarginTagTechnology"] = (
-                pd.concat(dfs_tag_technology)
-                if dfs_tag_technology
-                else pd.DataFrame(
-                    columns=self.otoole_stems["ReserveMarginTagTechnology"]["columns"]
-                )
-            )
-            dfs["ReserveMarginTagFuel"] = (
-                pd.concat(dfs_tag_fuel)
-                if dfs_tag_fuel
-                else pd.DataFrame(columns=self.otoole_stems["ReserveMarginTagFuel"]["columns"])
+
+            dfs["ReserveMarginTagTechnology"] = frames.to_dataframe(
+                "ReserveMarginTagTechnology"
+            ).astype({"VALUE": float})
+            dfs["ReserveMarginTagFuel"] = frames.to_dataframe("ReserveMarginTagFuel").astype(
+                {"VALUE": int}
             )
 
         # min renewable production targets
         if self.renewable_production_target:
-            df = pd.json_normalize(self.renewable_production_target.data).T.rename(
-                columns={0: "VALUE"}
-            )
-            df[["REGION", "YEAR"]] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
+            df = self.renewable_production_target.to_dataframe(["REGION", "YEAR"])
             dfs["REMinProductionTarget"] = df
 
-            dfs_tag_technology = []
-            for technology in self.technologies:
-                if technology.include_in_joint_renewable_target is not None:
-                    df = pd.json_normalize(
-                        technology.include_in_joint_renewable_target.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df["TECHNOLOGY"] = technology.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
-                    )
-                    df["VALUE"] = df["VALUE"].astype(int)
-                    dfs_tag_technology.append(df)
-
-            dfs_tag_fuel = []
-            for commodity in self.commodities:
-                if commodity.include_in_joint_renewable_target is not None:
-                    df = pd.json_normalize(
-                        commodity.include_in_joint_renewable_target.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df["FUEL"] = commodity.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
-                    )
-                    df["VALUE"] = df["VALUE"].astype(int)
-                    dfs_tag_fuel.append(df)
-
-            dfs["RETagTechnology"] = pd.concat(dfs_tag_technology)
-            dfs["RETagFuel"] = pd.concat(dfs_tag_fuel)
-
         if self.region_group_renewable_production_target:
-            df = pd.json_normalize(self.region_group_renewable_production_target.data).T.rename(
-                columns={0: "VALUE"}
-            )
-            df[["REGIONGROUP", "YEAR"]] = pd.DataFrame(
-                df.index.str.split(".").to_list(), index=df.index
-            )
+            df = self.region_group_renewable_production_target.to_dataframe(["REGIONGROUP", "YEAR"])
             dfs["RegionGroupREMinProductionTarget"] = df
 
-            dfs_tag_technology = []
+        if self.renewable_production_target or self.region_group_renewable_production_target:
+            frames = StemFrames(self.otoole_stems)
             for technology in self.technologies:
                 if technology.include_in_joint_renewable_target is not None:
-                    df = pd.json_normalize(
-                        technology.include_in_joint_renewable_target.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df["TECHNOLOGY"] = technology.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
+                    frames.add(
+                        "RETagTechnology",
+                        technology.include_in_joint_renewable_target,
+                        ["REGION", "YEAR"],
+                        TECHNOLOGY=technology.id,
                     )
-                    df["VALUE"] = df["VALUE"].astype(int)
-                    dfs_tag_technology.append(df)
-
-            dfs_tag_fuel = []
             for commodity in self.commodities:
                 if commodity.include_in_joint_renewable_target is not None:
-                    df = pd.json_normalize(
-                        commodity.include_in_joint_renewable_target.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df["FUEL"] = commodity.id
-                    df[["REGION", "YEAR"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
+                    frames.add(
+                        "RETagFuel",
+                        commodity.include_in_joint_renewable_target,
+                        ["REGION", "YEAR"],
+                        FUEL=commodity.id,
                     )
-                    df["VALUE"] = df["VALUE"].astype(int)
-                    dfs_tag_fuel.append(df)
 
-            dfs["RETagTechnology"] = pd.concat(dfs_tag_technology)
-            dfs["RETagFuel"] = pd.concat(dfs_tag_fuel)
+            dfs["RETagTechnology"] = frames.to_dataframe("RETagTechnology").astype({"VALUE": int})
+            dfs["RETagFuel"] = frames.to_dataframe("RETagFuel").astype({"VALUE": int})
 
         return dfs
 
@@ -536,25 +511,70 @@ class RunSpecOtoole(BaseModel):
 
         return dfs
 
-    def to_otoole_csv(self, output_directory):
+    @classmethod
+    def from_parquet(cls, root_dir, id: str | None = None, memory_map_size: int | None = None):
+        """
+        Instantiate a RunSpec from a directory of parquet tables written by `to_parquet`.
+
+        Args:
+            root_dir (str): Path to the directory of parquet tables
+            id (str, optional): id of the RunSpec, defaults to the name of `root_dir`
+            memory_map_size (int, optional): tables of at least this many bytes are memory-mapped
+                rather than read into a buffer
+
+        Returns:
+            RunSpec: A single RunSpec instance
+        """
+        reader = OtooleParquetReader(root_dir, memory_map_size=memory_map_size)
+        return cls.from_otoole_csv(root_dir, id=id, reader=reader)
+
+    def to_otoole_csv_dataframes(self) -> Dict[str, pd.DataFrame]:
+        """
+        Build the dataframes of every otoole csv of the RunSpec, keyed by stem.
+        """
         dfs = self.to_model_dataframes()
 
         # do subsidiary objects
-        Technology.to_otoole_csv(technologies=self.technologies, output_directory=output_directory)
-        Impact.to_otoole_csv(impacts=self.impacts, output_directory=output_directory)
-        Commodity.to_otoole_csv(commodities=self.commodities, output_directory=output_directory)
-        Region.to_otoole_csv(regions=self.regions, output_directory=output_directory)
-        self.time_definition.to_otoole_csv(output_directory=output_directory)
+        csv_dfs = {}
+        csv_dfs.update(Technology.to_otoole_csv_dataframes(technologies=self.technologies))
+        csv_dfs.update(Impact.to_otoole_csv_dataframes(impacts=self.impacts))
+        csv_dfs.update(Commodity.to_otoole_csv_dataframes(commodities=self.commodities))
+        csv_dfs.update(Region.to_otoole_csv_dataframes(regions=self.regions))
+        csv_dfs.update(self.time_definition.to_otoole_csv_dataframes())
         if self.regionsgroup is not None:
-            RegionGroup.to_otoole_csv(
-                regionsgroup=self.regionsgroup, output_directory=output_directory
-            )
+            csv_dfs.update(RegionGroup.to_otoole_csv_dataframes(regionsgroup=self.regionsgroup))
         if self.storage is not None:
-            Storage.to_otoole_csv(storage=self.storage, output_directory=output_directory)
+            csv_dfs.update(Storage.to_otoole_csv_dataframes(storage=self.storage))
         if self.trade is not None:
-            Trade.to_otoole_csv(trade=self.trade, output_directory=output_directory)
+            csv_dfs.update(Trade.to_otoole_csv_dataframes(trade=self.trade))
 
-        # write dataframes
+        # model-level dataframes take precedence
         for stem, _params in self.otoole_stems.items():
             if stem not in self.otoole_cfg.empty_dfs:
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+                csv_dfs[stem] = dfs[stem]
+
+        return csv_dfs
+
+    def to_otoole_csv(self, output_directory):
+        """
+        Write the RunSpec to otoole-organised csvs.
+
+        The dataframes of every stem are built first and then written concurrently.
+
+        Args:
+            output_directory (str): Path to the root of the otoole csv directory
+        """
+        write_csvs(self.to_otoole_csv_dataframes(), output_directory)
+
+    def to_parquet(self, output_directory):
+        """
+        Write the RunSpec to a directory of parquet tables, one table per otoole stem.
+
+        Tables have the columns of the equivalent otoole csvs, with named set columns stored as
+        dictionary-encoded categoricals and YEAR and MODE_OF_OPERATION as integers. A RunSpec can be
+        read back with `from_parquet`.
+
+        Args:
+            output_directory (str): Path to the directory in which to write the tables
+        """
+        write_parquets(self.to_otoole_csv_dataframes(), output_directory)
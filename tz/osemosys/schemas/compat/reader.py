@@ -0,0 +1,185 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+# Set columns whose members are names, read as categoricals
+CATEGORICAL_COLUMNS = [
+    "REGION",
+    "_REGION",
+    "REGIONGROUP",
+    "TECHNOLOGY",
+    "FUEL",
+    "EMISSION",
+    "STORAGE",
+]
+
+# Set columns whose members are always integers
+INTEGER_COLUMNS = ["YEAR", "MODE_OF_OPERATION"]
+
+
+def otoole_dtypes(stem: str) -> Dict[str, str]:
+    """
+    The fixed dtype schema used to read an otoole csv.
+
+    Set csvs (e.g. TECHNOLOGY.csv) have a single VALUE column, which is read as str for named sets
+    and as int for YEAR and MODE_OF_OPERATION. In parameter csvs, the named set columns are read as
+    categoricals and YEAR and MODE_OF_OPERATION as int. Time set members (e.g. TIMESLICE) may be
+    given as either int or str, and their dtype is inferred.
+
+    Args:
+        stem (str): The name of the csv, without extension
+
+    Returns:
+        Dict[str, str]: A mapping of column name to dtype, as accepted by `pd.read_csv`
+    """
+    if stem in CATEGORICAL_COLUMNS:
+        return {"VALUE": "str"}
+    elif stem in INTEGER_COLUMNS:
+        return {"VALUE": "int64"}
+
+    dtypes = {column: "category" for column in CATEGORICAL_COLUMNS}
+    dtypes.update({column: "int64" for column in INTEGER_COLUMNS})
+    return dtypes
+
+
+class OtooleReader:
+    """
+    Reads the csvs of an otoole directory, parsing each csv at most once.
+
+    Parsed frames are cached so that a single reader can be shared by each of the component
+    `from_otoole_csv` methods. `prefetch` parses all the csvs of the directory concurrently.
+    Each csv is read with the dtype schema given by `otoole_dtypes`.
+
+    Args:
+        root_dir (str): Path to the root of the otoole csv directory
+        memory_map_size (int | None): csvs of at least this many bytes are memory-mapped rather
+            than read into a buffer. Defaults to None, for no memory-mapping.
+        max_workers (int | None): Maximum number of threads used by `prefetch`
+    """
+
+    suffix = ".csv"
+
+    def __init__(
+        self,
+        root_dir: str,
+        memory_map_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.root_dir = Path(root_dir)
+        self.memory_map_size = memory_map_size
+        self.max_workers = max_workers
+        # parsed frames, or None where the csv is missing
+        self._frames: Dict[str, pd.DataFrame | None] = {}
+
+    def _parse(self, stem: str) -> pd.DataFrame | None:
+        path = self.root_dir / f"{stem}{self.suffix}"
+        if not path.is_file():
+            return None
+        return self._read_file(path, stem, memory_map=self._memory_map(path))
+
+    def _memory_map(self, path: Path) -> bool:
+        return self.memory_map_size is not None and os.path.getsize(path) >= self.memory_map_size
+
+    def _read_file(self, path: Path, stem: str, memory_map: bool) -> pd.DataFrame:
+        return pd.read_csv(path, dtype=otoole_dtypes(stem), memory_map=memory_map)
+
+    def stems(self) -> List[str]:
+        """
+        The stems of all the files in the directory.
+        """
+        return sorted(path.stem for path in self.root_dir.glob(f"*{self.suffix}"))
+
+    def prefetch(self, stems: Optional[List[str]] = None) -> "OtooleReader":
+        """
+        Parse the given csvs concurrently, defaulting to all the csvs in the directory.
+
+        Args:
+            stems (List[str] | None): The stems of the csvs to parse
+
+        Returns:
+            OtooleReader: This reader, for chaining
+        """
+        stems = [stem for stem in (stems or self.stems()) if stem not in self._frames]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for stem, df in zip(stems, pool.map(self._parse, stems)):
+                self._frames[stem] = df
+        return self
+
+    def read(self, stem: str) -> pd.DataFrame:
+        """
+        Read a single csv, parsing it only if it has not been read before.
+
+        Args:
+            stem (str): The name of the csv, without extension
+
+        Returns:
+            pd.DataFrame: A copy of the parsed csv, which the caller is free to modify
+
+        Raises:
+            FileNotFoundError: If the csv is not in the directory
+        """
+        if stem not in self._frames:
+            self._frames[stem] = self._parse(stem)
+        df = self._frames[stem]
+        if df is None:
+            raise FileNotFoundError(f"{stem}{self.suffix} not found in {self.root_dir}")
+        return df.copy()
+
+
+def _pandas_categorical(series: pl.Series) -> pd.Categorical:
+    # only the labels of the distinct codes are converted, and the codes of the column mapped
+    # onto them, with the categories sorted as pandas infers them
+    present = series.drop_nulls()
+    _, first, inverse = np.unique(
+        present.to_physical().to_numpy(), return_index=True, return_inverse=True
+    )
+    labels = present.gather(first).cast(pl.String).to_numpy()
+    order = np.argsort(labels)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    codes = np.full(len(series), -1)
+    codes[series.is_not_null().to_numpy()] = rank[inverse]
+    return pd.Categorical.from_codes(codes, categories=labels[order])
+
+
+def polars_to_pandas(table: pl.DataFrame) -> pd.DataFrame:
+    """
+    Convert a polars table to a pandas dataframe column by column, so that no pyarrow is needed.
+
+    Categorical columns are returned as pandas categoricals, built from their codes and distinct
+    labels, and string columns as object columns.
+    """
+    columns = {}
+    for name, series in table.to_dict().items():
+        if series.dtype == pl.Categorical:
+            columns[name] = _pandas_categorical(series)
+        elif series.dtype == pl.String:
+            columns[name] = series.to_numpy()
+        else:
+            columns[name] = series.to_numpy()
+    return pd.DataFrame(columns, columns=table.columns)
+
+
+class OtooleParquetReader(OtooleReader):
+    """
+    Reads a directory of parquet tables written by `RunSpec.to_parquet`, one table per otoole stem.
+
+    Tables have the same columns as the otoole csvs and are stored with the dtype schema given by
+    `otoole_dtypes`, so they are returned as they would be read from the equivalent csvs.
+
+    Args:
+        root_dir (str): Path to the directory of parquet tables
+        memory_map_size (int | None): tables of at least this many bytes are memory-mapped rather
+            than read into a buffer. Defaults to None, for no memory-mapping.
+        max_workers (int | None): Maximum number of threads used by `prefetch`
+    """
+
+    suffix = ".parquet"
+
+    def _read_file(self, path: Path, stem: str, memory_map: bool) -> pd.DataFrame:
+        return polars_to_pandas(pl.read_parquet(path, memory_map=memory_map))
@@ -1,5 +1,3 @@
-import os
-from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, Dict, List, Union
 
 import pandas as pd
@@ -7,7 +5,9 @@ from pydantic import BaseModel, Field
 
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.region import Region, RegionGroup
@@ -24,11 +24,13 @@ class OtooleRegion(BaseModel):
     """
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> List["Region"]:
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> List["Region"]:
         """Instantiate a number of Region objects from otoole-organised csvs.
 
         Args:
             root_dir (str): Path to the root of the otoole csv directory
+            reader (OtooleReader, optional): A reader shared between components, so that each csv
+                is only parsed once
 
         Returns:
             List[Region] (list): A list of Region instances,
@@ -39,10 +41,12 @@ class OtooleRegion(BaseModel):
         # Load Data #
         #############
 
+        reader = reader or OtooleReader(root_dir)
+
         # Sets
-        src_regions = pd.read_csv(os.path.join(root_dir, "REGION.csv"))
+        src_regions = reader.read("REGION")
         try:
-            dst_regions = pd.read_csv(os.path.join(root_dir, "_REGION.csv"))
+            dst_regions = reader.read("_REGION")
         except FileNotFoundError:
             dst_regions = None
 
@@ -79,6 +83,20 @@ class OtooleRegion(BaseModel):
 
         return dfs
 
+    @classmethod
+    def to_otoole_csv_dataframes(cls, regions: List["Region"]) -> Dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Region objects which are written to csv.
+
+        Args:
+            regions (List[Region]): A list of Region instances
+
+        Returns:
+            Dict[str, pd.DataFrame]: A dictionary of dataframes
+        """
+
+        # Sets
+        return cls.to_dataframes(regions)
+
     @classmethod
     def to_otoole_csv(cls, regions: List["Region"], output_directory: str):
         """Write a number of Region objects to otoole-organised csvs.
@@ -88,11 +106,7 @@ class OtooleRegion(BaseModel):
             output_directory (str): Path to the root of the otoole csv directory
         """
 
-        dfs = cls.to_dataframes(regions)
-
-        # Sets
-        dfs["REGION"].to_csv(os.path.join(output_directory, "REGION.csv"), index=False)
-        dfs["_REGION"].to_csv(os.path.join(output_directory, "_REGION.csv"), index=False)
+        write_csvs(cls.to_otoole_csv_dataframes(regions), output_directory)
 
         return True
 
@@ -111,14 +125,15 @@ class OtooleRegionGroup(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> List["RegionGroup"]:
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> List["RegionGroup"]:
+        reader = reader or OtooleReader(root_dir)
 
         dfs = {}
 
         otoole_cfg = OtooleCfg(empty_dfs=[], non_default_idx={})
         for key, params in list(cls.otoole_stems.items()):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
                 else:
@@ -129,7 +144,7 @@ class OtooleRegionGroup(BaseModel):
                 otoole_cfg.empty_dfs.append(key)
 
         try:
-            df_regionsgroup = pd.read_csv(os.path.join(root_dir, "REGIONGROUP.csv"))
+            df_regionsgroup = reader.read("REGIONGROUP")
         except FileNotFoundError:
             for key in cls.otoole_stems:
                 if key not in otoole_cfg.empty_dfs:
@@ -148,22 +163,28 @@ class OtooleRegionGroup(BaseModel):
 
         # Check REGIONGROUP.csv names are consistent with those in RegionGroupTagRegion.csv
         for df in dfs.keys():
-            for region_group in dfs[df]["REGIONGROUP"].unique():
-                if region_group not in list(df_regionsgroup["VALUE"]):
-                    raise ValueError(f"{region_group} given in {df}.csv but not in REGIONGROUP.csv")
+            unknown = dfs[df].loc[
+                ~dfs[df]["REGIONGROUP"].isin(df_regionsgroup["VALUE"]), "REGIONGROUP"
+            ]
+            if not unknown.empty:
+                raise ValueError(f"{unknown.iloc[0]} given in {df}.csv but not in REGIONGROUP.csv")
+
+        # group each csv by region group in a single pass
+        grouped = {
+            key: group_to_json_by_root(
+                dfs[key],
+                root_column="REGIONGROUP",
+                data_columns=[c for c in params["columns"] if c not in ["REGIONGROUP", "VALUE"]],
+            )
+            for key, params in cls.otoole_stems.items()
+            if key in dfs
+        }
 
         region_group_instances = []
 
         for region_group in df_regionsgroup["VALUE"].values.tolist():
             include_in_region_group = OSeMOSYSData.RY.Bool(
-                group_to_json(
-                    g=dfs["RegionGroupTagRegion"].loc[
-                        dfs["RegionGroupTagRegion"]["REGIONGROUP"] == region_group
-                    ],
-                    root_column="REGIONGROUP",
-                    data_columns=["REGION", "YEAR"],
-                    target_column="VALUE",
-                )
+                grouped["RegionGroupTagRegion"].get(region_group, {})
             )
 
             region_group_instances.append(
@@ -186,28 +207,51 @@ class OtooleRegionGroup(BaseModel):
             {"VALUE": [region_group.id for region_group in regionsgroup]}
         )
 
-        include_in_region_group_dfs = []
-
+        frames = StemFrames(cls.otoole_stems)
         for regions in regionsgroup:
-
             if regions.include_in_region_group is not None:
-                df = pd.json_normalize(regions.include_in_region_group.data).T.rename(
-                    columns={0: "VALUE"}
+                frames.add(
+                    "RegionGroupTagRegion",
+                    regions.include_in_region_group,
+                    ["REGION", "YEAR"],
+                    REGIONGROUP=regions.id,
                 )
-            df["REGIONGROUP"] = regions.id
-            df[["REGION", "YEAR"]] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
-            df["VALUE"] = df["VALUE"].map({True: 1, False: 0})
 
-            include_in_region_group_dfs.append(df)
-
-        dfs["RegionGroupTagRegion"] = (
-            pd.concat(include_in_region_group_dfs).drop_duplicates()
-            if include_in_region_group_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["RegionGroupTagRegion"]["columns"])
-        )
+        df = frames.to_dataframe("RegionGroupTagRegion")
+        df["VALUE"] = df["VALUE"].map({True: 1, False: 0})
+        dfs["RegionGroupTagRegion"] = df.drop_duplicates()
 
         return dfs
 
+    @classmethod
+    def to_otoole_csv_dataframes(cls, regionsgroup: List["RegionGroup"]) -> Dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of RegionGroup objects which are written to
+        csv.
+
+        Args:
+            regionsgroup (List[RegionGroup]): A list of RegionGroup instances
+
+        Returns:
+            Dict[str, pd.DataFrame]: A dictionary of dataframes
+        """
+
+        dfs = cls.to_dataframes(regionsgroup=regionsgroup)
+
+        # set, and params where appropriate
+        return {
+            "REGIONGROUP": dfs["REGIONGROUP"],
+            **{
+                stem: dfs[stem]
+                for stem in cls.otoole_stems
+                if any(
+                    [
+                        (stem not in region_group.otoole_cfg.empty_dfs)
+                        for region_group in regionsgroup
+                    ]
+                )
+            },
+        }
+
     @classmethod
     def to_otoole_csv(cls, regionsgroup: List["RegionGroup"], output_directory: str):
         """Write a number of Region objects to otoole-organised csvs.
@@ -217,15 +261,6 @@ class OtooleRegionGroup(BaseModel):
             output_directory (str): Path to the root of the otoole csv directory
         """
 
-        dfs = cls.to_dataframes(regionsgroup=regionsgroup)
-
-        # Sets
-        dfs["REGIONGROUP"].to_csv(os.path.join(output_directory, "REGIONGROUP.csv"), index=False)
-
-        for stem, _params in cls.otoole_stems.items():
-            if any(
-                [(stem not in region_group.otoole_cfg.empty_dfs) for region_group in regionsgroup]
-            ):
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+        write_csvs(cls.to_otoole_csv_dataframes(regionsgroup), output_directory)
 
         return True
@@ -1,5 +1,3 @@
-import os
-from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, List, Union
 
 import pandas as pd
@@ -8,7 +6,9 @@ from pydantic import BaseModel, Field
 from tz.osemosys.defaults import defaults
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.storage import Storage
@@ -68,18 +68,20 @@ class OtooleStorage(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> List["Storage"]:
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> List["Storage"]:
         #############
         # Load Data #
         #############
 
-        df_storage_technologies = pd.read_csv(os.path.join(root_dir, "STORAGE.csv"))
+        reader = reader or OtooleReader(root_dir)
+
+        df_storage_technologies = reader.read("STORAGE")
 
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
@@ -95,33 +97,33 @@ class OtooleStorage(BaseModel):
 
         # Check storage technology names are consistent with those in STORAGE.csv
         for df in dfs.keys():
-            for storage in dfs[df]["STORAGE"].unique():
-                if storage not in list(df_storage_technologies["VALUE"]):
-                    raise ValueError(f"{storage} given in {df}.csv but not in STORAGE.csv")
+            unknown = dfs[df].loc[
+                ~dfs[df]["STORAGE"].isin(df_storage_technologies["VALUE"]), "STORAGE"
+            ]
+            if not unknown.empty:
+                raise ValueError(f"{unknown.iloc[0]} given in {df}.csv but not in STORAGE.csv")
 
         ##########################
         # Define class instances #
         ##########################
 
+        # group each csv by storage in a single pass
+        grouped = {
+            stem: group_to_json_by_root(
+                df,
+                root_column="STORAGE",
+                data_columns=[c for c in df.columns if c not in ["STORAGE", "VALUE"]],
+            )
+            for stem, df in dfs.items()
+        }
+
         storage_instances = []
         for storage in df_storage_technologies["VALUE"].values.tolist():
             data_json_format = {}
             for stem in list(cls.otoole_stems):
-                # If input CSV present
-                if stem in dfs:
-                    data_columns = dfs[stem].columns.tolist()
-                    data_columns.remove("STORAGE")
-                    data_columns.remove("VALUE")
-                    data_json_format[stem] = (
-                        group_to_json(
-                            g=dfs[stem].loc[dfs[stem]["STORAGE"] == storage],
-                            root_column="STORAGE",
-                            data_columns=data_columns,
-                            target_column="VALUE",
-                        )
-                        if storage in dfs[stem]["STORAGE"].values
-                        else None
-                    )
+                # If input CSV present and has data for this storage
+                if stem in grouped:
+                    data_json_format[stem] = grouped[stem].get(storage)
                 # If input CSV missing
                 else:
                     data_json_format[stem] = None
@@ -195,114 +197,48 @@ class OtooleStorage(BaseModel):
             dict[str, pd.DataFrame]: A dictionary of dataframes
         """
 
-        # collect parameter dataframes
-        capex_dfs = []
-        operating_life_dfs = []
-        minimum_charge_dfs = []
-        initial_level_dfs = []
-        residual_capacity_dfs = []
-        max_discharge_rate_dfs = []
-        max_charge_rate_dfs = []
-        max_hours_dfs = []
-        storage_balance_day_dfs = []
-        storage_balance_season_dfs = []
-        storage_balance_year_dfs = []
-
+        # collect parameter data
+        frames = StemFrames(cls.otoole_stems)
         for sto in storage:
-            if sto.capex is not None:
-                df = pd.json_normalize(sto.capex.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                capex_dfs.append(df)
-            if sto.operating_life is not None:
-                df = pd.json_normalize(sto.operating_life.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = df.index
-                operating_life_dfs.append(df)
-            if sto.minimum_charge is not None:
-                df = pd.json_normalize(sto.minimum_charge.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                minimum_charge_dfs.append(df)
-            if sto.initial_level is not None:
-                df = pd.json_normalize(sto.initial_level.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = df.index
-                initial_level_dfs.append(df)
-            if sto.residual_capacity is not None:
-                df = pd.json_normalize(sto.residual_capacity.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df[["REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                residual_capacity_dfs.append(df)
-            if sto.max_discharge_rate is not None:
-                df = pd.json_normalize(sto.max_discharge_rate.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = df.index
-                max_discharge_rate_dfs.append(df)
-            if sto.max_charge_rate is not None:
-                df = pd.json_normalize(sto.max_charge_rate.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = df.index
-                max_charge_rate_dfs.append(df)
-            if sto.max_hours is not None:
-                df = pd.json_normalize(sto.max_hours.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = df.index
-                max_hours_dfs.append(df)
-            if sto.storage_balance_day is not None:
-                df = pd.json_normalize(sto.storage_balance_day.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
-                storage_balance_day_dfs.append(df)
-            if sto.storage_balance_season is not None:
-                df = pd.json_normalize(sto.storage_balance_season.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df["STORAGE"] = sto.id
-                df["REGION"] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
-                storage_balance_season_dfs.append(df)
-            if sto.storage_balance_year is not None:
-                df = pd.json_normalize(sto.storage_balance_year.data).T.rename(columns={0: "VALUE"})
-                df["STORAGE"] = sto.id
-                df["REGION"] = pd.DataFrame(df.index.str.split(".").to_list(), index=df.index)
-                storage_balance_year_dfs.append(df)
-
-        # collect concatenaed dfs
-        dfs = {}
-        if capex_dfs:
-            dfs["CapitalCostStorage"] = pd.concat(capex_dfs)
-        if operating_life_dfs:
-            dfs["OperationalLifeStorage"] = pd.concat(operating_life_dfs)
-        if minimum_charge_dfs:
-            dfs["MinStorageCharge"] = pd.concat(minimum_charge_dfs)
-        if initial_level_dfs:
-            dfs["StorageLevelStart"] = pd.concat(initial_level_dfs)
-        if residual_capacity_dfs:
-            dfs["ResidualStorageCapacity"] = pd.concat(residual_capacity_dfs)
-        if max_discharge_rate_dfs:
-            dfs["StorageMaxDischargeRate"] = pd.concat(max_discharge_rate_dfs)
-        if max_charge_rate_dfs:
-            dfs["StorageMaxChargeRate"] = pd.concat(max_charge_rate_dfs)
-        if max_hours_dfs:
-            dfs["StorageMaxHours"] = pd.concat(max_hours_dfs)
-        if storage_balance_day_dfs:
-            dfs["StorageBalanceDay"] = pd.concat(storage_balance_day_dfs)
-        if storage_balance_season_dfs:
-            dfs["StorageBalanceSeason"] = pd.concat(storage_balance_season_dfs)
-        if storage_balance_year_dfs:
-            dfs["StorageBalanceYear"] = pd.concat(storage_balance_year_dfs)
+            for stem, params in cls.otoole_stems.items():
+                if getattr(sto, params["attribute"]) is not None:
+                    frames.add(
+                        stem,
+                        getattr(sto, params["attribute"]),
+                        [c for c in params["columns"] if c not in ["STORAGE", "VALUE"]],
+                        STORAGE=sto.id,
+                    )
+
+        dfs = frames.to_dataframes()
 
         # SETS
         dfs["STORAGE"] = pd.DataFrame({"VALUE": [sto.id for sto in storage]})
 
         return dfs
 
+    @classmethod
+    def to_otoole_csv_dataframes(cls, storage: List["Storage"]) -> dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Storage objects which are written to csv.
+
+        Args:
+            storage (List[Storage]): A list of Storage instances
+
+        Returns:
+            dict[str, pd.DataFrame]: A dictionary of dataframes
+        """
+
+        dfs = cls.to_dataframes(storage)
+
+        # set, and params where appropriate
+        return {
+            "STORAGE": dfs["STORAGE"],
+            **{
+                stem: dfs[stem]
+                for stem in cls.otoole_stems
+                if any([(stem not in sto.otoole_cfg.empty_dfs) for sto in storage])
+            },
+        }
+
     @classmethod
     def to_otoole_csv(cls, storage: List["Storage"], output_directory: str):
         """Write a number of Storage objects to otoole-organised csvs.
@@ -312,14 +248,6 @@ class OtooleStorage(BaseModel):
             output_directory (str): Path to the root of the otoole csv directory
         """
 
-        dfs = cls.to_dataframes(storage)
-
-        # set to csv
-        dfs["STORAGE"].to_csv(os.path.join(output_directory, "STORAGE.csv"), index=False)
-
-        # params to csv where appropriate
-        for stem, _params in cls.otoole_stems.items():
-            if any([(stem not in sto.otoole_cfg.empty_dfs) for sto in storage]):
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+        write_csvs(cls.to_otoole_csv_dataframes(storage), output_directory)
 
         return True
@@ -1,4 +1,3 @@
-import os
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, Dict, List, Union
 
@@ -9,7 +8,9 @@ from tz.osemosys.defaults import defaults
 from tz.osemosys.logger import logging
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import flatten, group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import flatten, group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.technology import Technology
@@ -182,18 +183,20 @@ class OtooleTechnology(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> List["Technology"]:
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> List["Technology"]:
         #############
         # Load Data #
         #############
 
-        df_technologies = pd.read_csv(os.path.join(root_dir, "TECHNOLOGY.csv"))
+        reader = reader or OtooleReader(root_dir)
+
+        df_technologies = reader.read("TECHNOLOGY")
 
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[], non_default_idx={})
         for key, params in list(cls.otoole_stems.items()):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
                 else:
@@ -213,33 +216,34 @@ class OtooleTechnology(BaseModel):
 
         # Check technology names are consistent with those in TECHNOLOGY.csv
         for df in dfs.keys():
-            for technology in dfs[df]["TECHNOLOGY"].unique():
-                if technology not in list(df_technologies["VALUE"]):
-                    raise ValueError(f"{technology} given in {df}.csv but not in TECHNOLOGY.csv")
+            unknown = dfs[df].loc[
+                ~dfs[df]["TECHNOLOGY"].isin(df_technologies["VALUE"]), "TECHNOLOGY"
+            ]
+            if not unknown.empty:
+                raise ValueError(f"{unknown.iloc[0]} given in {df}.csv but not in TECHNOLOGY.csv")
 
         ##########################
         # Define class instances #
         ##########################
 
+        # group each csv by technology in a single pass
+        grouped = {
+            stem: group_to_json_by_root(
+                dfs[stem],
+                root_column="TECHNOLOGY",
+                data_columns=[c for c in params["columns"] if c not in ["TECHNOLOGY", "VALUE"]],
+            )
+            for stem, params in cls.otoole_stems.items()
+            if stem in dfs
+        }
+
         technology_instances = []
         for technology in df_technologies["VALUE"].values.tolist():
             data_json_format = {}
-            for stem, params in cls.otoole_stems.items():
-                # If input CSV present
-                if stem in dfs:
-                    data_columns = [
-                        c for c in params["columns"] if c not in ["TECHNOLOGY", "VALUE"]
-                    ]
-                    data_json_format[stem] = (
-                        group_to_json(
-                            g=dfs[stem].loc[dfs[stem]["TECHNOLOGY"] == technology],
-                            root_column="TECHNOLOGY",
-                            data_columns=data_columns,
-                            target_column="VALUE",
-                        )
-                        if technology in dfs[stem]["TECHNOLOGY"].values
-                        else None
-                    )
+            for stem in cls.otoole_stems:
+                # If input CSV present and has data for this technology
+                if stem in grouped:
+                    data_json_format[stem] = grouped[stem].get(technology)
                 # If input CSV missing
                 else:
                     data_json_format[stem] = None
@@ -404,6 +408,7 @@ class OtooleTechnology(BaseModel):
         )
 
         # Parameters
+        frames = StemFrames(cls.otoole_stems)
         for technology in technologies:
             omitted_fields = []
             for stem, params in cls.otoole_stems.items():
@@ -413,17 +418,12 @@ class OtooleTechnology(BaseModel):
                             columns = [
                                 c for c in params["columns"] if c not in ["TECHNOLOGY", "VALUE"]
                             ]
-                            df = pd.json_normalize(
-                                getattr(technology, params["attribute"]).data
-                            ).T.rename(columns={0: "VALUE"})
-                            df["TECHNOLOGY"] = technology.id
-                            df[columns] = pd.DataFrame(
-                                df.index.str.split(".").to_list(), index=df.index
+                            frames.add(
+                                stem,
+                                getattr(technology, params["attribute"]),
+                                columns,
+                                TECHNOLOGY=technology.id,
                             )
-                            if stem in dfs:
-                                dfs[stem].append(df)
-                            else:
-                                dfs[stem] = [df]
                         else:
                             # do something else or nothing with non-composed data
                             omitted_fields.append(stem)
@@ -435,23 +435,18 @@ class OtooleTechnology(BaseModel):
                 for mode in technology.operating_modes:
                     if getattr(mode, attribute) is not None:
                         if getattr(mode, attribute).is_composed:
-                            df = pd.json_normalize(getattr(mode, attribute).data).T.rename(
-                                columns={0: "VALUE"}
-                            )
-                            df["TECHNOLOGY"] = technology.id
-                            df["MODE_OF_OPERATION"] = mode.id
                             columns = [
                                 c
                                 for c in cls.otoole_stems[stem]["columns"]
                                 if c not in ["TECHNOLOGY", "VALUE", "MODE_OF_OPERATION"]
                             ]
-                            df[columns] = pd.DataFrame(
-                                df.index.str.split(".").to_list(), index=df.index
+                            frames.add(
+                                stem,
+                                getattr(mode, attribute),
+                                columns,
+                                TECHNOLOGY=technology.id,
+                                MODE_OF_OPERATION=mode.id,
                             )
-                            if stem in dfs:
-                                dfs[stem].append(df)
-                            else:
-                                dfs[stem] = [df]
                         else:
                             omitted_fields.append(stem)
 
@@ -460,28 +455,27 @@ class OtooleTechnology(BaseModel):
                     f"{technology.id}: Data for {omitted_fields} not composed - omitting."
                 )
 
-        for stem in cls.operating_mode_stem_translation.keys():
-            if stem in dfs:
-                dfs[stem] = pd.concat(dfs[stem])
-
-        for stem in cls.otoole_stems.keys():
-            if stem not in cls.operating_mode_stem_translation.keys():
-                if stem in dfs:
-                    dfs[stem] = pd.concat(dfs[stem])
+        dfs.update(frames.to_dataframes())
 
         return dfs
 
     @classmethod
-    def to_otoole_csv(cls, technologies: List["Technology"], output_directory: Union[str, Path]):
+    def to_otoole_csv_dataframes(cls, technologies: List["Technology"]) -> Dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Technology objects which are written to
+        csv.
+
+        Args:
+            technologies (List[Technology]): A list of Technology instances
+
+        Returns:
+            Dict[str, pd.DataFrame]: A dictionary of dataframes
+        """
         dfs = cls.to_dataframes(technologies)
 
         # Sets
-        dfs["TECHNOLOGY"].to_csv(os.path.join(output_directory, "TECHNOLOGY.csv"), index=False)
-        dfs["MODE_OF_OPERATION"].to_csv(
-            os.path.join(output_directory, "MODE_OF_OPERATION.csv"), index=False
-        )
+        csv_dfs = {"TECHNOLOGY": dfs["TECHNOLOGY"], "MODE_OF_OPERATION": dfs["MODE_OF_OPERATION"]}
 
-        # write dataframes
+        # Parameters
         for stem, params in cls.otoole_stems.items():
             if (
                 any([(stem not in technology.otoole_cfg.empty_dfs) for technology in technologies])
@@ -491,12 +485,17 @@ class OtooleTechnology(BaseModel):
                 for col in ["YEAR", "MODE_OF_OPERATION"]:
                     if col in dfs[stem].columns:
                         dfs[stem][col] = dfs[stem][col].astype(int)
-                (
+                csv_dfs[stem] = (
                     dfs[stem]
                     .set_index([c for c in params["columns"] if c != "VALUE"])
                     .loc[technologies[0].otoole_cfg.non_default_idx[stem]]
                     .reset_index()
-                    .to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
                 )
 
+        return csv_dfs
+
+    @classmethod
+    def to_otoole_csv(cls, technologies: List["Technology"], output_directory: Union[str, Path]):
+        write_csvs(cls.to_otoole_csv_dataframes(technologies), output_directory)
+
         return True
@@ -6,6 +6,8 @@ import pandas as pd
 from pydantic import BaseModel, Field
 
 from tz.osemosys.schemas.compat.base import OtooleCfg
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import write_csvs
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.time_definition import TimeDefinition
@@ -50,7 +52,7 @@ class OtooleTimeDefinition(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> "TimeDefinition":
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> "TimeDefinition":
         """
         Instantiate a single TimeDefinition object containing all relevant data from
         otoole-organised csvs.
@@ -59,6 +61,8 @@ class OtooleTimeDefinition(BaseModel):
         ----------
         root_dir: str
             Path to the root of the otoole csv directory
+        reader: OtooleReader, optional
+            A reader shared between components, so that each csv is only parsed once
 
         Returns
         -------
@@ -69,11 +73,12 @@ class OtooleTimeDefinition(BaseModel):
         # ###########
         # Load Data #
         # ###########
+        reader = reader or OtooleReader(root_dir)
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
@@ -310,7 +315,12 @@ class OtooleTimeDefinition(BaseModel):
 
         return dfs
 
+    def to_otoole_csv_dataframes(self):
+        return {
+            stem: self._to_dataframe(stem)
+            for stem in self.otoole_stems
+            if stem not in self.otoole_cfg.empty_dfs
+        }
+
     def to_otoole_csv(self, output_directory):
-        for stem, _params in self.otoole_stems.items():
-            if stem not in self.otoole_cfg.empty_dfs:
-                self._to_dataframe(stem).to_csv(Path(output_directory) / f"{stem}.csv", index=False)
+        write_csvs(self.to_otoole_csv_dataframes(), output_directory)
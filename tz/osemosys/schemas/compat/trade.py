@@ -1,5 +1,3 @@
-import os
-from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, List, Union
 
 import pandas as pd
@@ -8,7 +6,9 @@ from pydantic import BaseModel, Field
 from tz.osemosys.defaults import defaults
 from tz.osemosys.schemas.base import OSeMOSYSData
 from tz.osemosys.schemas.compat.base import OtooleCfg
-from tz.osemosys.utils import group_to_json
+from tz.osemosys.schemas.compat.reader import OtooleReader
+from tz.osemosys.schemas.compat.writer import StemFrames, write_csvs
+from tz.osemosys.utils import group_to_json_by_root
 
 if TYPE_CHECKING:
     from tz.osemosys.schemas.trade import Trade
@@ -72,7 +72,7 @@ class OtooleTrade(BaseModel):
     }
 
     @classmethod
-    def from_otoole_csv(cls, root_dir) -> "Trade":
+    def from_otoole_csv(cls, root_dir, reader: OtooleReader | None = None) -> "Trade":
         """
         Instantiate a single Trade object containing all relevant data from
         otoole-organised csvs.
@@ -81,6 +81,8 @@ class OtooleTrade(BaseModel):
         ----------
         root_dir: str
             Path to the root of the otoole csv directory
+        reader: OtooleReader, optional
+            A reader shared between components, so that each csv is only parsed once
 
         Returns
         -------
@@ -91,11 +93,12 @@ class OtooleTrade(BaseModel):
         # ###########
         # Load Data #
         # ###########
+        reader = reader or OtooleReader(root_dir)
         dfs = {}
         otoole_cfg = OtooleCfg(empty_dfs=[])
         for key in list(cls.otoole_stems):
             try:
-                dfs[key] = pd.read_csv(Path(root_dir) / f"{key}.csv")
+                dfs[key] = reader.read(key)
                 if dfs[key].empty:
                     otoole_cfg.empty_dfs.append(key)
             except FileNotFoundError:
@@ -112,162 +115,89 @@ class OtooleTrade(BaseModel):
         if "TradeRoute" in otoole_cfg.empty_dfs:
             trade_instances = None
         else:
+            # group each csv by commodity in a single pass
+            grouped = {
+                key: group_to_json_by_root(
+                    dfs[key],
+                    root_column="FUEL",
+                    data_columns=[
+                        "LINKED_REGION" if c == "_REGION" else c
+                        for c in params["columns"]
+                        if c not in ["FUEL", "VALUE"]
+                    ],
+                )
+                for key, params in cls.otoole_stems.items()
+                if key not in otoole_cfg.empty_dfs
+            }
+
             trade_instances = []
-            for commodity in dfs["TradeRoute"]["FUEL"].values.tolist():
+            for commodity in dfs["TradeRoute"]["FUEL"].unique().tolist():
 
                 id = commodity + " trade"
                 commodity = commodity
                 trade_routes = (
-                    OSeMOSYSData.RRY.Bool(
-                        group_to_json(
-                            g=dfs["TradeRoute"].loc[dfs["TradeRoute"]["FUEL"] == commodity],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY.Bool(grouped["TradeRoute"].get(commodity, {}))
                     if "TradeRoute" not in otoole_cfg.empty_dfs
                     else None
                 )
                 trade_loss = (
-                    OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["TradeLossBetweenRegions"].loc[
-                                dfs["TradeLossBetweenRegions"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY(grouped["TradeLossBetweenRegions"].get(commodity, {}))
                     if "TradeLossBetweenRegions" not in otoole_cfg.empty_dfs
                     else OSeMOSYSData.RRY(defaults.trade_loss)
                 )
                 residual_capacity = (
-                    OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["ResidualTradeCapacity"].loc[
-                                dfs["ResidualTradeCapacity"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY(grouped["ResidualTradeCapacity"].get(commodity, {}))
                     if "ResidualTradeCapacity" not in otoole_cfg.empty_dfs
                     else OSeMOSYSData.RRY(defaults.trade_residual_capacity)
                 )
                 capex = (
-                    OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["CapitalCostTrade"].loc[
-                                dfs["CapitalCostTrade"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY(grouped["CapitalCostTrade"].get(commodity, {}))
                     if "CapitalCostTrade" not in otoole_cfg.empty_dfs
                     else OSeMOSYSData.RRY(defaults.trade_capex)
                 )
                 capacity_additional_max = (
-                    OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["TotalAnnualMaxTradeInvestment"].loc[
-                                dfs["TotalAnnualMaxTradeInvestment"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY(grouped["TotalAnnualMaxTradeInvestment"].get(commodity, {}))
                     if "TotalAnnualMaxTradeInvestment" not in otoole_cfg.empty_dfs
                     else None
                 )
                 operating_life = (
-                    OSeMOSYSData.RRY.Int(
-                        group_to_json(
-                            g=dfs["OperationalLifeTrade"].loc[
-                                dfs["OperationalLifeTrade"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY.Int(grouped["OperationalLifeTrade"].get(commodity, {}))
                     if "OperationalLifeTrade" not in otoole_cfg.empty_dfs
                     else OSeMOSYSData.RRY.Int(defaults.trade_operating_life)
                 )
                 cost_of_capital = (
-                    OSeMOSYSData.RR(
-                        group_to_json(
-                            g=dfs["DiscountRateTrade"].loc[
-                                dfs["DiscountRateTrade"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RR(grouped["DiscountRateTrade"].get(commodity, {}))
                     if "DiscountRateTrade" not in otoole_cfg.empty_dfs
                     else None
                 )
                 otoole_cfg = otoole_cfg
                 capacity_activity_unit_ratio = (
-                    OSeMOSYSData.RR(
-                        group_to_json(
-                            g=dfs["TradeCapacityToActivityUnit"].loc[
-                                dfs["TradeCapacityToActivityUnit"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RR(grouped["TradeCapacityToActivityUnit"].get(commodity, {}))
                     if "TradeCapacityToActivityUnit" not in otoole_cfg.empty_dfs
                     else OSeMOSYSData.RR(defaults.trade_capacity_activity_unit_ratio)
                 )
                 activity_annual_max = (
                     OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["TotalTradeAnnualActivityUpperLimit"].loc[
-                                dfs["TotalTradeAnnualActivityUpperLimit"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
+                        grouped["TotalTradeAnnualActivityUpperLimit"].get(commodity, {})
                     )
                     if "TotalTradeAnnualActivityUpperLimit" not in otoole_cfg.empty_dfs
                     else None
                 )
                 activity_annual_min = (
                     OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["TotalTradeAnnualActivityLowerLimit"].loc[
-                                dfs["TotalTradeAnnualActivityLowerLimit"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
+                        grouped["TotalTradeAnnualActivityLowerLimit"].get(commodity, {})
                     )
                     if "TotalTradeAnnualActivityLowerLimit" not in otoole_cfg.empty_dfs
                     else None
                 )
                 availability_factor = (
-                    OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["AvailabilityFactorTrade"].loc[
-                                dfs["AvailabilityFactorTrade"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
-                    )
+                    OSeMOSYSData.RRY(grouped["AvailabilityFactorTrade"].get(commodity, {}))
                     if "AvailabilityFactorTrade" not in otoole_cfg.empty_dfs
                     else None
                 )
                 capacity_factor_annual_min = (
                     OSeMOSYSData.RRY(
-                        group_to_json(
-                            g=dfs["TotalAnnualMinCapacityFactorTrade"].loc[
-                                dfs["TotalAnnualMinCapacityFactorTrade"]["FUEL"] == commodity
-                            ],
-                            data_columns=["REGION", "LINKED_REGION", "YEAR"],
-                            target_column="VALUE",
-                        )
+                        grouped["TotalAnnualMinCapacityFactorTrade"].get(commodity, {})
                     )
                     if "TotalAnnualMinCapacityFactorTrade" not in otoole_cfg.empty_dfs
                     else None
@@ -298,187 +228,27 @@ class OtooleTrade(BaseModel):
     @classmethod
     def to_dataframes(cls, trade: List["Trade"]):
 
-        dfs = {}
-
-        trade_routes_dfs = []
-        trade_loss_dfs = []
-        residual_capacity_dfs = []
-        capex_dfs = []
-        capacity_additional_max_dfs = []
-        operating_life_dfs = []
-        cost_of_capital_dfs = []
-        capacity_activity_unit_ratio_dfs = []
-        activity_annual_max_dfs = []
-        activity_annual_min_dfs = []
-        availability_factor_dfs = []
-        capacity_factor_annual_min_dfs = []
-
+        frames = StemFrames(cls.otoole_stems)
         for trade_commodity in trade:
-
-            if trade_commodity.trade_routes is not None:
-                df = pd.json_normalize(trade_commodity.trade_routes.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                df["VALUE"] = df["VALUE"].map({True: 1, False: 0})
-                trade_routes_dfs.append(df)
-
-            if trade_commodity.trade_loss is not None:
-                df = pd.json_normalize(trade_commodity.trade_loss.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                trade_loss_dfs.append(df)
-
-            if trade_commodity.capacity_additional_max is not None:
-                df = pd.json_normalize(trade_commodity.capacity_additional_max.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                capacity_additional_max_dfs.append(df)
-
-            if trade_commodity.residual_capacity is not None:
-                df = pd.json_normalize(trade_commodity.residual_capacity.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                residual_capacity_dfs.append(df)
-
-            if trade_commodity.operating_life is not None:
-                df = pd.json_normalize(trade_commodity.operating_life.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                operating_life_dfs.append(df)
-
-            if trade_commodity.capex is not None:
-                df = pd.json_normalize(trade_commodity.capex.data).T.rename(columns={0: "VALUE"})
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                capex_dfs.append(df)
-
-            if trade_commodity.cost_of_capital is not None:
-                df = pd.json_normalize(trade_commodity.cost_of_capital.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                cost_of_capital_dfs.append(df)
-
-            if trade_commodity.capacity_activity_unit_ratio is not None:
-                # Only create df if values are not default (incl. if values have been composed)
-                # test_otoole_trade only builds the Trade class, only a whole Model can be composed
-                if (
-                    trade_commodity.capacity_activity_unit_ratio.data
-                    != defaults.trade_capacity_activity_unit_ratio
-                ):
-                    df = pd.json_normalize(
-                        trade_commodity.capacity_activity_unit_ratio.data
-                    ).T.rename(columns={0: "VALUE"})
-                    df[["REGION", "_REGION"]] = pd.DataFrame(
-                        df.index.str.split(".").to_list(), index=df.index
-                    )
-                    df["FUEL"] = trade_commodity.commodity
-                    capacity_activity_unit_ratio_dfs.append(df)
-
-            if trade_commodity.activity_annual_max is not None:
-                df = pd.json_normalize(trade_commodity.activity_annual_max.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                activity_annual_max_dfs.append(df)
-            if trade_commodity.activity_annual_min is not None:
-                df = pd.json_normalize(trade_commodity.activity_annual_min.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                activity_annual_min_dfs.append(df)
-            if trade_commodity.availability_factor is not None:
-                df = pd.json_normalize(trade_commodity.availability_factor.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                availability_factor_dfs.append(df)
-            if trade_commodity.capacity_factor_annual_min is not None:
-                df = pd.json_normalize(trade_commodity.capacity_factor_annual_min.data).T.rename(
-                    columns={0: "VALUE"}
-                )
-                df[["REGION", "_REGION", "YEAR"]] = pd.DataFrame(
-                    df.index.str.split(".").to_list(), index=df.index
-                )
-                df["FUEL"] = trade_commodity.commodity
-                capacity_factor_annual_min_dfs.append(df)
-
-        dfs["TradeRoute"] = (
-            pd.concat(trade_routes_dfs)
-            if trade_routes_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["TradeRoute"]["columns"])
-        )
-        dfs["TradeLossBetweenRegions"] = (
-            pd.concat(trade_loss_dfs)
-            if trade_loss_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["TradeLossBetweenRegions"]["columns"])
-        )
-        dfs["TotalAnnualMaxTradeInvestment"] = (
-            pd.concat(capacity_additional_max_dfs)
-            if capacity_additional_max_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["TotalAnnualMaxTradeInvestment"]["columns"])
-        )
-        dfs["ResidualTradeCapacity"] = (
-            pd.concat(residual_capacity_dfs)
-            if residual_capacity_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["ResidualTradeCapacity"]["columns"])
-        )
-        dfs["OperationalLifeTrade"] = (
-            pd.concat(operating_life_dfs)
-            if operating_life_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["OperationalLifeTrade"]["columns"])
-        )
-        dfs["CapitalCostTrade"] = (
-            pd.concat(capex_dfs)
-            if capex_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["CapitalCostTrade"]["columns"])
-        )
-        dfs["DiscountRateTrade"] = (
-            pd.concat(cost_of_capital_dfs)
-            if cost_of_capital_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["DiscountRateTrade"]["columns"])
-        )
-        dfs["TradeCapacityToActivityUnit"] = (
-            pd.concat(capacity_activity_unit_ratio_dfs)
-            if capacity_activity_unit_ratio_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["TradeCapacityToActivityUnit"]["columns"])
-        )
+            for stem, params in cls.otoole_stems.items():
+                data = getattr(trade_commodity, params["attribute"])
+                if data is None:
+                    continue
+                if stem == "TradeCapacityToActivityUnit":
+                    # Only add data if values are not default (incl. if values have been composed)
+                    # test_otoole_trade only builds the Trade class, only a whole Model can be
+                    # composed
+                    if data.data == defaults.trade_capacity_activity_unit_ratio:
+                        continue
+                frames.add(
+                    stem,
+                    data,
+                    [c for c in params["columns"] if c not in ["FUEL", "VALUE"]],
+                    FUEL=trade_commodity.commodity,
+                )
+
+        dfs = {stem: frames.to_dataframe(stem) for stem in cls.otoole_stems}
+        dfs["TradeRoute"]["VALUE"] = dfs["TradeRoute"]["VALUE"].map({True: 1, False: 0})
         dfs["TradeRouteLookup"] = pd.DataFrame(
             [
                 (r, _r, t.commodity, t.id)
@@ -489,51 +259,40 @@ class OtooleTrade(BaseModel):
             ],
             columns=["REGION", "_REGION", "FUEL", "VALUE"],
         )
-        dfs["TotalTradeAnnualActivityUpperLimit"] = (
-            pd.concat(activity_annual_max_dfs)
-            if activity_annual_max_dfs
-            else pd.DataFrame(
-                columns=cls.otoole_stems["TotalTradeAnnualActivityUpperLimit"]["columns"]
-            )
-        )
-        dfs["TotalTradeAnnualActivityLowerLimit"] = (
-            pd.concat(activity_annual_min_dfs)
-            if activity_annual_min_dfs
-            else pd.DataFrame(
-                columns=cls.otoole_stems["TotalTradeAnnualActivityLowerLimit"]["columns"]
-            )
-        )
-        dfs["AvailabilityFactorTrade"] = (
-            pd.concat(availability_factor_dfs)
-            if availability_factor_dfs
-            else pd.DataFrame(columns=cls.otoole_stems["AvailabilityFactorTrade"]["columns"])
-        )
-        dfs["TotalAnnualMinCapacityFactorTrade"] = (
-            pd.concat(capacity_factor_annual_min_dfs)
-            if capacity_factor_annual_min_dfs
-            else pd.DataFrame(
-                columns=cls.otoole_stems["TotalAnnualMinCapacityFactorTrade"]["columns"]
-            )
-        )
 
         return dfs
 
     @classmethod
-    def to_otoole_csv(cls, trade: List["Trade"], output_directory: str):
-        """Write a number of Trade objects to otoole-organised csvs.
+    def to_otoole_csv_dataframes(cls, trade: List["Trade"]) -> dict[str, pd.DataFrame]:
+        """The otoole-organised dataframes of a number of Trade objects which are written to csv.
 
         Args:
             trade (List[Trade]): A list of Trade instances
-            output_directory (str): Path to the root of the otoole csv directory
+
+        Returns:
+            dict[str, pd.DataFrame]: A dictionary of dataframes
         """
 
         dfs = cls.to_dataframes(trade=trade)
 
-        # params to csv where appropriate
-        for stem, _params in cls.otoole_stems.items():
+        # params where appropriate
+        return {
+            stem: dfs[stem]
+            for stem in cls.otoole_stems
             if any(
                 [(stem not in trade_commodity.otoole_cfg.empty_dfs) for trade_commodity in trade]
-            ):
-                dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+            )
+        }
+
+    @classmethod
+    def to_otoole_csv(cls, trade: List["Trade"], output_directory: str):
+        """Write a number of Trade objects to otoole-organised csvs.
+
+        Args:
+            trade (List[Trade]): A list of Trade instances
+            output_directory (str): Path to the root of the otoole csv directory
+        """
+
+        write_csvs(cls.to_otoole_csv_dataframes(trade), output_directory)
 
         return True
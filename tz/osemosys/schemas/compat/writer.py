@@ -0,0 +1,215 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from tz.osemosys.schemas.base import OSeMOSYSData
+from tz.osemosys.schemas.compat.reader import otoole_dtypes
+from tz.osemosys.utils import ComposedData, flatten_nested
+
+
+def _concat_values(values: List[np.ndarray]) -> np.ndarray:
+    # promote as pd.concat would: numeric dtypes to a common numeric dtype, anything else mixed
+    # (e.g. bool with int) to object
+    kinds = {v.dtype.kind for v in values}
+    if len(kinds) > 1 and not kinds <= {"i", "u", "f"}:
+        values = [v.astype(object) for v in values]
+    return np.concatenate(values)
+
+
+class StemFrames:
+    """
+    Collects the long-format data of many instances as flat column arrays, so that the dataframe
+    of each otoole stem is built once rather than concatenated from a dataframe per instance.
+
+    Columns of the built dataframes are ordered as in `otoole_stems`.
+
+    Args:
+        otoole_stems (Dict[str, Dict]): The otoole stems of the class being exported, with the
+            'columns' of each stem
+    """
+
+    def __init__(self, otoole_stems: Dict[str, Dict[str, Any]]):
+        self.otoole_stems = otoole_stems
+        # per stem, a list of (n_rows, {column: array}) parts
+        self._parts = defaultdict(list)
+
+    def __contains__(self, stem: str) -> bool:
+        return stem in self._parts
+
+    def add(
+        self,
+        stem: str,
+        data: OSeMOSYSData,
+        columns: List[str],
+        subset: Optional[Dict[str, List[str]]] = None,
+        **constants: Any,
+    ):
+        """
+        Add the data of a single instance to a stem.
+
+        Args:
+            stem (str): The otoole stem
+            data (OSeMOSYSData): The (composed or uncomposed) data to add
+            columns (List[str]): Column names for each of the data dimensions
+            subset (Dict[str, List[str]], optional): Only add the rows whose labels, in each of the
+                given columns, are among the given labels
+            **constants: Any additional columns to be filled with a constant value
+        """
+        data = data.data if isinstance(data, OSeMOSYSData) else data
+
+        part = {}
+        if isinstance(data, ComposedData):
+            codes = np.nonzero(data.mask)
+            part["VALUE"] = data.values[codes]
+            for name, dim, c in zip(columns, data.dims, codes):
+                part[name] = np.asarray(data.coords[dim], dtype=object)[c]
+        else:
+            paths, values = flatten_nested(data)
+            part["VALUE"] = pd.Series(values).to_numpy()
+            for name, labels in zip(columns, zip(*paths)):
+                part[name] = np.asarray(labels, dtype=object)
+
+        if subset:
+            rows = np.logical_and.reduce(
+                [np.isin(part[name], list(labels)) for name, labels in subset.items()]
+            )
+            part = {name: array[rows] for name, array in part.items()}
+
+        n_rows = len(part["VALUE"])
+        for name, value in constants.items():
+            part[name] = value
+        self._parts[stem].append((n_rows, part))
+
+    def to_dataframe(self, stem: str) -> pd.DataFrame:
+        """
+        Build the dataframe of a stem from all the data added to it.
+
+        Args:
+            stem (str): The otoole stem
+
+        Returns:
+            pd.DataFrame: The long-format data of the stem, or an empty dataframe with the stem's
+            columns if no data has been added
+        """
+        columns = self.otoole_stems[stem]["columns"]
+        parts = self._parts.get(stem)
+        if not parts:
+            return pd.DataFrame(columns=columns)
+
+        n_rows = np.array([n for n, _ in parts])
+        arrays = {}
+        for column in columns:
+            if column == "VALUE":
+                arrays[column] = _concat_values([part[column] for _, part in parts])
+            elif isinstance(parts[0][1][column], np.ndarray):
+                arrays[column] = np.concatenate([part[column] for _, part in parts])
+            else:
+                # constant-valued column, repeated for the rows of each part
+                constant = np.empty(len(parts), dtype=object)
+                constant[:] = [part[column] for _, part in parts]
+                arrays[column] = pd.Series(np.repeat(constant, n_rows)).infer_objects()
+
+        return pd.DataFrame(arrays, columns=columns)
+
+    def to_dataframes(self) -> Dict[str, pd.DataFrame]:
+        """
+        Build the dataframes of all the stems to which data has been added.
+        """
+        return {stem: self.to_dataframe(stem) for stem in self.otoole_stems if stem in self}
+
+
+def write_csvs(
+    dfs: Dict[str, pd.DataFrame], output_directory: str, max_workers: Optional[int] = None
+):
+    """
+    Write a number of dataframes to csvs concurrently, one csv per stem.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): A dictionary of stem to dataframe
+        output_directory (str): Path to the directory in which to write the csvs
+        max_workers (int, optional): Maximum number of threads used to write the csvs
+    """
+
+    def _write(stem):
+        dfs[stem].to_csv(os.path.join(output_directory, f"{stem}.csv"), index=False)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # consume the results to raise any exceptions
+        list(pool.map(_write, dfs))
+
+
+def _polars_labels(name: str, series: pd.Series, dtype: Any) -> pl.Series:
+    # only the distinct labels of the column are converted, and gathered by the codes of its rows
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, labels = pd.factorize(series)
+    indices = pl.Series(codes)
+    indices = pl.select(pl.when(indices >= 0).then(indices)).to_series()
+    labels = pl.Series(name, labels.astype(str).to_numpy(dtype=object), dtype=pl.String)
+    return labels.gather(indices).cast(dtype)
+
+
+def pandas_to_polars(df: pd.DataFrame, stem: str) -> pl.DataFrame:
+    """
+    Convert the dataframe of an otoole stem to a polars table with the dtype schema given by
+    `otoole_dtypes`, column by column so that no pyarrow is needed.
+
+    Named set columns are stored as (dictionary-encoded) categoricals and YEAR and
+    MODE_OF_OPERATION as integers. Any other non-numeric column (e.g. time set members) is stored
+    as integers where all its labels are integers, as it would be inferred from a csv, and as
+    strings otherwise. Only the distinct labels of categorical and string columns are converted.
+
+    Args:
+        df (pd.DataFrame): The long-format data of the stem
+        stem (str): The otoole stem
+
+    Returns:
+        pl.DataFrame: The typed table
+    """
+    dtypes = otoole_dtypes(stem)
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        dtype = dtypes.get(name)
+        if dtype == "category":
+            columns.append(_polars_labels(name, series, pl.Categorical))
+        elif dtype == "int64":
+            columns.append(pl.Series(name, series.astype("int64").to_numpy()))
+        elif dtype == "str":
+            columns.append(_polars_labels(name, series, pl.String))
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns.append(pl.Series(name, series.to_numpy()))
+        else:
+            try:
+                columns.append(pl.Series(name, pd.to_numeric(series).to_numpy()))
+            except (ValueError, TypeError):
+                columns.append(_polars_labels(name, series, pl.String))
+    return pl.DataFrame(columns)
+
+
+def write_parquets(
+    dfs: Dict[str, pd.DataFrame], output_directory: str, max_workers: Optional[int] = None
+):
+    """
+    Write a number of dataframes to parquet tables concurrently, one table per stem.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): A dictionary of stem to dataframe
+        output_directory (str): Path to the directory in which to write the tables
+        max_workers (int, optional): Maximum number of threads used to write the tables
+    """
+
+    def _write(stem):
+        pandas_to_polars(dfs[stem], stem).write_parquet(
+            os.path.join(output_directory, f"{stem}.parquet")
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # consume the results to raise any exceptions
+        list(pool.map(_write, dfs))
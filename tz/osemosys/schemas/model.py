@@ -1,9 +1,13 @@
 import warnings
+from collections.abc import Mapping
 from typing import Any, List
 
+import numpy as np
+import pandas as pd
 from pydantic import Field, model_validator
 
 from tz.osemosys.defaults import defaults
+from tz.osemosys.schemas.aggregation import aggregate_timeslices, select_milestone_years
 from tz.osemosys.schemas.base import (
     OSeMOSYSBase,
     OSeMOSYSData,
@@ -32,7 +36,6 @@ from tz.osemosys.schemas.validation.technology_validation import (
     validate_technologies_reserve_margin_tag,
     validate_technology_production_target_commodities,
 )
-from tz.osemosys.utils import merge, recursive_keys
 
 # filter this pandas-3 dep warning for now
 warnings.filterwarnings("ignore", "\nPyarrow", DeprecationWarning)
@@ -214,6 +217,37 @@ class RunSpec(OSeMOSYSBase, RunSpecOtoole):
 
     run_spec_object = load_model(path_to_yaml)
     ```
+
+    ### Aggregating timeslices
+
+    A spec with high-resolution timeslices (e.g. 8760 hours) can be reduced to representative
+    periods (e.g. 12 representative days), clustered on its demand and capacity factor profiles.
+    The representative timeslice of each original timeslice is returned with the reduced spec, to
+    expand results back to the original timeslices:
+
+    ```python
+    from tz.osemosys.schemas.aggregation import disaggregate_timeslices
+
+    reduced, timeslice_map = run_spec_object.aggregate_timeslices(12, period_length=24)
+    ```
+
+    ### Estimating the model size
+
+    The size of the linopy model of a spec can be estimated before it is built, with the number
+    of variables, constraints and nonzeros, and the memory of its largest blocks:
+
+    ```python
+    run_spec_object.estimate_size()
+    ```
+
+    ### Milestone years
+
+    A spec with annual years can be reduced to milestone years (e.g. every fifth year), each
+    weighted by the number of years it represents:
+
+    ```python
+    milestones = run_spec_object.select_milestone_years(range(2025, 2071, 5))
+    ```
     """
 
     # COMPONENTS
@@ -245,6 +279,58 @@ class RunSpec(OSeMOSYSBase, RunSpecOtoole):
     # REGION GROUPS
     # -------
 
+    def aggregate_timeslices(
+        self,
+        n_periods: int,
+        period_length: int = 24,
+        method: str = "kmeans",
+        seed: int = 0,
+    ):
+        """
+        Aggregate the timeslices of the spec into `n_periods` representative periods of
+        `period_length` timeslices, clustered with k-means or k-medoids on the timeslice profiles
+        (e.g. `demand_profile` and `capacity_factor`). See
+        `tz.osemosys.schemas.aggregation.aggregate_timeslices`.
+
+        Returns the aggregated spec and the representative timeslice of each original timeslice,
+        for use with `tz.osemosys.schemas.aggregation.disaggregate_timeslices`.
+        """
+        return aggregate_timeslices(
+            self, n_periods, period_length=period_length, method=method, seed=seed
+        )
+
+    def select_milestone_years(self, years: List[int]):
+        """
+        Reduce the spec to the milestone `years`, each weighted by the number of years up to the
+        next milestone year. See `tz.osemosys.schemas.aggregation.select_milestone_years`.
+        """
+        return select_milestone_years(self, years)
+
+    def estimate_size(self) -> pd.DataFrame:
+        """
+        Estimate the variable, constraint and nonzero counts and the memory of the largest blocks
+        of the linopy model of the spec, from the sizes of its sets and the sparsity of its
+        parameters, without building the model. See `tz.osemosys.model.size.estimate_size`.
+        """
+        # the model layer builds on the schemas, so it is only imported when it is used
+        from tz.osemosys.model.dataset import compile_dataset
+        from tz.osemosys.model.size import estimate_size
+
+        return estimate_size(compile_dataset(self))
+
+    def _regional_discount_rate(self, regions: List[str]) -> np.ndarray:
+        # composed discount rate for each region, or the default value
+        return np.array(
+            [
+                (
+                    self.discount_rate.data.get(region)
+                    if self.discount_rate.data.get(region) is not None
+                    else defaults.discount_rate
+                )
+                for region in regions
+            ]
+        )
+
     def maybe_mixin_discount_rate_idv(self):
         regions = [region.id for region in self.regions]
         technologies = [technology.id for technology in self.technologies]
@@ -257,28 +343,18 @@ class RunSpec(OSeMOSYSBase, RunSpecOtoole):
             if isinstance(self.cost_of_capital.data, float):
                 # if cost_of_capital is a float, return it, it'll cast on composition
                 return OSeMOSYSData.RT(self.cost_of_capital.data)
-            elif isinstance(self.cost_of_capital.data, dict):
-                all_data = {
-                    region: {technology: None for technology in technologies} for region in regions
-                }
-
+            elif isinstance(self.cost_of_capital.data, Mapping):
                 # first compose to fill any wild vals
                 composed_cost_of_capital = _check_set_membership(
                     "cost_of_capital",
                     self.cost_of_capital.data,
                     {"regions": regions, "technologies": technologies},
                 )
-                all_data = merge(all_data, composed_cost_of_capital)
 
                 # mix back in any discount rates or the default value
-                for region, technology in recursive_keys(all_data):
-                    if all_data[region][technology] is None:
-                        if self.discount_rate.data[region] is not None:
-                            all_data[region][technology] = self.discount_rate.data[region]
-                        else:
-                            all_data[region][technology] = defaults.discount_rate
-
-                return OSeMOSYSData.RT(all_data)
+                return OSeMOSYSData.RT(
+                    composed_cost_of_capital.fillna(self._regional_discount_rate(regions)[:, None])
+                )
 
             else:
                 raise ValueError(f"Wrong datatype for cost_of_capital: {self.cost_of_capital.data}")
@@ -296,26 +372,20 @@ class RunSpec(OSeMOSYSBase, RunSpecOtoole):
             if isinstance(self.cost_of_capital_storage.data, float):
                 # if cost_of_capital is a float, return it, it'll cast on composition
                 return OSeMOSYSData.RO(self.cost_of_capital_storage.data)
-            elif isinstance(self.cost_of_capital_storage.data, dict):
-                all_data = {region: {sto: None for sto in storage_techs} for region in regions}
-
+            elif isinstance(self.cost_of_capital_storage.data, Mapping):
                 # first compose to fill any wild vals
                 composed_cost_of_capital_storage = _check_set_membership(
                     "cost_of_capital_storage",
                     self.cost_of_capital_storage.data,
                     {"regions": regions, "storage": storage_techs},
                 )
-                all_data = merge(all_data, composed_cost_of_capital_storage)
 
                 # mix back in any discount rates or the default value
-                for region, sto in recursive_keys(all_data):
-                    if all_data[region][sto] is None:
-                        if self.discount_rate.data[region] is not None:
-                            all_data[region][sto] = self.discount_rate.data[region]
-                        else:
-                            all_data[region][sto] = defaults.discount_rate
-
-                return OSeMOSYSData.RO(all_data)
+                return OSeMOSYSData.RO(
+                    composed_cost_of_capital_storage.fillna(
+                        self._regional_discount_rate(regions)[:, None]
+                    )
+                )
 
             else:
                 raise ValueError(
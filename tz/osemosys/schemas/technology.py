@@ -77,7 +77,7 @@ class OperatingMode(OSeMOSYSBase):
     @field_serializer("emission_activity_ratio")
     def osemosysdata_serializer(self, value: Any) -> Any:
         if isinstance(value, OSeMOSYSData):
-            return value.data
+            return value.model_dump()["data"]
         return value
 
     input_activity_ratio: OSeMOSYSData.RCY | None = Field(None)
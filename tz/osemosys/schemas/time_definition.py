@@ -360,6 +360,13 @@ class TimeDefinition(OSeMOSYSBase, OtooleTimeDefinition):
     `timeslice_in_season` `({timeslice:season})`: OSeMOSYS Conversionls.
     Optional, constructed if not provided.
 
+    `year_weight` `({year:float})`: The number of years represented by each model year, for
+    milestone-year models in which only selected years (e.g. every five years) are modelled.
+    Operating costs, emissions and model period activity are weighted by it, and capacity is
+    available in each model year for the share of the years it represents within its operational
+    life. Optional, defaults to `None`, with each model year representing itself only. See
+    `RunSpec.select_milestone_years`.
+
     `adj` `({str:dict})`: Parameter to manually define adjanecy for `years`, `seasons`,
     `day_types`, `daily_time_brackets`, and `timeslices`. Optional, if not providing values for
     `adj`, it is assumed that the other variables are provided in order from first to last.
@@ -434,6 +441,7 @@ class TimeDefinition(OSeMOSYSBase, OtooleTimeDefinition):
     timeslice_in_timebracket: Mapping | None
     timeslice_in_daytype: Mapping | None
     timeslice_in_season: Mapping | None
+    year_weight: Mapping | None = None
 
     adj: TimeAdjacency
     adj_inv: TimeAdjacency
@@ -447,6 +455,18 @@ class TimeDefinition(OSeMOSYSBase, OtooleTimeDefinition):
             return list(v)
         return v
 
+    @field_validator("year_weight")
+    @classmethod
+    def validate_year_weight(cls, v: Any, info: ValidationInfo) -> Any:
+        if v is None:
+            return v
+        v = {int(year): float(weight) for year, weight in v.items()}
+        if set(v) != set(info.data.get("years", [])):
+            raise ValueError("provided 'year_weight' keys do not match 'years'")
+        if any(weight < 1 for weight in v.values()):
+            raise ValueError("'year_weight' must be at least 1 for each year")
+        return v
+
     @model_validator(mode="before")
     @classmethod
     def construction_validation(cls, values: Any, info: ValidationInfo) -> Any:
@@ -1,10 +1,12 @@
 from typing import Any
 
+import numpy as np
 from pydantic import Field, model_validator
 
 from tz.osemosys.defaults import defaults
 from tz.osemosys.schemas.base import OSeMOSYSBase, OSeMOSYSData, cast_osemosysdata_value
 from tz.osemosys.schemas.compat.trade import OtooleTrade
+from tz.osemosys.utils import ComposedData
 
 
 class Trade(OSeMOSYSBase, OtooleTrade):
@@ -154,29 +156,17 @@ class Trade(OSeMOSYSBase, OtooleTrade):
         This construction must be done after composing/broadcasting
         """
 
-        for region in param.data.keys():
-            for linked_region in param.data[region].keys():
-                # linked region not defined at all eg:
-                # trade_routes={"R1": {"R2": {"COMMODITY": {"2020": True}}}}
-                if linked_region not in param.data.keys():
-                    param.data = {
-                        **param.data,
-                        **{linked_region: {region: param.data[region][linked_region]}},
-                    }
-                # linked region defined but not with matching link to first region eg:
-                # trade_routes={"R1": {"R2": {"COMMODITY": {"2020": True}}},
-                #               "R2": {"R3": {"COMMODITY": {"2020": True}}}}
-                elif linked_region in param.data.keys():
-                    if region not in param.data[linked_region].keys():
-                        param.data = {
-                            **param.data,
-                            **{
-                                linked_region: {
-                                    **param.data[linked_region],
-                                    **{region: param.data[region][linked_region]},
-                                }
-                            },
-                        }
+        data = param.data
+        n_regions = len(data.coords[data.dims[0]])
+
+        # region pairs with any data defined, and those with only the opposite direction defined
+        pairs = data.mask.reshape(n_regions, n_regions, -1).any(axis=-1)
+        missing = pairs.T & ~pairs
+
+        values, mask = data.values.copy(), data.mask.copy()
+        values[missing] = np.swapaxes(data.values, 0, 1)[missing]
+        mask[missing] = np.swapaxes(data.mask, 0, 1)[missing]
+        param.data = ComposedData(data.dims, data.coords, values, mask)
 
         return self
 
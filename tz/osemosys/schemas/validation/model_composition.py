@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 
 
 def check_tech_producing_commodity(values):
@@ -10,9 +10,10 @@ def check_tech_producing_commodity(values):
         for technology in values.technologies:
             for tech_mode in technology.operating_modes:
                 if technology_missing and tech_mode.output_activity_ratio is not None:
-                    for region in tech_mode.output_activity_ratio.data.keys():
-                        if commodity.id in tech_mode.output_activity_ratio.data[region].keys():
-                            technology_missing = False
+                    if commodity.id in tech_mode.output_activity_ratio.data.defined_labels(
+                        "commodities"
+                    ):
+                        technology_missing = False
         if technology_missing:
             raise ValueError(f"Commodity '{commodity.id}' is not an output of any technology")
 
@@ -28,9 +29,10 @@ def check_tech_producing_impact(values):
         for technology in values.technologies:
             for tech_mode in technology.operating_modes:
                 if technology_missing and tech_mode.emission_activity_ratio is not None:
-                    for region in tech_mode.emission_activity_ratio.data.keys():
-                        if impact.id in tech_mode.emission_activity_ratio.data[region].keys():
-                            technology_missing = False
+                    if impact.id in tech_mode.emission_activity_ratio.data.defined_labels(
+                        "impacts"
+                    ):
+                        technology_missing = False
         if technology_missing:
             raise ValueError(f"Impact '{impact.id}' is not an output of any technology")
 
@@ -47,9 +49,10 @@ def check_tech_consuming_commodity(values):
             for technology in values.technologies:
                 for tech_mode in technology.operating_modes:
                     if technology_missing and tech_mode.input_activity_ratio is not None:
-                        for region in tech_mode.input_activity_ratio.data.keys():
-                            if commodity.id in tech_mode.input_activity_ratio.data[region].keys():
-                                technology_missing = False
+                        if commodity.id in tech_mode.input_activity_ratio.data.defined_labels(
+                            "commodities"
+                        ):
+                            technology_missing = False
             if technology_missing:
                 raise ValueError(
                     f"Commodity '{commodity.id}' is neither a final demand nor "
@@ -69,13 +72,11 @@ def check_tech_linked_to_storage(values):
         for technology in values.technologies:
             for mode in technology.operating_modes:
                 if mode.to_storage is not None:
-                    for region in mode.to_storage.data.keys():
-                        if storage.id in mode.to_storage.data[region].keys():
-                            techs_to_storage.append(storage.id)
+                    if storage.id in mode.to_storage.data.defined_labels("storage"):
+                        techs_to_storage.append(storage.id)
                 if mode.from_storage is not None:
-                    for region in mode.from_storage.data.keys():
-                        if storage.id in mode.from_storage.data[region].keys():
-                            techs_from_storage.append(storage.id)
+                    if storage.id in mode.from_storage.data.defined_labels("storage"):
+                        techs_from_storage.append(storage.id)
 
         if not techs_to_storage:
             raise ValueError(f"Storage '{storage.id}' has no associated to_storage technologies")
@@ -92,11 +93,7 @@ def reserve_margin_fully_defined(values):
     """
 
     # Check if any reserve_margin values are not 1 (i.e. the default value)
-    if any(
-        value != 1
-        for year_values in values.reserve_margin.data.values()
-        for value in year_values.values()
-    ):
+    if (values.reserve_margin.data.defined_values() != 1).any():
         if all(
             technology.include_in_joint_reserve_margin is None for technology in values.technologies
         ):
@@ -105,11 +102,9 @@ def reserve_margin_fully_defined(values):
                 "least one technology"
             )
         total = sum(
-            v
+            technology.include_in_joint_reserve_margin.data.defined_values().sum()
             for technology in values.technologies
             if technology.include_in_joint_reserve_margin is not None
-            for region in technology.include_in_joint_reserve_margin.data.values()
-            for v in region.values()
         )
         if total == 0:
             raise ValueError(
@@ -134,13 +129,13 @@ def discount_rate_as_decimals(values):
     """
 
     if values.discount_rate is not None:
-        df = pd.json_normalize(values.discount_rate.data).iloc[:, -1]
-        assert (df.abs() < 1).all(), "discount_rate should take decimal values"
+        rates = values.discount_rate.data.defined_values()
+        assert (np.abs(rates) < 1).all(), "discount_rate should take decimal values"
     if values.cost_of_capital is not None:
-        df = pd.json_normalize(values.cost_of_capital.data).iloc[:, -1]
-        assert (df.abs() < 1).all(), "cost_of_capital should take decimal values"
+        rates = values.cost_of_capital.data.defined_values()
+        assert (np.abs(rates) < 1).all(), "cost_of_capital should take decimal values"
     if values.cost_of_capital_storage is not None:
-        df = pd.json_normalize(values.cost_of_capital_storage.data).iloc[:, -1]
-        assert (df.abs() < 1).all(), "cost_of_capital_storage should take decimal values"
+        rates = values.cost_of_capital_storage.data.defined_values()
+        assert (np.abs(rates) < 1).all(), "cost_of_capital_storage should take decimal values"
 
     return values
@@ -1,6 +1,7 @@
-from collections import defaultdict
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from tz.osemosys.schemas.validation.validation_utils import check_min_vals_lower_max
 
 if TYPE_CHECKING:
@@ -95,8 +96,7 @@ def validate_technology_production_target_commodities(technology: "Technology")
     commodities = set()
     for mode in technology.operating_modes:
         if mode.output_activity_ratio is not None:
-            for values in mode.output_activity_ratio.data.values():
-                commodities.update(values.keys())
+            commodities.update(mode.output_activity_ratio.data.defined_labels("commodities"))
 
     if not commodities and (
         technology.production_target_max is not None or technology.production_target_min is not None
@@ -107,22 +107,20 @@ def validate_technology_production_target_commodities(technology: "Technology")
         )
 
     if technology.production_target_max is not None:
-        for values in technology.production_target_max.data.values():
-            for commodity in values:
-                if commodity not in commodities:
-                    raise ValueError(
-                        f"Technology '{technology.id}' has a production target defined for "
-                        f"commodity '{commodity}', but it does not produce this commodity."
-                    )
+        for commodity in technology.production_target_max.data.defined_labels("commodities"):
+            if commodity not in commodities:
+                raise ValueError(
+                    f"Technology '{technology.id}' has a production target defined for "
+                    f"commodity '{commodity}', but it does not produce this commodity."
+                )
 
     if technology.production_target_min is not None:
-        for values in technology.production_target_min.data.values():
-            for commodity in values:
-                if commodity not in commodities:
-                    raise ValueError(
-                        f"Technology '{technology.id}' has a production target defined for "
-                        f"commodity '{commodity}', but it does not produce this commodity."
-                    )
+        for commodity in technology.production_target_min.data.defined_labels("commodities"):
+            if commodity not in commodities:
+                raise ValueError(
+                    f"Technology '{technology.id}' has a production target defined for "
+                    f"commodity '{commodity}', but it does not produce this commodity."
+                )
 
 
 def validate_technologies_production_targets_values(
@@ -131,28 +129,29 @@ def validate_technologies_production_targets_values(
     """Check that the sum of all minimum production targets at each node for each commodity
     in each year is less than or equal to 1.0.
     """
-    totals = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+    totals = None
     for technology in technologies:
         if technology.production_target_min is not None:
-            for node, commodities in technology.production_target_min.data.items():
-                for commodity, years in commodities.items():
-                    for year, value in years.items():
-                        totals[node][commodity][year] += value
-                        if totals[node][commodity][year] > 1.0:
-                            raise ValueError(
-                                f"Total minimum production target for {node, commodity, year} "
-                                f"exceeds 1.0."
-                            )
+            data = technology.production_target_min.data
+            values = np.where(data.mask, data.values, 0.0)
+            totals = values if totals is None else totals + values
+            if (totals > 1.0).any():
+                node, commodity, year = (
+                    data.coords[dim][idx]
+                    for dim, idx in zip(data.dims, np.argwhere(totals > 1.0)[0])
+                )
+                raise ValueError(
+                    f"Total minimum production target for {node, commodity, year} " f"exceeds 1.0."
+                )
 
 
 def validate_technologies_reserve_margin_tag(technologies: list["Technology"]) -> None:
     """Check that if include_in_joint_reserve_margin is defined, it takes values between 0 and 1."""
     for technology in technologies:
         if technology.include_in_joint_reserve_margin is not None:
-            for region_values in technology.include_in_joint_reserve_margin.data.values():
-                for value in region_values.values():
-                    if not (0.0 <= value <= 1.0):
-                        raise ValueError(
-                            f"include_in_joint_reserve_margin for technology '{technology.id}' "
-                            f"must be between 0 and 1 inclusive."
-                        )
+            values = technology.include_in_joint_reserve_margin.data.defined_values()
+            if not ((values >= 0.0) & (values <= 1.0)).all():
+                raise ValueError(
+                    f"include_in_joint_reserve_margin for technology '{technology.id}' "
+                    f"must be between 0 and 1 inclusive."
+                )
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 
-from tz.osemosys.utils import json_dict_to_dataframe
+from tz.osemosys.utils import ComposedData, json_dict_to_dataframe
 
 
 def check_sums_one(data, leniency, cols, cols_to_groupby):
@@ -24,6 +24,15 @@ def check_min_vals_lower_max(min_data, max_data, columns):
     Returns:
         bool: True if all data in max_data is >= corresponding data in min_data, otherwise False
     """
+    # Composed data with the same dimensions can be compared directly
+    if (
+        isinstance(min_data.data, ComposedData)
+        and isinstance(max_data.data, ComposedData)
+        and min_data.data.coords == max_data.data.coords
+    ):
+        both = min_data.data.mask & max_data.data.mask
+        return bool((min_data.data.values[both] <= max_data.data.values[both]).all())
+
     # Convert JSON style data to dataframes
     min_df = json_dict_to_dataframe(min_data.data)
     max_df = json_dict_to_dataframe(max_data.data)
@@ -9,6 +9,7 @@ from tz.osemosys.utils.utils import (
     enforce_list,
     flatten,
     group_to_json,
+    group_to_json_by_root,
     isnumeric,
     json_dict_to_dataframe,
     makehash,
@@ -20,6 +21,8 @@ from tz.osemosys.utils.utils import (
     safecast_bool,
     to_df_helper,
 )
+from tz.osemosys.utils.composed import ComposedData
+from tz.osemosys.utils.wildcards import broadcast_wildcards, flatten_nested, unify_values
 
 __all__ = [
     "EnvVarLoader",
@@ -30,6 +33,7 @@ __all__ = [
     "flatten",
     "makehash",
     "group_to_json",
+    "group_to_json_by_root",
     "json_dict_to_dataframe",
     "to_df_helper",
     "isnumeric",
@@ -40,4 +44,8 @@ __all__ = [
     "safecast_bool",
     "enforce_list",
     "maybe_flatten",
+    "broadcast_wildcards",
+    "flatten_nested",
+    "unify_values",
+    "ComposedData",
 ]
@@ -0,0 +1,226 @@
+from collections.abc import Mapping
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic_core import core_schema
+
+
+def as_python(val: Any) -> Any:
+    """
+    Cast a numpy scalar to its python equivalent, returning None for NaN.
+    """
+    if isinstance(val, np.generic):
+        val = val.item()
+    if isinstance(val, float) and np.isnan(val):
+        return None
+    return val
+
+
+def as_python_list(values: np.ndarray) -> List[Any]:
+    """
+    Cast an array to a list of python scalars, returning None for NaN.
+    """
+    if values.dtype.kind == "f":
+        out = values.astype(object)
+        out[np.isnan(values)] = None
+        return out.tolist()
+    return [as_python(v) for v in values.tolist()]
+
+
+class ComposedData(Mapping):
+    """
+    Array-backed storage for composed OSeMOSYSData.
+
+    Composed data is held as a dense array over the product of its sets (`dims`), a boolean
+    `mask` of the cells which are defined, and the ordered labels of each set (`coords`).
+    Nested dict-style access (e.g. `data[region][year]`) is supported: indexing returns either a
+    view on the underlying arrays or, for the last dimension, a python scalar.
+
+    Args:
+        dims (Sequence[str]): the ordered names of the sets indexing the data
+        coords (Dict[str, List[str]]): the ordered (str) labels of each set
+        values (np.ndarray): dense array of values, with a shape matching `coords`
+        mask (np.ndarray): boolean array, True where a value is defined
+    """
+
+    def __init__(
+        self,
+        dims: Sequence[str],
+        coords: Dict[str, List[str]],
+        values: np.ndarray,
+        mask: np.ndarray,
+    ):
+        self.dims = tuple(dims)
+        self.coords = {dim: coords[dim] for dim in self.dims}
+        self.values = values
+        self.mask = mask
+        self._index = None
+
+    @classmethod
+    def from_cells(
+        cls, labels: Dict[str, List[str]], codes: np.ndarray, values: np.ndarray
+    ) -> "ComposedData":
+        """
+        Build from the set codes and values of each defined cell, as returned by
+        `broadcast_wildcards`.
+        """
+        shape = tuple(len(lbls) for lbls in labels.values())
+        if values.dtype.kind == "f":
+            dense = np.full(shape, np.nan)
+        elif values.dtype.kind == "O":
+            dense = np.full(shape, None, dtype=object)
+        else:
+            dense = np.zeros(shape, dtype=values.dtype)
+        mask = np.zeros(shape, dtype=bool)
+
+        idx = tuple(codes.T)
+        dense[idx] = values
+        mask[idx] = True
+
+        return cls(list(labels.keys()), labels, dense, mask)
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def _label_index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {label: ii for ii, label in enumerate(self.coords[self.dims[0]])}
+        return self._index
+
+    def _present(self) -> np.ndarray:
+        # first-dimension labels with any defined data
+        return self.mask.reshape(self.mask.shape[0], -1).any(axis=1)
+
+    def __getitem__(self, key: Any) -> Any:
+        ii = self._label_index().get(key)
+        if ii is None:
+            raise KeyError(key)
+        if len(self.dims) == 1:
+            if not self.mask[ii]:
+                raise KeyError(key)
+            return as_python(self.values[ii])
+        if not self.mask[ii].any():
+            raise KeyError(key)
+        return ComposedData(self.dims[1:], self.coords, self.values[ii], self.mask[ii])
+
+    def __setitem__(self, key: Any, value: Any):
+        ii = self._label_index().get(key)
+        if ii is None:
+            raise KeyError(f"{key} is not a member of '{self.dims[0]}'.")
+        if len(self.dims) == 1:
+            self.values[ii] = value
+            self.mask[ii] = True
+        else:
+            if not isinstance(value, Mapping):
+                raise ValueError(f"Data for {key} must be a mapping over {self.dims[1:]}.")
+            self.mask[ii] = False
+            sub = ComposedData(self.dims[1:], self.coords, self.values[ii], self.mask[ii])
+            for sub_key, sub_value in value.items():
+                sub[sub_key] = sub_value
+
+    def __iter__(self):
+        labels = self.coords[self.dims[0]]
+        return (labels[ii] for ii in np.flatnonzero(self._present()))
+
+    def __len__(self) -> int:
+        return int(self._present().sum())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ComposedData) and other.coords == self.coords:
+            return bool(
+                np.array_equal(self.mask, other.mask)
+                and pd.Series(self.values[self.mask]).equals(pd.Series(other.values[other.mask]))
+            )
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        shape = ", ".join(f"{dim}: {len(self.coords[dim])}" for dim in self.dims)
+        return f"ComposedData({shape}; {int(self.mask.sum())} values)"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda data: data.to_dict()
+            ),
+        )
+
+    # ------------------------------------------------------------------
+    # Array access
+    # ------------------------------------------------------------------
+
+    def cells(self) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        """
+        The set codes (one array per dimension) and values of each defined cell.
+        """
+        codes = np.nonzero(self.mask)
+        return codes, self.values[codes]
+
+    def defined_values(self) -> np.ndarray:
+        """
+        The values of each defined cell.
+        """
+        return self.values[self.mask]
+
+    def defined_labels(self, dim: str) -> List[str]:
+        """
+        The labels of `dim` for which any data is defined.
+        """
+        axis = self.dims.index(dim)
+        other_axes = tuple(ii for ii in range(len(self.dims)) if ii != axis)
+        present = self.mask.any(axis=other_axes) if other_axes else self.mask
+        return [self.coords[dim][ii] for ii in np.flatnonzero(present)]
+
+    def fillna(self, value: Any) -> "ComposedData":
+        """
+        Return fully-defined data, with any undefined or null cells filled from `value`, which is
+        broadcast against the data array.
+        """
+        missing = ~self.mask | pd.isna(self.values)
+        values = np.where(missing, value, self.values)
+        return ComposedData(self.dims, self.coords, values, np.ones_like(self.mask))
+
+    def flatten(self) -> Tuple[List[Tuple[str, ...]], List[Any]]:
+        """
+        The key paths and values of each defined cell, as per `flatten_nested`.
+        """
+        codes, values = self.cells()
+        labels = [np.asarray(self.coords[dim], dtype=object)[c] for dim, c in zip(self.dims, codes)]
+        return list(zip(*labels)), as_python_list(values)
+
+    def to_dict(self) -> Dict:
+        """
+        Materialise the data as a nested dict.
+        """
+        paths, values = self.flatten()
+        nested = {}
+        for *path, last, value in (p + (v,) for p, v in zip(paths, values)):
+            node = nested
+            for key in path:
+                node = node.setdefault(key, {})
+            node[last] = value
+        return nested
+
+    def to_dataframe(self, columns: List[str], **constants: Any) -> pd.DataFrame:
+        """
+        Long-format dataframe of the defined cells.
+
+        Args:
+            columns (List[str]): column names for each of the data dimensions
+            **constants: any additional columns to be filled with a constant value
+
+        Returns:
+            pd.DataFrame: a dataframe with columns ['VALUE', *constants, *columns]
+        """
+        codes, values = self.cells()
+        df = pd.DataFrame({"VALUE": values})
+        for name, value in constants.items():
+            df[name] = value
+        for name, dim, c in zip(columns, self.dims, codes):
+            df[name] = np.asarray(self.coords[dim], dtype=object)[c]
+        return df
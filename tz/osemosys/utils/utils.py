@@ -2,9 +2,9 @@ import importlib
 import os
 import re
 from collections import defaultdict
-from collections.abc import MutableMapping
+from collections.abc import Mapping, MutableMapping
 from itertools import chain
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 import orjson
 import pandas as pd
@@ -94,7 +94,7 @@ def recursive_items(dictionary, keys=None):
     if keys is None:
         keys = []
     for key, value in dictionary.items():
-        if type(value) is dict:
+        if isinstance(value, Mapping):
             yield from recursive_items(value, keys + [key])
         else:
             yield (tuple(keys + [key]), value)
@@ -104,7 +104,7 @@ def recursive_keys(dictionary, keys=None):
     if keys is None:
         keys = []
     for key, value in dictionary.items():
-        if type(value) is dict:
+        if isinstance(value, Mapping):
             yield from recursive_keys(value, keys + [key])
         else:
             yield (tuple(keys + [key]))
@@ -269,6 +269,46 @@ def group_to_json(
     return orjson.loads(orjson.dumps(d, option=orjson.OPT_NON_STR_KEYS))
 
 
+def group_to_json_by_root(
+    g: pd.DataFrame,
+    root_column: str,
+    data_columns: List[str],
+    target_column: str = "VALUE",
+) -> Dict[Any, Dict]:
+    """
+    Converts a DataFrame to a nested JSON-like structure for each value of its root column.
+
+    Equivalent to calling `group_to_json` on the rows of each root value in turn, but done in a
+    single pass over the rows of the DataFrame.
+
+    Args:
+        g (pd.DataFrame): The input DataFrame to be converted.
+        root_column (str): The column to group the rows by (eg. TECHNOLOGY).
+        data_columns (List[str]): List of columns representing the nested structure.
+        target_column (str): The column containing data values to be nested.
+
+    Returns:
+        Dict[Any, Dict]: A nested JSON-like Dict for each value of the root column.
+    """
+
+    if g.empty:
+        return {}
+
+    grouped = {}
+    keys = zip(*[[str(key) for key in g[c].tolist()] for c in data_columns])
+    for root, path, value in zip(g[root_column].tolist(), keys, g[target_column].tolist()):
+        node = grouped.setdefault(root, {})
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+
+    # https://github.com/ijl/orjson#opt_non_str_keys
+    return {
+        root: orjson.loads(orjson.dumps(d, option=orjson.OPT_NON_STR_KEYS))
+        for root, d in grouped.items()
+    }
+
+
 def json_dict_to_dataframe(data, prefix=""):
     """Function to convert a JSON dictionary as defined by the group_to_json()
     function into a pandas dataframe with empty column names
@@ -311,14 +351,17 @@ def add_instance_data_to_output_dfs(instance, output_dfs, otoole_stems, root_col
     If root_column is given, add root_column as a column to the instance data with values of self.id
     (to account for data from multiple instances, e.g. technology, being added to the same df)
 
+    The data of each instance is appended to a list of dfs for each output csv, so that the dfs of
+    many instances can be concatenated once rather than repeatedly.
+
     Args:
         instance (cls): Instance of a data class (such as Technology)
-        output_dfs (dict{str:df}): dict of {output_csv_name:output_data_dataframe}
+        output_dfs (dict{str:list[df]}): dict of {output_csv_name:[output_data_dataframe]}
         otoole_stems (dict): Dict of mapping otoole names to RunSpec names
         root_column (str, optional): Missing column to add (e.g. TECHNOLOGY). Defaults to None.
 
     Returns:
-        output_dfs (dict{str:df}): output_dfs with additional data added
+        output_dfs (dict{str:list[df]}): output_dfs with additional data added
     """
 
     # Iterate over otoole style csv names
@@ -341,10 +384,7 @@ def add_instance_data_to_output_dfs(instance, output_dfs, otoole_stems, root_col
                 data[root_column] = instance.id
             data = data[otoole_stems[output_file]["columns"]]
             # TODO: add casting to int for YEAR and MODE_OF_OPERATION?
-            if not output_dfs[output_file].empty:
-                output_dfs[output_file] = pd.concat([output_dfs[output_file], data])
-            else:
-                output_dfs[output_file] = data
+            output_dfs[output_file].append(data)
 
     return output_dfs
 
@@ -397,10 +437,10 @@ def to_df_helper(self):
         otoole_stems = values["otoole_stems"]
         root_column = values["root_column"]
 
-        # Create output dfs, adding to dict with filename as key
+        # Create lists of output dfs, adding to dict with filename as key
         attribute_dfs = {}
         for file in list(otoole_stems):
-            attribute_dfs[file] = pd.DataFrame(columns=otoole_stems[file]["columns"])
+            attribute_dfs[file] = []
 
         # Add data to output dfs iteratively for attributes with multiple instances (eg. impacts)
         if isinstance(getattr(self, f"{attribute}"), list):
@@ -412,7 +452,6 @@ def to_df_helper(self):
                 attribute_dfs = add_instance_data_to_output_dfs(
                     instance, attribute_dfs, otoole_stems, root_column
                 )
-            attribute_dfs[root_column] = pd.DataFrame(id_list, columns=["VALUE"])
 
         # Add data to output dfs once for single instance attributes (eg. time_definition)
         else:
@@ -420,6 +459,14 @@ def to_df_helper(self):
                 getattr(self, f"{attribute}"), attribute_dfs, otoole_stems
             )
 
+        # Concatenate the dfs of each output file once
+        for file, dfs in attribute_dfs.items():
+            attribute_dfs[file] = (
+                pd.concat(dfs) if dfs else pd.DataFrame(columns=otoole_stems[file]["columns"])
+            )
+        if isinstance(getattr(self, f"{attribute}"), list):
+            attribute_dfs[root_column] = pd.DataFrame(id_list, columns=["VALUE"])
+
         output_dfs = {**output_dfs, **attribute_dfs}
 
     return output_dfs
@@ -0,0 +1,190 @@
+from collections.abc import Mapping
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tz.osemosys.utils.composed import ComposedData, as_python
+
+WILDCARD = "*"
+
+
+def flatten_nested(data: Any) -> Tuple[List[Tuple[str, ...]], List[Any]]:
+    """
+    Flatten a nested dict into a list of key paths and a list of leaf values.
+
+    Keys are cast to str, mirroring `pd.json_normalize`. Non-dict data is treated as a single
+    wildcard entry.
+
+    Args:
+        data (Any): nested dict of {key: {key: ... value}} or a scalar value
+
+    Returns:
+        Tuple[List[Tuple[str, ...]], List[Any]]: the key paths and the corresponding leaf values
+    """
+    if isinstance(data, ComposedData):
+        return data.flatten()
+    if not isinstance(data, Mapping):
+        data = {WILDCARD: data}
+
+    paths, values = [], []
+    stack = [((), data)]
+    while stack:
+        prefix, node = stack.pop()
+        # reverse so that the depth-first traversal keeps the dict ordering
+        for key, value in reversed(list(node.items())):
+            path = prefix + (str(key),)
+            if isinstance(value, Mapping):
+                stack.append((path, value))
+            else:
+                paths.append(path)
+                values.append(value)
+
+    paths.reverse()
+    values.reverse()
+    return paths, values
+
+
+def unify_values(values: List[Any]) -> np.ndarray:
+    """
+    Unify the dtype of a list of leaf values as a single pandas column would: ints are upcast to
+    float if any float is present, and mixed types are left as python objects.
+
+    Args:
+        values (List[Any]): leaf values
+
+    Returns:
+        np.ndarray: a float (with NaN for None), int, bool, or object array of the values
+    """
+    inferred = pd.api.types.infer_dtype(values, skipna=False)
+
+    if inferred in ("floating", "mixed-integer-float"):
+        return np.asarray(values, dtype=np.float64)
+    elif inferred == "integer":
+        return np.asarray(values, dtype=np.int64)
+    elif inferred == "boolean":
+        return np.asarray(values, dtype=bool)
+
+    out = np.empty(len(values), dtype=object)
+    out[:] = [as_python(v) for v in values]
+    if all(v is None or isinstance(v, (int, float)) and not isinstance(v, bool) for v in out):
+        # numeric data with nulls
+        if any(isinstance(v, float) for v in out) or all(v is None for v in out):
+            return out.astype(np.float64)
+    return out
+
+
+def _label_index(labels: List[Any]) -> pd.Index:
+    # de-duplicate while retaining order so that get_indexer is well-defined
+    return pd.Index(list(dict.fromkeys(labels)), dtype=object)
+
+
+def broadcast_wildcards(
+    obj_id: str, data: Any, sets: Dict[str, List[Any]]
+) -> Tuple[Dict[str, List[str]], np.ndarray, np.ndarray]:
+    """
+    Broadcast wildcard ('*') keys of nested data over the members of the given sets.
+
+    Each nesting level of `data` is assigned to the first unassigned set (in the order of `sets`)
+    that contains all the explicit keys of that level. Levels that contain only wildcards are
+    assigned to the remaining sets in order, and any sets left over are broadcast in full.
+
+    A wildcard expands to all the members of its set that are not given explicitly as one of its
+    siblings, so that explicit data always takes precedence over wildcard data. The expansion is
+    done with integer set codes, so it is vectorised over all the leaves of `data`.
+
+    Args:
+        obj_id (str): id of the object owning the data, used for error messages
+        data (Any): nested dict of data, or a single value
+        sets (Dict[str, List[Any]]): ordered mapping of set name to set members
+
+    Returns:
+        Tuple[Dict[str, List[str]], np.ndarray, np.ndarray]: the (str) labels of each set, an
+        (n, len(sets)) integer array of set codes for each broadcast data point (columns ordered
+        as `sets`), and an object array of the n data values.
+    """
+    sets = {name: list(members) for name, members in sets.items()}
+    if "years" in sets:
+        sets["years"] = [str(yr) for yr in sets["years"]]
+
+    paths, values = flatten_nested(data)
+    if len(paths) == 0:
+        raise ValueError(f"Data for {obj_id} is empty.")
+
+    depth = max(len(p) for p in paths)
+    if any(len(p) != depth for p in paths):
+        raise ValueError(f"Data for {obj_id} has inconsistent nesting depth.")
+
+    keys = np.empty((len(paths), depth), dtype=object)
+    keys[:] = paths
+    is_wild = keys == WILDCARD
+
+    indexes = {name: _label_index(members) for name, members in sets.items()}
+
+    # assign each level to a set
+    unassigned = list(sets.keys())
+    level_sets = [None] * depth
+    level_codes = np.full((len(paths), depth), -1, dtype=np.int64)
+    for level in range(depth):
+        explicit = ~is_wild[:, level]
+        if not explicit.any():
+            continue
+        level_keys = keys[explicit, level]
+        for set_name in list(unassigned):
+            codes = indexes[set_name].get_indexer(level_keys)
+            if (codes >= 0).all():
+                unassigned.remove(set_name)
+                level_sets[level] = set_name
+                level_codes[explicit, level] = codes
+                break
+        else:
+            raise ValueError(
+                f"Data for {obj_id} contains set values {level_keys.tolist()} that do not match "
+                f"any set."
+            )
+
+    wildcard_levels = [level for level in range(depth) if level_sets[level] is None]
+    if len(wildcard_levels) > len(unassigned):
+        raise ValueError(
+            f"Data for {obj_id} contains more unassigned columns that there are unassigned sets."
+        )
+    for level in wildcard_levels:
+        level_sets[level] = unassigned.pop(0)
+
+    # any remaining sets are broadcast in full
+    for set_name in unassigned:
+        level_sets.append(set_name)
+    level_codes = np.hstack(
+        [level_codes, np.full((len(paths), len(unassigned)), -1, dtype=np.int64)]
+    )
+
+    # expand level-by-level. Wildcard siblings are grouped on their literal prefix.
+    row_idx = np.arange(len(paths))
+    group = np.zeros(len(paths), dtype=np.int64)
+    cell_codes = np.empty((len(paths), 0), dtype=np.int64)
+    for level, set_name in enumerate(level_sets):
+        n_members = len(indexes[set_name])
+        codes = level_codes[:, level]
+
+        present = np.zeros((group.max() + 1, n_members), dtype=bool)
+        explicit = codes >= 0
+        present[group[explicit], codes[explicit]] = True
+
+        allowed = ~present[group]
+        allowed[explicit] = False
+        allowed[np.flatnonzero(explicit), codes[explicit]] = True
+
+        rows, members = np.nonzero(allowed[row_idx])
+        row_idx = row_idx[rows]
+        cell_codes = np.hstack([cell_codes[rows], members[:, None]])
+
+        # group on the literal prefix including this level, with 0 for a wildcard: the mixed-radix
+        # key is re-densified at each level, so that it stays below the number of paths
+        _, group = np.unique(group * (n_members + 1) + (codes + 1), return_inverse=True)
+
+    # reorder the code columns from nesting order to set order
+    order = [level_sets.index(set_name) for set_name in sets.keys()]
+    cell_codes = cell_codes[:, order]
+
+    labels = {name: [str(member) for member in index] for name, index in indexes.items()}
+    return labels, cell_codes, unify_values(values)[row_idx]